@@ -1,40 +1,86 @@
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import ValidationError
 import streamlit as st
 
-from src.config import settings
-from src.core.graph import create_graph
+from src.config import get_settings
+from src.core.aquecimento import recursos_compartilhados
+from src.core.checkpoint import config_sessao, entrada_turno, estado_sessao, nova_sessao
+from src.core.limitador import identificar_cliente
+from src.core.state import estado_inicial
+from src.core.streaming import stream_resposta
+
+MENSAGEM_BOAS_VINDAS = "Olá! Bem-vindo ao **Banco Ágil** 👋\n\nPara garantir sua segurança e acessar seus serviços, informe seu **CPF**."
+
+MENSAGENS_FERRAMENTA = {
+    "consultar_limite_credito": "💳 Consultando seu limite...",
+    "solicitar_aumento_limite": "📝 Analisando sua solicitação de aumento...",
+    "calcular_novo_score": "📊 Recalculando seu score...",
+    "consultar_cotacao_moeda": "💱 Consultando a cotação...",
+    "encerrar_atendimento": "👋 Encerrando o atendimento..."
+}
+
+
+def resumo_estado(estado: dict) -> dict:
+    """Campos do estado exibidos na barra lateral (o histórico fica no checkpointer)."""
+    resumo = {**estado_inicial(), **estado}
+    resumo.pop("messages")
+    return resumo
+
+
+def restaurar_conversa():
+    """Recarrega do checkpointer a conversa da sessão atual (ex: após reiniciar o servidor)."""
+    estado = estado_sessao(st.session_state.graph, st.session_state.thread_id)
+    st.session_state.agent_state = resumo_estado(estado)
+    st.session_state.messages = []
+    st.session_state.chat_started = False
+
+    if estado.get("messages"):
+        st.session_state.messages.append({"role": "assistant", "content": MENSAGEM_BOAS_VINDAS})
+        for mensagem in estado["messages"]:
+            if isinstance(mensagem, HumanMessage):
+                st.session_state.messages.append({"role": "user", "content": mensagem.content})
+            elif isinstance(mensagem, AIMessage) and mensagem.content:
+                st.session_state.messages.append({"role": "assistant", "content": mensagem.content})
+        st.session_state.chat_started = True
+
+
+def iniciar_nova_sessao():
+    """Inicia uma nova conversa, com um novo thread_id no checkpointer."""
+    st.session_state.thread_id = nova_sessao()
+    st.query_params["sessao"] = st.session_state.thread_id
+    st.session_state.messages = []
+    st.session_state.agent_state = resumo_estado({})
+    st.session_state.chat_started = False
+
+
+@st.cache_resource(show_spinner="Preparando o atendimento...")
+def obter_graph():
+    """Grafo compilado e cliente do LLM compartilhados por todas as sessões do processo."""
+    return recursos_compartilhados()
 
 
 def initialize_session_state():
     """Inicializa o estado da sessão do Streamlit."""
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-
-    if "agent_state" not in st.session_state:
-        st.session_state.agent_state = {
-            "messages": [],
-            "current_agent": "triagem",
-            "authenticated": False,
-            "cpf": None,
-            "nome_cliente": None,
-            "limite_credito": None,
-            "score": None,
-            "authentication_attempts": 0,
-            "pending_redirect": None,
-            "interview_data": None,
-            "should_end": False,
-            "temp_cpf": None,
-            "temp_data_nascimento": None
-        }
-
     if "graph" not in st.session_state:
+        try:
+            settings = get_settings()
+        except ValidationError:
+            st.error("ERRO: OPENAI_API_KEY não encontrada no arquivo .env")
+            st.stop()
         if not settings.is_configured:
             st.error("ERRO: OPENAI_API_KEY não encontrada no arquivo .env")
             st.stop()
-        st.session_state.graph = create_graph(settings.openai_api_key)
-
-    if "chat_started" not in st.session_state:
-        st.session_state.chat_started = False
+        # Apenas uma referência ao grafo compartilhado: nada é recriado por sessão
+        st.session_state.graph = obter_graph()
+
+    if "thread_id" not in st.session_state:
+        # O id da conversa fica na URL: recarregar a página retoma a mesma conversa
+        thread_id = st.query_params.get("sessao")
+        if thread_id:
+            st.session_state.thread_id = thread_id
+            restaurar_conversa()
+        else:
+            iniciar_nova_sessao()
 
 
 def display_chat_messages():
@@ -44,18 +90,34 @@ def display_chat_messages():
             st.markdown(message["content"])
 
 
-def process_user_input(user_input: str):
-    """Processa a entrada do usuário e obtém a resposta do chatbot."""
+def process_user_input(user_input: str, placeholder):
+    """Processa a entrada do usuário exibindo a resposta do chatbot em streaming."""
     previous_authenticated = st.session_state.agent_state.get("authenticated", False)
     previous_limite = st.session_state.agent_state.get("limite_credito")
     previous_score = st.session_state.agent_state.get("score")
     previous_nome = st.session_state.agent_state.get("nome_cliente")
 
-    st.session_state.agent_state["messages"].append(HumanMessage(content=user_input))
+    graph = st.session_state.graph
+    thread_id = st.session_state.thread_id
+
+    try:
+        placeholder.markdown("⏳ Processando...")
+        result = None
+        # Apenas a nova mensagem é enviada: o restante do estado vem do checkpointer
+        cliente_id = identificar_cliente(
+            st.context.ip_address, st.context.headers.get("X-Forwarded-For"), thread_id,
+            get_settings().trusted_proxy_ips
+        )
+        entrada = entrada_turno(graph, thread_id, user_input, cliente_id)
+        for evento in stream_resposta(graph, entrada, config_sessao(thread_id)):
+            if evento["tipo"] == "token":
+                placeholder.markdown(evento["texto"] + "▌")
+            elif evento["tipo"] == "ferramenta":
+                placeholder.markdown(MENSAGENS_FERRAMENTA.get(evento["nome"], "⏳ Processando..."))
+            elif evento["tipo"] == "final":
+                result = evento["estado"]
 
-    try:        
-        result = st.session_state.graph.invoke(st.session_state.agent_state)
-        st.session_state.agent_state = result
+        st.session_state.agent_state = resumo_estado(result)
 
         current_authenticated = result.get("authenticated", False)
         current_limite = result.get("limite_credito")
@@ -115,23 +177,7 @@ def main():
         st.divider()
 
         if st.button("🔄 Nova Conversa", use_container_width=True):
-            st.session_state.messages = []
-            st.session_state.agent_state = {
-                "messages": [],
-                "current_agent": "triagem",
-                "authenticated": False,
-                "cpf": None,
-                "nome_cliente": None,
-                "limite_credito": None,
-                "score": None,
-                "authentication_attempts": 0,
-                "pending_redirect": None,
-                "interview_data": None,
-                "should_end": False,
-                "temp_cpf": None,
-                "temp_data_nascimento": None
-            }
-            st.session_state.chat_started = False
+            iniciar_nova_sessao()
             if "estado_limpo" in st.session_state:
                 del st.session_state.estado_limpo
             st.rerun()
@@ -139,7 +185,7 @@ def main():
     if not st.session_state.chat_started:
         st.session_state.messages.append({
             "role": "assistant",
-            "content": "Olá! Bem-vindo ao **Banco Ágil** 👋\n\nPara garantir sua segurança e acessar seus serviços, informe seu **CPF**."
+            "content": MENSAGEM_BOAS_VINDAS
         })
         st.session_state.chat_started = True
 
@@ -175,9 +221,9 @@ def main():
             st.markdown(user_input)
     
         with st.chat_message("assistant"):
-            with st.spinner("Processando..."):
-                response, state_changed = process_user_input(user_input)
-            st.markdown(response)
+            placeholder = st.empty()
+            response, state_changed = process_user_input(user_input, placeholder)
+            placeholder.markdown(response)
 
         st.session_state.messages.append({
             "role": "assistant",
@@ -1,16 +1,78 @@
+from typing import Dict, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_openai import ChatOpenAI
 
-from src.config import settings
+from src.config import get_settings
+from src.config.settings import MENSAGEM_SEM_CHAVE
+from src.core.admissao import LLMComAdmissao, get_controlador_admissao
+from src.core.cache import CacheRespostasLLM
+from src.core.ferramentas import ExecutorFerramentas
+from src.core.instrumentacao import instrumentar_runnable
+from src.core.prazo import LLMComPrazo
 from src.tools import tools_list
 
+AGENTES = ("triagem", "credito", "entrevista", "cambio")
+
 
 class BancoAgilAgents:
-    """Classe base para gerenciar os agentes."""
+    """Classe base para gerenciar os agentes.
+
+    Cada agente usa o modelo configurado para ele (`Settings.modelo_agente`); agentes
+    com o mesmo modelo compartilham o mesmo cliente.
+    """
+
+    def __init__(self, openai_api_key: Optional[str], llm: Optional[BaseChatModel] = None,
+                 llms: Optional[Dict[str, BaseChatModel]] = None):
+        settings = get_settings()
+        clientes: Dict[str, BaseChatModel] = {}
+
+        def cliente(modelo: str) -> BaseChatModel:
+            if modelo not in clientes:
+                if not openai_api_key:
+                    raise ValueError(MENSAGEM_SEM_CHAVE)
+                clientes[modelo] = ChatOpenAI(
+                    model=modelo,
+                    temperature=settings.llm_temperature,
+                    api_key=openai_api_key,
+                    timeout=settings.llm_request_timeout_seconds,
+                    max_retries=settings.llm_max_retries
+                )
+            return clientes[modelo]
+
+        # Um modelo já instanciado (ex: LLM roteirizado dos benchmarks) substitui os da OpenAI;
+        # `llms` substitui apenas o dos agentes informados
+        llms = llms or {}
+        self.llms: Dict[str, BaseChatModel] = {
+            agente: llms.get(agente) or (llm if llm is not None else cliente(settings.modelo_agente(agente)))
+            for agente in AGENTES
+        }
+        # Com o modelo de todos os agentes injetado, nenhum cliente da OpenAI (nem a chave) é necessário
+        if llm is None and all(agente in llms for agente in AGENTES):
+            llm = self.llms["triagem"]
+        self.llm = llm if llm is not None else cliente(settings.llm_model)
+
+        # As chamadas de todos os agentes passam pelo mesmo controle de admissão do processo;
+        # dentro dele, cada requisição recebe como timeout o que resta do prazo do turno
+        controlador = get_controlador_admissao()
+        com_ferramentas: Dict[int, BaseChatModel] = {}
+        for modelo in [self.llm, *self.llms.values()]:
+            if id(modelo) not in com_ferramentas:
+                instrumentar_runnable(modelo)
+                vinculado = LLMComPrazo(modelo.bind_tools(tools_list))
+                com_ferramentas[id(modelo)] = (
+                    LLMComAdmissao(vinculado, controlador) if controlador is not None else vinculado
+                )
+        self.llm_with_tools = com_ferramentas[id(self.llm)]
+        self.llms_with_tools: Dict[str, BaseChatModel] = {
+            agente: com_ferramentas[id(modelo)] for agente, modelo in self.llms.items()
+        }
 
-    def __init__(self, openai_api_key: str):
-        self.llm = ChatOpenAI(
-            model=settings.llm_model,
-            temperature=settings.llm_temperature,
-            api_key=openai_api_key
+        self.cache = CacheRespostasLLM(
+            max_entradas=settings.llm_cache_max_entries,
+            ttl_segundos=settings.llm_cache_ttl_seconds
+        ) if settings.llm_cache_enabled else None
+        self.executor_ferramentas = ExecutorFerramentas(
+            timeout_segundos=settings.tool_timeout_seconds,
+            max_paralelo=settings.tool_max_parallel
         )
-        self.llm_with_tools = self.llm.bind_tools(tools_list)
@@ -1,27 +1,24 @@
+import asyncio
+from datetime import datetime
 import logging
-from typing import Dict, Any
+import re
+import unicodedata
+from typing import Dict, Any, List, Optional
 
-from langchain_core.messages import AIMessage, SystemMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
+from src.core.cache import CacheRespostasLLM
+from src.core.ferramentas import ChamadaFerramenta, ExecutorFerramentas, ResultadoFerramenta
+from src.core.prazo import PrazoEsgotado, achamar_com_prazo, chamar_com_prazo, tempo_restante
 from src.core.state import AgentState
 from src.tools.atendimento import encerrar_atendimento
-from src.tools.cambio import consultar_cotacao_moeda
+from src.tools.cambio import consultar_cotacao_moeda, ultima_cotacao
 
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
-class AgenteCambio:
-    """Agente de Câmbio - Consulta cotações."""
-
-    def __init__(self, llm, llm_with_tools):
-        self.llm = llm
-        self.llm_with_tools = llm_with_tools
-
-    def process(self, state: AgentState) -> Dict[str, Any]:
-        """Processa a requisição do agente de câmbio."""
-        try:
-            system_prompt = """Você é o Agente de Câmbio do Banco Ágil.
+SYSTEM_PROMPT = """Você é o Agente de Câmbio do Banco Ágil.
 
 Suas responsabilidades:
 1. Consultar cotação de moedas usando 'consultar_cotacao_moeda'
@@ -34,39 +31,157 @@ IMPORTANTE:
 - Seja cordial e objetivo
 - Se o cliente desejar encerrar, use a ferramenta encerrar_atendimento
 - Se o cliente perguntar sobre OUTROS ASSUNTOS (não relacionados a moedas), informe educadamente que você só atende consultas de câmbio
+- Se a mensagem trouxer câmbio junto com outros assuntos (ex: limite de crédito), atenda apenas a parte de câmbio: o restante é respondido por outro agente
 
 Cliente autenticado: {nome}
 """
 
-            messages = [
-                SystemMessage(content=system_prompt.format(
-                    nome=state.get("nome_cliente", "")
-                ))
-            ] + list(state["messages"])
+PERGUNTA_CONTINUAR = "Deseja consultar outra moeda ou posso ajudar com algo mais?"
+
+MENSAGEM_FERRAMENTA_INDISPONIVEL = (
+    "Não foi possível consultar a cotação no momento. Por favor, tente novamente em alguns instantes."
+)
+
+MENSAGEM_PRAZO_ESGOTADO = "A consulta está demorando mais que o esperado."
+
+# Nomes de moeda reconhecidos sem o LLM, usados na contingência por falta de tempo
+MOEDAS_POR_NOME = {
+    "dolar": "USD", "dolares": "USD", "usd": "USD",
+    "euro": "EUR", "euros": "EUR", "eur": "EUR",
+    "libra": "GBP", "libras": "GBP", "gbp": "GBP",
+    "iene": "JPY", "ienes": "JPY", "jpy": "JPY",
+    "peso": "ARS", "pesos": "ARS", "ars": "ARS",
+}
+
 
-            response = self.llm_with_tools.invoke(messages)
+def moedas_citadas(texto: str) -> List[str]:
+    """Códigos das moedas citadas no texto, na ordem, sem repetição."""
+    sem_acentos = unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode()
+    moedas = []
+    for palavra in re.findall(r"[a-z]+", sem_acentos):
+        moeda = MOEDAS_POR_NOME.get(palavra)
+        if moeda is not None and moeda not in moedas:
+            moedas.append(moeda)
+    return moedas
 
-            updates = {"current_agent": "cambio"}
 
-            if response.tool_calls:
-                for tool_call in response.tool_calls:
-                    if tool_call["name"] == "consultar_cotacao_moeda":
-                        result = consultar_cotacao_moeda.invoke(tool_call["args"])
-                        response = AIMessage(
-                            content=result["mensagem"] + "\n\nDeseja consultar outra moeda ou posso ajudar com algo mais?"
-                        )
+def _e_chamada_ferramenta(resposta: AIMessage) -> bool:
+    """Só chamadas de ferramenta vão para o cache: textos livres podem citar o cliente."""
+    return bool(resposta.tool_calls)
 
-                    elif tool_call["name"] == "encerrar_atendimento":
-                        result = encerrar_atendimento.invoke({})
-                        updates["should_end"] = True
-                        response = AIMessage(content=result["mensagem"])
 
-            updates["messages"] = [response]
-            return updates
+class AgenteCambio:
+    """Agente de Câmbio - Consulta cotações."""
+
+    def __init__(self, llm, llm_with_tools, cache: Optional[CacheRespostasLLM] = None,
+                 executor: Optional[ExecutorFerramentas] = None):
+        self.llm = llm
+        self.llm_with_tools = llm_with_tools
+        self.cache = cache
+        self.executor = executor if executor is not None else ExecutorFerramentas()
+
+    def process(self, state: AgentState) -> Dict[str, Any]:
+        """Processa a requisição do agente de câmbio."""
+        try:
+            messages = self._montar_mensagens(state)
+            if self.cache is not None:
+                chave = self.cache.chave(SYSTEM_PROMPT, messages[1:])
+                response = chamar_com_prazo(state, "cambio", self.cache.invocar,
+                                            self.llm_with_tools, messages, chave, _e_chamada_ferramenta)
+            else:
+                response = chamar_com_prazo(state, "cambio", self.llm_with_tools.invoke, messages)
+            return self._processar_resposta(state, response)
+        except PrazoEsgotado:
+            return self._resposta_prazo_esgotado(state)
+        except Exception as e:
+            logger.error(f"Erro no agente de câmbio: {str(e)}", exc_info=True)
+            return self._resposta_erro()
+
+    async def aprocess(self, state: AgentState) -> Dict[str, Any]:
+        """Processa a requisição do agente de câmbio sem bloquear o event loop."""
+        try:
+            messages = self._montar_mensagens(state)
+            if self.cache is not None:
+                chave = self.cache.chave(SYSTEM_PROMPT, messages[1:])
+                chamada = self.cache.ainvocar(self.llm_with_tools, messages, chave, _e_chamada_ferramenta)
+            else:
+                chamada = self.llm_with_tools.ainvoke(messages)
+            response = await achamar_com_prazo(state, "cambio", chamada)
+            # A consulta de cotação faz requisições HTTP bloqueantes: executa fora do event loop
+            return await asyncio.to_thread(self._processar_resposta, state, response)
+        except PrazoEsgotado:
+            return self._resposta_prazo_esgotado(state)
         except Exception as e:
             logger.error(f"Erro no agente de câmbio: {str(e)}", exc_info=True)
-            return {
-                "current_agent": "cambio",
-                "messages": [AIMessage(content="Desculpe, não foi possível consultar a cotação no momento. Por favor, tente novamente em alguns instantes.")],
-                "should_end": False
-            }
+            return self._resposta_erro()
+
+    def _montar_mensagens(self, state: AgentState) -> List[BaseMessage]:
+        """Monta as mensagens enviadas ao LLM."""
+        return [
+            SystemMessage(content=SYSTEM_PROMPT.format(
+                nome=state.get("nome_cliente", "")
+            ))
+        ] + list(state["messages"])
+
+    def _resposta_erro(self) -> Dict[str, Any]:
+        """Resposta padrão para erros inesperados."""
+        return {
+            "current_agent": "cambio",
+            "messages": [AIMessage(content="Desculpe, não foi possível consultar a cotação no momento. Por favor, tente novamente em alguns instantes.")],
+            "should_end": False
+        }
+
+    def _resposta_prazo_esgotado(self, state: AgentState) -> Dict[str, Any]:
+        """Contingência sem LLM: a última cotação conhecida das moedas citadas pelo cliente."""
+        texto = next((m.content for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), "")
+        partes = [MENSAGEM_PRAZO_ESGOTADO]
+        for moeda in moedas_citadas(texto):
+            cotacao = ultima_cotacao(moeda)
+            if cotacao is not None:
+                horario = datetime.fromtimestamp(cotacao["consultada_em"]).strftime("%H:%M")
+                partes.append(f"Última cotação disponível: {cotacao['mensagem']} (consultada às {horario})")
+
+        if len(partes) == 1:
+            partes.append("Por favor, tente novamente em alguns instantes.")
+        else:
+            partes.append(PERGUNTA_CONTINUAR)
+        return {
+            "current_agent": "cambio",
+            "messages": [AIMessage(content="\n\n".join(partes))],
+            "should_end": False
+        }
+
+    def _processar_resposta(self, state: AgentState, response: AIMessage) -> Dict[str, Any]:
+        """Executa as ferramentas solicitadas pelo LLM e monta as atualizações de estado."""
+        updates = {"current_agent": "cambio"}
+
+        if response.tool_calls:
+            # Várias cotações pedidas de uma vez são consultadas em paralelo e apresentadas juntas
+            resultados = self.executor.executar(self._chamadas(response.tool_calls), tempo_restante(state))
+            partes = [self._mensagem_resultado(resultado, updates) for resultado in resultados]
+            if partes:
+                if not updates.get("should_end"):
+                    partes.append(PERGUNTA_CONTINUAR)
+                response = AIMessage(content="\n\n".join(partes))
+
+        updates["messages"] = [response]
+        return updates
+
+    def _chamadas(self, tool_calls: List[Dict[str, Any]]) -> List[ChamadaFerramenta]:
+        """Ferramentas de câmbio pedidas pelo LLM."""
+        ferramentas = {
+            "consultar_cotacao_moeda": consultar_cotacao_moeda,
+            "encerrar_atendimento": encerrar_atendimento
+        }
+        return [
+            (tool_call["name"], ferramentas[tool_call["name"]], tool_call["args"])
+            for tool_call in tool_calls if tool_call["name"] in ferramentas
+        ]
+
+    def _mensagem_resultado(self, resultado: ResultadoFerramenta, updates: Dict[str, Any]) -> str:
+        """Texto exibido ao cliente para uma ferramenta executada, atualizando o estado."""
+        if not resultado.sucesso:
+            return MENSAGEM_FERRAMENTA_INDISPONIVEL
+        if resultado.nome == "encerrar_atendimento":
+            updates["should_end"] = True
+        return resultado.resultado["mensagem"]
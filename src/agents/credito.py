@@ -1,9 +1,13 @@
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
-from langchain_core.messages import SystemMessage, AIMessage
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
 
+from src.core.ferramentas import ChamadaFerramenta, ExecutorFerramentas, ResultadoFerramenta
+from src.core.prazo import PrazoEsgotado, achamar_com_prazo, chamar_com_prazo, tempo_restante
 from src.core.state import AgentState
+from src.data_models.instantaneo import campos_estado, com_instantaneo
 from src.tools.atendimento import encerrar_atendimento
 from src.tools.credito import consultar_limite_credito, solicitar_aumento_limite
 
@@ -11,17 +15,7 @@ logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(name)s - %(leve
 logger = logging.getLogger(__name__)
 
 
-class AgenteCredito:
-    """Agente de Crédito - Consulta e aumento de limite."""
-
-    def __init__(self, llm, llm_with_tools):
-        self.llm = llm
-        self.llm_with_tools = llm_with_tools
-
-    def process(self, state: AgentState) -> Dict[str, Any]:
-        """Processa a requisição do agente de crédito."""
-        try:
-            system_prompt = """Você é o Agente de Crédito do Banco Ágil.
+SYSTEM_PROMPT = """Você é o Agente de Crédito do Banco Ágil.
 
 Suas responsabilidades:
 1. Consultar limite de crédito atual usando 'consultar_limite_credito'
@@ -39,66 +33,152 @@ IMPORTANTE:
 - Se rejeitado, explique que pode fazer entrevista para melhorar score
 - Para redirecionar à entrevista, responda "REDIRECIONAR: entrevista"
 - Se o cliente desejar encerrar, use a ferramenta encerrar_atendimento
+- Se a mensagem trouxer crédito junto com outros assuntos (ex: cotação de moedas), atenda apenas a parte de crédito: o restante é respondido por outro agente
 - Seja cordial e objetivo
 
 Cliente autenticado: {nome}
 """
 
-            messages = [
-                SystemMessage(content=system_prompt.format(
-                    cpf=state.get("cpf", ""),
-                    nome=state.get("nome_cliente", "")
-                ))
-            ] + list(state["messages"])
-
-            response = self.llm_with_tools.invoke(messages)
-
-            updates = {"current_agent": "credito"}
-
-            if response.tool_calls:
-                tool_results = []
-                for tool_call in response.tool_calls:
-                    if tool_call["name"] == "consultar_limite_credito":
-                        result = consultar_limite_credito.invoke({"cpf": state["cpf"]})
-                        tool_results.append(result["mensagem"])
-                        response = AIMessage(content=result["mensagem"])
-
-                    elif tool_call["name"] == "solicitar_aumento_limite":
-                        args = tool_call["args"]
-                        args["cpf"] = state["cpf"]
-                        result = solicitar_aumento_limite.invoke(args)
-
-                        if result["aprovado"]:
-                            updates["limite_credito"] = args["novo_limite"]
-                            response = AIMessage(content=result["mensagem"])
-                        else:
-                            response = AIMessage(
-                                content=result["mensagem"] + "\n\n" +
-                                "Temos uma entrevista de crédito que pode aumentar suas chances de melhorar o score. "
-                                "Deseja fazer a entrevista?"
-                            )
-
-                    elif tool_call["name"] == "encerrar_atendimento":
-                        result = encerrar_atendimento.invoke({})
-                        updates["should_end"] = True
-                        response = AIMessage(content=result["mensagem"])
-
-            if hasattr(response, 'content') and response.content:
-                if "REDIRECIONAR:" in response.content:
-                    redirect_to = response.content.split("REDIRECIONAR:")[1].strip().split()[0]
-                    updates["pending_redirect"] = redirect_to
-                    clean_message = response.content.split("REDIRECIONAR:")[0].strip()
-                    return updates
-            else:
-                if not response.content:
-                    response = AIMessage(content="Processando sua solicitação...")
+OFERTA_ENTREVISTA = (
+    "Temos uma entrevista de crédito que pode aumentar suas chances de melhorar o score. "
+    "Deseja fazer a entrevista?"
+)
+
+MENSAGEM_FERRAMENTA_INDISPONIVEL = (
+    "Não foi possível concluir esta operação de crédito no momento. Por favor, tente novamente em alguns instantes."
+)
+
+MENSAGEM_PRAZO_ESGOTADO = (
+    "Sua solicitação está demorando mais que o esperado e não pôde ser concluída agora. "
+    "Por favor, repita o pedido em alguns instantes."
+)
 
-            updates["messages"] = [response]
-            return updates
+
+class AgenteCredito:
+    """Agente de Crédito - Consulta e aumento de limite."""
+
+    def __init__(self, llm, llm_with_tools, executor: Optional[ExecutorFerramentas] = None):
+        self.llm = llm
+        self.llm_with_tools = llm_with_tools
+        self.executor = executor if executor is not None else ExecutorFerramentas()
+
+    def process(self, state: AgentState) -> Dict[str, Any]:
+        """Processa a requisição do agente de crédito."""
+        try:
+            response = chamar_com_prazo(state, "credito", self.llm_with_tools.invoke, self._montar_mensagens(state))
+            return self._processar_resposta(state, response)
+        except PrazoEsgotado:
+            return self._resposta_prazo_esgotado(state)
         except Exception as e:
             logger.error(f"Erro no agente de crédito: {str(e)}", exc_info=True)
-            return {
-                "current_agent": "credito",
-                "messages": [AIMessage(content="Desculpe, tivemos um problema ao processar sua solicitação de crédito. Por favor, tente novamente em alguns instantes ou entre em contato com nossa central.")],
-                "should_end": False
-            }
+            return self._resposta_erro()
+
+    async def aprocess(self, state: AgentState) -> Dict[str, Any]:
+        """Processa a requisição do agente de crédito sem bloquear o event loop."""
+        try:
+            response = await achamar_com_prazo(
+                state, "credito", self.llm_with_tools.ainvoke(self._montar_mensagens(state))
+            )
+            # As ferramentas de crédito leem e gravam CSV: executa fora do event loop
+            return await asyncio.to_thread(self._processar_resposta, state, response)
+        except PrazoEsgotado:
+            return await asyncio.to_thread(self._resposta_prazo_esgotado, state)
+        except Exception as e:
+            logger.error(f"Erro no agente de crédito: {str(e)}", exc_info=True)
+            return self._resposta_erro()
+
+    def _montar_mensagens(self, state: AgentState) -> List[BaseMessage]:
+        """Monta as mensagens enviadas ao LLM."""
+        return [
+            SystemMessage(content=SYSTEM_PROMPT.format(
+                cpf=state.get("cpf", ""),
+                nome=state.get("nome_cliente", "")
+            ))
+        ] + list(state["messages"])
+
+    def _resposta_erro(self) -> Dict[str, Any]:
+        """Resposta padrão para erros inesperados."""
+        return {
+            "current_agent": "credito",
+            "messages": [AIMessage(content="Desculpe, tivemos um problema ao processar sua solicitação de crédito. Por favor, tente novamente em alguns instantes ou entre em contato com nossa central.")],
+            "should_end": False
+        }
+
+    def _resposta_prazo_esgotado(self, state: AgentState) -> Dict[str, Any]:
+        """Contingência sem LLM: informa o limite lido diretamente do Database."""
+        partes = [MENSAGEM_PRAZO_ESGOTADO]
+        try:
+            resultado = consultar_limite_credito.invoke(com_instantaneo(state, {"cpf": state["cpf"]}))
+            if resultado.get("sucesso"):
+                partes.append(resultado["mensagem"] + ".")
+        except Exception as e:
+            logger.error(f"Erro ao consultar o limite na contingência: {str(e)}", exc_info=True)
+        return {
+            "current_agent": "credito",
+            "messages": [AIMessage(content="\n\n".join(partes))],
+            "should_end": False
+        }
+
+    def _processar_resposta(self, state: AgentState, response: AIMessage) -> Dict[str, Any]:
+        """Executa as ferramentas solicitadas pelo LLM e monta as atualizações de estado."""
+        updates = {"current_agent": "credito"}
+
+        if response.tool_calls:
+            # As ferramentas pedidas na mesma resposta rodam em paralelo; as respostas são unidas
+            resultados = self.executor.executar(self._chamadas(state, response.tool_calls), tempo_restante(state))
+            partes = [self._mensagem_resultado(resultado, updates) for resultado in resultados]
+            if partes:
+                response = AIMessage(content="\n\n".join(partes))
+
+        if hasattr(response, 'content') and response.content:
+            if "REDIRECIONAR:" in response.content:
+                redirect_to = response.content.split("REDIRECIONAR:")[1].strip().split()[0]
+                updates["pending_redirect"] = redirect_to
+                clean_message = response.content.split("REDIRECIONAR:")[0].strip()
+                return updates
+        else:
+            if not response.content:
+                response = AIMessage(content="Processando sua solicitação...")
+
+        updates["messages"] = [response]
+        return updates
+
+    def _chamadas(self, state: AgentState, tool_calls: List[Dict[str, Any]]) -> List[ChamadaFerramenta]:
+        """Ferramentas pedidas pelo LLM, sempre com o CPF e o instantâneo do cliente autenticado."""
+        ferramentas = {
+            "consultar_limite_credito": consultar_limite_credito,
+            "solicitar_aumento_limite": solicitar_aumento_limite,
+            "encerrar_atendimento": encerrar_atendimento
+        }
+        chamadas = []
+        for tool_call in tool_calls:
+            nome = tool_call["name"]
+            if nome == "consultar_limite_credito":
+                args = com_instantaneo(state, {"cpf": state["cpf"]})
+            elif nome == "solicitar_aumento_limite":
+                args = com_instantaneo(state, {**tool_call["args"], "cpf": state["cpf"]})
+            elif nome == "encerrar_atendimento":
+                args = {}
+            else:
+                continue
+            chamadas.append((nome, ferramentas[nome], args))
+        return chamadas
+
+    def _mensagem_resultado(self, resultado: ResultadoFerramenta, updates: Dict[str, Any]) -> str:
+        """Texto exibido ao cliente para uma ferramenta executada, atualizando o estado."""
+        if not resultado.sucesso:
+            return MENSAGEM_FERRAMENTA_INDISPONIVEL
+
+        if resultado.resultado.get("instantaneo"):
+            # Dados lidos ou gravados pela ferramenta: a próxima consulta da sessão não relê o cadastro
+            updates.update(campos_estado(resultado.resultado["instantaneo"]))
+
+        if resultado.nome == "solicitar_aumento_limite":
+            if resultado.resultado["aprovado"]:
+                updates["limite_credito"] = resultado.args["novo_limite"]
+                return resultado.resultado["mensagem"]
+            return resultado.resultado["mensagem"] + "\n\n" + OFERTA_ENTREVISTA
+
+        if resultado.nome == "encerrar_atendimento":
+            updates["should_end"] = True
+        return resultado.resultado["mensagem"]
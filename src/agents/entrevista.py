@@ -1,44 +1,37 @@
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
-from langchain_core.messages import AIMessage, SystemMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
+from src.core.interpretacao import interpretar_campo
+from src.core.prazo import PrazoEsgotado, achamar_com_prazo, chamar_com_prazo
 from src.core.state import AgentState
+from src.data_models.instantaneo import campos_estado, com_instantaneo
 from src.tools.score import calcular_novo_score
 from src.tools.atendimento import encerrar_atendimento
+from src.tools.entrevista import registrar_dados_entrevista
 
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
-class AgenteEntrevista:
-    """Agente de Entrevista de Crédito - Coleta dados e recalcula score de forma conversacional."""
+SYSTEM_PROMPT = """Você é o Agente de Entrevista de Crédito do Banco Ágil.
 
-    def __init__(self, llm, llm_with_tools):
-        self.llm = llm
-        self.llm_with_tools = llm_with_tools
+Você conduz uma entrevista conversacional para recalcular o score do cliente. As informações já coletadas ficam
+registradas pelo sistema; você recebe apenas a sua última pergunta e a última resposta do cliente.
 
-    def process(self, state: AgentState) -> Dict[str, Any]:
-        """Processa a requisição do agente de entrevista."""
-        try:
-            system_prompt = """Você é o Agente de Entrevista de Crédito do Banco Ágil.
+INFORMAÇÕES JÁ COLETADAS:
+{coletados}
 
-Sua missão é conduzir uma entrevista conversacional e natural para coletar as seguintes informações do cliente:
-
-INFORMAÇÕES NECESSÁRIAS:
-1. renda_mensal: Renda mensal em reais (número)
-2. tipo_emprego: Tipo de emprego (formal/autonomo/desempregado)
-3. despesas_fixas: Despesas fixas mensais em reais (número)
-4. num_dependentes: Número de dependentes (0, 1, 2, ou 3+)
-5. tem_dividas: Se possui dívidas ativas (true/false)
+INFORMAÇÕES QUE AINDA FALTAM:
+{faltantes}
 
 INSTRUÇÕES:
-- Conduza a conversa de forma natural e amigável
-- Faça UMA pergunta por vez
-- Adapte suas perguntas ao contexto da conversa
-- Se o cliente fornecer múltiplas informações de uma vez, agradeça e colete
-- Seja claro e objetivo
-- Quando tiver TODAS as 5 informações, use a ferramenta 'calcular_novo_score' para calcular o novo score
+- Identifique na última mensagem do cliente qualquer uma das informações que ainda faltam
+- Registre-as com a ferramenta 'registrar_dados_entrevista', informando APENAS os campos respondidos
+- Se a resposta for ambígua ou não responder à pergunta, peça esclarecimento de forma cordial
+- Faça UMA pergunta por vez, sempre sobre uma informação que ainda falta
 
 IMPORTANTE:
 - Extraia números considerando "mil", "k", "milhão", etc. (ex: "5 mil" = 5000, "3.5k" = 3500)
@@ -46,60 +39,247 @@ IMPORTANTE:
 - Para num_dependentes, se disser "3 ou mais", use 3
 - Para tem_dividas, sim/tenho/possuo = true, não/sem/nenhuma = false
 - Mantenha tom profissional mas acolhedor
-- Após calcular o score, informe o resultado e diga "REDIRECIONAR: credito"
 - Se o cliente desejar encerrar o atendimento, use a ferramenta encerrar_atendimento
 
 Cliente: {nome}
-CPF: {cpf}
 """
 
-            messages = [
-                SystemMessage(content=system_prompt.format(
-                    nome=state.get("nome_cliente", ""),
-                    cpf=state.get("cpf", "")
-                ))
-            ] + list(state["messages"])
-
-            response = self.llm_with_tools.invoke(messages)
-
-            updates = {"current_agent": "entrevista"}
-
-            if response.tool_calls:
-                for tool_call in response.tool_calls:
-                    if tool_call["name"] == "calcular_novo_score":
-                        args = tool_call["args"]
-                        args["cpf"] = state["cpf"]
-                        result = calcular_novo_score.invoke(args)
-
-                        if result["sucesso"]:
-                            updates["score"] = result["novo_score"]
-                            updates["pending_redirect"] = "credito"
-
-                            response = AIMessage(
-                                content=result["mensagem"] +
-                                        "\n\nVou redirecioná-lo de volta ao atendimento de crédito para reanalisar sua solicitação."
-                            )
-                        else:
-                            response = AIMessage(content=result["mensagem"])
-
-                    elif tool_call["name"] == "encerrar_atendimento":
-                        result = encerrar_atendimento.invoke({})
-                        updates["should_end"] = True
-                        response = AIMessage(content=result["mensagem"])
-
-            if hasattr(response, 'content') and response.content:
-                if "REDIRECIONAR:" in response.content:
-                    redirect_to = response.content.split("REDIRECIONAR:")[1].strip().split()[0]
-                    updates["pending_redirect"] = redirect_to
-                    clean_message = response.content.split("REDIRECIONAR:")[0].strip()
-                    response = AIMessage(content=clean_message)
-
-            updates["messages"] = [response]
-            return updates
+CAMPOS_ENTREVISTA = {
+    "renda_mensal": (
+        "Renda mensal em reais (número)",
+        "Qual é a sua renda mensal?"
+    ),
+    "tipo_emprego": (
+        "Tipo de emprego (formal/autonomo/desempregado)",
+        "Qual é o seu tipo de emprego: formal (CLT), autônomo ou desempregado?"
+    ),
+    "despesas_fixas": (
+        "Despesas fixas mensais em reais (número)",
+        "Quanto você gasta, em média, com despesas fixas por mês?"
+    ),
+    "num_dependentes": (
+        "Número de dependentes (0, 1, 2, ou 3+)",
+        "Quantos dependentes você possui?"
+    ),
+    "tem_dividas": (
+        "Se possui dívidas ativas (true/false)",
+        "Você possui alguma dívida ativa no momento?"
+    ),
+}
+
+MENSAGEM_INICIO = "Ótimo! Vou fazer algumas perguntas rápidas para recalcular seu score de crédito."
+
+MENSAGEM_PRAZO_ESGOTADO = "Desculpe, não consegui entender sua resposta a tempo."
+
+
+class AgenteEntrevista:
+    """Agente de Entrevista de Crédito - Coleta dados e recalcula score de forma conversacional."""
+
+    def __init__(self, llm, llm_with_tools):
+        self.llm = llm
+        self.llm_with_tools = llm_with_tools
+
+    def process(self, state: AgentState) -> Dict[str, Any]:
+        """Processa a requisição do agente de entrevista."""
+        try:
+            local = self._processar_localmente(state)
+            if local is not None:
+                return local
+
+            response = chamar_com_prazo(state, "entrevista", self.llm_with_tools.invoke, self._montar_mensagens(state))
+            return self._processar_resposta(state, response)
+        except PrazoEsgotado:
+            return self._resposta_prazo_esgotado(state)
+        except Exception as e:
+            logger.error(f"Erro no agente de entrevista: {str(e)}", exc_info=True)
+            return self._resposta_erro()
+
+    async def aprocess(self, state: AgentState) -> Dict[str, Any]:
+        """Processa a requisição do agente de entrevista sem bloquear o event loop."""
+        try:
+            # O caminho local pode concluir a entrevista e gravar o score no CSV
+            local = await asyncio.to_thread(self._processar_localmente, state)
+            if local is not None:
+                return local
+
+            response = await achamar_com_prazo(
+                state, "entrevista", self.llm_with_tools.ainvoke(self._montar_mensagens(state))
+            )
+            # O recálculo de score grava no CSV de clientes: executa fora do event loop
+            return await asyncio.to_thread(self._processar_resposta, state, response)
+        except PrazoEsgotado:
+            return self._resposta_prazo_esgotado(state)
         except Exception as e:
             logger.error(f"Erro no agente de entrevista: {str(e)}", exc_info=True)
+            return self._resposta_erro()
+
+    def _dados_coletados(self, state: AgentState) -> Dict[str, Any]:
+        """Retorna os campos da entrevista já registrados no estado."""
+        dados = state.get("interview_data") or {}
+        return {campo: valor for campo, valor in dados.items() if campo in CAMPOS_ENTREVISTA}
+
+    def _campos_faltantes(self, dados: Dict[str, Any]) -> List[str]:
+        """Retorna, na ordem da entrevista, os campos ainda não respondidos."""
+        return [campo for campo in CAMPOS_ENTREVISTA if campo not in dados]
+
+    def _proxima_pergunta(self, dados: Dict[str, Any]) -> str:
+        """Pergunta referente ao próximo campo faltante."""
+        return CAMPOS_ENTREVISTA[self._campos_faltantes(dados)[0]][1]
+
+    def _ultima_troca(self, state: AgentState) -> Tuple[Optional[AIMessage], Optional[HumanMessage]]:
+        """Retorna a última pergunta feita ao cliente e a resposta dada a ela."""
+        ultima_pergunta = None
+        ultima_resposta = None
+        for msg in reversed(state["messages"]):
+            if ultima_resposta is None:
+                if isinstance(msg, HumanMessage):
+                    ultima_resposta = msg
+            elif isinstance(msg, AIMessage) and msg.content:
+                # Remove eventuais tool_calls sem ToolMessage correspondente
+                ultima_pergunta = AIMessage(content=msg.content)
+                break
+        return ultima_pergunta, ultima_resposta
+
+    def _processar_localmente(self, state: AgentState) -> Optional[Dict[str, Any]]:
+        """Conduz o turno sem LLM quando a resposta pode ser interpretada localmente.
+
+        Retorna None quando o LLM precisa ser consultado.
+        """
+        if state.get("current_agent") != "entrevista":
+            # Início da entrevista: a primeira pergunta é sempre a mesma
+            primeiro_campo = next(iter(CAMPOS_ENTREVISTA))
             return {
                 "current_agent": "entrevista",
-                "messages": [AIMessage(content="Desculpe, ocorreu um problema durante a entrevista. Por favor, tente novamente em alguns instantes ou retorne ao menu anterior.")],
-                "pending_redirect": "credito"
+                "interview_data": {},
+                "messages": [AIMessage(content=f"{MENSAGEM_INICIO}\n\n{CAMPOS_ENTREVISTA[primeiro_campo][1]}")]
             }
+
+        dados = self._dados_coletados(state)
+        faltantes = self._campos_faltantes(dados)
+        ultima_pergunta, ultima_resposta = self._ultima_troca(state)
+        if not faltantes or ultima_pergunta is None or ultima_resposta is None:
+            return None
+
+        # Só interpreta localmente respostas à pergunta padrão do próximo campo
+        campo = faltantes[0]
+        if CAMPOS_ENTREVISTA[campo][1] not in ultima_pergunta.content:
+            return None
+
+        valor = interpretar_campo(campo, ultima_resposta.content)
+        if valor is None:
+            return None
+
+        dados = {**dados, campo: valor}
+        updates = {"current_agent": "entrevista"}
+        if not self._campos_faltantes(dados):
+            return self._calcular_score(state, dados, updates)
+
+        updates["interview_data"] = dados
+        updates["messages"] = [AIMessage(content="Obrigado! " + self._proxima_pergunta(dados))]
+        return updates
+
+    def _montar_mensagens(self, state: AgentState) -> List[BaseMessage]:
+        """Monta as mensagens enviadas ao LLM.
+
+        Apenas a última pergunta e a última resposta são enviadas: os campos já
+        respondidos estão em interview_data, então o prompt tem tamanho constante.
+        """
+        dados = self._dados_coletados(state)
+        coletados = "\n".join(f"- {campo}: {valor}" for campo, valor in dados.items()) or "- nenhuma"
+        faltantes = "\n".join(
+            f"- {campo}: {CAMPOS_ENTREVISTA[campo][0]}" for campo in self._campos_faltantes(dados)
+        ) or "- nenhuma"
+
+        ultima_pergunta, ultima_resposta = self._ultima_troca(state)
+
+        return [
+            SystemMessage(content=SYSTEM_PROMPT.format(
+                coletados=coletados,
+                faltantes=faltantes,
+                nome=state.get("nome_cliente", "")
+            ))
+        ] + [msg for msg in (ultima_pergunta, ultima_resposta) if msg is not None]
+
+    def _resposta_prazo_esgotado(self, state: AgentState) -> Dict[str, Any]:
+        """Contingência sem LLM: repete a pergunta pendente, mantendo os dados já coletados."""
+        dados = self._dados_coletados(state)
+        if not self._campos_faltantes(dados):
+            return self._resposta_erro()
+        return {
+            "current_agent": "entrevista",
+            "messages": [AIMessage(content=f"{MENSAGEM_PRAZO_ESGOTADO} {self._proxima_pergunta(dados)}")]
+        }
+
+    def _resposta_erro(self) -> Dict[str, Any]:
+        """Resposta padrão para erros inesperados."""
+        return {
+            "current_agent": "entrevista",
+            "messages": [AIMessage(content="Desculpe, ocorreu um problema durante a entrevista. Por favor, tente novamente em alguns instantes ou retorne ao menu anterior.")],
+            "pending_redirect": "credito"
+        }
+
+    def _calcular_score(self, state: AgentState, args: Dict[str, Any],
+                        updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Recalcula o score com os dados da entrevista e encerra a coleta."""
+        args = com_instantaneo(state, {**args, "cpf": state["cpf"]})
+        result = calcular_novo_score.invoke(args)
+
+        if result["sucesso"]:
+            updates["score"] = result["novo_score"]
+            # Write-through: o instantâneo da sessão já tem o novo score, sem reler o cadastro
+            if result.get("instantaneo"):
+                updates.update(campos_estado(result["instantaneo"]))
+            updates["pending_redirect"] = "credito"
+            updates["interview_data"] = None
+
+            response = AIMessage(
+                content=result["mensagem"] +
+                        "\n\nVou redirecioná-lo de volta ao atendimento de crédito para reanalisar sua solicitação."
+            )
+        else:
+            response = AIMessage(content=result["mensagem"])
+
+        updates["messages"] = [response]
+        return updates
+
+    def _processar_resposta(self, state: AgentState, response: AIMessage) -> Dict[str, Any]:
+        """Executa as ferramentas solicitadas pelo LLM e monta as atualizações de estado."""
+        updates = {"current_agent": "entrevista"}
+        dados = self._dados_coletados(state)
+        registrou = False
+
+        if response.tool_calls:
+            for tool_call in response.tool_calls:
+                if tool_call["name"] == "registrar_dados_entrevista":
+                    result = registrar_dados_entrevista.invoke(tool_call["args"])
+                    dados = {**dados, **result["dados"]}
+                    registrou = True
+
+                elif tool_call["name"] == "calcular_novo_score":
+                    return self._calcular_score(state, {**dados, **tool_call["args"]}, updates)
+
+                elif tool_call["name"] == "encerrar_atendimento":
+                    result = encerrar_atendimento.invoke({})
+                    updates["should_end"] = True
+                    updates["messages"] = [AIMessage(content=result["mensagem"])]
+                    return updates
+
+        if registrou:
+            if not self._campos_faltantes(dados):
+                return self._calcular_score(state, dados, updates)
+
+            updates["interview_data"] = dados
+            response = AIMessage(content="Obrigado! " + self._proxima_pergunta(dados))
+
+        if hasattr(response, 'content') and response.content:
+            if "REDIRECIONAR:" in response.content:
+                redirect_to = response.content.split("REDIRECIONAR:")[1].strip().split()[0]
+                updates["pending_redirect"] = redirect_to
+                clean_message = response.content.split("REDIRECIONAR:")[0].strip()
+                response = AIMessage(content=clean_message)
+        else:
+            response = AIMessage(content=self._proxima_pergunta(dados) if self._campos_faltantes(dados)
+                                 else "Processando sua solicitação...")
+
+        updates["messages"] = [response]
+        return updates
@@ -1,9 +1,19 @@
+import asyncio
 import logging
+import math
 import re
-from typing import Any, Dict
-
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from src.agents.cambio import moedas_citadas
+from src.core.cache import CacheRespostasLLM
+from src.core.extracao import cpf_valido, extrair_credenciais
+from src.core.interpretacao import detectar_intencao_saida
+from src.core.limitador import LimitadorTaxa
+from src.core.prazo import PrazoEsgotado, achamar_com_prazo, chamar_com_prazo
+from src.core.prometheus import registro_prometheus
 from src.core.state import AgentState
 from src.tools.atendimento import encerrar_atendimento
 from src.tools.autenticacao import autenticar_cliente
@@ -12,12 +22,166 @@ logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(name)s - %(leve
 logger = logging.getLogger(__name__)
 
 
+SYSTEM_PROMPT_AUTENTICADO = """Você é o Agente de Triagem do Banco Ágil.
+
+O cliente já está autenticado como {nome}.
+
+IMPORTANTE: Você NÃO deve responder às perguntas do cliente. Sua ÚNICA função é identificar a necessidade e redirecionar.
+
+Identifique a necessidade do cliente e direcione IMEDIATAMENTE:
+- Se pergunta sobre LIMITE DE CRÉDITO, AUMENTO DE LIMITE ou CRÉDITO → Responda APENAS: "REDIRECIONAR: credito"
+- Se pergunta sobre COTAÇÃO, MOEDAS, CÂMBIO, DÓLAR, EURO → Responda APENAS: "REDIRECIONAR: cambio"
+- Se pergunta sobre CRÉDITO e também sobre CÂMBIO na mesma mensagem → Responda APENAS: "REDIRECIONAR: credito, cambio" (na ordem em que o cliente perguntou)
+- Se quer ENCERRAR/SAIR → use a ferramenta encerrar_atendimento
+
+NÃO responda às perguntas. NÃO tente ajudar. APENAS redirecione usando o formato exato acima.
+IMPORTANTE: O agente de entrevista NÃO está disponível via triagem. Questões sobre entrevista ou score devem ir para crédito.
+"""
+
+SYSTEM_PROMPT_SOLICITA_DATA = """Você é o Agente de Triagem do Banco Ágil.
+
+O cliente já forneceu o CPF mas ainda NÃO completou a autenticação.
+
+Suas responsabilidades:
+- Agradecer pelo CPF e solicitar a data de nascimento no formato AAAA-MM-DD (exemplo: 1990-05-15)
+- Se o cliente demonstrar que quer ENCERRAR/SAIR/CANCELAR o atendimento, use a ferramenta encerrar_atendimento
+- Seja cordial e objetivo
+
+IMPORTANTE: Analise a intenção do cliente. Se ele claramente quer sair, encerre. Caso contrário, solicite a data de nascimento."""
+
+SYSTEM_PROMPT_SOLICITA_CPF = """Você é o Agente de Triagem do Banco Ágil.
+
+O cliente ainda NÃO está autenticado.
+
+Suas responsabilidades:
+- Responda cordialmente ao cliente e peça o CPF (11 dígitos)
+- Se o cliente demonstrar que quer ENCERRAR/SAIR/CANCELAR o atendimento, use a ferramenta encerrar_atendimento
+- Seja educado mas objetivo
+
+IMPORTANTE: Analise a intenção do cliente. Se ele claramente quer sair, encerre. Caso contrário, solicite o CPF."""
+
+# Mensagens da autenticação: dependem apenas de quais dados o cliente já informou
+MENSAGEM_SOLICITA_CPF = "Olá! Bem-vindo ao Banco Ágil. Para começarmos, por favor informe seu CPF (11 dígitos)."
+MENSAGEM_CPF_NAO_ENCONTRADO = (
+    "Não encontrei um CPF na sua mensagem. Por favor, informe seu CPF com 11 dígitos (somente números)."
+)
+MENSAGEM_CPF_INVALIDO = "O CPF informado não é válido. Por favor, confira os números e informe novamente."
+MENSAGEM_SOLICITA_CPF_APOS_DATA = "Obrigado! Agora, por favor, informe seu CPF (11 dígitos)."
+MENSAGEM_SOLICITA_DATA = (
+    "Obrigado! Agora, por favor, informe sua data de nascimento no formato AAAA-MM-DD (exemplo: 1990-05-15)."
+)
+MENSAGEM_DATA_NAO_ENCONTRADA = (
+    "Não reconheci a data de nascimento. Por favor, informe no formato AAAA-MM-DD (exemplo: 1990-05-15)."
+)
+MENSAGEM_TENTATIVAS_EXCEDIDAS = (
+    "Recebemos muitas tentativas de autenticação. Por segurança, aguarde cerca de {minutos} minuto(s) "
+    "e informe seu CPF novamente."
+)
+MENSAGEM_PRAZO_ESGOTADO = (
+    "Desculpe, a resposta está demorando mais que o esperado. Pode repetir sua solicitação?"
+)
+
+# Palavras-chave de cada agente, usadas quando o roteamento é feito sem o LLM
+PALAVRAS_CREDITO = ("limite", "credito", "aumento", "aumentar", "score", "entrevista")
+PALAVRAS_CAMBIO = ("cotacao", "cambio", "moeda", "moedas")
+
+TENTATIVAS_AUTENTICACAO = registro_prometheus.contador(
+    "banco_agil_autenticacao_tentativas_total", "Tentativas de autenticação de clientes"
+)
+FALHAS_AUTENTICACAO = registro_prometheus.contador(
+    "banco_agil_autenticacao_falhas_total", "Tentativas de autenticação malsucedidas"
+)
+CPFS_INVALIDOS = registro_prometheus.contador(
+    "banco_agil_autenticacao_cpf_invalido_total", "CPFs recusados pelos dígitos verificadores, sem consulta ao cadastro"
+)
+AUTENTICACOES_LIMITADAS = registro_prometheus.contador(
+    "banco_agil_autenticacao_limitada_total", "Autenticações recusadas pelo limitador de tentativas, sem consulta ao cadastro"
+)
+
+
+# Ferramenta que o LLM tentou chamar na triagem -> agente responsável por ela
+DESTINO_FERRAMENTA = {
+    "consultar_limite_credito": "credito",
+    "solicitar_aumento_limite": "credito",
+    "consultar_cotacao_moeda": "cambio",
+    # Entrevista só pode ser acessada via agente de crédito
+    "calcular_novo_score": "credito",
+    "registrar_dados_entrevista": "credito"
+}
+
+
+def _destinos_redirecionamento(texto: str) -> List[str]:
+    """Agentes citados após "REDIRECIONAR:", na ordem, sem repetição (entrevista vai para crédito)."""
+    trecho = texto.split("REDIRECIONAR:")[1].strip()
+    destinos = []
+    for palavra in re.findall(r"\w+", trecho.split("\n")[0].lower()):
+        destino = "credito" if palavra == "entrevista" else palavra
+        if destino in ("credito", "cambio") and destino not in destinos:
+            destinos.append(destino)
+    return destinos or trecho.split()[:1]
+
+
+def _destinos_por_palavras(texto: str) -> List[str]:
+    """Roteamento determinístico pela presença de palavras-chave, na ordem em que aparecem."""
+    sem_acentos = unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode()
+    posicoes = {}
+    for destino, palavras in (("credito", PALAVRAS_CREDITO), ("cambio", PALAVRAS_CAMBIO)):
+        encontradas = [m.start() for m in re.finditer(r"\b(" + "|".join(palavras) + r")\b", sem_acentos)]
+        if destino == "cambio" and moedas_citadas(texto):
+            encontradas.append(len(sem_acentos))
+        if encontradas:
+            posicoes[destino] = min(encontradas)
+    return sorted(posicoes, key=posicoes.get)
+
+
+def _e_roteamento(resposta: AIMessage) -> bool:
+    """Respostas de roteamento não contêm dados do cliente e podem ir para o cache."""
+    return bool(resposta.tool_calls) or "REDIRECIONAR:" in (resposta.content or "")
+
+
+def _e_chamada_ferramenta(resposta: AIMessage) -> bool:
+    """Apenas chamadas de ferramenta são independentes do que o cliente já informou."""
+    return bool(resposta.tool_calls)
+
+
+def _sempre(resposta: AIMessage) -> bool:
+    """O pedido de CPF não depende de nenhum dado do cliente."""
+    return True
+
+
 class AgenteTriagem:
     """Agente de Triagem - Autenticação e direcionamento."""
 
-    def __init__(self, llm, llm_with_tools):
+    def __init__(self, llm, llm_with_tools, cache: Optional[CacheRespostasLLM] = None,
+                 templates_autenticacao: bool = True, validar_cpf: bool = False,
+                 limitador: Optional[LimitadorTaxa] = None):
         self.llm = llm
         self.llm_with_tools = llm_with_tools
+        self.cache = cache
+        # Com templates, a autenticação é conduzida sem nenhuma chamada ao LLM
+        self.templates_autenticacao = templates_autenticacao
+        # Recusa CPFs com dígitos verificadores inválidos sem gastar tentativa nem ler o cadastro
+        self.validar_cpf = validar_cpf
+        # Compartilhado entre as conversas: limita as falhas por CPF e por cliente
+        self.limitador = limitador
+
+    def _invocar_llm(self, messages: List[BaseMessage], system_prompt: str,
+                     armazenar_se: Callable[[AIMessage], bool]) -> AIMessage:
+        """Invoca o LLM consultando antes o cache de respostas, quando disponível."""
+        if self.cache is None:
+            return self.llm_with_tools.invoke(messages)
+
+        chave = self.cache.chave(system_prompt, messages[1:])
+        return self.cache.invocar(self.llm_with_tools, messages, chave, armazenar_se)
+
+    async def _ainvocar_llm(self, messages: List[BaseMessage], system_prompt: str,
+                            armazenar_se: Callable[[AIMessage], bool]) -> AIMessage:
+        """Versão assíncrona de _invocar_llm."""
+        if self.cache is None:
+            return await self.llm_with_tools.ainvoke(messages)
+
+        chave = self.cache.chave(system_prompt, messages[1:])
+        return await self.cache.ainvocar(self.llm_with_tools, messages, chave, armazenar_se)
 
     def process(self, state: AgentState) -> Dict[str, Any]:
         """Processa a requisição do agente de triagem."""
@@ -26,63 +190,102 @@ class AgenteTriagem:
                 return self._process_authenticated(state)
 
             return self._process_authentication(state)
+        except PrazoEsgotado:
+            return self._resposta_prazo_esgotado(state)
         except Exception as e:
             logger.error(f"Erro no agente de triagem: {str(e)}", exc_info=True)
-            return {
-                "current_agent": "triagem",
-                "messages": [AIMessage(content="Desculpe, ocorreu um erro inesperado. Por favor, tente novamente em alguns instantes.")],
-                "should_end": True
-            }
-
-    def _process_authenticated(self, state: AgentState) -> Dict[str, Any]:
-        """Processa usuário já autenticado."""
-        system_prompt = """Você é o Agente de Triagem do Banco Ágil.
-
-O cliente já está autenticado como {nome}.
+            return self._resposta_erro()
 
-IMPORTANTE: Você NÃO deve responder às perguntas do cliente. Sua ÚNICA função é identificar a necessidade e redirecionar.
+    async def aprocess(self, state: AgentState) -> Dict[str, Any]:
+        """Processa a requisição do agente de triagem sem bloquear o event loop."""
+        try:
+            if state.get("authenticated", False):
+                messages = self._mensagens_autenticado(state)
+                response = await achamar_com_prazo(
+                    state, "triagem", self._ainvocar_llm(messages, SYSTEM_PROMPT_AUTENTICADO, _e_roteamento)
+                )
+                return self._tratar_roteamento(response)
+
+            cpf_temp, data_temp = self._extrair_credenciais(state)
+            if cpf_temp and self.validar_cpf and not cpf_valido(cpf_temp):
+                return self._cpf_invalido(data_temp)
+            if cpf_temp and data_temp:
+                # A autenticação lê o arquivo de clientes: executa fora do event loop
+                return await asyncio.to_thread(self._autenticar, state, cpf_temp, data_temp)
+            if self.templates_autenticacao:
+                return self._responder_autenticacao(state, cpf_temp, data_temp)
+
+            system_prompt, armazenar_se = self._prompt_autenticacao(cpf_temp)
+            messages = [SystemMessage(content=system_prompt)] + list(state["messages"])
+            response = await achamar_com_prazo(
+                state, "triagem", self._ainvocar_llm(messages, system_prompt, armazenar_se)
+            )
+            return self._tratar_resposta_autenticacao(response, cpf_temp)
+        except PrazoEsgotado:
+            return self._resposta_prazo_esgotado(state)
+        except Exception as e:
+            logger.error(f"Erro no agente de triagem: {str(e)}", exc_info=True)
+            return self._resposta_erro()
+
+    def _resposta_erro(self) -> Dict[str, Any]:
+        """Resposta padrão para erros inesperados."""
+        return {
+            "current_agent": "triagem",
+            "messages": [AIMessage(content="Desculpe, ocorreu um erro inesperado. Por favor, tente novamente em alguns instantes.")],
+            "should_end": True
+        }
+
+    def _resposta_prazo_esgotado(self, state: AgentState) -> Dict[str, Any]:
+        """Contingência sem LLM: roteia por palavras-chave ou repete o pedido de autenticação."""
+        updates = {"current_agent": "triagem"}
+        if state.get("authenticated", False):
+            texto = next((m.content for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), "")
+            destinos = _destinos_por_palavras(texto)
+            if destinos:
+                # Os agentes de destino também estão sem tempo e respondem com as suas contingências
+                updates["pending_redirect"] = ",".join(destinos)
+                return updates
+            updates["messages"] = [AIMessage(content=MENSAGEM_PRAZO_ESGOTADO)]
+            return updates
 
-Identifique a necessidade do cliente e direcione IMEDIATAMENTE:
-- Se pergunta sobre LIMITE DE CRÉDITO, AUMENTO DE LIMITE ou CRÉDITO → Responda APENAS: "REDIRECIONAR: credito"
-- Se pergunta sobre COTAÇÃO, MOEDAS, CÂMBIO, DÓLAR, EURO → Responda APENAS: "REDIRECIONAR: cambio"
-- Se quer ENCERRAR/SAIR → use a ferramenta encerrar_atendimento
+        return self._responder_autenticacao(state, *self._extrair_credenciais(state))
 
-NÃO responda às perguntas. NÃO tente ajudar. APENAS redirecione usando o formato exato acima.
-IMPORTANTE: O agente de entrevista NÃO está disponível via triagem. Questões sobre entrevista ou score devem ir para crédito.
-"""
-        messages = [
-            SystemMessage(content=system_prompt.format(nome=state.get("nome_cliente", "")))
+    def _process_authenticated(self, state: AgentState) -> Dict[str, Any]:
+        """Processa usuário já autenticado."""
+        messages = self._mensagens_autenticado(state)
+        response = chamar_com_prazo(state, "triagem", self._invocar_llm,
+                                    messages, SYSTEM_PROMPT_AUTENTICADO, _e_roteamento)
+        return self._tratar_roteamento(response)
+
+    def _mensagens_autenticado(self, state: AgentState) -> List[BaseMessage]:
+        """Monta as mensagens enviadas ao LLM para um cliente autenticado."""
+        return [
+            SystemMessage(content=SYSTEM_PROMPT_AUTENTICADO.format(nome=state.get("nome_cliente", "")))
         ] + list(state["messages"])
 
-        response = self.llm_with_tools.invoke(messages)
+    def _tratar_roteamento(self, response: AIMessage) -> Dict[str, Any]:
+        """Converte a resposta do LLM em redirecionamento ou mensagem ao cliente."""
         updates = {"current_agent": "triagem"}
 
-        # Se o LLM tentou chamar uma ferramenta que não é de triagem, redireciona silenciosamente
+        # Se o LLM tentou chamar ferramentas que não são de triagem, redireciona silenciosamente
         if response.tool_calls:
+            destinos = []
             for tool_call in response.tool_calls:
-                tool_name = tool_call["name"]
-                if tool_name == "consultar_limite_credito" or tool_name == "solicitar_aumento_limite":
-                    updates["pending_redirect"] = "credito"
-                    return updates
-                elif tool_name == "consultar_cotacao_moeda":
-                    updates["pending_redirect"] = "cambio"
-                    return updates
-                elif tool_name == "calcular_novo_score":
-                    # Entrevista só pode ser acessada via agente de crédito
-                    updates["pending_redirect"] = "credito"
-                    return updates
-                elif tool_name == "encerrar_atendimento":
-                    result = encerrar_atendimento.invoke({})
-                    updates["should_end"] = True
-                    response = AIMessage(content=result["mensagem"])
+                destino = DESTINO_FERRAMENTA.get(tool_call["name"])
+                if destino is not None and destino not in destinos:
+                    destinos.append(destino)
+            if destinos:
+                # Mais de um destino (ex: crédito e câmbio) é atendido em paralelo pelo grafo
+                updates["pending_redirect"] = ",".join(destinos)
+                return updates
+
+            if any(tool_call["name"] == "encerrar_atendimento" for tool_call in response.tool_calls):
+                result = encerrar_atendimento.invoke({})
+                updates["should_end"] = True
+                response = AIMessage(content=result["mensagem"])
 
         if hasattr(response, 'content') and "REDIRECIONAR:" in response.content:
-            redirect_to = response.content.split("REDIRECIONAR:")[1].strip().split()[0]
-            # Bloqueia redirecionamento direto para entrevista - deve ir via crédito
-            if redirect_to == "entrevista":
-                redirect_to = "credito"
-            updates["pending_redirect"] = redirect_to
-            clean_message = response.content.split("REDIRECIONAR:")[0].strip()
+            updates["pending_redirect"] = ",".join(_destinos_redirecionamento(response.content))
             return updates
 
         updates["messages"] = [response]
@@ -90,104 +293,157 @@ IMPORTANTE: O agente de entrevista NÃO está disponível via triagem. Questões
 
     def _process_authentication(self, state: AgentState) -> Dict[str, Any]:
         """Processa autenticação do usuário."""
+        cpf_temp, data_temp = self._extrair_credenciais(state)
+
+        if cpf_temp and self.validar_cpf and not cpf_valido(cpf_temp):
+            return self._cpf_invalido(data_temp)
+        if cpf_temp and data_temp:
+            return self._autenticar(state, cpf_temp, data_temp)
+        if self.templates_autenticacao:
+            return self._responder_autenticacao(state, cpf_temp, data_temp)
+
+        system_prompt, armazenar_se = self._prompt_autenticacao(cpf_temp)
+        messages = [SystemMessage(content=system_prompt)] + list(state["messages"])
+        response = chamar_com_prazo(state, "triagem", self._invocar_llm, messages, system_prompt, armazenar_se)
+        return self._tratar_resposta_autenticacao(response, cpf_temp)
+
+    def _extrair_credenciais(self, state: AgentState) -> Tuple[Optional[str], Optional[str]]:
+        """Extrai CPF e data de nascimento da última mensagem do cliente."""
         cpf_temp = state.get("temp_cpf")
         data_temp = state.get("temp_data_nascimento")
-        
+
         if len(state["messages"]) > 0:
             last_user_message = ""
             for msg in reversed(state["messages"]):
                 if isinstance(msg, HumanMessage):
                     last_user_message = msg.content
                     break
-            
-            cpf_match = re.search(r'\b\d{11}\b', last_user_message)
-            if cpf_match and not cpf_temp:
-                cpf_temp = cpf_match.group(0)
 
-            data_match = re.search(r'\b\d{4}-\d{2}-\d{2}\b', last_user_message)
-            if data_match:
-                data_temp = data_match.group(0)
+            # Aceita "123.456.789-01", "15/05/1990", "15 de maio de 1990" etc.; devolve os formatos canônicos
+            cpf_encontrado, data_encontrada = extrair_credenciais(last_user_message)
+            if cpf_encontrado and not cpf_temp:
+                cpf_temp = cpf_encontrado
 
-        updates = {"current_agent": "triagem"}
+            if data_encontrada:
+                data_temp = data_encontrada
 
-        if cpf_temp and data_temp:
-            result = autenticar_cliente.invoke({"cpf": cpf_temp, "data_nascimento": data_temp})
-
-            if result["sucesso"]:
-                updates["authenticated"] = True
-                updates["cpf"] = result["cliente"]["cpf"]
-                updates["nome_cliente"] = result["cliente"]["nome"]
-                updates["limite_credito"] = result["cliente"]["limite_credito"]
-                updates["score"] = result["cliente"]["score"]
-                updates["authentication_attempts"] = 0
-                updates["temp_cpf"] = None
-                updates["temp_data_nascimento"] = None
-                response = AIMessage(content=result["mensagem"] + "\n\nComo posso ajudá-lo hoje?")
-            else:
-                new_attempts = state.get("authentication_attempts", 0) + 1
-                updates["authentication_attempts"] = new_attempts
-                updates["temp_cpf"] = None
-                updates["temp_data_nascimento"] = None
+        return cpf_temp, data_temp
 
-                if new_attempts >= 3:
-                    updates["should_end"] = True
-                    response = AIMessage(
-                        content="Lamento, mas não foi possível autenticar seus dados após 3 tentativas. "
-                               "Por favor, entre em contato com nossa central de atendimento. Até logo!"
-                    )
-                else:
-                    response = AIMessage(
-                        content=f"{result['mensagem']} Você tem mais {3 - new_attempts} tentativa(s). "
-                               f"Por favor, informe seu CPF novamente."
-                    )
-        
-        elif cpf_temp and not data_temp:            
-            system_prompt_data = """Você é o Agente de Triagem do Banco Ágil.
+    def _cpf_invalido(self, data_temp: Optional[str]) -> Dict[str, Any]:
+        """Recusa o CPF sem consultar o cadastro e sem contar como tentativa de autenticação."""
+        CPFS_INVALIDOS.incrementar()
+        updates = {"current_agent": "triagem", "temp_cpf": None,
+                   "messages": [AIMessage(content=MENSAGEM_CPF_INVALIDO)]}
+        if data_temp:
+            updates["temp_data_nascimento"] = data_temp
+        return updates
 
-O cliente já forneceu o CPF mas ainda NÃO completou a autenticação.
+    def _autenticacao_limitada(self, espera: float) -> Dict[str, Any]:
+        """Recusa a tentativa sem consultar o cadastro; não conta como tentativa da conversa."""
+        AUTENTICACOES_LIMITADAS.incrementar()
+        minutos = max(1, math.ceil(espera / 60))
+        return {
+            "current_agent": "triagem",
+            "temp_cpf": None,
+            "temp_data_nascimento": None,
+            "messages": [AIMessage(content=MENSAGEM_TENTATIVAS_EXCEDIDAS.format(minutos=minutos))]
+        }
+
+    def _autenticar(self, state: AgentState, cpf_temp: str, data_temp: str) -> Dict[str, Any]:
+        """Autentica o cliente e controla o número de tentativas."""
+        updates = {"current_agent": "triagem"}
+        chaves = [f"cpf:{cpf_temp}"]
+        if state.get("cliente_id"):
+            chaves.append(f"cliente:{state['cliente_id']}")
+        if self.limitador is not None:
+            espera = self.limitador.tentar(*chaves)
+            if espera > 0:
+                return self._autenticacao_limitada(espera)
+
+        result = autenticar_cliente.invoke({"cpf": cpf_temp, "data_nascimento": data_temp})
+        TENTATIVAS_AUTENTICACAO.incrementar()
+
+        if result["sucesso"]:
+            if self.limitador is not None:
+                self.limitador.devolver(*chaves)
+            updates["authenticated"] = True
+            updates["cpf"] = result["cliente"]["cpf"]
+            updates["nome_cliente"] = result["cliente"]["nome"]
+            updates["limite_credito"] = result["cliente"]["limite_credito"]
+            updates["score"] = result["cliente"]["score"]
+            updates["versao_cliente"] = result["cliente"].get("versao")
+            updates["authentication_attempts"] = 0
+            updates["temp_cpf"] = None
+            updates["temp_data_nascimento"] = None
+            response = AIMessage(content=result["mensagem"] + "\n\nComo posso ajudá-lo hoje?")
+        else:
+            FALHAS_AUTENTICACAO.incrementar()
+            new_attempts = state.get("authentication_attempts", 0) + 1
+            updates["authentication_attempts"] = new_attempts
+            updates["temp_cpf"] = None
+            updates["temp_data_nascimento"] = None
+
+            if new_attempts >= 3:
+                updates["should_end"] = True
+                response = AIMessage(
+                    content="Lamento, mas não foi possível autenticar seus dados após 3 tentativas. "
+                           "Por favor, entre em contato com nossa central de atendimento. Até logo!"
+                )
+            else:
+                response = AIMessage(
+                    content=f"{result['mensagem']} Você tem mais {3 - new_attempts} tentativa(s). "
+                           f"Por favor, informe seu CPF novamente."
+                )
 
-Suas responsabilidades:
-- Agradecer pelo CPF e solicitar a data de nascimento no formato AAAA-MM-DD (exemplo: 1990-05-15)
-- Se o cliente demonstrar que quer ENCERRAR/SAIR/CANCELAR o atendimento, use a ferramenta encerrar_atendimento
-- Seja cordial e objetivo
+        updates["messages"] = [response]
+        return updates
 
-IMPORTANTE: Analise a intenção do cliente. Se ele claramente quer sair, encerre. Caso contrário, solicite a data de nascimento."""
+    def _responder_autenticacao(self, state: AgentState, cpf_temp: Optional[str],
+                                data_temp: Optional[str]) -> Dict[str, Any]:
+        """Conduz a coleta de CPF e data de nascimento com mensagens prontas, sem LLM."""
+        updates = {"current_agent": "triagem"}
+        ultima = next((m.content for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), "")
+        if detectar_intencao_saida(ultima):
+            result = encerrar_atendimento.invoke({})
+            updates["should_end"] = True
+            updates["messages"] = [AIMessage(content=result["mensagem"])]
+            return updates
 
-            messages_data = [SystemMessage(content=system_prompt_data)] + list(state["messages"])
-            response_data = self.llm_with_tools.invoke(messages_data)
-            
-            if response_data.tool_calls:
-                for tool_call in response_data.tool_calls:
-                    if tool_call["name"] == "encerrar_atendimento":                        
-                        result = encerrar_atendimento.invoke({})
-                        updates["should_end"] = True
-                        response = AIMessage(content=result["mensagem"])
-                        updates["messages"] = [response]
-                        return updates
-            
+        if cpf_temp:
             updates["temp_cpf"] = cpf_temp
-            response = response_data        
+            # A data já pedida e ainda não reconhecida recebe uma orientação sobre o formato
+            texto = MENSAGEM_DATA_NAO_ENCONTRADA if state.get("temp_cpf") else MENSAGEM_SOLICITA_DATA
+        elif data_temp:
+            updates["temp_data_nascimento"] = data_temp
+            texto = MENSAGEM_SOLICITA_CPF_APOS_DATA
+        elif any(isinstance(m, AIMessage) for m in state["messages"]):
+            texto = MENSAGEM_CPF_NAO_ENCONTRADO
         else:
-            system_prompt = """Você é o Agente de Triagem do Banco Ágil.
+            texto = MENSAGEM_SOLICITA_CPF
 
-O cliente ainda NÃO está autenticado.
+        updates["messages"] = [AIMessage(content=texto)]
+        return updates
 
-Suas responsabilidades:
-- Responda cordialmente ao cliente e peça o CPF (11 dígitos)
-- Se o cliente demonstrar que quer ENCERRAR/SAIR/CANCELAR o atendimento, use a ferramenta encerrar_atendimento
-- Seja educado mas objetivo
+    def _prompt_autenticacao(self, cpf_temp: Optional[str]) -> Tuple[str, Callable[[AIMessage], bool]]:
+        """Escolhe o prompt de autenticação e a política de cache conforme os dados já informados."""
+        if cpf_temp:
+            return SYSTEM_PROMPT_SOLICITA_DATA, _e_chamada_ferramenta
+        return SYSTEM_PROMPT_SOLICITA_CPF, _sempre
 
-IMPORTANTE: Analise a intenção do cliente. Se ele claramente quer sair, encerre. Caso contrário, solicite o CPF."""
+    def _tratar_resposta_autenticacao(self, response: AIMessage, cpf_temp: Optional[str]) -> Dict[str, Any]:
+        """Trata a resposta do LLM durante a coleta de CPF e data de nascimento."""
+        updates = {"current_agent": "triagem"}
 
-            messages = [SystemMessage(content=system_prompt)] + list(state["messages"])
-            response = self.llm_with_tools.invoke(messages)
-            
-            if response.tool_calls:
-                for tool_call in response.tool_calls:
-                    if tool_call["name"] == "encerrar_atendimento":                        
-                        result = encerrar_atendimento.invoke({})
-                        updates["should_end"] = True
-                        response = AIMessage(content=result["mensagem"])
+        if response.tool_calls:
+            for tool_call in response.tool_calls:
+                if tool_call["name"] == "encerrar_atendimento":
+                    result = encerrar_atendimento.invoke({})
+                    updates["should_end"] = True
+                    updates["messages"] = [AIMessage(content=result["mensagem"])]
+                    return updates
+
+        if cpf_temp:
+            updates["temp_cpf"] = cpf_temp
 
         updates["messages"] = [response]
         return updates
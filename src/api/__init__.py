@@ -0,0 +1 @@
+"""API HTTP do Banco Ágil (FastAPI), servida com `uvicorn src.api.app:app`."""
@@ -0,0 +1,220 @@
+"""API HTTP assíncrona para conversar com os agentes do Banco Ágil.
+
+Cada worker compila o grafo uma única vez e o compartilha entre todas as
+requisições; o estado de cada conversa fica no armazém de sessões, então
+vários workers (atrás de um balanceador) podem atender a mesma conversa.
+
+Uso:
+    uvicorn src.api.app:app --host 0.0.0.0 --port 8000 --workers 4
+"""
+import asyncio
+from contextlib import asynccontextmanager, suppress
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import BaseModel, Field
+
+from src.config import get_settings
+from src.core.checkpoint import nova_sessao
+from src.core.graph import create_graph
+from src.core.limitador import identificar_cliente
+from src.core.prometheus import TIPO_CONTEUDO, registro_prometheus
+from src.core.sessoes import ArmazemSessoes, ConflitoSessao, criar_armazem
+from src.core.state import estado_inicial
+from src.core.streaming import astream_resposta
+
+MENSAGEM_BOAS_VINDAS = "Olá! Bem-vindo ao Banco Ágil. Para garantir sua segurança, informe seu CPF."
+MENSAGEM_CONFLITO = "A sessão foi atualizada por outra mensagem enquanto esta era processada; reenvie a mensagem"
+
+
+class MensagemEntrada(BaseModel):
+    texto: str = Field(..., min_length=1, max_length=2000, description="Mensagem do cliente")
+
+
+def _mensagens_visiveis(mensagens) -> List[Dict[str, str]]:
+    """Mensagens exibidas ao cliente (sem chamadas de ferramenta)."""
+    visiveis = []
+    for mensagem in mensagens:
+        if isinstance(mensagem, HumanMessage):
+            visiveis.append({"papel": "cliente", "conteudo": mensagem.content})
+        elif isinstance(mensagem, AIMessage) and mensagem.content:
+            visiveis.append({"papel": "assistente", "conteudo": mensagem.content})
+    return visiveis
+
+
+def _resumo(estado: Dict[str, Any]) -> Dict[str, Any]:
+    """Campos do estado devolvidos ao cliente da API (sem o histórico)."""
+    return {campo: valor for campo, valor in estado.items() if campo != "messages"}
+
+
+def _resultado_turno(anterior: Dict[str, Any], final: Dict[str, Any]) -> Dict[str, Any]:
+    """Corpo da resposta de um turno: as novas mensagens do assistente e o estado."""
+    novas = _mensagens_visiveis(final["messages"][len(anterior["messages"]) + 1:])
+    return {
+        "resposta": "\n\n".join(m["conteudo"] for m in novas if m["papel"] == "assistente"),
+        "estado": _resumo(final),
+        "encerrada": bool(final.get("should_end"))
+    }
+
+
+def _armazem(request: Request) -> ArmazemSessoes:
+    return request.app.state.armazem
+
+
+async def _preparar_turno(request: Request, sessao_id: str,
+                          texto: str) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[int]]:
+    """Carrega a sessão (e a sua versão) e monta a entrada do grafo com a nova mensagem."""
+    estado, versao = await _armazem(request).carregar_versionado(sessao_id)
+    if estado is None:
+        raise HTTPException(status_code=404, detail="Sessão não encontrada")
+    if estado.get("should_end"):
+        raise HTTPException(status_code=409, detail="A conversa desta sessão já foi encerrada")
+
+    # O limitador de autenticação conta as falhas por IP, que sobrevive a novas sessões
+    cliente_id = identificar_cliente(
+        request.client.host if request.client else None,
+        request.headers.get("x-forwarded-for"),
+        sessao_id,
+        get_settings().trusted_proxy_ips
+    )
+    entrada = {**estado, "messages": list(estado["messages"]) + [HumanMessage(content=texto)],
+               "cliente_id": cliente_id}
+    return estado, entrada, versao
+
+
+async def _salvar_turno(armazem: ArmazemSessoes, sessao_id: str, estado: Dict[str, Any],
+                        versao: Optional[int]) -> None:
+    """Salva o estado final do turno, desde que nenhum outro turno (de outro worker) o tenha salvo antes."""
+    try:
+        await armazem.salvar(sessao_id, estado, versao)
+    except ConflitoSessao:
+        raise HTTPException(status_code=409, detail=MENSAGEM_CONFLITO) from None
+
+
+def _evento_sse(evento: str, dados: Dict[str, Any]) -> str:
+    return f"event: {evento}\ndata: {json.dumps(dados, ensure_ascii=False, default=str)}\n\n"
+
+
+def _armazem_configurado() -> ArmazemSessoes:
+    """Armazém de sessões definido nas configurações."""
+    settings = get_settings()
+    if settings.session_store == "memoria":
+        return criar_armazem(
+            "memoria",
+            settings.session_spill_path,
+            max_sessoes=settings.session_max_sessions,
+            ttl_ocioso_segundos=settings.session_idle_ttl_seconds,
+            orcamento_bytes=int(settings.session_memory_budget_mb * 1024 * 1024)
+        )
+    return criar_armazem(settings.session_store, settings.session_db_path)
+
+
+async def _varrer_sessoes(armazem: ArmazemSessoes, intervalo: float) -> None:
+    """Executa a manutenção do armazém (ex: expulsar sessões ociosas) periodicamente."""
+    while True:
+        await asyncio.sleep(intervalo)
+        await armazem.manutencao()
+
+
+def criar_app(graph=None, armazem: Optional[ArmazemSessoes] = None,
+              intervalo_varredura: Optional[float] = None) -> FastAPI:
+    """Cria a aplicação; sem argumentos, o grafo e o armazém vêm das configurações."""
+
+    @asynccontextmanager
+    async def ciclo_de_vida(app: FastAPI) -> AsyncIterator[None]:
+        if graph is None:
+            registro_prometheus.configurar_buckets(get_settings().metrics_histogram_buckets)
+        app.state.graph = graph if graph is not None else create_graph(get_settings().openai_api_key)
+        app.state.armazem = armazem if armazem is not None else _armazem_configurado()
+
+        intervalo = intervalo_varredura
+        if intervalo is None:
+            intervalo = get_settings().session_sweep_interval_seconds if armazem is None else 60.0
+        varredura = asyncio.create_task(_varrer_sessoes(app.state.armazem, intervalo))
+        try:
+            yield
+        finally:
+            varredura.cancel()
+            with suppress(asyncio.CancelledError):
+                await varredura
+            await app.state.armazem.fechar()
+
+    app = FastAPI(title="Banco Ágil", lifespan=ciclo_de_vida)
+
+    @app.get("/health")
+    async def health() -> Dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics() -> Response:
+        return Response(content=registro_prometheus.exportar(), media_type=TIPO_CONTEUDO)
+
+    @app.post("/sessoes", status_code=201)
+    async def criar_sessao(request: Request) -> Dict[str, Any]:
+        sessao_id = nova_sessao()
+        await _armazem(request).salvar(sessao_id, estado_inicial())
+        return {"sessao_id": sessao_id, "mensagem": MENSAGEM_BOAS_VINDAS}
+
+    @app.get("/sessoes/{sessao_id}")
+    async def obter_sessao(request: Request, sessao_id: str) -> Dict[str, Any]:
+        estado = await _armazem(request).carregar(sessao_id)
+        if estado is None:
+            raise HTTPException(status_code=404, detail="Sessão não encontrada")
+        return {
+            "sessao_id": sessao_id,
+            "mensagens": _mensagens_visiveis(estado["messages"]),
+            "estado": _resumo(estado)
+        }
+
+    @app.delete("/sessoes/{sessao_id}", status_code=204)
+    async def remover_sessao(request: Request, sessao_id: str) -> Response:
+        if not await _armazem(request).remover(sessao_id):
+            raise HTTPException(status_code=404, detail="Sessão não encontrada")
+        return Response(status_code=204)
+
+    @app.post("/sessoes/{sessao_id}/mensagens")
+    async def enviar_mensagem(request: Request, sessao_id: str, corpo: MensagemEntrada) -> Dict[str, Any]:
+        armazem = _armazem(request)
+        async with armazem.lock(sessao_id):
+            anterior, entrada, versao = await _preparar_turno(request, sessao_id, corpo.texto)
+            final = await request.app.state.graph.ainvoke(entrada)
+            await _salvar_turno(armazem, sessao_id, final, versao)
+        return _resultado_turno(anterior, final)
+
+    @app.post("/sessoes/{sessao_id}/mensagens/stream")
+    async def enviar_mensagem_stream(request: Request, sessao_id: str, corpo: MensagemEntrada) -> StreamingResponse:
+        """Executa o turno emitindo Server-Sent Events: token, ferramenta e final."""
+        armazem = _armazem(request)
+        # Valida antes de abrir o stream, para responder 404/409 com o status HTTP adequado
+        await _preparar_turno(request, sessao_id, corpo.texto)
+
+        async def eventos() -> AsyncIterator[str]:
+            async with armazem.lock(sessao_id):
+                try:
+                    anterior, entrada, versao = await _preparar_turno(request, sessao_id, corpo.texto)
+                except HTTPException as e:
+                    # A sessão mudou enquanto o turno aguardava o lock
+                    yield _evento_sse("erro", {"status": e.status_code, "detalhe": e.detail})
+                    return
+
+                async for evento in astream_resposta(request.app.state.graph, entrada):
+                    if evento["tipo"] == "final":
+                        try:
+                            await _salvar_turno(armazem, sessao_id, evento["estado"], versao)
+                        except HTTPException as e:
+                            yield _evento_sse("erro", {"status": e.status_code, "detalhe": e.detail})
+                            return
+                        yield _evento_sse("final", _resultado_turno(anterior, evento["estado"]))
+                    else:
+                        tipo = evento.pop("tipo")
+                        yield _evento_sse(tipo, evento)
+
+        return StreamingResponse(eventos(), media_type="text/event-stream")
+
+    return app
+
+
+app = criar_app()
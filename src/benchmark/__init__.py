@@ -0,0 +1 @@
+"""Ferramentas de benchmark e simulação do Banco Ágil (executadas com python -m)."""
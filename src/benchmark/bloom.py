@@ -0,0 +1,103 @@
+"""Benchmark do filtro de Bloom de CPFs.
+
+Para cadastros sintéticos de tamanhos crescentes, mede a taxa real de falsos
+positivos (consultando CPFs que não existem), a memória do filtro comparada a
+um `set` de CPFs e o tempo de autenticar um CPF inexistente com e sem o filtro.
+
+Uso:
+    python -m src.benchmark.bloom [--clientes N ...] [--taxa P] [--consultas N]
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.data_models.bloom import FiltroBloom
+from src.data_models.database import Database
+
+
+def cpfs_sinteticos(quantidade: int, semente: int = 0) -> List[str]:
+    """CPFs distintos de 11 dígitos, reprodutíveis pela semente."""
+    gerador = random.Random(semente)
+    cpfs = set()
+    while len(cpfs) < quantidade:
+        cpfs.add(f"{gerador.randrange(10 ** 11):011d}")
+    return sorted(cpfs)
+
+
+def _memoria_set(cpfs: Sequence[str]) -> int:
+    conjunto = set(cpfs)
+    return sys.getsizeof(conjunto) + sum(sys.getsizeof(cpf) for cpf in conjunto)
+
+
+def _gravar_cadastro(diretorio: str, cpfs: Sequence[str]) -> None:
+    with open(os.path.join(diretorio, "clientes.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["cpf", "nome", "data_nascimento", "limite_credito", "score"])
+        for cpf in cpfs:
+            writer.writerow([cpf, "Cliente", "1990-01-01", "1000.0", "500"])
+
+
+def _tempo_autenticacao(db: Database, ausentes: Sequence[str]) -> float:
+    """Tempo médio, em microssegundos, de autenticar CPFs inexistentes."""
+    db.autenticar_cliente(ausentes[0], "1990-01-01")  # constrói o filtro fora da medição
+    inicio = time.perf_counter()
+    for cpf in ausentes:
+        db.autenticar_cliente(cpf, "1990-01-01")
+    return (time.perf_counter() - inicio) / len(ausentes) * 1_000_000
+
+
+def medir_filtro(clientes: int, taxa: float = 0.01, consultas: int = 100_000,
+                 consultas_arquivo: int = 50) -> Dict[str, Any]:
+    """Taxa de falsos positivos, memória e ganho na autenticação para um cadastro de `clientes` CPFs."""
+    cpfs = cpfs_sinteticos(clientes)
+    existentes = set(cpfs)
+    ausentes = [cpf for cpf in cpfs_sinteticos(consultas + clientes, semente=1) if cpf not in existentes][:consultas]
+
+    filtro = FiltroBloom.de_itens(cpfs, taxa)
+    inicio = time.perf_counter()
+    falsos_positivos = sum(1 for cpf in ausentes if cpf in filtro)
+    consulta_us = (time.perf_counter() - inicio) / len(ausentes) * 1_000_000
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        _gravar_cadastro(diretorio, cpfs)
+        amostra = ausentes[:consultas_arquivo]
+        sem_filtro_us = _tempo_autenticacao(Database(diretorio, filtro_bloom=False), amostra)
+        com_filtro_us = _tempo_autenticacao(Database(diretorio, taxa_falsos_positivos=taxa), amostra)
+
+    return {
+        "clientes": clientes,
+        "num_hashes": filtro.num_hashes,
+        "taxa_alvo": taxa,
+        "taxa_estimada": filtro.taxa_estimada(),
+        "taxa_medida": falsos_positivos / len(ausentes),
+        "bytes_filtro": filtro.bytes,
+        "bytes_set": _memoria_set(cpfs),
+        "consulta_filtro_us": consulta_us,
+        "autenticacao_sem_filtro_us": sem_filtro_us,
+        "autenticacao_com_filtro_us": com_filtro_us,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Taxa de falsos positivos e memória do filtro de Bloom de CPFs")
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--taxa", type=float, default=0.01, help="Taxa de falsos positivos alvo")
+    parser.add_argument("--consultas", type=int, default=100_000, help="CPFs inexistentes consultados")
+    args = parser.parse_args(argv)
+
+    print(f"{'clientes':>10}{'k':>4}{'FP alvo':>9}{'FP medido':>11}{'filtro KB':>11}{'set KB':>10}"
+          f"{'consulta us':>13}{'aut. sem us':>13}{'aut. com us':>13}")
+    for clientes in args.clientes:
+        r = medir_filtro(clientes, args.taxa, args.consultas)
+        print(f"{r['clientes']:>10}{r['num_hashes']:>4}{r['taxa_alvo']:>9.2%}{r['taxa_medida']:>11.3%}"
+              f"{r['bytes_filtro'] / 1024:>11.1f}{r['bytes_set'] / 1024:>10.1f}{r['consulta_filtro_us']:>13.2f}"
+              f"{r['autenticacao_sem_filtro_us']:>13.1f}{r['autenticacao_com_filtro_us']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
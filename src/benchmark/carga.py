@@ -0,0 +1,169 @@
+"""Gerador de carga com clientes simultâneos percorrendo a jornada completa.
+
+Cada cliente simulado autentica, consulta o limite, pede um aumento (rejeitado),
+faz a entrevista de crédito, consulta o câmbio e encerra. Os clientes rodam em
+paralelo via `graph.ainvoke`, com o LLM roteirizado ou um endpoint local
+compatível com a API da OpenAI.
+
+Uso:
+    python -m src.benchmark.carga --clientes 1 4 16 64 [--latencia-llm MS] [--endpoint URL]
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import HumanMessage
+
+from src.benchmark.fake_llm import LLMRoteirizado, responder_banco_agil
+from src.benchmark.replay import cotacao_offline, dados_isolados, percentil
+from src.config import get_settings
+from src.core.graph import create_graph
+from src.core.instrumentacao import metricas
+from src.core.state import estado_inicial
+
+CLIENTES_SEED = (
+    ("12345678901", "1990-05-15"),
+    ("98765432100", "1985-08-20"),
+    ("11122233344", "1992-03-10"),
+)
+
+def jornada(cpf: str, data_nascimento: str) -> List[Tuple[str, str]]:
+    """Turnos (tipo, mensagem) da jornada completa de um cliente.
+
+    O aumento pedido excede o maior limite da tabela, então é sempre rejeitado
+    e leva à entrevista, independentemente do score atual do cliente.
+    """
+    return [
+        ("saudacao", "Olá"),
+        ("autenticacao", f"{cpf} {data_nascimento}"),
+        ("consulta_limite", "Qual é o meu limite de crédito?"),
+        ("aumento_limite", "Quero aumentar meu limite para 60000"),
+        ("inicio_entrevista", "Sim, quero fazer a entrevista"),
+        ("entrevista", "5 mil"),
+        ("entrevista", "CLT"),
+        ("entrevista", "1.500"),
+        ("entrevista", "2"),
+        ("entrevista", "não"),
+        ("cambio", "Qual a cotação do dólar?"),
+        ("encerramento", "encerrar"),
+    ]
+
+
+async def _cliente(graph, indice: int, conversas: int, latencias: Dict[str, List[float]],
+                   erros: List[str]) -> None:
+    """Executa `conversas` jornadas completas em sequência."""
+    cpf, data_nascimento = CLIENTES_SEED[indice % len(CLIENTES_SEED)]
+    for _ in range(conversas):
+        estado = estado_inicial()
+        for tipo, texto in jornada(cpf, data_nascimento):
+            if estado.get("should_end"):
+                erros.append(f"cliente {indice}: conversa encerrada antes de '{tipo}'")
+                break
+            estado = {**estado, "messages": list(estado["messages"]) + [HumanMessage(content=texto)]}
+            inicio = time.perf_counter()
+            estado = await graph.ainvoke(estado)
+            latencias.setdefault(tipo, []).append(time.perf_counter() - inicio)
+
+
+def _resumir(valores: Sequence[float]) -> Dict[str, float]:
+    return {
+        "n": len(valores),
+        "p50_ms": percentil(valores, 50) * 1000,
+        "p95_ms": percentil(valores, 95) * 1000,
+        "p99_ms": percentil(valores, 99) * 1000
+    }
+
+
+async def executar_carga(clientes: int, conversas: int = 1, latencia_llm: float = 0.05,
+                         llm=None) -> Dict[str, Any]:
+    """Roda `clientes` clientes simultâneos e consolida vazão, percentis e I/O do Database.
+
+    O I/O do Database vem do registro de métricas, que é zerado no início da execução.
+    """
+    llm = llm or LLMRoteirizado(responder=responder_banco_agil, latencia_segundos=latencia_llm)
+    latencias: Dict[str, List[float]] = {}
+    erros: List[str] = []
+
+    metricas.limpar()
+    with dados_isolados(), cotacao_offline():
+        graph = create_graph(None, llm=llm)
+        inicio = time.perf_counter()
+        await asyncio.gather(*(
+            _cliente(graph, indice, conversas, latencias, erros) for indice in range(clientes)
+        ))
+        duracao = time.perf_counter() - inicio
+
+    todos = [valor for valores in latencias.values() for valor in valores]
+    return {
+        "clientes": clientes,
+        "turnos": len(todos),
+        "duracao_segundos": duracao,
+        "turnos_por_segundo": len(todos) / duracao if duracao else 0.0,
+        "geral": _resumir(todos),
+        "por_tipo": {tipo: _resumir(valores) for tipo, valores in latencias.items()},
+        "io_database": {
+            metodo: {
+                "chamadas": serie["chamadas"],
+                "total_ms": serie["duracao_total_s"] * 1000,
+                "max_ms": serie["duracao_max_s"] * 1000,
+                "bytes_lidos": serie["bytes_lidos"],
+                "bytes_escritos": serie["bytes_escritos"]
+            }
+            for metodo, serie in metricas.instantaneo().get("database", {}).items()
+        },
+        "erros": erros
+    }
+
+
+def _llm_endpoint(endpoint: str):
+    """LLM apontando para um endpoint local compatível com a API da OpenAI."""
+    from langchain_openai import ChatOpenAI
+
+    settings = get_settings()
+    return ChatOpenAI(
+        model=settings.llm_model,
+        temperature=settings.llm_temperature,
+        base_url=endpoint,
+        # Endpoints locais costumam ignorar a chave, mas o cliente exige uma
+        api_key=settings.openai_api_key or "endpoint-local",
+        timeout=settings.llm_request_timeout_seconds,
+        max_retries=settings.llm_max_retries
+    )
+
+
+def _imprimir(resultado: Dict[str, Any]) -> None:
+    print(f"\n=== {resultado['clientes']} cliente(s) ===")
+    print(f"Turnos: {resultado['turnos']}  Duração: {resultado['duracao_segundos']:.2f} s  "
+          f"Vazão: {resultado['turnos_por_segundo']:.1f} turnos/s")
+    if resultado["erros"]:
+        print(f"Erros: {len(resultado['erros'])} (ex: {resultado['erros'][0]})")
+
+    print(f"{'turno':<20}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for tipo, m in list(resultado["por_tipo"].items()) + [("TOTAL", resultado["geral"])]:
+        print(f"{tipo:<20}{m['n']:>6}{m['p50_ms']:>10.1f}{m['p95_ms']:>10.1f}{m['p99_ms']:>10.1f}")
+
+    print(f"{'Database':<30}{'chamadas':>9}{'total ms':>10}{'máx ms':>10}{'KB lidos':>10}{'KB gravados':>12}")
+    for metodo, m in resultado["io_database"].items():
+        print(f"{metodo:<30}{m['chamadas']:>9}{m['total_ms']:>10.1f}{m['max_ms']:>10.2f}"
+              f"{m['bytes_lidos'] / 1024:>10.1f}{m['bytes_escritos'] / 1024:>12.1f}")
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Teste de carga com clientes simultâneos")
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 4, 16, 64],
+                        help="Números de clientes simultâneos a testar, em sequência")
+    parser.add_argument("--conversas", type=int, default=1, help="Jornadas completas por cliente")
+    parser.add_argument("--latencia-llm", type=float, default=50.0,
+                        help="Latência simulada de cada chamada ao LLM roteirizado, em milissegundos")
+    parser.add_argument("--endpoint", help="URL de um endpoint local compatível com a OpenAI (substitui o LLM roteirizado)")
+    args = parser.parse_args(argv)
+
+    for clientes in args.clientes:
+        llm = _llm_endpoint(args.endpoint) if args.endpoint else None
+        resultado = asyncio.run(executar_carga(clientes, args.conversas, args.latencia_llm / 1000, llm))
+        _imprimir(resultado)
+
+
+if __name__ == "__main__":
+    main()
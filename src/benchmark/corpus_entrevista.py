@@ -0,0 +1,103 @@
+"""Corpus rotulado de respostas reais da entrevista de crédito.
+
+Cada item é (campo, resposta do cliente, valor esperado). O valor None indica
+que a resposta é ambígua e deve ser encaminhada ao LLM.
+"""
+
+CORPUS_ENTREVISTA = [
+    # renda_mensal
+    ("renda_mensal", "5000", 5000.0),
+    ("renda_mensal", "5 mil", 5000.0),
+    ("renda_mensal", "3.5k", 3500.0),
+    ("renda_mensal", "3,5 mil", 3500.0),
+    ("renda_mensal", "R$ 5.000,00", 5000.0),
+    ("renda_mensal", "R$5.000", 5000.0),
+    ("renda_mensal", "ganho 8000 por mês", 8000.0),
+    ("renda_mensal", "Minha renda é de 12.500 reais", 12500.0),
+    ("renda_mensal", "uns 4 mil", 4000.0),
+    ("renda_mensal", "dois mil", 2000.0),
+    ("renda_mensal", "1 milhão", 1000000.0),
+    ("renda_mensal", "2.750,50", 2750.5),
+    ("renda_mensal", "10k", 10000.0),
+    ("renda_mensal", "1500 reais", 1500.0),
+    ("renda_mensal", "4.500 mensais", 4500.0),
+    ("renda_mensal", "6 mil por mês", 6000.0),
+    ("renda_mensal", "recebo R$ 3.200,00 líquido", 3200.0),
+    ("renda_mensal", "entre 4 e 5 mil", None),
+    ("renda_mensal", "dois mil e quinhentos", None),
+    ("renda_mensal", "uns 3 mil e 500", None),
+    ("renda_mensal", "depende do mês", None),
+    ("renda_mensal", "prefiro não dizer", None),
+    ("renda_mensal", "12 mil anuais", None),
+    ("renda_mensal", "uns 60 mil por ano", None),
+    ("renda_mensal", "500 por semana", None),
+    ("renda_mensal", "150 reais por dia", None),
+    ("renda_mensal", "-500", None),
+    # despesas_fixas
+    ("despesas_fixas", "3000", 3000.0),
+    ("despesas_fixas", "umas 2 mil", 2000.0),
+    ("despesas_fixas", "R$ 1.200", 1200.0),
+    ("despesas_fixas", "gasto uns 1.8k", 1800.0),
+    ("despesas_fixas", "0", 0.0),
+    ("despesas_fixas", "uns 2 mil por mês", 2000.0),
+    ("despesas_fixas", "R$ 2.300,00", 2300.0),
+    ("despesas_fixas", "1.500 por mês", 1500.0),
+    ("despesas_fixas", "aluguel 1500 e luz 200", None),
+    ("despesas_fixas", "não sei ao certo", None),
+    ("despesas_fixas", "menos 500", None),
+    # tipo_emprego
+    ("tipo_emprego", "CLT", "formal"),
+    ("tipo_emprego", "trabalho de carteira assinada", "formal"),
+    ("tipo_emprego", "sou registrado", "formal"),
+    ("tipo_emprego", "servidor público", "formal"),
+    ("tipo_emprego", "sou concursada", "formal"),
+    ("tipo_emprego", "formal", "formal"),
+    ("tipo_emprego", "sou MEI", "autonomo"),
+    ("tipo_emprego", "autônomo", "autonomo"),
+    ("tipo_emprego", "freelancer", "autonomo"),
+    ("tipo_emprego", "trabalho por conta própria", "autonomo"),
+    ("tipo_emprego", "sou PJ", "autonomo"),
+    ("tipo_emprego", "não tenho carteira assinada", "autonomo"),
+    ("tipo_emprego", "empresário", "autonomo"),
+    ("tipo_emprego", "desempregado", "desempregado"),
+    ("tipo_emprego", "estou sem emprego", "desempregado"),
+    ("tipo_emprego", "não estou trabalhando", "desempregado"),
+    ("tipo_emprego", "fui demitido mês passado", "desempregado"),
+    ("tipo_emprego", "não sou CLT", None),
+    ("tipo_emprego", "trabalho meio período", None),
+    ("tipo_emprego", "CLT e faço freela no fim de semana", None),
+    ("tipo_emprego", "estudante", None),
+    # num_dependentes
+    ("num_dependentes", "2", 2),
+    ("num_dependentes", "dois filhos", 2),
+    ("num_dependentes", "tenho um filho", 1),
+    ("num_dependentes", "nenhum", 0),
+    ("num_dependentes", "não tenho", 0),
+    ("num_dependentes", "zero", 0),
+    ("num_dependentes", "3 ou mais", 3),
+    ("num_dependentes", "5", 3),
+    ("num_dependentes", "sem filhos", 0),
+    ("num_dependentes", "um filho e uma filha", None),
+    ("num_dependentes", "minha mãe mora comigo", None),
+    # tem_dividas
+    ("tem_dividas", "sim", True),
+    ("tem_dividas", "Sim, tenho", True),
+    ("tem_dividas", "tenho sim", True),
+    ("tem_dividas", "possuo", True),
+    ("tem_dividas", "infelizmente sim", True),
+    ("tem_dividas", "não", False),
+    ("tem_dividas", "Não tenho", False),
+    ("tem_dividas", "nenhuma", False),
+    ("tem_dividas", "sem dívidas", False),
+    ("tem_dividas", "n", False),
+    ("tem_dividas", "não devo nada", False),
+    ("tem_dividas", "estou devendo", True),
+    ("tem_dividas", "talvez", None),
+    ("tem_dividas", "não sei", None),
+    ("tem_dividas", "acho que não", None),
+    ("tem_dividas", "acho que sim", None),
+    ("tem_dividas", "não lembro", None),
+    ("tem_dividas", "não tenho certeza", None),
+    ("tem_dividas", "sim, mas não muito", None),
+    ("tem_dividas", "tenho um financiamento do carro que ainda estou pagando", None),
+]
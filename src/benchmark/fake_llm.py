@@ -0,0 +1,228 @@
+"""Modelo de chat determinístico para benchmarks e testes sem chamadas à OpenAI.
+
+O `LLMRoteirizado` reproduz primeiro as respostas do roteiro, na ordem, e depois
+delega ao `responder` (ex: `responder_banco_agil`), simulando a latência configurada.
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+import uuid
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Union
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict, PrivateAttr
+
+from src.core.interpretacao import interpretar_campo
+
+RespostaRoteiro = Union[str, AIMessage]
+
+
+def chamada_ferramenta(nome: str, **args) -> AIMessage:
+    """Cria uma resposta do LLM que chama a ferramenta informada."""
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": nome, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}", "type": "tool_call"}]
+    )
+
+
+def _contar_tokens(texto: str) -> int:
+    """Aproximação de tokens por palavras, suficiente para comparar prompts."""
+    return len(texto.split())
+
+
+def _uso(messages: List[BaseMessage], resposta: AIMessage) -> dict:
+    """Uso de tokens aproximado da chamada, no formato `usage_metadata`."""
+    entrada = sum(_contar_tokens(m.content) for m in messages if isinstance(m.content, str))
+    saida = _contar_tokens(resposta.content or "") + sum(
+        _contar_tokens(json.dumps(tc["args"], ensure_ascii=False)) for tc in resposta.tool_calls
+    )
+    return {"input_tokens": entrada, "output_tokens": saida, "total_tokens": entrada + saida}
+
+
+class LLMRoteirizado(BaseChatModel):
+    """Chat model que responde com um roteiro fixo e/ou uma função de regras."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    roteiro: List[RespostaRoteiro] = []
+    responder: Optional[Callable[[List[BaseMessage]], RespostaRoteiro]] = None
+    latencia_segundos: float = 0.0
+
+    _posicao: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _chamadas: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self) -> str:
+        return "llm-roteirizado"
+
+    @property
+    def chamadas(self) -> int:
+        """Número de invocações atendidas."""
+        return self._chamadas
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs) -> "LLMRoteirizado":
+        """As ferramentas já vêm definidas nas respostas roteirizadas."""
+        return self
+
+    def _proxima_resposta(self, messages: List[BaseMessage]) -> AIMessage:
+        """Retorna uma cópia da próxima resposta do roteiro ou a resposta das regras."""
+        with self._lock:
+            self._chamadas += 1
+            if self._posicao < len(self.roteiro):
+                resposta = self.roteiro[self._posicao]
+                self._posicao += 1
+            else:
+                resposta = None
+
+        if resposta is None:
+            if self.responder is None:
+                raise RuntimeError("Roteiro do LLM esgotado e nenhum responder configurado")
+            resposta = self.responder(messages)
+
+        if isinstance(resposta, str):
+            resposta = AIMessage(content=resposta)
+        # Cópia sem id: o LangChain atribui o id da execução à mensagem retornada
+        return resposta.model_copy(update={"id": None, "usage_metadata": _uso(messages, resposta)}, deep=True)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        if self.latencia_segundos:
+            time.sleep(self.latencia_segundos)
+        return ChatResult(generations=[ChatGeneration(message=self._proxima_resposta(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs) -> ChatResult:
+        if self.latencia_segundos:
+            await asyncio.sleep(self.latencia_segundos)
+        return ChatResult(generations=[ChatGeneration(message=self._proxima_resposta(messages))])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        resposta = self._proxima_resposta(messages)
+        palavras = re.findall(r"\S+\s*", resposta.content) if resposta.content else []
+
+        # A latência é distribuída entre os tokens, como em um streaming real
+        intervalo = self.latencia_segundos / max(len(palavras), 1)
+        for palavra in palavras:
+            if intervalo:
+                time.sleep(intervalo)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=palavra))
+            if run_manager:
+                run_manager.on_llm_new_token(palavra, chunk=chunk)
+            yield chunk
+
+        if not palavras and intervalo:
+            time.sleep(intervalo)
+        # O uso de tokens vem no último chunk, como no streaming da OpenAI
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="",
+            tool_call_chunks=[
+                {"name": tc["name"], "args": json.dumps(tc["args"], ensure_ascii=False),
+                 "id": tc["id"], "index": i}
+                for i, tc in enumerate(resposta.tool_calls)
+            ],
+            usage_metadata=resposta.usage_metadata
+        ))
+
+
+# ---------------------------------------------------------------------------
+# Regras que imitam o comportamento esperado do LLM em cada agente
+# ---------------------------------------------------------------------------
+
+_MOEDAS = {
+    "dolar": "USD", "dólar": "USD", "usd": "USD",
+    "euro": "EUR", "eur": "EUR",
+    "libra": "GBP", "gbp": "GBP",
+    "iene": "JPY", "peso": "ARS"
+}
+
+_RE_SAIR = re.compile(r"\b(sair|encerrar|tchau|finalizar|cancelar)\b", re.IGNORECASE)
+_RE_CREDITO = re.compile(r"\b(limite|cr[ée]dito|aumento|aumentar|score|entrevista)\b", re.IGNORECASE)
+_RE_CAMBIO = re.compile(r"\b(cota[çc][ãa]o|c[âa]mbio|moeda|d[óo]lar|euro|libra)\b", re.IGNORECASE)
+_RE_VALOR = re.compile(r"\d[\d.]*(?:,\d+)?")
+
+
+def _ultima_humana(messages: List[BaseMessage]) -> str:
+    for mensagem in reversed(messages):
+        if isinstance(mensagem, HumanMessage):
+            return mensagem.content
+    return ""
+
+
+def _ultima_ia(messages: List[BaseMessage]) -> str:
+    for mensagem in reversed(messages):
+        if isinstance(mensagem, AIMessage):
+            return mensagem.content or ""
+    return ""
+
+
+def _responder_triagem(system: str, texto: str) -> RespostaRoteiro:
+    if _RE_SAIR.search(texto):
+        return chamada_ferramenta("encerrar_atendimento")
+    if "já está autenticado" in system:
+        credito, cambio = _RE_CREDITO.search(texto), _RE_CAMBIO.search(texto)
+        if credito and cambio:
+            return "REDIRECIONAR: credito, cambio" if credito.start() < cambio.start() else "REDIRECIONAR: cambio, credito"
+        if credito:
+            return "REDIRECIONAR: credito"
+        if cambio:
+            return "REDIRECIONAR: cambio"
+        return "Posso ajudar com limite de crédito ou cotação de moedas. O que deseja?"
+    if "já forneceu o CPF" in system:
+        return "Obrigado! Agora informe sua data de nascimento no formato AAAA-MM-DD."
+    return "Olá! Bem-vindo ao Banco Ágil. Por favor, informe seu CPF (11 dígitos)."
+
+
+def _responder_credito(messages: List[BaseMessage], texto: str) -> RespostaRoteiro:
+    if _RE_SAIR.search(texto):
+        return chamada_ferramenta("encerrar_atendimento")
+    if "entrevista" in _ultima_ia(messages).lower() and re.search(r"\b(sim|quero|aceito|claro)\b", texto, re.IGNORECASE):
+        return "REDIRECIONAR: entrevista"
+
+    valor = _RE_VALOR.search(texto)
+    if valor and re.search(r"aument|para", texto, re.IGNORECASE):
+        novo_limite = float(valor.group(0).replace(".", "").replace(",", "."))
+        return chamada_ferramenta("solicitar_aumento_limite", novo_limite=novo_limite)
+    return chamada_ferramenta("consultar_limite_credito")
+
+
+def _responder_cambio(texto: str) -> RespostaRoteiro:
+    if _RE_SAIR.search(texto):
+        return chamada_ferramenta("encerrar_atendimento")
+    for palavra, codigo in _MOEDAS.items():
+        if re.search(r"\b" + palavra + r"\b", texto, re.IGNORECASE):
+            return chamada_ferramenta("consultar_cotacao_moeda", moeda=codigo)
+    return "Atendo apenas consultas de câmbio. Qual moeda deseja consultar?"
+
+
+def _responder_entrevista(system: str, texto: str) -> RespostaRoteiro:
+    if _RE_SAIR.search(texto):
+        return chamada_ferramenta("encerrar_atendimento")
+
+    faltantes = system.split("INFORMAÇÕES QUE AINDA FALTAM:")[1].split("INSTRUÇÕES:")[0]
+    for campo in re.findall(r"- (\w+)", faltantes):
+        valor = interpretar_campo(campo, texto)
+        if valor is not None:
+            return chamada_ferramenta("registrar_dados_entrevista", **{campo: valor})
+    return "Não entendi bem. Pode responder com um valor aproximado?"
+
+
+def responder_banco_agil(messages: List[BaseMessage]) -> RespostaRoteiro:
+    """Imita as decisões do LLM a partir do prompt de sistema e da última mensagem do cliente."""
+    system = messages[0].content if messages and isinstance(messages[0], SystemMessage) else ""
+    texto = _ultima_humana(messages)
+
+    if "Agente de Triagem" in system:
+        return _responder_triagem(system, texto)
+    if "Agente de Crédito" in system:
+        return _responder_credito(messages, texto)
+    if "Agente de Câmbio" in system:
+        return _responder_cambio(texto)
+    if "Agente de Entrevista" in system:
+        return _responder_entrevista(system, texto)
+    return "Como posso ajudar?"
@@ -0,0 +1,71 @@
+"""Benchmark do interpretador local de respostas da entrevista.
+
+Uso:
+    python -m src.benchmark.interpretacao [--repeticoes N]
+"""
+import argparse
+import time
+from typing import Any, Dict
+
+from src.benchmark.corpus_entrevista import CORPUS_ENTREVISTA
+from src.core.interpretacao import interpretar_campo
+
+
+def avaliar_corpus() -> Dict[str, Any]:
+    """Compara o interpretador com os rótulos do corpus.
+
+    - cobertura: fração das respostas resolvidas sem LLM
+    - acuracia: fração das respostas cujo resultado (valor ou None) bate com o rótulo
+    - erros_confiantes: respostas interpretadas com um valor diferente do esperado
+    """
+    acertos = 0
+    resolvidas = 0
+    erros_confiantes = []
+
+    for campo, texto, esperado in CORPUS_ENTREVISTA:
+        resultado = interpretar_campo(campo, texto)
+        if resultado is not None:
+            resolvidas += 1
+            if resultado != esperado:
+                erros_confiantes.append((campo, texto, resultado, esperado))
+        if resultado == esperado:
+            acertos += 1
+
+    total = len(CORPUS_ENTREVISTA)
+    return {
+        "total": total,
+        "acuracia": acertos / total,
+        "cobertura": resolvidas / total,
+        "erros_confiantes": erros_confiantes
+    }
+
+
+def medir_latencia(repeticoes: int = 200) -> float:
+    """Retorna a latência média, em microssegundos, de uma interpretação."""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for campo, texto, _esperado in CORPUS_ENTREVISTA:
+            interpretar_campo(campo, texto)
+    duracao = time.perf_counter() - inicio
+    return duracao / (repeticoes * len(CORPUS_ENTREVISTA)) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do interpretador da entrevista")
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    resultado = avaliar_corpus()
+    latencia_us = medir_latencia(args.repeticoes)
+
+    print(f"Respostas no corpus:     {resultado['total']}")
+    print(f"Acurácia:                {resultado['acuracia']:.1%}")
+    print(f"Resolvidas sem LLM:      {resultado['cobertura']:.1%}")
+    print(f"Erros confiantes:        {len(resultado['erros_confiantes'])}")
+    print(f"Latência média:          {latencia_us:.1f} µs por resposta")
+    for campo, texto, obtido, esperado in resultado["erros_confiantes"]:
+        print(f"  [{campo}] {texto!r}: obtido={obtido!r} esperado={esperado!r}")
+
+
+if __name__ == "__main__":
+    main()
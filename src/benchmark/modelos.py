@@ -0,0 +1,133 @@
+"""Latência e custo por conversa com diferentes modelos por agente.
+
+Cada configuração associa um modelo a cada agente. No modo offline, cada agente
+recebe um LLM roteirizado com a latência típica do seu modelo, e o custo é
+calculado a partir dos tokens registrados pela instrumentação e do preço de cada
+modelo. Com `--real`, as conversas usam os modelos da OpenAI (exige
+OPENAI_API_KEY e gera custo); as cotações continuam offline.
+
+Uso:
+    python -m src.benchmark.modelos [--repeticoes N] [--real] [--configuracao NOME ...]
+"""
+import argparse
+from dataclasses import dataclass
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.agents.base import AGENTES
+from src.benchmark.fake_llm import LLMRoteirizado, responder_banco_agil
+from src.benchmark.replay import CONVERSAS, cotacao_offline, dados_isolados, executar_conversa, percentil
+from src.config import get_settings
+from src.core.graph import create_graph
+from src.core.instrumentacao import metricas
+
+
+@dataclass
+class PerfilModelo:
+    """Latência típica de uma chamada e preço em US$ por milhão de tokens."""
+    latencia_segundos: float
+    preco_entrada: float
+    preco_saida: float
+
+
+# Estimativas para o modo offline; ajuste conforme a tabela de preços vigente
+PERFIS_MODELOS: Dict[str, PerfilModelo] = {
+    "gpt-4o": PerfilModelo(latencia_segundos=0.9, preco_entrada=2.50, preco_saida=10.00),
+    "gpt-4o-mini": PerfilModelo(latencia_segundos=0.45, preco_entrada=0.15, preco_saida=0.60),
+}
+
+CONFIGURACOES: Dict[str, Dict[str, str]] = {
+    "unico": {agente: "gpt-4o" for agente in AGENTES},
+    "escalonado": {"triagem": "gpt-4o-mini", "credito": "gpt-4o", "entrevista": "gpt-4o", "cambio": "gpt-4o-mini"},
+    "economico": {agente: "gpt-4o-mini" for agente in AGENTES},
+}
+
+
+def _agente_do_no(no: str) -> str:
+    """Agente responsável por um nó do grafo (ramos paralelos usam o agente de origem)."""
+    return no[:-len("_paralelo")] if no.endswith("_paralelo") else no
+
+
+def custo_chamadas(llm: Dict[str, Dict[str, float]], modelos: Dict[str, str]) -> float:
+    """Custo em US$ das chamadas registradas em `metricas.instantaneo()["llm"]`."""
+    total = 0.0
+    for no, serie in llm.items():
+        modelo = modelos.get(_agente_do_no(no))
+        perfil = PERFIS_MODELOS.get(modelo)
+        if perfil is None:
+            continue
+        total += (serie["tokens_prompt"] * perfil.preco_entrada + serie["tokens_resposta"] * perfil.preco_saida) / 1e6
+    return total
+
+
+def _llms_offline(modelos: Dict[str, str]) -> Dict[str, LLMRoteirizado]:
+    return {
+        agente: LLMRoteirizado(responder=responder_banco_agil,
+                               latencia_segundos=PERFIS_MODELOS[modelo].latencia_segundos)
+        for agente, modelo in modelos.items()
+    }
+
+
+def _llms_openai(modelos: Dict[str, str]) -> Dict[str, Any]:
+    from langchain_openai import ChatOpenAI
+
+    settings = get_settings()
+    clientes: Dict[str, Any] = {}
+    for modelo in set(modelos.values()):
+        clientes[modelo] = ChatOpenAI(model=modelo, temperature=settings.llm_temperature,
+                                      api_key=settings.exigir_openai_api_key(),
+                                      timeout=settings.llm_request_timeout_seconds,
+                                      max_retries=settings.llm_max_retries)
+    return {agente: clientes[modelo] for agente, modelo in modelos.items()}
+
+
+def comparar_configuracao(modelos: Dict[str, str], conversas: Optional[Dict[str, List[str]]] = None,
+                          repeticoes: int = 1, real: bool = False) -> Dict[str, Any]:
+    """Reproduz as conversas com os modelos dados e consolida latência e custo por conversa."""
+    conversas = conversas or CONVERSAS
+    duracoes: List[float] = []
+
+    metricas.limpar()
+    with dados_isolados(), cotacao_offline():
+        llms = _llms_openai(modelos) if real else _llms_offline(modelos)
+        graph = create_graph(get_settings().openai_api_key, llms=llms)
+        for _ in range(repeticoes):
+            for roteiro in conversas.values():
+                inicio = time.perf_counter()
+                executar_conversa(graph, roteiro, {})
+                duracoes.append(time.perf_counter() - inicio)
+
+    llm = metricas.instantaneo().get("llm", {})
+    custo = custo_chamadas(llm, modelos)
+    return {
+        "modelos": dict(modelos),
+        "conversas": len(duracoes),
+        "latencia_media_s": sum(duracoes) / len(duracoes),
+        "latencia_p95_s": percentil(duracoes, 95),
+        "tokens_prompt": sum(serie["tokens_prompt"] for serie in llm.values()),
+        "tokens_resposta": sum(serie["tokens_resposta"] for serie in llm.values()),
+        "custo_por_conversa_usd": custo / len(duracoes),
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Latência e custo por conversa para cada configuração de modelos")
+    parser.add_argument("--configuracao", choices=sorted(CONFIGURACOES), action="append",
+                        help="Configuração a comparar (pode ser repetido; padrão: todas)")
+    parser.add_argument("--repeticoes", type=int, default=1)
+    parser.add_argument("--real", action="store_true",
+                        help="Usa os modelos da OpenAI em vez do LLM roteirizado (gera custo)")
+    args = parser.parse_args(argv)
+
+    nomes = args.configuracao or list(CONFIGURACOES)
+    print(f"{'configuração':<14}{'conversas':>10}{'média s':>10}{'p95 s':>10}"
+          f"{'tokens in':>11}{'tokens out':>11}{'US$/conversa':>14}{'US$/1000':>10}")
+    for nome in nomes:
+        r = comparar_configuracao(CONFIGURACOES[nome], repeticoes=args.repeticoes, real=args.real)
+        print(f"{nome:<14}{r['conversas']:>10}{r['latencia_media_s']:>10.2f}{r['latencia_p95_s']:>10.2f}"
+              f"{r['tokens_prompt']:>11}{r['tokens_resposta']:>11}"
+              f"{r['custo_por_conversa_usd']:>14.5f}{r['custo_por_conversa_usd'] * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Reprodução de conversas completas pelo grafo com um LLM roteirizado.
+
+Mede a latência de cada nó e a vazão de turnos sem chamadas à OpenAI: os dados
+são copiados para um diretório temporário e a cotação de moedas é respondida
+localmente, isolando o custo do grafo e das ferramentas.
+
+Uso:
+    python -m src.benchmark.replay [--repeticoes N] [--latencia-llm MS] [--conversa NOME]
+"""
+import argparse
+from contextlib import contextmanager
+import importlib
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+import requests
+
+from src.benchmark.fake_llm import LLMRoteirizado, responder_banco_agil
+from src.config.settings import BASE_DIR
+from src.core.graph import create_graph
+from src.core.instrumentacao import metricas
+from src.core.limitador import get_limitador_autenticacao
+from src.core.state import estado_inicial
+from src.data_models.database import Database
+from src.tools.cambio import cache_cotacoes, ultimas_cotacoes
+
+CONVERSAS: Dict[str, List[str]] = {
+    "consulta_limite": [
+        "Olá", "12345678901", "1990-05-15", "Qual é o meu limite de crédito?", "sair"
+    ],
+    "aumento_aprovado": [
+        "Oi", "12345678901 1990-05-15", "Quero aumentar meu limite para 7000", "tchau"
+    ],
+    "aumento_rejeitado_entrevista": [
+        "Olá", "98765432100", "1985-08-20", "Quero aumentar meu limite para 5000",
+        "Sim, quero fazer a entrevista", "5 mil", "CLT", "1.500", "2", "não", "encerrar"
+    ],
+    "cotacao": [
+        "Bom dia", "11122233344", "1992-03-10", "Qual a cotação do dólar?", "E o euro?", "encerrar"
+    ],
+    "limite_e_cotacao": [
+        "Oi", "12345678901 1990-05-15", "Qual meu limite e quanto está o euro?", "sair"
+    ],
+    "falha_autenticacao": [
+        "Olá", "00000000000", "2000-01-01", "00000000000 2000-01-01", "00000000000 2000-01-01"
+    ]
+}
+
+COTACOES_OFFLINE = {"USD": 5.25, "EUR": 5.70, "GBP": 6.60, "JPY": 0.035, "ARS": 0.006}
+
+MODULOS_COM_DATABASE = ("src.tools.autenticacao", "src.tools.credito", "src.tools.score")
+
+
+@contextmanager
+def dados_isolados(origem: Optional[str] = None) -> Iterator[str]:
+    """Aponta as ferramentas para uma cópia temporária dos CSVs de data/."""
+    origem = origem or str(BASE_DIR / "data")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        destino = os.path.join(tmpdir, "data")
+        shutil.copytree(origem, destino)
+        db = Database(destino)
+        with _substituir_database(db):
+            yield destino
+
+
+@contextmanager
+def _substituir_database(db: Database) -> Iterator[None]:
+    modulos = [importlib.import_module(nome) for nome in MODULOS_COM_DATABASE]
+    originais = [modulo.db for modulo in modulos]
+    try:
+        for modulo in modulos:
+            modulo.db = db
+        yield
+    finally:
+        for modulo, original in zip(modulos, originais):
+            modulo.db = original
+
+
+@contextmanager
+def cotacao_offline(cotacoes: Optional[Dict[str, float]] = None) -> Iterator[None]:
+    """Responde a consulta de cotação localmente, sem acessar a API de câmbio.
+
+    O cache de cotações é esvaziado na entrada e na saída, para que valores
+    reais e simulados não se misturem.
+    """
+    cotacoes = cotacoes or COTACOES_OFFLINE
+
+    def _get(url: str, timeout: float = None):
+        moeda = url.rstrip("/").split("/")[-1]
+        if moeda not in cotacoes:
+            return SimpleNamespace(status_code=404, json=lambda: {})
+        return SimpleNamespace(status_code=200, json=lambda: {"rates": {"BRL": cotacoes[moeda]}})
+
+    falso = SimpleNamespace(get=_get, exceptions=requests.exceptions)
+    cache_cotacoes.limpar()
+    ultimas_cotacoes.limpar()
+    try:
+        with patch("src.tools.cambio.requests", falso):
+            yield
+    finally:
+        cache_cotacoes.limpar()
+        ultimas_cotacoes.limpar()
+
+
+def percentil(valores: Sequence[float], p: float) -> float:
+    """Percentil pelo método do posto mais próximo (p entre 0 e 100)."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1))
+    return ordenados[indice]
+
+
+def executar_conversa(graph, turnos: Sequence[str], latencias: Dict[str, List[float]]) -> Dict[str, Any]:
+    """Reproduz os turnos de uma conversa, acumulando a duração de cada nó em `latencias`.
+
+    Retorna o estado final e o número de turnos efetivamente executados.
+    """
+    estado = estado_inicial()
+    executados = 0
+
+    for texto in turnos:
+        if estado.get("should_end"):
+            break
+
+        estado = {**estado, "messages": list(estado["messages"]) + [HumanMessage(content=texto)]}
+        anterior = time.perf_counter()
+        for modo, dados in graph.stream(estado, stream_mode=["updates", "values"]):
+            if modo == "updates":
+                agora = time.perf_counter()
+                for no in dados:
+                    latencias.setdefault(no, []).append(agora - anterior)
+                anterior = agora
+            else:
+                estado = dados
+        executados += 1
+
+    return {"estado": estado, "turnos": executados}
+
+
+def executar_replay(conversas: Optional[Dict[str, List[str]]] = None, repeticoes: int = 1,
+                    latencia_llm: float = 0.0) -> Dict[str, Any]:
+    """Reproduz as conversas `repeticoes` vezes e consolida latência por nó e vazão.
+
+    Inclui o instantâneo do registro de métricas (agentes, LLM, ferramentas e Database),
+    que é zerado no início da execução.
+    """
+    conversas = conversas or CONVERSAS
+    llm = LLMRoteirizado(responder=responder_banco_agil, latencia_segundos=latencia_llm)
+    latencias: Dict[str, List[float]] = {}
+    turnos = 0
+
+    metricas.limpar()
+    with dados_isolados(), cotacao_offline():
+        graph = create_graph(None, llm=llm)
+        inicio = time.perf_counter()
+        limitador = get_limitador_autenticacao()
+        for _ in range(repeticoes):
+            # Cada repetição simula outros clientes: as falhas roteirizadas não se acumulam no limitador
+            if limitador is not None:
+                limitador.limpar()
+            for roteiro in conversas.values():
+                turnos += executar_conversa(graph, roteiro, latencias)["turnos"]
+        duracao = time.perf_counter() - inicio
+
+    return {
+        "turnos": turnos,
+        "duracao_segundos": duracao,
+        "turnos_por_segundo": turnos / duracao if duracao else 0.0,
+        "chamadas_llm": llm.chamadas,
+        "nos": {
+            no: {
+                "execucoes": len(valores),
+                "media_ms": sum(valores) / len(valores) * 1000,
+                "p50_ms": percentil(valores, 50) * 1000,
+                "p95_ms": percentil(valores, 95) * 1000
+            }
+            for no, valores in sorted(latencias.items())
+        },
+        "metricas": metricas.instantaneo()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay de conversas com LLM roteirizado")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--latencia-llm", type=float, default=0.0,
+                        help="Latência simulada de cada chamada ao LLM, em milissegundos")
+    parser.add_argument("--conversa", choices=sorted(CONVERSAS), action="append",
+                        help="Conversa a reproduzir (pode ser repetido; padrão: todas)")
+    parser.add_argument("--metricas", metavar="ARQUIVO",
+                        help="Grava o registro de métricas em JSON no arquivo informado")
+    args = parser.parse_args()
+
+    conversas = {nome: CONVERSAS[nome] for nome in args.conversa} if args.conversa else CONVERSAS
+    resultado = executar_replay(conversas, args.repeticoes, args.latencia_llm / 1000)
+
+    print(f"Turnos:            {resultado['turnos']}")
+    print(f"Duração:           {resultado['duracao_segundos']:.2f} s")
+    print(f"Vazão:             {resultado['turnos_por_segundo']:.1f} turnos/s")
+    print(f"Chamadas ao LLM:   {resultado['chamadas_llm']}")
+    print()
+    print(f"{'nó':<12}{'execuções':>10}{'média ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for no, m in resultado["nos"].items():
+        print(f"{no:<12}{m['execucoes']:>10}{m['media_ms']:>10.2f}"
+              f"{m['p50_ms']:>10.2f}{m['p95_ms']:>10.2f}")
+
+    llm = resultado["metricas"].get("llm", {})
+    print()
+    print(f"{'LLM por nó':<12}{'chamadas':>10}{'tokens in':>11}{'tokens out':>11}")
+    for no, serie in llm.items():
+        print(f"{no:<12}{serie['chamadas']:>10}{serie['tokens_prompt']:>11}{serie['tokens_resposta']:>11}")
+
+    if args.metricas:
+        with open(args.metricas, "w", encoding="utf-8") as f:
+            json.dump(resultado["metricas"], f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
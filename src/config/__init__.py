@@ -1,5 +1,19 @@
+from functools import lru_cache
+
 from src.config.settings import Settings
 
-settings = Settings()
 
-__all__ = ['settings', 'Settings']
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Carrega as configurações na primeira utilização e as reaproveita depois."""
+    return Settings()
+
+
+def __getattr__(nome: str):
+    # `from src.config import settings` continua funcionando, mas só carrega quando usado
+    if nome == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+__all__ = ['get_settings', 'settings', 'Settings']
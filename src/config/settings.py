@@ -1,4 +1,6 @@
 from pathlib import Path
+from typing import List, Literal, Optional
+
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
@@ -6,6 +8,8 @@ from dotenv import load_dotenv
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 ENV_FILE = BASE_DIR / ".env"
 
+MENSAGEM_SEM_CHAVE = "OPENAI_API_KEY não configurada. Configure uma chave válida no arquivo .env"
+
 if ENV_FILE.exists():
     load_dotenv(ENV_FILE)
 
@@ -20,8 +24,10 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
-    openai_api_key: str = Field(
-        ...,
+    # Exigida apenas quando um cliente da OpenAI é criado: grafos com modelos injetados
+    # (ex: benchmarks offline) funcionam sem ela
+    openai_api_key: Optional[str] = Field(
+        default=None,
         description="Chave de API da OpenAI",
         min_length=1
     )
@@ -31,6 +37,28 @@ class Settings(BaseSettings):
         description="Modelo de linguagem a ser usado"
     )
     
+    # Modelo de cada agente; vazio usa o llm_model. A triagem só emite rótulos de
+    # redirecionamento e o câmbio só escolhe a moeda: um modelo pequeno basta
+    llm_model_triagem: Optional[str] = Field(
+        default="gpt-4o-mini",
+        description="Modelo do agente de triagem (vazio: usa o llm_model)"
+    )
+
+    llm_model_credito: Optional[str] = Field(
+        default=None,
+        description="Modelo do agente de crédito (vazio: usa o llm_model)"
+    )
+
+    llm_model_entrevista: Optional[str] = Field(
+        default=None,
+        description="Modelo do agente de entrevista (vazio: usa o llm_model)"
+    )
+
+    llm_model_cambio: Optional[str] = Field(
+        default="gpt-4o-mini",
+        description="Modelo do agente de câmbio (vazio: usa o llm_model)"
+    )
+
     llm_temperature: float = Field(
         default=0.0,
         ge=0.0,
@@ -38,16 +66,216 @@ class Settings(BaseSettings):
         description="Temperatura do modelo (0.0 a 2.0)"
     )
 
+    llm_request_timeout_seconds: float = Field(
+        default=30.0,
+        gt=0,
+        description="Tempo limite de cada requisição ao LLM; dentro de um turno, vale o que resta do prazo"
+    )
+
+    llm_max_retries: int = Field(
+        default=1,
+        ge=0,
+        description="Novas tentativas do cliente da OpenAI após erros transitórios de uma requisição"
+    )
+
+    llm_cache_enabled: bool = Field(
+        default=True,
+        description="Ativa o cache de respostas do LLM para turnos sem dados do cliente"
+    )
+
+    llm_cache_max_entries: int = Field(
+        default=256,
+        ge=1,
+        description="Número máximo de respostas mantidas no cache do LLM"
+    )
+
+    llm_cache_ttl_seconds: float = Field(
+        default=600.0,
+        gt=0.0,
+        description="Tempo de vida (em segundos) das respostas no cache do LLM"
+    )
+
+    llm_admission_enabled: bool = Field(
+        default=True,
+        description="Limita as chamadas simultâneas ao LLM, enfileirando as excedentes"
+    )
+
+    llm_admission_backend: Literal["local", "sqlite"] = Field(
+        default="local",
+        description="Controle de admissão por processo ('local') ou entre processos ('sqlite')"
+    )
+
+    llm_admission_db_path: str = Field(
+        default="data/admissao.sqlite",
+        description="Arquivo SQLite compartilhado pelo controle de admissão 'sqlite'"
+    )
+
+    llm_max_in_flight: int = Field(
+        default=16,
+        ge=1,
+        description="Máximo de chamadas ao LLM em andamento ao mesmo tempo"
+    )
+
+    llm_tokens_per_minute: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Orçamento de tokens por minuto das chamadas ao LLM (vazio: sem limite)"
+    )
+
+    triage_auth_templates: bool = Field(
+        default=True,
+        description="Conduz a autenticação com mensagens prontas, sem chamar o LLM"
+    )
+
+    cpf_check_digit_validation: bool = Field(
+        default=False,
+        description="Recusa CPFs com dígitos verificadores inválidos antes de consultar o cadastro "
+                    "(os CPFs de demonstração de data/clientes.csv não têm dígitos válidos)"
+    )
+
+    auth_rate_limit_enabled: bool = Field(
+        default=True,
+        description="Limita as autenticações malsucedidas por CPF e por cliente, entre todas as conversas"
+    )
+
+    auth_rate_limit_attempts: int = Field(
+        default=5,
+        ge=1,
+        description="Autenticações malsucedidas permitidas em sequência para o mesmo CPF ou cliente"
+    )
+
+    auth_rate_limit_window_seconds: float = Field(
+        default=300.0,
+        gt=0,
+        description="Tempo (em segundos) para recuperar todas as tentativas de um CPF ou cliente"
+    )
+
+    auth_rate_limit_max_keys: int = Field(
+        default=10_000,
+        ge=1,
+        description="Máximo de CPFs e clientes acompanhados em memória pelo limitador"
+    )
+
+    auth_rate_limit_backend: Literal["local", "sqlite"] = Field(
+        default="local",
+        description="Limitador por processo ('local') ou compartilhado entre os processos da máquina ('sqlite')"
+    )
+
+    auth_rate_limit_db_path: str = Field(
+        default="data/limitador.sqlite",
+        description="Arquivo SQLite compartilhado pelo limitador 'sqlite'"
+    )
+
+    trusted_proxy_ips: List[str] = Field(
+        default=[],
+        description="IPs dos proxies/balanceadores confiáveis; atrás deles, o cliente é lido de X-Forwarded-For"
+    )
+
+    turn_budget_seconds: Optional[float] = Field(
+        default=45.0,
+        gt=0,
+        description="Tempo máximo de cada turno; ao esgotar, o agente responde com uma mensagem de contingência"
+    )
+
+    tool_timeout_seconds: float = Field(
+        default=30.0,
+        gt=0.0,
+        description="Tempo limite (em segundos) de cada chamada de ferramenta"
+    )
+
+    tool_max_parallel: int = Field(
+        default=8,
+        ge=1,
+        description="Máximo de chamadas de ferramenta executadas em paralelo por processo"
+    )
+
+    multi_intent_fan_out: bool = Field(
+        default=True,
+        description="Atende em paralelo, no mesmo turno, pedidos de crédito e câmbio na mesma mensagem"
+    )
+
+    checkpoint_db_path: str = Field(
+        default="data/checkpoints.sqlite",
+        description="Arquivo SQLite onde o estado das conversas é persistido"
+    )
+
+    session_store: Literal["memoria", "sqlite"] = Field(
+        default="sqlite",
+        description="Armazém do estado das conversas da API HTTP"
+    )
+
+    session_db_path: str = Field(
+        default="data/sessoes.sqlite",
+        description="Arquivo SQLite do armazém de sessões da API HTTP"
+    )
+
+    session_max_sessions: int = Field(
+        default=10000,
+        ge=1,
+        description="Máximo de sessões mantidas em memória pelo armazém 'memoria'"
+    )
+
+    session_idle_ttl_seconds: float = Field(
+        default=1800.0,
+        gt=0.0,
+        description="Tempo sem turnos (em segundos) após o qual a sessão sai da memória"
+    )
+
+    session_memory_budget_mb: float = Field(
+        default=256.0,
+        gt=0.0,
+        description="Memória estimada máxima (em MB) ocupada pelas sessões em memória"
+    )
+
+    session_spill_path: Optional[str] = Field(
+        default=None,
+        description="Arquivo SQLite que recebe as sessões expulsas da memória (vazio: descartá-las)"
+    )
+
+    session_sweep_interval_seconds: float = Field(
+        default=60.0,
+        gt=0.0,
+        description="Intervalo (em segundos) da varredura de sessões ociosas"
+    )
+
+    metrics_enabled: bool = Field(
+        default=True,
+        description="Ativa o endpoint /metrics no formato do Prometheus"
+    )
+
+    metrics_port: int = Field(
+        default=9100,
+        ge=1,
+        le=65535,
+        description="Porta do servidor de métricas"
+    )
+
+    metrics_histogram_buckets: List[float] = Field(
+        default=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0],
+        min_length=1,
+        description="Limites (em segundos) dos buckets dos histogramas de latência"
+    )
+
     @field_validator("openai_api_key")
     @classmethod
-    def validate_openai_key(cls, v: str) -> str:
-        """Valida que a chave da OpenAI não está vazia."""
-        if not v or v == "your_openai_api_key_here":
+    def validate_openai_key(cls, v: Optional[str]) -> Optional[str]:
+        """Valida que a chave da OpenAI, quando informada, não está vazia."""
+        if v is not None and (not v or v == "your_openai_api_key_here"):
             raise ValueError(
                 "OPENAI_API_KEY inválida. Configure uma chave válida no arquivo .env"
             )
         return v
 
+    def exigir_openai_api_key(self) -> str:
+        """Chave da OpenAI, com erro claro quando ela não foi configurada."""
+        if not self.openai_api_key:
+            raise ValueError(MENSAGEM_SEM_CHAVE)
+        return self.openai_api_key
+
+    def modelo_agente(self, agente: str) -> str:
+        """Modelo configurado para o agente, ou o modelo padrão."""
+        return getattr(self, f"llm_model_{agente}", None) or self.llm_model
+
     @property
     def is_configured(self) -> bool:
         """Verifica se a aplicação está configurada corretamente."""
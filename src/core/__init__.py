@@ -1,4 +1,5 @@
-from src.core.state import AgentState
+from src.core.cache import CacheLRU, CacheRespostasLLM
+from src.core.state import AgentState, estado_inicial
 
 
-__all__ = ['AgentState']
+__all__ = ['AgentState', 'CacheLRU', 'CacheRespostasLLM', 'estado_inicial']
@@ -0,0 +1,446 @@
+"""Controle de admissão das chamadas ao LLM.
+
+Sob carga, todas as conversas chamariam o modelo ao mesmo tempo, estourando o
+limite de requisições do provedor e provocando rajadas de erros 429 e novas
+tentativas. O controlador limita as chamadas em andamento e, opcionalmente, os
+tokens consumidos por minuto; as chamadas excedentes esperam em uma fila FIFO,
+então nenhuma conversa é preterida indefinidamente.
+
+`AdmissaoLocal` vale para o processo; `AdmissaoSqlite` coordena vários processos
+(ex: workers do uvicorn) da mesma máquina por um arquivo SQLite.
+"""
+from abc import ABC, abstractmethod
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Deque, Iterator, Optional
+
+from langchain_core.runnables import Runnable
+
+from src.config import get_settings
+from src.core.prazo import PrazoEsgotado, segundos_restantes
+from src.core.prometheus import registro_prometheus
+
+# Reserva para a resposta, somada à estimativa do prompt antes de a chamada acontecer
+TOKENS_RESPOSTA_ESTIMADOS = 256
+CARACTERES_POR_TOKEN = 4
+
+FILA_LLM = registro_prometheus.medidor(
+    "banco_agil_llm_fila", "Chamadas ao LLM aguardando admissão"
+)
+EM_VOO_LLM = registro_prometheus.medidor(
+    "banco_agil_llm_em_voo", "Chamadas ao LLM em andamento"
+)
+ESPERA_LLM = registro_prometheus.histograma(
+    "banco_agil_llm_espera_segundos", "Tempo de espera na fila de admissão do LLM"
+)
+TOKENS_DISPONIVEIS_LLM = registro_prometheus.medidor(
+    "banco_agil_llm_tokens_disponiveis", "Tokens ainda disponíveis no orçamento por minuto"
+)
+
+
+def estimar_tokens(entrada: Any) -> int:
+    """Estimativa barata dos tokens de uma chamada: prompt (~4 caracteres/token) + resposta."""
+    mensagens = entrada if isinstance(entrada, (list, tuple)) else [entrada]
+    caracteres = 0
+    for mensagem in mensagens:
+        conteudo = getattr(mensagem, "content", mensagem)
+        caracteres += len(conteudo if isinstance(conteudo, str) else str(conteudo))
+    return caracteres // CARACTERES_POR_TOKEN + TOKENS_RESPOSTA_ESTIMADOS
+
+
+def _tokens_usados(resposta: Any) -> Optional[int]:
+    uso = getattr(resposta, "usage_metadata", None)
+    return uso.get("total_tokens") if uso else None
+
+
+class Bilhete:
+    """Vaga na fila de admissão de uma chamada."""
+
+    def __init__(self, estimativa: int):
+        self.estimativa = estimativa
+        self.tokens_usados: Optional[int] = None
+        self.admitido = False
+        self.id: Optional[int] = None
+        self._evento: Optional[threading.Event] = None
+        self._futuro: Optional[asyncio.Future] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def registrar_uso(self, resposta: Any) -> None:
+        """Guarda os tokens realmente usados, para corrigir o orçamento na liberação."""
+        self.tokens_usados = _tokens_usados(resposta)
+
+
+class ControladorAdmissao(ABC):
+    """Interface dos controladores: adquirir uma vaga antes da chamada e liberá-la depois."""
+
+    def __init__(self, max_em_voo: int, tokens_por_minuto: Optional[int] = None,
+                 relogio: Callable[[], float] = time.monotonic):
+        if max_em_voo < 1:
+            raise ValueError("max_em_voo deve ser ao menos 1")
+        self.max_em_voo = max_em_voo
+        self.tokens_por_minuto = tokens_por_minuto or None
+        self._relogio = relogio
+
+    @abstractmethod
+    def adquirir(self, estimativa: int, limite_segundos: Optional[float] = None) -> Bilhete:
+        """Bloqueia até a chamada ser admitida.
+
+        Passados `limite_segundos` sem admissão, a chamada sai da fila e PrazoEsgotado é levantada.
+        """
+
+    @abstractmethod
+    async def aadquirir(self, estimativa: int, limite_segundos: Optional[float] = None) -> Bilhete:
+        """Espera, sem bloquear o event loop, até a chamada ser admitida (ou até `limite_segundos`)."""
+
+    @abstractmethod
+    def liberar(self, bilhete: Bilhete) -> None:
+        """Devolve a vaga e corrige o orçamento com os tokens realmente usados."""
+
+    @contextmanager
+    def admitir(self, entrada: Any, limite_segundos: Optional[float] = None) -> Iterator[Bilhete]:
+        bilhete = self.adquirir(estimar_tokens(entrada), limite_segundos)
+        try:
+            yield bilhete
+        finally:
+            self.liberar(bilhete)
+
+    @asynccontextmanager
+    async def aadmitir(self, entrada: Any, limite_segundos: Optional[float] = None) -> AsyncIterator[Bilhete]:
+        bilhete = await self.aadquirir(estimar_tokens(entrada), limite_segundos)
+        try:
+            yield bilhete
+        finally:
+            self.liberar(bilhete)
+
+    def _custo(self, estimativa: int) -> int:
+        # Uma chamada maior que o orçamento inteiro espera o balde encher, e não para sempre
+        return min(estimativa, self.tokens_por_minuto) if self.tokens_por_minuto else 0
+
+
+class AdmissaoLocal(ControladorAdmissao):
+    """Admissão no processo, compartilhada por threads e event loops.
+
+    As vagas são entregues na ordem de chegada: quando uma chamada termina, a vaga
+    passa diretamente para a primeira da fila. O orçamento de tokens é um balde
+    que se recompõe continuamente à taxa de `tokens_por_minuto`.
+    """
+
+    def __init__(self, max_em_voo: int, tokens_por_minuto: Optional[int] = None,
+                 relogio: Callable[[], float] = time.monotonic):
+        super().__init__(max_em_voo, tokens_por_minuto, relogio)
+        self._lock = threading.Lock()
+        self._fila: Deque[Bilhete] = deque()
+        self.em_voo = 0
+        self._tokens = float(self.tokens_por_minuto or 0)
+        self._reposto_em = relogio()
+        self._temporizador: Optional[threading.Timer] = None
+
+    def adquirir(self, estimativa: int, limite_segundos: Optional[float] = None) -> Bilhete:
+        bilhete = Bilhete(estimativa)
+        bilhete._evento = threading.Event()
+        inicio = self._relogio()
+        with self._lock:
+            self._fila.append(bilhete)
+            self._despachar()
+        if not bilhete._evento.wait(limite_segundos):
+            self._desistir(bilhete)
+            raise PrazoEsgotado("admissao")
+        ESPERA_LLM.observar(self._relogio() - inicio)
+        return bilhete
+
+    async def aadquirir(self, estimativa: int, limite_segundos: Optional[float] = None) -> Bilhete:
+        bilhete = Bilhete(estimativa)
+        bilhete._loop = asyncio.get_running_loop()
+        bilhete._futuro = bilhete._loop.create_future()
+        inicio = self._relogio()
+        with self._lock:
+            self._fila.append(bilhete)
+            self._despachar()
+        try:
+            await asyncio.wait_for(asyncio.shield(bilhete._futuro), limite_segundos)
+        except asyncio.TimeoutError:
+            self._desistir(bilhete)
+            raise PrazoEsgotado("admissao") from None
+        except asyncio.CancelledError:
+            self._desistir(bilhete)
+            raise
+        ESPERA_LLM.observar(self._relogio() - inicio)
+        return bilhete
+
+    def _desistir(self, bilhete: Bilhete) -> None:
+        """Retira da fila uma chamada que não quer mais a vaga (ou devolve a vaga recém-recebida)."""
+        with self._lock:
+            if bilhete.admitido:
+                self._devolver(bilhete)
+            else:
+                self._fila.remove(bilhete)
+                self._despachar()
+
+    def liberar(self, bilhete: Bilhete) -> None:
+        with self._lock:
+            self._devolver(bilhete)
+
+    @property
+    def tamanho_fila(self) -> int:
+        return len(self._fila)
+
+    def _devolver(self, bilhete: Bilhete) -> None:
+        self.em_voo -= 1
+        if self.tokens_por_minuto and bilhete.tokens_usados is not None:
+            # Corrige a estimativa: o saldo pode ficar negativo e atrasar as próximas chamadas
+            self._repor()
+            self._tokens -= bilhete.tokens_usados - self._custo(bilhete.estimativa)
+        self._despachar()
+
+    def _repor(self) -> None:
+        agora = self._relogio()
+        taxa = self.tokens_por_minuto / 60.0
+        self._tokens = min(float(self.tokens_por_minuto), self._tokens + (agora - self._reposto_em) * taxa)
+        self._reposto_em = agora
+
+    def _despachar(self) -> None:
+        """Admite as primeiras da fila enquanto houver vaga e orçamento (chamado com o lock)."""
+        while self._fila and self.em_voo < self.max_em_voo:
+            bilhete = self._fila[0]
+            custo = self._custo(bilhete.estimativa)
+            if self.tokens_por_minuto:
+                self._repor()
+                if self._tokens < custo:
+                    self._agendar((custo - self._tokens) / (self.tokens_por_minuto / 60.0))
+                    break
+                self._tokens -= custo
+
+            self._fila.popleft()
+            self.em_voo += 1
+            bilhete.admitido = True
+            if bilhete._evento is not None:
+                bilhete._evento.set()
+            else:
+                bilhete._loop.call_soon_threadsafe(_resolver, bilhete._futuro)
+        self._atualizar_medidores()
+
+    def _agendar(self, segundos: float) -> None:
+        """Tenta de novo quando o balde tiver tokens para a primeira da fila."""
+        if self._temporizador is not None and self._temporizador.is_alive():
+            return
+
+        def despachar():
+            with self._lock:
+                self._despachar()
+
+        self._temporizador = threading.Timer(max(segundos, 0.001), despachar)
+        self._temporizador.daemon = True
+        self._temporizador.start()
+
+    def _atualizar_medidores(self) -> None:
+        FILA_LLM.definir(len(self._fila))
+        EM_VOO_LLM.definir(self.em_voo)
+        if self.tokens_por_minuto:
+            TOKENS_DISPONIVEIS_LLM.definir(max(self._tokens, 0))
+
+
+def _resolver(futuro: asyncio.Future) -> None:
+    if not futuro.done():
+        futuro.set_result(None)
+
+
+class AdmissaoSqlite(ControladorAdmissao):
+    """Admissão compartilhada entre processos da mesma máquina por um arquivo SQLite.
+
+    A fila é uma tabela ordenada pelo número do bilhete; cada processo verifica
+    periodicamente se o seu é o primeiro e se há vaga e orçamento. Bilhetes de
+    processos que morreram expiram (`validade_segundos` após a admissão, ou alguns
+    segundos sem renovação enquanto aguardam).
+    """
+
+    def __init__(self, caminho: str, max_em_voo: int, tokens_por_minuto: Optional[int] = None,
+                 intervalo_segundos: float = 0.02, validade_segundos: float = 600.0):
+        super().__init__(max_em_voo, tokens_por_minuto, time.time)
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        self.intervalo_segundos = intervalo_segundos
+        self.validade_segundos = validade_segundos
+        self._lock = threading.Lock()
+        # Transações explícitas (BEGIN IMMEDIATE): a verificação e a admissão são atômicas entre processos
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False, timeout=30, isolation_level=None)
+        with self._lock:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS fila (bilhete INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "estimativa INTEGER NOT NULL, admitido_em REAL, renovado_em REAL NOT NULL)"
+            )
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS orcamento (id INTEGER PRIMARY KEY CHECK (id = 1), "
+                "tokens REAL NOT NULL, atualizado_em REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _transacao(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conexao
+            except BaseException:
+                self._conexao.execute("ROLLBACK")
+                raise
+            self._conexao.execute("COMMIT")
+
+    def _entrar(self, estimativa: int) -> Bilhete:
+        bilhete = Bilhete(estimativa)
+        with self._transacao() as conexao:
+            cursor = conexao.execute(
+                "INSERT INTO fila (estimativa, renovado_em) VALUES (?, ?)", (estimativa, self._relogio())
+            )
+        bilhete.id = cursor.lastrowid
+        return bilhete
+
+    def _tentar(self, bilhete: Bilhete) -> bool:
+        """Admite o bilhete se ele for o primeiro da fila e houver vaga e orçamento."""
+        agora = self._relogio()
+        with self._transacao() as conexao:
+            conexao.execute(
+                "DELETE FROM fila WHERE (admitido_em IS NOT NULL AND admitido_em < ?) "
+                "OR (admitido_em IS NULL AND renovado_em < ?)",
+                (agora - self.validade_segundos, agora - max(1.0, self.intervalo_segundos * 100))
+            )
+            conexao.execute("UPDATE fila SET renovado_em = ? WHERE bilhete = ?", (agora, bilhete.id))
+            aguardando = conexao.execute("SELECT COUNT(*), MIN(bilhete) FROM fila WHERE admitido_em IS NULL").fetchone()
+            FILA_LLM.definir(aguardando[0])
+            if aguardando[1] != bilhete.id:
+                return False
+
+            em_voo = conexao.execute("SELECT COUNT(*) FROM fila WHERE admitido_em IS NOT NULL").fetchone()[0]
+            if em_voo >= self.max_em_voo:
+                return False
+
+            if self.tokens_por_minuto:
+                tokens = self._tokens_atuais(conexao, agora)
+                custo = self._custo(bilhete.estimativa)
+                if tokens < custo:
+                    return False
+                self._gravar_tokens(conexao, tokens - custo, agora)
+
+            conexao.execute("UPDATE fila SET admitido_em = ? WHERE bilhete = ?", (agora, bilhete.id))
+        EM_VOO_LLM.definir(em_voo + 1)
+        FILA_LLM.definir(aguardando[0] - 1)
+        bilhete.admitido = True
+        return True
+
+    def _tokens_atuais(self, conexao: sqlite3.Connection, agora: float) -> float:
+        linha = conexao.execute("SELECT tokens, atualizado_em FROM orcamento WHERE id = 1").fetchone()
+        if linha is None:
+            return float(self.tokens_por_minuto)
+        tokens, atualizado_em = linha
+        return min(float(self.tokens_por_minuto), tokens + (agora - atualizado_em) * self.tokens_por_minuto / 60.0)
+
+    def _gravar_tokens(self, conexao: sqlite3.Connection, tokens: float, agora: float) -> None:
+        conexao.execute("INSERT OR REPLACE INTO orcamento (id, tokens, atualizado_em) VALUES (1, ?, ?)", (tokens, agora))
+        TOKENS_DISPONIVEIS_LLM.definir(max(tokens, 0))
+
+    def _sair(self, bilhete: Bilhete) -> None:
+        agora = self._relogio()
+        with self._transacao() as conexao:
+            conexao.execute("DELETE FROM fila WHERE bilhete = ?", (bilhete.id,))
+            if bilhete.admitido and self.tokens_por_minuto and bilhete.tokens_usados is not None:
+                tokens = self._tokens_atuais(conexao, agora)
+                self._gravar_tokens(conexao, tokens - (bilhete.tokens_usados - self._custo(bilhete.estimativa)), agora)
+
+    def adquirir(self, estimativa: int, limite_segundos: Optional[float] = None) -> Bilhete:
+        inicio = self._relogio()
+        bilhete = self._entrar(estimativa)
+        try:
+            while not self._tentar(bilhete):
+                if limite_segundos is not None and self._relogio() - inicio >= limite_segundos:
+                    raise PrazoEsgotado("admissao")
+                time.sleep(self.intervalo_segundos)
+        except BaseException:
+            self._sair(bilhete)
+            raise
+        ESPERA_LLM.observar(self._relogio() - inicio)
+        return bilhete
+
+    async def aadquirir(self, estimativa: int, limite_segundos: Optional[float] = None) -> Bilhete:
+        inicio = self._relogio()
+        bilhete = await asyncio.to_thread(self._entrar, estimativa)
+        try:
+            while not await asyncio.to_thread(self._tentar, bilhete):
+                if limite_segundos is not None and self._relogio() - inicio >= limite_segundos:
+                    raise PrazoEsgotado("admissao")
+                await asyncio.sleep(self.intervalo_segundos)
+        except BaseException:
+            await asyncio.shield(asyncio.to_thread(self._sair, bilhete))
+            raise
+        ESPERA_LLM.observar(self._relogio() - inicio)
+        return bilhete
+
+    def liberar(self, bilhete: Bilhete) -> None:
+        self._sair(bilhete)
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._conexao.close()
+
+
+class LLMComAdmissao(Runnable):
+    """Modelo (já com as ferramentas) cujas chamadas passam pelo controlador de admissão.
+
+    A espera na fila termina junto com o prazo do turno: uma chamada abandonada
+    não é admitida depois que o turno já desistiu dela.
+    """
+
+    def __init__(self, llm: Runnable, controlador: ControladorAdmissao):
+        self.llm = llm
+        self.controlador = controlador
+
+    def invoke(self, input, config=None, **kwargs):
+        with self.controlador.admitir(input, _limite_espera()) as bilhete:
+            resposta = self.llm.invoke(input, config, **kwargs)
+            bilhete.registrar_uso(resposta)
+        return resposta
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        async with self.controlador.aadmitir(input, _limite_espera()) as bilhete:
+            resposta = await self.llm.ainvoke(input, config, **kwargs)
+            bilhete.registrar_uso(resposta)
+        return resposta
+
+
+def _limite_espera() -> Optional[float]:
+    restante = segundos_restantes()
+    if restante is not None and restante <= 0:
+        raise PrazoEsgotado("admissao")
+    return restante
+
+
+def criar_controlador(tipo: str, max_em_voo: int, tokens_por_minuto: Optional[int] = None,
+                      caminho: Optional[str] = None) -> ControladorAdmissao:
+    """Cria o controlador configurado ("local" ou "sqlite")."""
+    if tipo == "local":
+        return AdmissaoLocal(max_em_voo, tokens_por_minuto)
+    if tipo == "sqlite":
+        if not caminho:
+            raise ValueError("A admissão via SQLite exige o caminho do arquivo")
+        return AdmissaoSqlite(caminho, max_em_voo, tokens_por_minuto)
+    raise ValueError(f"Controle de admissão desconhecido: {tipo}")
+
+
+@lru_cache(maxsize=1)
+def get_controlador_admissao() -> Optional[ControladorAdmissao]:
+    """Controlador único do processo, conforme as configurações (None se desativado)."""
+    settings = get_settings()
+    if not settings.llm_admission_enabled:
+        return None
+    return criar_controlador(
+        settings.llm_admission_backend,
+        settings.llm_max_in_flight,
+        settings.llm_tokens_per_minute,
+        settings.llm_admission_db_path
+    )
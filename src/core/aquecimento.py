@@ -0,0 +1,69 @@
+"""Aquecimento do processo da interface antes de aceitar a primeira conexão.
+
+O grafo compilado (com o cliente do LLM e o checkpointer) é criado uma única vez
+por processo e compartilhado entre as sessões do Streamlit. Executar a interface
+por este módulo cria esses recursos antes de o servidor começar a aceitar
+conexões, tirando esse custo da primeira mensagem do primeiro visitante.
+
+Uso:
+    python -m src.core.aquecimento [opções do streamlit, ex: --server.port 8501]
+"""
+import logging
+import sys
+import time
+from typing import Optional, Sequence
+
+from pydantic import ValidationError
+
+from src.config import get_settings
+from src.config.settings import BASE_DIR
+from src.core.graph import get_graph_aplicacao
+from src.core.prometheus import iniciar_servidor_metricas
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+CAMINHO_APP = str(BASE_DIR / "app_streamlit.py")
+
+
+def recursos_compartilhados():
+    """Grafo compartilhado do processo, com o servidor de métricas iniciado (idempotente)."""
+    settings = get_settings()
+    if settings.metrics_enabled:
+        iniciar_servidor_metricas(settings.metrics_port, buckets=settings.metrics_histogram_buckets)
+    return get_graph_aplicacao()
+
+
+def aquecer() -> Optional[float]:
+    """Cria os recursos compartilhados do processo.
+
+    Retorna a duração em segundos, ou None se a aplicação não estiver configurada
+    (a interface exibirá o erro de configuração ao primeiro visitante).
+    """
+    try:
+        configurado = get_settings().is_configured
+    except ValidationError:
+        configurado = False
+    if not configurado:
+        logger.warning("Aquecimento ignorado: OPENAI_API_KEY não configurada")
+        return None
+
+    inicio = time.perf_counter()
+    recursos_compartilhados()
+
+    duracao = time.perf_counter() - inicio
+    logger.info(f"Aquecimento concluído em {duracao:.2f} s")
+    return duracao
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    from streamlit.web import cli as stcli
+
+    aquecer()
+    # Mesmo processo: a interface reutiliza os recursos criados acima
+    sys.argv = ["streamlit", "run", CAMINHO_APP, *(sys.argv[1:] if argv is None else argv)]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from src.core.prometheus import registro_prometheus
+
+CONSULTAS_CACHE_LLM = registro_prometheus.contador(
+    "banco_agil_llm_cache_total", "Turnos atendidos pelo cache de respostas (hit) ou pelo LLM (miss)",
+    ("resultado",)
+)
+
+
+class CacheLRU:
+    """Cache em memória com expulsão LRU e expiração por TTL."""
+
+    def __init__(self, max_entradas: int = 256, ttl_segundos: float = 600.0,
+                 relogio: Callable[[], float] = time.monotonic):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._relogio = relogio
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        """Retorna o valor em cache ou None se ausente ou expirado."""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.misses += 1
+                return None
+
+            expira_em, valor = entrada
+            if expira_em <= self._relogio():
+                del self._entradas[chave]
+                self.misses += 1
+                return None
+
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return valor
+
+    def armazenar(self, chave: Hashable, valor: Any) -> None:
+        """Armazena um valor, expulsando a entrada menos usada se necessário."""
+        with self._lock:
+            self._entradas[chave] = (self._relogio() + self.ttl_segundos, valor)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def limpar(self) -> None:
+        """Remove todas as entradas e zera os contadores."""
+        with self._lock:
+            self._entradas.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna contadores de acertos e falhas do cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entradas": len(self._entradas),
+                "taxa_acerto": self.hits / total if total else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+def _normalizar(texto: str) -> str:
+    """Normaliza espaços em branco para que variações de formatação gerem a mesma chave."""
+    return " ".join(str(texto).split())
+
+
+class CacheRespostasLLM(CacheLRU):
+    """Cache de respostas do LLM para turnos que não dependem de dados do cliente."""
+
+    def chave(self, system_prompt: str, mensagens: Sequence[BaseMessage]) -> str:
+        """Gera a chave a partir do prompt de sistema e do final da conversa.
+
+        O final começa na última resposta do assistente antes da mensagem atual
+        e inclui as chamadas e os resultados de ferramentas seguintes: respostas
+        curtas ("sim", "e o outro?") só compartilham a entrada no mesmo contexto.
+        """
+        mensagens = list(mensagens)
+        inicio = 0
+        for indice in range(len(mensagens) - 1, -1, -1):
+            if isinstance(mensagens[indice], AIMessage):
+                inicio = indice
+                break
+
+        partes = [_normalizar(system_prompt)]
+        for mensagem in mensagens[inicio:]:
+            partes.append(f"{mensagem.type}:{_normalizar(mensagem.content).lower()}")
+            for chamada in getattr(mensagem, "tool_calls", None) or []:
+                partes.append(f"ferramenta:{chamada['name']}:{json.dumps(chamada['args'], sort_keys=True, default=str)}")
+        return hashlib.sha256("\n".join(partes).encode("utf-8")).hexdigest()
+
+    def invocar(self, llm_with_tools, mensagens: Sequence[BaseMessage], chave: str,
+                armazenar_se: Callable[[AIMessage], bool] = lambda resposta: True) -> AIMessage:
+        """Invoca o LLM apenas quando a resposta não está em cache."""
+        resposta = self.obter(chave)
+        if resposta is not None:
+            CONSULTAS_CACHE_LLM.incrementar(resultado="hit")
+            # Cópia sem id para não substituir mensagens anteriores no add_messages
+            return resposta.model_copy(update={"id": None})
+
+        CONSULTAS_CACHE_LLM.incrementar(resultado="miss")
+        resposta = llm_with_tools.invoke(mensagens)
+        if armazenar_se(resposta):
+            self.armazenar(chave, resposta)
+        return resposta
+
+    async def ainvocar(self, llm_with_tools, mensagens: Sequence[BaseMessage], chave: str,
+                       armazenar_se: Callable[[AIMessage], bool] = lambda resposta: True) -> AIMessage:
+        """Versão assíncrona de invocar."""
+        resposta = self.obter(chave)
+        if resposta is not None:
+            CONSULTAS_CACHE_LLM.incrementar(resultado="hit")
+            return resposta.model_copy(update={"id": None})
+
+        CONSULTAS_CACHE_LLM.incrementar(resultado="miss")
+        resposta = await llm_with_tools.ainvoke(mensagens)
+        if armazenar_se(resposta):
+            self.armazenar(chave, resposta)
+        return resposta
@@ -0,0 +1,53 @@
+import os
+import sqlite3
+from typing import Any, Dict, Optional
+import uuid
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from src.config import get_settings
+from src.core.state import estado_inicial
+
+
+def criar_checkpointer(caminho: Optional[str] = None) -> SqliteSaver:
+    """Cria o checkpointer SQLite que persiste o estado das conversas entre turnos e reinícios."""
+    if caminho is None:
+        caminho = get_settings().checkpoint_db_path
+
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+
+    # A mesma conexão é usada pelas threads do Streamlit; o SqliteSaver serializa o acesso
+    conexao = sqlite3.connect(caminho, check_same_thread=False)
+    return SqliteSaver(conexao)
+
+
+def nova_sessao() -> str:
+    """Gera um identificador para uma nova conversa (thread_id do checkpointer)."""
+    return uuid.uuid4().hex
+
+
+def config_sessao(thread_id: str) -> Dict[str, Any]:
+    """Config do LangGraph que associa a execução à conversa informada."""
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def estado_sessao(graph, thread_id: str) -> Dict[str, Any]:
+    """Estado salvo da conversa, ou dicionário vazio se ela ainda não existe."""
+    return dict(graph.get_state(config_sessao(thread_id)).values)
+
+
+def entrada_turno(graph, thread_id: str, texto: str, cliente_id: Optional[str] = None) -> Dict[str, Any]:
+    """Entrada do grafo para um novo turno: apenas a mensagem do cliente.
+
+    No primeiro turno da conversa, os demais campos do estado são inicializados.
+    `cliente_id` (ex: o IP) identifica o cliente para o limitador de autenticação;
+    sem ele, vale o próprio thread_id.
+    """
+    mensagem = HumanMessage(content=texto)
+    entrada = {"messages": [mensagem], "cliente_id": cliente_id or thread_id}
+    if not estado_sessao(graph, thread_id):
+        return {**estado_inicial(), **entrada}
+    return entrada
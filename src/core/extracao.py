@@ -0,0 +1,97 @@
+"""Extração local de CPF e data de nascimento das mensagens do cliente.
+
+Reconhece os formatos usuais no Brasil ("123.456.789-01", "123 456 789 01",
+"15/05/1990", "15-05-1990", "15 de maio de 1990") além dos formatos canônicos
+(11 dígitos e AAAA-MM-DD), que são os devolvidos. Datas inexistentes (ex:
+30/02) e, opcionalmente, CPFs com dígitos verificadores inválidos são
+descartados antes de qualquer consulta ao Database.
+"""
+from datetime import date
+import re
+import unicodedata
+from typing import Optional, Tuple
+
+_RE_CPF = re.compile(r"(?<![\d.-])(\d{3})[.\s]?(\d{3})[.\s]?(\d{3})\s?[-.\s]?\s?(\d{2})(?![\d])")
+_RE_DATA_ISO = re.compile(r"(?<!\d)(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})(?!\d)")
+_RE_DATA_BR = re.compile(r"(?<!\d)(\d{1,2})[/.-](\d{1,2})[/.-](\d{4}|\d{2})(?!\d)")
+
+MESES = {
+    "janeiro": 1, "fevereiro": 2, "marco": 3, "abril": 4, "maio": 5, "junho": 6,
+    "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12
+}
+_RE_DATA_EXTENSO = re.compile(
+    r"\b(\d{1,2})\s*(?:de\s+)?(" + "|".join(MESES) + r")\s*(?:de\s+)?(\d{4})\b"
+)
+
+ANO_MINIMO = 1900
+
+
+def _sem_acentos(texto: str) -> str:
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def cpf_valido(cpf: str) -> bool:
+    """Confere os dois dígitos verificadores do CPF (11 dígitos, sem pontuação)."""
+    if len(cpf) != 11 or not cpf.isdigit() or cpf == cpf[0] * 11:
+        return False
+    for posicao in (9, 10):
+        soma = sum(int(digito) * peso for digito, peso in zip(cpf[:posicao], range(posicao + 1, 1, -1)))
+        if (soma * 10) % 11 % 10 != int(cpf[posicao]):
+            return False
+    return True
+
+
+def extrair_cpf(texto: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+    """Primeiro CPF do texto, normalizado para 11 dígitos, e o trecho em que foi encontrado."""
+    encontrado = _RE_CPF.search(texto)
+    if encontrado is None:
+        return None
+    return "".join(encontrado.groups()), encontrado.span()
+
+
+def _montar_data(ano: int, mes: int, dia: int) -> Optional[str]:
+    try:
+        data = date(ano, mes, dia)
+    except ValueError:
+        return None
+    if data.year < ANO_MINIMO or data > date.today():
+        return None
+    return data.isoformat()
+
+
+def _ano_completo(ano: str) -> int:
+    """Ano com quatro dígitos; "90" vira 1990 e "05" vira 2005 (janela dos últimos 100 anos)."""
+    if len(ano) == 4:
+        return int(ano)
+    seculo_atual = date.today().year // 100 * 100
+    ano_completo = seculo_atual + int(ano)
+    return ano_completo - 100 if ano_completo > date.today().year else ano_completo
+
+
+def extrair_data(texto: str) -> Optional[str]:
+    """Primeira data de nascimento válida do texto, no formato AAAA-MM-DD."""
+    for ano, mes, dia in _RE_DATA_ISO.findall(texto):
+        data = _montar_data(int(ano), int(mes), int(dia))
+        if data:
+            return data
+
+    for dia, mes, ano in _RE_DATA_BR.findall(texto):
+        data = _montar_data(_ano_completo(ano), int(mes), int(dia))
+        if data:
+            return data
+
+    for dia, mes, ano in _RE_DATA_EXTENSO.findall(_sem_acentos(texto)):
+        data = _montar_data(int(ano), MESES[mes], int(dia))
+        if data:
+            return data
+    return None
+
+
+def extrair_credenciais(texto: str) -> Tuple[Optional[str], Optional[str]]:
+    """CPF e data de nascimento da mensagem; a data é procurada fora do trecho do CPF."""
+    cpf = extrair_cpf(texto)
+    if cpf is None:
+        return None, extrair_data(texto)
+    numero, (inicio, fim) = cpf
+    return numero, extrair_data(texto[:inicio] + " " + texto[fim:])
@@ -0,0 +1,91 @@
+"""Execução concorrente das chamadas de ferramenta de uma mesma resposta do LLM.
+
+Quando o modelo pede várias ferramentas de uma vez (ex: duas cotações, ou o
+limite e uma cotação), as chamadas são independentes entre si: executá-las em
+paralelo faz o turno esperar pela mais lenta, e não pela soma de todas.
+"""
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TempoEsgotado
+import contextvars
+from dataclasses import dataclass
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.core.prazo import definir_prazo
+from src.core.prometheus import registro_prometheus
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT_PADRAO_SEGUNDOS = 30.0
+MAX_PARALELO_PADRAO = 8
+
+FERRAMENTAS_EXPIRADAS = registro_prometheus.contador(
+    "banco_agil_ferramentas_timeout_total", "Chamadas de ferramenta interrompidas pelo tempo limite",
+    ("ferramenta",)
+)
+
+# (nome da ferramenta, ferramenta, argumentos)
+ChamadaFerramenta = Tuple[str, Any, Dict[str, Any]]
+
+
+@dataclass
+class ResultadoFerramenta:
+    """Resultado de uma chamada; `erro` é preenchido quando ela falhou ou expirou."""
+    nome: str
+    args: Dict[str, Any]
+    resultado: Optional[Dict[str, Any]] = None
+    erro: Optional[str] = None
+    expirou: bool = False
+
+    @property
+    def sucesso(self) -> bool:
+        return self.erro is None
+
+
+class ExecutorFerramentas:
+    """Executa chamadas de ferramenta em paralelo, com tempo limite por chamada.
+
+    As threads são compartilhadas por todos os turnos do processo. Uma chamada que
+    expira não é interrompida (threads não podem ser canceladas), mas o turno deixa
+    de esperar por ela e o seu resultado é descartado.
+    """
+
+    def __init__(self, timeout_segundos: float = TIMEOUT_PADRAO_SEGUNDOS,
+                 max_paralelo: int = MAX_PARALELO_PADRAO):
+        self.timeout_segundos = timeout_segundos
+        self._pool = ThreadPoolExecutor(max_workers=max_paralelo, thread_name_prefix="ferramentas")
+
+    def executar(self, chamadas: Sequence[ChamadaFerramenta],
+                 limite_segundos: Optional[float] = None) -> List[ResultadoFerramenta]:
+        """Executa as chamadas e devolve os resultados na mesma ordem.
+
+        `limite_segundos` (ex: o tempo que resta ao turno) reduz o tempo limite quando é menor.
+        """
+        timeout = self.timeout_segundos if limite_segundos is None else min(self.timeout_segundos, limite_segundos)
+        # Cada chamada leva o contexto atual, para as medições em andamento continuarem valendo, e o
+        # seu prazo: as requisições externas da ferramenta usam como timeout o tempo que resta a ela
+        futuros = []
+        for _, ferramenta, args in chamadas:
+            contexto = contextvars.copy_context()
+            contexto.run(definir_prazo, time.time() + timeout)
+            futuros.append(self._pool.submit(contexto.run, ferramenta.invoke, args))
+        prazo = time.monotonic() + timeout
+
+        resultados = []
+        for (nome, _, args), futuro in zip(chamadas, futuros):
+            try:
+                resultado = futuro.result(timeout=max(0.0, prazo - time.monotonic()))
+                resultados.append(ResultadoFerramenta(nome, args, resultado=resultado))
+            except TempoEsgotado:
+                futuro.cancel()
+                FERRAMENTAS_EXPIRADAS.incrementar(ferramenta=nome)
+                logger.warning(f"Ferramenta {nome} excedeu o tempo limite de {timeout:.1f} s")
+                resultados.append(ResultadoFerramenta(nome, args, erro="tempo limite excedido", expirou=True))
+            except Exception as e:
+                logger.error(f"Erro na ferramenta {nome}: {str(e)}", exc_info=True)
+                resultados.append(ResultadoFerramenta(nome, args, erro=str(e)))
+        return resultados
+
+    def encerrar(self) -> None:
+        """Libera as threads do executor."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
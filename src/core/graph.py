@@ -1,5 +1,10 @@
-import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
 
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, START, END
 
 from src.agents.base import BancoAgilAgents
@@ -7,72 +12,127 @@ from src.agents.cambio import AgenteCambio
 from src.agents.credito import AgenteCredito
 from src.agents.entrevista import AgenteEntrevista
 from src.agents.triagem import AgenteTriagem
+from src.config import get_settings
+from src.core.checkpoint import criar_checkpointer
+from src.core.instrumentacao import medir
+from src.core.limitador import get_limitador_autenticacao
+from src.core.prazo import novo_prazo
 from src.core.state import AgentState
 
 
-def create_graph(openai_api_key: str):
-    """Cria o grafo de estados do LangGraph com os agentes."""
-
-    base_agents = BancoAgilAgents(openai_api_key)
-
-    agente_triagem = AgenteTriagem(base_agents.llm, base_agents.llm_with_tools)
-    agente_credito = AgenteCredito(base_agents.llm, base_agents.llm_with_tools)
-    agente_entrevista = AgenteEntrevista(base_agents.llm, base_agents.llm_with_tools)
-    agente_cambio = AgenteCambio(base_agents.llm, base_agents.llm_with_tools)
-
-    def triagem_node(state: AgentState) -> AgentState:
-        """Nó do agente de triagem."""
-        updates = agente_triagem.process(state)
-        new_state = {**state, **updates}
-        if "pending_redirect" in updates:
-            new_state["pending_redirect"] = updates["pending_redirect"]
-        else:
-            new_state["pending_redirect"] = None
-        return new_state
-
-    def credito_node(state: AgentState) -> AgentState:
-        """Nó do agente de crédito."""
-        updates = agente_credito.process(state)
-        new_state = {**state, **updates}
-        if "pending_redirect" in updates:
-            new_state["pending_redirect"] = updates["pending_redirect"]
-        else:
-            new_state["pending_redirect"] = None
-        return new_state
-
-    def entrevista_node(state: AgentState) -> AgentState:
-        """Nó do agente de entrevista."""
-        updates = agente_entrevista.process(state)
-        new_state = {**state, **updates}
-        if "pending_redirect" in updates:
-            new_state["pending_redirect"] = updates["pending_redirect"]
-        else:
-            new_state["pending_redirect"] = None
-        return new_state
-
-    def cambio_node(state: AgentState) -> AgentState:
-        """Nó do agente de câmbio."""
-        updates = agente_cambio.process(state)
-        new_state = {**state, **updates}
-        if "pending_redirect" in updates:
-            new_state["pending_redirect"] = updates["pending_redirect"]
-        else:
-            new_state["pending_redirect"] = None
-        return new_state
-
-    def router_node(state: AgentState) -> AgentState:
+# Agentes que podem atender partes de um mesmo pedido em paralelo (ex: "meu limite e o euro")
+DESTINOS_PARALELOS = ("credito", "cambio")
+
+
+def criar_no(nome: str, agente, paralelo: bool = False) -> RunnableLambda:
+    """Cria o nó (síncrono e assíncrono) que executa o agente.
+
+    O nó devolve apenas as atualizações do agente, sem copiar o estado. O
+    pending_redirect é sempre escrito: quando o agente não redireciona, o valor
+    None limpa o redirecionamento anterior. É aqui, e não em um reducer, que ele
+    é limpo: um reducer só é chamado para as chaves que o nó escreveu. Em um ramo
+    `paralelo`, as atualizações ficam em `respostas_paralelas` para o nó de
+    junção (que também limpa o pending_redirect), evitando que dois ramos
+    escrevam as mesmas chaves no mesmo passo.
+    """
+    def empacotar(updates: Dict[str, Any]) -> Dict[str, Any]:
+        if paralelo:
+            return {"respostas_paralelas": [{"agente": nome, **updates}]}
+        updates.setdefault("pending_redirect", None)
+        return updates
+
+    def no(state: AgentState) -> Dict[str, Any]:
+        with medir("agente", nome):
+            updates = agente.process(state)
+        return empacotar(updates)
+
+    async def ano(state: AgentState) -> Dict[str, Any]:
+        with medir("agente", nome):
+            updates = await agente.aprocess(state)
+        return empacotar(updates)
+
+    return RunnableLambda(no, afunc=ano, name=f"{nome}_{'paralelo_' if paralelo else ''}node")
+
+
+def juntar_respostas(state: AgentState) -> Dict[str, Any]:
+    """Une as respostas dos ramos paralelos em uma única mensagem, na ordem pedida pelo cliente."""
+    ordem = (state.get("pending_redirect") or "").split(",")
+    respostas = sorted(
+        state.get("respostas_paralelas") or [],
+        key=lambda resposta: ordem.index(resposta["agente"]) if resposta["agente"] in ordem else len(ordem)
+    )
+
+    updates: Dict[str, Any] = {"respostas_paralelas": None, "pending_redirect": None}
+    textos = []
+    for resposta in respostas:
+        resposta = dict(resposta)
+        del resposta["agente"]
+        textos.extend(m.content for m in resposta.pop("messages", []) if m.content)
+        if resposta.pop("should_end", False):
+            updates["should_end"] = True
+        redirecionamento = resposta.pop("pending_redirect", None)
+        if redirecionamento:
+            updates["pending_redirect"] = redirecionamento
+        updates.update(resposta)
+
+    if textos:
+        updates["messages"] = [AIMessage(content="\n\n".join(textos))]
+    return updates
+
+
+def destinos_redirecionamento(state: AgentState, paralelo: bool = True) -> Union[str, List[str]]:
+    """Próximo passo após a triagem: um agente, os ramos paralelos ou o fim do turno."""
+    if state.get("should_end"):
+        return "end"
+
+    destinos = [d for d in (state.get("pending_redirect") or "").split(",") if d in DESTINOS_PARALELOS]
+    if paralelo and len(destinos) > 1:
+        return [f"{destino}_paralelo" for destino in destinos]
+    return destinos[0] if destinos else "end"
+
+
+def create_graph(openai_api_key: Optional[str], llm: Optional[BaseChatModel] = None,
+                 checkpointer: Optional[BaseCheckpointSaver] = None,
+                 llms: Optional[Dict[str, BaseChatModel]] = None):
+    """Cria o grafo de estados do LangGraph com os agentes.
+
+    Um `llm` já instanciado pode ser injetado no lugar do modelo da OpenAI (ex: benchmarks offline);
+    `llms` injeta o modelo de agentes específicos ({"triagem": ..., "cambio": ...}). A chave só é
+    exigida (ValueError) se algum agente ficar com o modelo da OpenAI.
+    Com um `checkpointer`, o estado de cada conversa fica salvo por thread_id e cada turno
+    precisa enviar apenas a nova mensagem do cliente.
+    """
+
+    base_agents = BancoAgilAgents(openai_api_key, llm=llm, llms=llms)
+    llms_agentes, com_ferramentas = base_agents.llms, base_agents.llms_with_tools
+
+    settings = get_settings()
+    agente_triagem = AgenteTriagem(llms_agentes["triagem"], com_ferramentas["triagem"], base_agents.cache,
+                                   settings.triage_auth_templates, settings.cpf_check_digit_validation,
+                                   get_limitador_autenticacao())
+    agente_credito = AgenteCredito(llms_agentes["credito"], com_ferramentas["credito"],
+                                   base_agents.executor_ferramentas)
+    agente_entrevista = AgenteEntrevista(llms_agentes["entrevista"], com_ferramentas["entrevista"])
+    agente_cambio = AgenteCambio(llms_agentes["cambio"], com_ferramentas["cambio"], base_agents.cache,
+                                 base_agents.executor_ferramentas)
+
+    def router_node(state: AgentState) -> Dict[str, Any]:
         """Nó roteador inicial - decide para qual agente direcionar."""
         # Router simples: apenas verifica se está em entrevista ativa
         # Caso contrário, sempre vai para triagem que faz o roteamento real
-        return state
+        # Todo turno começa aqui: o prazo vale para todos os agentes executados no turno
+        return {"prazo_turno": novo_prazo()}
 
     workflow = StateGraph(AgentState)
 
     workflow.add_node("router", router_node)
-    workflow.add_node("triagem", triagem_node)
-    workflow.add_node("credito", credito_node)
-    workflow.add_node("entrevista", entrevista_node)
-    workflow.add_node("cambio", cambio_node)
+    workflow.add_node("triagem", criar_no("triagem", agente_triagem))
+    workflow.add_node("credito", criar_no("credito", agente_credito))
+    workflow.add_node("entrevista", criar_no("entrevista", agente_entrevista))
+    workflow.add_node("cambio", criar_no("cambio", agente_cambio))
+    workflow.add_node("credito_paralelo", criar_no("credito", agente_credito, paralelo=True))
+    workflow.add_node("cambio_paralelo", criar_no("cambio", agente_cambio, paralelo=True))
+    workflow.add_node("juntar", juntar_respostas)
 
     workflow.add_edge(START, "router")
 
@@ -89,17 +149,26 @@ def create_graph(openai_api_key: str):
         }
     )
 
+    # Um pedido com mais de um assunto vai para os ramos paralelos, que se encontram em "juntar"
+    fan_out = settings.multi_intent_fan_out
     workflow.add_conditional_edges(
         "triagem",
-        lambda state: (
-            "end" if state.get("should_end") else
-            "credito" if state.get("pending_redirect") == "credito" else
-            "cambio" if state.get("pending_redirect") == "cambio" else
-            "end"
-        ),
+        lambda state: destinos_redirecionamento(state, paralelo=fan_out),
         {
             "credito": "credito",
             "cambio": "cambio",
+            "credito_paralelo": "credito_paralelo",
+            "cambio_paralelo": "cambio_paralelo",
+            "end": END
+        }
+    )
+
+    workflow.add_edge(["credito_paralelo", "cambio_paralelo"], "juntar")
+    workflow.add_conditional_edges(
+        "juntar",
+        lambda state: "entrevista" if state.get("pending_redirect") == "entrevista" else "end",
+        {
+            "entrevista": "entrevista",
             "end": END
         }
     )
@@ -134,7 +203,22 @@ def create_graph(openai_api_key: str):
         }
     )
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
+@lru_cache(maxsize=1)
+def get_graph():
+    """Grafo padrão, criado apenas na primeira utilização."""
+    return create_graph(get_settings().openai_api_key)
+
+
+@lru_cache(maxsize=1)
+def get_graph_aplicacao():
+    """Grafo da interface, com o checkpointer SQLite: um por processo, compartilhado entre sessões."""
+    return create_graph(get_settings().openai_api_key, checkpointer=criar_checkpointer())
+
 
-key = os.getenv("OPENAI_API_KEY")
-graph = create_graph(key)
\ No newline at end of file
+def __getattr__(nome: str):
+    # `graph` é o grafo usado pelo LangGraph CLI (langgraph.json); a persistência fica a cargo do servidor
+    if nome == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
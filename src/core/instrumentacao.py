@@ -0,0 +1,211 @@
+"""Instrumentação de agentes, chamadas ao LLM, ferramentas e acesso a dados.
+
+Cada medição registra o tempo de execução e, quando aplicável, tokens de prompt
+e de resposta e bytes lidos/gravados. As medições são agregadas no registro em
+memória `metricas`, emitidas como linhas de log JSON no logger deste módulo
+(nível INFO) e observadas no histograma `banco_agil_duracao_segundos` do
+endpoint Prometheus.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler, BaseCallbackManager
+from langchain_core.outputs import LLMResult
+
+from src.core.prometheus import observar, registro_prometheus
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_ACUMULADOS = ("tokens_prompt", "tokens_resposta", "bytes_lidos", "bytes_escritos")
+
+TOKENS_LLM = registro_prometheus.contador(
+    "banco_agil_llm_tokens_total", "Tokens consumidos nas chamadas ao LLM, por agente", ("agente", "tipo")
+)
+
+
+class RegistroMetricas:
+    """Registro em memória das medições, agregadas por categoria e nome."""
+
+    def __init__(self):
+        self._series: Dict[tuple, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, categoria: str, nome: str, duracao_segundos: float,
+                  erro: bool = False, **valores: float) -> None:
+        """Agrega uma medição na série (categoria, nome)."""
+        with self._lock:
+            serie = self._series.get((categoria, nome))
+            if serie is None:
+                serie = {"chamadas": 0, "erros": 0, "duracao_total_s": 0.0,
+                         "duracao_min_s": duracao_segundos, "duracao_max_s": duracao_segundos,
+                         **{campo: 0 for campo in CAMPOS_ACUMULADOS}}
+                self._series[(categoria, nome)] = serie
+
+            serie["chamadas"] += 1
+            serie["erros"] += int(erro)
+            serie["duracao_total_s"] += duracao_segundos
+            serie["duracao_min_s"] = min(serie["duracao_min_s"], duracao_segundos)
+            serie["duracao_max_s"] = max(serie["duracao_max_s"], duracao_segundos)
+            for campo in CAMPOS_ACUMULADOS:
+                serie[campo] += valores.get(campo, 0)
+
+    def instantaneo(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Cópia das séries no formato {categoria: {nome: métricas}}."""
+        with self._lock:
+            resultado: Dict[str, Dict[str, Dict[str, float]]] = {}
+            for (categoria, nome), serie in sorted(self._series.items()):
+                resultado.setdefault(categoria, {})[nome] = dict(serie)
+            return resultado
+
+    def exportar_json(self) -> str:
+        """Séries serializadas em JSON, para dump ou coleta externa."""
+        return json.dumps(self.instantaneo(), ensure_ascii=False, indent=2)
+
+    def limpar(self) -> None:
+        """Remove todas as séries."""
+        with self._lock:
+            self._series.clear()
+
+
+metricas = RegistroMetricas()
+
+_medicao_atual: ContextVar[Optional[Dict[str, Any]]] = ContextVar("medicao_atual", default=None)
+
+
+def _finalizar(categoria: str, nome: str, duracao: float, erro: bool, valores: Dict[str, Any]) -> None:
+    """Agrega a medição no registro e emite a linha de log estruturada."""
+    metricas.registrar(categoria, nome, duracao, erro=erro, **valores)
+    observar("banco_agil_duracao_segundos",
+             "Duração das operações instrumentadas (agente, llm, ferramenta, database)",
+             duracao, categoria=categoria, nome=nome)
+    if categoria == "llm":
+        TOKENS_LLM.incrementar(valores.get("tokens_prompt", 0), agente=nome, tipo="prompt")
+        TOKENS_LLM.incrementar(valores.get("tokens_resposta", 0), agente=nome, tipo="resposta")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({
+            "evento": "metrica",
+            "categoria": categoria,
+            "nome": nome,
+            "duracao_ms": round(duracao * 1000, 3),
+            "erro": erro,
+            **valores
+        }, ensure_ascii=False))
+
+
+@contextmanager
+def medir(categoria: str, nome: str) -> Iterator[Dict[str, Any]]:
+    """Mede o bloco; valores somados via `acumular` dentro dele entram na mesma medição."""
+    valores: Dict[str, Any] = {}
+    token = _medicao_atual.set(valores)
+    erro = False
+    inicio = time.perf_counter()
+    try:
+        yield valores
+    except BaseException:
+        erro = True
+        raise
+    finally:
+        duracao = time.perf_counter() - inicio
+        _medicao_atual.reset(token)
+        _finalizar(categoria, nome, duracao, erro, valores)
+
+
+def acumular(**valores: float) -> None:
+    """Soma valores (ex: bytes_lidos) à medição em andamento, se houver."""
+    atual = _medicao_atual.get()
+    if atual is not None:
+        for campo, valor in valores.items():
+            atual[campo] = atual.get(campo, 0) + valor
+
+
+def instrumentar(categoria: str, nome: Optional[str] = None) -> Callable:
+    """Decorador que mede cada chamada da função."""
+    def decorador(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def medido(*args, **kwargs):
+            with medir(categoria, nome or func.__name__):
+                return func(*args, **kwargs)
+        return medido
+    return decorador
+
+
+def _tokens(resposta: LLMResult) -> Dict[str, int]:
+    """Extrai o uso de tokens da resposta do LLM."""
+    prompt = resposta_tokens = 0
+    for geracoes in resposta.generations:
+        for geracao in geracoes:
+            uso = getattr(getattr(geracao, "message", None), "usage_metadata", None)
+            if uso:
+                prompt += uso.get("input_tokens", 0)
+                resposta_tokens += uso.get("output_tokens", 0)
+
+    if not prompt and not resposta_tokens and resposta.llm_output:
+        uso = resposta.llm_output.get("token_usage") or {}
+        prompt = uso.get("prompt_tokens", 0)
+        resposta_tokens = uso.get("completion_tokens", 0)
+    return {"tokens_prompt": prompt, "tokens_resposta": resposta_tokens}
+
+
+class HandlerMetricas(BaseCallbackHandler):
+    """Callback do LangChain que mede chamadas ao LLM e às ferramentas."""
+
+    # Executa no mesmo contexto da chamada, inclusive em ainvoke, sem ir para um executor
+    run_inline = True
+
+    def __init__(self):
+        self._inicios: Dict[UUID, tuple] = {}
+
+    def _iniciar(self, run_id: UUID, categoria: str, nome: str) -> None:
+        self._inicios[run_id] = (categoria, nome, time.perf_counter())
+
+    def _encerrar(self, run_id: UUID, erro: bool = False, **valores) -> None:
+        inicio = self._inicios.pop(run_id, None)
+        if inicio is not None:
+            categoria, nome, comeco = inicio
+            _finalizar(categoria, nome, time.perf_counter() - comeco, erro, valores)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID,
+                            metadata: Optional[Dict[str, Any]] = None, **kwargs) -> None:
+        # As chamadas ao LLM são agrupadas pelo nó do grafo que as fez
+        self._iniciar(run_id, "llm", (metadata or {}).get("langgraph_node", "fora_do_grafo"))
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        self._encerrar(run_id, **_tokens(response))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._encerrar(run_id, erro=True)
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs) -> None:
+        self._iniciar(run_id, "ferramenta", (serialized or {}).get("name") or kwargs.get("name", "ferramenta"))
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs) -> None:
+        self._encerrar(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._encerrar(run_id, erro=True)
+
+
+handler_metricas = HandlerMetricas()
+
+
+def instrumentar_runnable(objeto) -> None:
+    """Anexa o handler de métricas a um chat model ou ferramenta (operação idempotente).
+
+    O handler entra como callback local do objeto, preservando os callbacks herdados
+    da execução (ex: o streaming de tokens do grafo).
+    """
+    if isinstance(objeto.callbacks, BaseCallbackManager):
+        if handler_metricas not in objeto.callbacks.handlers:
+            objeto.callbacks.add_handler(handler_metricas, inherit=False)
+        return
+
+    callbacks = list(objeto.callbacks or [])
+    if handler_metricas not in callbacks:
+        objeto.callbacks = callbacks + [handler_metricas]
@@ -0,0 +1,240 @@
+"""Interpretação local e determinística das respostas do cliente.
+
+As funções da entrevista de crédito retornam None quando não conseguem
+interpretar a resposta com segurança; nesse caso o agente recorre ao LLM.
+`detectar_intencao_saida` atende a triagem durante a autenticação.
+"""
+import re
+import unicodedata
+from typing import Any, Callable, Dict, Optional
+
+
+def _normalizar(texto: str) -> str:
+    """Minúsculas, sem acentos e com espaços simples."""
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.split())
+
+
+NUMEROS_POR_EXTENSO = {
+    "zero": 0, "um": 1, "uma": 1, "dois": 2, "duas": 2, "tres": 3, "quatro": 4,
+    "cinco": 5, "seis": 6, "sete": 7, "oito": 8, "nove": 9, "dez": 10,
+    "vinte": 20, "trinta": 30, "quarenta": 40, "cinquenta": 50, "cem": 100,
+    "duzentos": 200, "trezentos": 300, "quinhentos": 500, "meio": 0.5, "meia": 0.5
+}
+
+MULTIPLICADORES = {
+    "k": 1_000, "mil": 1_000,
+    "mi": 1_000_000, "milhao": 1_000_000, "milhoes": 1_000_000
+}
+
+_RE_VALOR = re.compile(
+    r"(?<![\w.,])(\d{1,3}(?:\.\d{3})+(?:,\d+)?|\d+(?:[.,]\d+)?)\s*"
+    r"(k|mil|milhao|milhoes|mi)?(?![\w])"
+)
+_RE_EXTENSO = re.compile(
+    r"\b(" + "|".join(NUMEROS_POR_EXTENSO) + r")\s+(mil|milhao|milhoes)\b"
+)
+_RE_NUMERO = re.compile(r"\b\d+\b")
+# Valores de outro período ("12 mil anuais", "500 por semana") não são mensais
+_RE_PERIODO_NAO_MENSAL = re.compile(
+    r"\b(anos?|anua(l|is)|semanas?|semana(l|is)|quinzena(l|is)?|dias?|diari[oa]s?|hora|horas)\b"
+)
+
+# Valores negativos ("-500", "menos 2 mil") ficam para o LLM: renda e despesas não são negativas
+_RE_NEGATIVO = re.compile(r"(?<![\w.,])(-|\bmenos\b)\s*(\d|(" + "|".join(NUMEROS_POR_EXTENSO) + r")\b)")
+
+
+def _converter_numero(texto: str) -> float:
+    """Converte número no formato brasileiro ("5.000,50", "3,5") ou com ponto decimal ("3.5")."""
+    if "," in texto:
+        return float(texto.replace(".", "").replace(",", "."))
+    if re.fullmatch(r"\d{1,3}(?:\.\d{3})+", texto):
+        return float(texto.replace(".", ""))
+    return float(texto)
+
+
+def interpretar_valor_monetario(texto: str) -> Optional[float]:
+    """Interpreta valores como "5000", "R$ 5.000,00", "5 mil", "3.5k" ou "dois mil"."""
+    normalizado = _normalizar(texto).replace("r$", " ")
+    if _RE_PERIODO_NAO_MENSAL.search(normalizado) or _RE_NEGATIVO.search(normalizado):
+        return None
+
+    valores = []
+    for numero, multiplicador in _RE_VALOR.findall(normalizado):
+        valor = _converter_numero(numero)
+        if multiplicador:
+            valor *= MULTIPLICADORES[multiplicador]
+        valores.append(valor)
+
+    por_extenso = _RE_EXTENSO.findall(normalizado)
+    for palavra, multiplicador in por_extenso:
+        valores.append(NUMEROS_POR_EXTENSO[palavra] * MULTIPLICADORES[multiplicador])
+
+    # "dois mil e quinhentos": sobram palavras numéricas fora do valor reconhecido
+    palavras_numericas = [p for p in re.findall(r"\b\w+\b", normalizado) if p in NUMEROS_POR_EXTENSO]
+    if len(palavras_numericas) > len(por_extenso):
+        return None
+
+    if len(valores) != 1:
+        return None
+    return round(float(valores[0]), 2)
+
+
+TERMOS_EMPREGO = {
+    "desempregado": (
+        r"desempregad\w*", r"sem (emprego|trabalho)", r"nao (estou )?trabalh\w*",
+        r"estou parad[oa]", r"fui demitid[oa]"
+    ),
+    "autonomo": (
+        r"autonom\w*", r"freela\w*", r"mei\b", r"(por )?conta propria", r"microempreendedor\w*",
+        r"empreendedor\w*", r"empresari[oa]", r"pj\b", r"(sem|nao tenho) carteira( assinada)?",
+        r"informal\b", r"bicos?\b", r"liberal\b"
+    ),
+    "formal": (
+        r"formal\b", r"clt\b", r"carteira assinada", r"registrad[oa]", r"de carteira\b",
+        r"servidor\w*", r"concursad[oa]", r"funcionari[oa] public[oa]", r"assalariad[oa]",
+        r"empregad[oa]\b"
+    )
+}
+
+_PADROES_EMPREGO = {
+    tipo: [re.compile(r"\b" + termo) for termo in termos]
+    for tipo, termos in TERMOS_EMPREGO.items()
+}
+
+
+def interpretar_tipo_emprego(texto: str) -> Optional[str]:
+    """Classifica a resposta em 'formal', 'autonomo' ou 'desempregado'."""
+    restante = _normalizar(texto)
+
+    encontrados = set()
+    for tipo, padroes in _PADROES_EMPREGO.items():
+        for padrao in padroes:
+            if padrao.search(restante):
+                encontrados.add(tipo)
+                # Remove o trecho para que "sem carteira assinada" não conte também como formal
+                restante = padrao.sub(" ", restante)
+
+    # Uma negação que sobrou ("não sou CLT") torna a resposta ambígua
+    if len(encontrados) != 1 or re.search(r"\bnao\b", restante):
+        return None
+    return encontrados.pop()
+
+
+_TERMOS_SEM_DEPENDENTES = ("nenhum", "nenhuma", "nao tenho", "sem dependentes", "sem filhos", "ninguem")
+
+
+def interpretar_num_dependentes(texto: str) -> Optional[int]:
+    """Interpreta o número de dependentes, limitado a 3 ("3 ou mais" = 3)."""
+    normalizado = _normalizar(texto)
+
+    numeros = [int(n) for n in _RE_NUMERO.findall(normalizado)]
+    numeros += [
+        int(NUMEROS_POR_EXTENSO[palavra]) for palavra in re.findall(r"\b\w+\b", normalizado)
+        if palavra in NUMEROS_POR_EXTENSO and NUMEROS_POR_EXTENSO[palavra] == int(NUMEROS_POR_EXTENSO[palavra])
+    ]
+
+    if not numeros:
+        if any(re.search(r"\b" + termo + r"\b", normalizado) for termo in _TERMOS_SEM_DEPENDENTES):
+            return 0
+        return None
+
+    if len(numeros) != 1 and not re.search(r"\bou mais\b", normalizado):
+        return None
+    return min(max(numeros), 3)
+
+
+_RESPOSTAS_NEGATIVAS = (
+    "nao", "n", "nenhuma", "nenhum", "sem", "negativo", "nunca", "no", "zero"
+)
+_RESPOSTAS_POSITIVAS = (
+    "sim", "s", "tenho", "possuo", "positivo", "claro", "yes", "infelizmente", "devo", "estou"
+)
+# "não sei" tem uma negação, mas não responde à pergunta
+_RE_INCERTEZA = re.compile(
+    r"\b(nao sei|sei la|talvez|acho|acho que|nao lembro|nao me lembro|nao tenho certeza|"
+    r"mais ou menos|depende|provavelmente|possivelmente)\b"
+)
+
+
+def interpretar_sim_nao(texto: str) -> Optional[bool]:
+    """Interpreta respostas curtas de sim/não (ex: "sim, tenho", "não", "nenhuma")."""
+    normalizado = _normalizar(texto)
+    palavras = re.findall(r"\b\w+\b", normalizado)
+    if not palavras or len(palavras) > 6 or _RE_INCERTEZA.search(normalizado):
+        return None
+
+    negativo = any(p in _RESPOSTAS_NEGATIVAS for p in palavras)
+    positivo = any(p in _RESPOSTAS_POSITIVAS for p in palavras)
+
+    if negativo:
+        # "não tenho" é negativo; "sim" junto de uma negação é ambíguo
+        return None if "sim" in palavras else False
+    if positivo:
+        return True
+    return None
+
+
+INTERPRETADORES: Dict[str, Callable[[str], Any]] = {
+    "renda_mensal": interpretar_valor_monetario,
+    "tipo_emprego": interpretar_tipo_emprego,
+    "despesas_fixas": interpretar_valor_monetario,
+    "num_dependentes": interpretar_num_dependentes,
+    "tem_dividas": interpretar_sim_nao,
+}
+
+
+def interpretar_campo(campo: str, texto: str) -> Optional[Any]:
+    """Interpreta a resposta do cliente para um campo da entrevista."""
+    interpretador = INTERPRETADORES.get(campo)
+    if interpretador is None:
+        return None
+    return interpretador(texto)
+
+
+_TERMOS_SAIDA = (
+    "sair", "encerrar", "encerra", "encerre", "tchau", "ate logo", "ate mais", "adeus",
+    "cancelar", "cancela", "desistir", "desisto", "finalizar", "finaliza", "nao quero mais", "deixa pra la"
+)
+_INTENCOES_SAIDA = (
+    "quero", "queria", "gostaria de", "pode", "podemos", "vamos", "vou", "preciso", "posso", "prefiro"
+)
+_OBJETOS_SAIDA = (
+    "atendimento", "conversa", "chat", "sessao", "contato"
+)
+_COMPLEMENTOS_SAIDA = ("por aqui", "por hoje", "entao", "agora")
+_PALAVRAS_NEUTRAS = ("ok", "certo", "bom", "entao", "obrigado", "obrigada", "valeu", "por favor", "agora", "ja",
+                     "e", "mas", "eu")
+
+
+def _alternativas(termos) -> str:
+    return "(?:" + "|".join(re.escape(termo) for termo in termos) + ")"
+
+
+# Um pedido de saída completo: "quero sair", "pode encerrar o atendimento", "tchau por hoje"
+_PEDIDO_SAIDA = (
+    r"(?:(?:eu )?" + _alternativas(_INTENCOES_SAIDA) + r" )?" + _alternativas(_TERMOS_SAIDA)
+    + r"(?: (?:(?:com )?(?:o|a|esse|este|essa|esta|meu|do|da|desse|deste) )?" + _alternativas(_OBJETOS_SAIDA) + r")?"
+    + r"(?: " + _alternativas(_COMPLEMENTOS_SAIDA) + r")?"
+)
+_RE_MENSAGEM_SAIDA = re.compile(
+    r"(?:(?:" + _PEDIDO_SAIDA + r"|" + _alternativas(_PALAVRAS_NEUTRAS) + r") ?)+"
+)
+_RE_SAIDA = re.compile(r"\b" + _alternativas(_TERMOS_SAIDA) + r"\b")
+# Pedidos de saída são curtos; mensagens longas tratam de outro assunto
+MAX_PALAVRAS_SAIDA = 12
+
+
+def detectar_intencao_saida(texto: str) -> bool:
+    """Indica se a mensagem é um pedido para encerrar o atendimento ("sair", "tchau", "pode encerrar").
+
+    A mensagem inteira precisa ser o pedido, no máximo com palavras de cortesia:
+    "quero cancelar meu cartão", "finalizar uma compra" e "não quero sair" não
+    encerram o atendimento.
+    """
+    palavras = re.findall(r"\w+", _normalizar(texto))
+    if not palavras or len(palavras) > MAX_PALAVRAS_SAIDA:
+        return False
+    mensagem = " ".join(palavras)
+    return bool(_RE_SAIDA.search(mensagem)) and _RE_MENSAGEM_SAIDA.fullmatch(mensagem) is not None
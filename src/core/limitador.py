@@ -0,0 +1,227 @@
+"""Limitador de tentativas de autenticação compartilhado entre conversas.
+
+O contador `authentication_attempts` vive no estado de uma conversa; quem abre
+novas conversas recomeça do zero. O limitador guarda um balde de fichas por
+CPF e por cliente (IP ou sessão) para o processo inteiro: cada autenticação
+malsucedida consome uma ficha, as fichas voltam aos poucos e, com o balde
+vazio, a tentativa é recusada antes de chegar ao cadastro.
+
+A memória é limitada: baldes que já teriam se enchido de novo são descartados
+(equivalem a um balde novo) e, acima de `max_chaves`, sai o menos usado.
+
+`LimitadorTaxa` vale para o processo: com N workers, cada um concede as suas
+tentativas. `LimitadorSqlite` guarda os baldes em um arquivo SQLite
+compartilhado pelos processos da mesma máquina.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Collection, Iterator, Optional, Tuple
+
+from src.config import get_settings
+from src.core.prometheus import registro_prometheus
+
+CHAVES_LIMITADOR = registro_prometheus.medidor(
+    "banco_agil_limitador_chaves", "CPFs e clientes acompanhados pelo limitador de autenticação"
+)
+
+
+class LimitadorTaxa:
+    """Baldes de fichas por chave: `capacidade` tentativas, repostas ao longo de `janela_segundos`."""
+
+    def __init__(self, capacidade: int, janela_segundos: float, max_chaves: int = 10_000,
+                 relogio: Callable[[], float] = time.monotonic):
+        if capacidade < 1 or janela_segundos <= 0:
+            raise ValueError("capacidade e janela_segundos devem ser positivos")
+        self.capacidade = float(capacidade)
+        self.janela_segundos = janela_segundos
+        self.taxa = capacidade / janela_segundos
+        self.max_chaves = max_chaves
+        self._relogio = relogio
+        # chave -> (fichas, instante da última atualização); ordenado do menos ao mais recente
+        self._baldes: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _repor(self, balde: Optional[Tuple[float, float]], agora: float) -> float:
+        if balde is None:
+            return self.capacidade
+        fichas, atualizado_em = balde
+        return min(self.capacidade, fichas + (agora - atualizado_em) * self.taxa)
+
+    def _fichas(self, chave: str, agora: float) -> float:
+        return self._repor(self._baldes.get(chave), agora)
+
+    def _expirar(self, agora: float) -> None:
+        # Um balde parado por uma janela inteira está cheio de novo: não precisa ser lembrado
+        while self._baldes:
+            fichas, atualizado_em = next(iter(self._baldes.values()))
+            if agora - atualizado_em < self.janela_segundos:
+                break
+            self._baldes.popitem(last=False)
+
+    def _gravar(self, chave: str, fichas: float, agora: float) -> None:
+        self._baldes[chave] = (fichas, agora)
+        self._baldes.move_to_end(chave)
+        while len(self._baldes) > self.max_chaves:
+            self._baldes.popitem(last=False)
+
+    def tentar(self, *chaves: str) -> float:
+        """Reserva uma ficha de cada chave, ou nenhuma.
+
+        Retorna 0.0 se a tentativa foi liberada; senão, os segundos até haver
+        ficha em todas as chaves.
+        """
+        with self._lock:
+            agora = self._relogio()
+            self._expirar(agora)
+            fichas = {chave: self._fichas(chave, agora) for chave in chaves}
+            faltando = max((1 - saldo for saldo in fichas.values()), default=0.0)
+            if faltando > 0:
+                return faltando / self.taxa
+            for chave, saldo in fichas.items():
+                self._gravar(chave, saldo - 1, agora)
+            CHAVES_LIMITADOR.definir(len(self._baldes))
+            return 0.0
+
+    def devolver(self, *chaves: str) -> None:
+        """Devolve a ficha reservada (tentativas bem-sucedidas não contam)."""
+        with self._lock:
+            agora = self._relogio()
+            for chave in chaves:
+                if chave in self._baldes:
+                    self._gravar(chave, min(self.capacidade, self._fichas(chave, agora) + 1), agora)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._baldes)
+
+    def limpar(self) -> None:
+        """Esquece todos os baldes."""
+        with self._lock:
+            self._baldes.clear()
+        CHAVES_LIMITADOR.definir(0)
+
+
+class LimitadorSqlite(LimitadorTaxa):
+    """Baldes de fichas compartilhados entre processos da mesma máquina por um arquivo SQLite."""
+
+    def __init__(self, caminho: str, capacidade: int, janela_segundos: float, max_chaves: int = 10_000,
+                 relogio: Callable[[], float] = time.time):
+        super().__init__(capacidade, janela_segundos, max_chaves, relogio)
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        # Transações explícitas (BEGIN IMMEDIATE): a leitura e a reserva das fichas são atômicas entre processos
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False, timeout=30, isolation_level=None)
+        with self._lock:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS baldes (chave TEXT PRIMARY KEY, "
+                "fichas REAL NOT NULL, atualizado_em REAL NOT NULL)"
+            )
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS baldes_atualizado_em ON baldes (atualizado_em)")
+
+    @contextmanager
+    def _transacao(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conexao.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conexao
+            except BaseException:
+                self._conexao.execute("ROLLBACK")
+                raise
+            self._conexao.execute("COMMIT")
+
+    @staticmethod
+    def _balde(conexao: sqlite3.Connection, chave: str) -> Optional[Tuple[float, float]]:
+        return conexao.execute("SELECT fichas, atualizado_em FROM baldes WHERE chave = ?", (chave,)).fetchone()
+
+    @staticmethod
+    def _gravar_balde(conexao: sqlite3.Connection, chave: str, fichas: float, agora: float) -> None:
+        conexao.execute(
+            "INSERT OR REPLACE INTO baldes (chave, fichas, atualizado_em) VALUES (?, ?, ?)", (chave, fichas, agora)
+        )
+
+    def tentar(self, *chaves: str) -> float:
+        with self._transacao() as conexao:
+            agora = self._relogio()
+            conexao.execute("DELETE FROM baldes WHERE atualizado_em <= ?", (agora - self.janela_segundos,))
+            fichas = {chave: self._repor(self._balde(conexao, chave), agora) for chave in chaves}
+            faltando = max((1 - saldo for saldo in fichas.values()), default=0.0)
+            if faltando > 0:
+                return faltando / self.taxa
+            for chave, saldo in fichas.items():
+                self._gravar_balde(conexao, chave, saldo - 1, agora)
+            conexao.execute(
+                "DELETE FROM baldes WHERE chave IN (SELECT chave FROM baldes "
+                "ORDER BY atualizado_em DESC LIMIT -1 OFFSET ?)", (self.max_chaves,)
+            )
+            total = conexao.execute("SELECT COUNT(*) FROM baldes").fetchone()[0]
+        CHAVES_LIMITADOR.definir(total)
+        return 0.0
+
+    def devolver(self, *chaves: str) -> None:
+        with self._transacao() as conexao:
+            agora = self._relogio()
+            for chave in chaves:
+                balde = self._balde(conexao, chave)
+                if balde is not None:
+                    self._gravar_balde(conexao, chave, min(self.capacidade, self._repor(balde, agora) + 1), agora)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conexao.execute("SELECT COUNT(*) FROM baldes").fetchone()[0]
+
+    def limpar(self) -> None:
+        with self._transacao() as conexao:
+            conexao.execute("DELETE FROM baldes")
+        CHAVES_LIMITADOR.definir(0)
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._conexao.close()
+
+
+def identificar_cliente(endereco: Optional[str], encaminhado: Optional[str], sessao_id: str,
+                        proxies_confiaveis: Collection[str] = ()) -> str:
+    """Identificador do cliente para o limitador: o IP de origem ou, sem ele, a sessão.
+
+    Quando a conexão vem de um proxy confiável (ex: o balanceador), o IP é o
+    último endereço de `X-Forwarded-For` que não é de um proxy confiável: os
+    anteriores foram escritos pelo próprio cliente. Sem esse endereço, todos
+    os clientes atrás do proxy teriam o mesmo IP, então vale a sessão.
+    """
+    if not endereco:
+        return sessao_id
+    if endereco not in proxies_confiaveis:
+        return endereco
+    for salto in reversed((encaminhado or "").split(",")):
+        salto = salto.strip()
+        if salto and salto not in proxies_confiaveis:
+            return salto
+    return sessao_id
+
+
+@lru_cache(maxsize=1)
+def get_limitador_autenticacao() -> Optional[LimitadorTaxa]:
+    """Limitador único do processo, conforme as configurações (None se desativado)."""
+    settings = get_settings()
+    if not settings.auth_rate_limit_enabled:
+        return None
+    if settings.auth_rate_limit_backend == "sqlite":
+        return LimitadorSqlite(
+            settings.auth_rate_limit_db_path,
+            settings.auth_rate_limit_attempts,
+            settings.auth_rate_limit_window_seconds,
+            settings.auth_rate_limit_max_keys
+        )
+    return LimitadorTaxa(
+        settings.auth_rate_limit_attempts,
+        settings.auth_rate_limit_window_seconds,
+        settings.auth_rate_limit_max_keys
+    )
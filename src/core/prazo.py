@@ -0,0 +1,148 @@
+"""Prazo de cada turno da conversa.
+
+O nó roteador grava em `prazo_turno` o instante (epoch) até o qual o turno deve
+terminar. Os agentes chamam o LLM dentro do tempo que resta e, quando o prazo se
+esgota, respondem com uma mensagem determinística (ex: o limite lido do
+Database ou a última cotação conhecida) em vez de deixar a sessão presa.
+
+O prazo também acompanha a chamada (`segundos_restantes`): a fila de admissão
+desiste de esperar quando ele termina, o LLM o recebe como timeout da
+requisição e as ferramentas limitam por ele o timeout das APIs externas. Assim,
+uma chamada abandonada pelo turno não continua ocupando vagas e tokens.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TempoEsgotado
+import contextvars
+import logging
+import time
+from typing import Any, Awaitable, Callable, Mapping, Optional, TypeVar
+
+from langchain_core.runnables import Runnable
+
+from src.config import get_settings
+from src.core.prometheus import registro_prometheus
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PRAZOS_ESGOTADOS = registro_prometheus.contador(
+    "banco_agil_prazo_esgotado_total", "Turnos respondidos com a mensagem de contingência por falta de tempo",
+    ("agente",)
+)
+
+# Chamadas síncronas rodam nestas threads para que o turno possa deixar de esperar por elas
+_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="prazo")
+
+
+# Prazo (epoch) da chamada em andamento, visto pelo LLM, pela fila de admissão e pelas ferramentas
+_prazo_chamada: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("prazo_chamada", default=None)
+
+# Timeout mínimo de uma requisição: zero ou negativo seria interpretado como "sem timeout"
+TIMEOUT_MINIMO_SEGUNDOS = 0.001
+
+
+class PrazoEsgotado(Exception):
+    """O turno não tem mais tempo para a chamada."""
+
+
+def segundos_restantes() -> Optional[float]:
+    """Segundos que restam ao prazo da chamada em andamento (None quando não há prazo)."""
+    prazo = _prazo_chamada.get()
+    return None if prazo is None else prazo - time.time()
+
+
+def limitar_timeout(timeout: float) -> float:
+    """Timeout de uma chamada externa, reduzido ao que resta do prazo da chamada em andamento."""
+    restante = segundos_restantes()
+    return timeout if restante is None else max(TIMEOUT_MINIMO_SEGUNDOS, min(timeout, restante))
+
+
+def definir_prazo(prazo: Optional[float]) -> contextvars.Token:
+    """Define o prazo (epoch) das chamadas feitas no contexto atual."""
+    return _prazo_chamada.set(prazo)
+
+
+def novo_prazo(orcamento_segundos: Optional[float] = None) -> Optional[float]:
+    """Prazo de um turno que começa agora (None quando não há orçamento configurado)."""
+    if orcamento_segundos is None:
+        orcamento_segundos = get_settings().turn_budget_seconds
+    return time.time() + orcamento_segundos if orcamento_segundos else None
+
+
+def tempo_restante(state: Mapping[str, Any]) -> Optional[float]:
+    """Segundos que ainda restam ao turno (None quando o turno não tem prazo)."""
+    prazo = state.get("prazo_turno")
+    return None if prazo is None else prazo - time.time()
+
+
+def _esgotado(agente: str) -> PrazoEsgotado:
+    PRAZOS_ESGOTADOS.incrementar(agente=agente)
+    logger.warning(f"Prazo do turno esgotado no agente {agente}")
+    return PrazoEsgotado(agente)
+
+
+def chamar_com_prazo(state: Mapping[str, Any], agente: str, funcao: Callable[..., T], *args: Any) -> T:
+    """Executa `funcao(*args)` dentro do tempo restante do turno.
+
+    Ao expirar, a chamada não é interrompida (threads não podem ser canceladas),
+    mas o turno deixa de esperar por ela e PrazoEsgotado é levantada. A chamada
+    recebe o prazo no contexto: a admissão e o timeout da requisição o respeitam.
+    """
+    restante = tempo_restante(state)
+    if restante is None:
+        return funcao(*args)
+    if restante <= 0:
+        raise _esgotado(agente)
+
+    # O contexto copiado mantém as medições e os callbacks do LangGraph na outra thread
+    contexto = contextvars.copy_context()
+    contexto.run(definir_prazo, state["prazo_turno"])
+    futuro = _pool.submit(contexto.run, funcao, *args)
+    try:
+        return futuro.result(timeout=restante)
+    except TempoEsgotado:
+        futuro.cancel()
+        raise _esgotado(agente) from None
+
+
+async def achamar_com_prazo(state: Mapping[str, Any], agente: str, chamada: Awaitable[T]) -> T:
+    """Aguarda `chamada` dentro do tempo restante do turno; ao expirar, ela é cancelada."""
+    restante = tempo_restante(state)
+    if restante is None:
+        return await chamada
+    if restante <= 0:
+        if asyncio.iscoroutine(chamada):
+            chamada.close()
+        raise _esgotado(agente)
+
+    # A tarefa criada por wait_for copia o contexto com o prazo definido aqui
+    token = definir_prazo(state["prazo_turno"])
+    try:
+        return await asyncio.wait_for(chamada, restante)
+    except asyncio.TimeoutError:
+        raise _esgotado(agente) from None
+    finally:
+        _prazo_chamada.reset(token)
+
+
+class LLMComPrazo(Runnable):
+    """Modelo cujas chamadas recebem como timeout da requisição o que resta do prazo."""
+
+    def __init__(self, llm: Runnable):
+        self.llm = llm
+
+    @staticmethod
+    def _com_timeout(kwargs: dict) -> dict:
+        restante = segundos_restantes()
+        if restante is None:
+            return kwargs
+        if restante <= 0:
+            raise PrazoEsgotado("llm")
+        return {**kwargs, "timeout": restante}
+
+    def invoke(self, input, config=None, **kwargs):
+        return self.llm.invoke(input, config, **self._com_timeout(kwargs))
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        return await self.llm.ainvoke(input, config, **self._com_timeout(kwargs))
@@ -0,0 +1,282 @@
+"""Contadores, medidores e histogramas expostos no formato de texto do Prometheus.
+
+As métricas ficam no registro `registro_prometheus` e são servidas em `/metrics`
+por um servidor HTTP em thread própria, iniciado junto com a aplicação via
+`iniciar_servidor_metricas`.
+"""
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_PADRAO: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+class _Metrica:
+    """Base das métricas: nome, descrição e séries indexadas pelos valores dos rótulos."""
+
+    tipo = ""
+
+    def __init__(self, nome: str, descricao: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos: Dict[str, str]) -> Tuple[str, ...]:
+        if set(rotulos) != set(self.rotulos):
+            raise ValueError(f"Rótulos de {self.nome} devem ser {self.rotulos}, recebido {tuple(rotulos)}")
+        return tuple(str(rotulos[nome]) for nome in self.rotulos)
+
+    def zerar(self) -> None:
+        """Remove todas as séries da métrica."""
+        with self._lock:
+            self._series.clear()
+
+    def _cabecalho(self) -> List[str]:
+        return [f"# HELP {self.nome} {_escapar(self.descricao)}", f"# TYPE {self.nome} {self.tipo}"]
+
+
+class _MetricaValor(_Metrica):
+    """Métrica com um único valor por série (contadores e medidores)."""
+
+    def __init__(self, nome: str, descricao: str, rotulos: Sequence[str] = ()):
+        super().__init__(nome, descricao, rotulos)
+        self._series: Dict[Tuple[str, ...], float] = {}
+
+    def valor(self, **rotulos: str) -> float:
+        with self._lock:
+            return self._series.get(self._chave(rotulos), 0.0)
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            valores = sorted(self._series.items())
+        return self._cabecalho() + [
+            f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}"
+            for chave, valor in valores
+        ]
+
+
+class Contador(_MetricaValor):
+    """Contador monotônico."""
+
+    tipo = "counter"
+
+    def incrementar(self, valor: float = 1.0, /, **rotulos: str) -> None:
+        if valor < 0:
+            raise ValueError("Contadores só podem ser incrementados")
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._series[chave] = self._series.get(chave, 0.0) + valor
+
+
+class Medidor(_MetricaValor):
+    """Valor instantâneo que pode subir e descer (gauge)."""
+
+    tipo = "gauge"
+
+    def definir(self, valor: float, /, **rotulos: str) -> None:
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._series[chave] = valor
+
+
+class Histograma(_Metrica):
+    """Histograma com buckets cumulativos, soma e contagem por série."""
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, descricao: str, rotulos: Sequence[str] = (),
+                 buckets: Sequence[float] = BUCKETS_PADRAO, buckets_do_registro: bool = False):
+        super().__init__(nome, descricao, rotulos)
+        # Histogramas sem buckets próprios acompanham `RegistroPrometheus.configurar_buckets`
+        self.buckets_do_registro = buckets_do_registro
+        self.buckets: Tuple[float, ...] = ()
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self.redefinir_buckets(buckets)
+
+    def redefinir_buckets(self, buckets: Sequence[float]) -> None:
+        """Troca os limites dos buckets; as séries já observadas são descartadas."""
+        novos = tuple(sorted(float(limite) for limite in buckets))
+        if not novos:
+            raise ValueError(f"Histograma {self.nome} precisa de ao menos um bucket")
+        with self._lock:
+            if novos != self.buckets:
+                self.buckets = novos
+                self._series.clear()
+
+    def observar(self, valor: float, /, **rotulos: str) -> None:
+        chave = self._chave(rotulos)
+        # Buckets "le": o valor entra no primeiro limite maior ou igual a ele
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def contagem(self, **rotulos: str) -> int:
+        with self._lock:
+            serie = self._series.get(self._chave(rotulos))
+            return serie[2] if serie else 0
+
+    def exportar(self) -> List[str]:
+        with self._lock:
+            series = sorted((chave, (list(contagens), soma, total))
+                            for chave, (contagens, soma, total) in self._series.items())
+
+        linhas = self._cabecalho()
+        for chave, (contagens, soma, total) in series:
+            acumulado = 0
+            for limite, quantidade in zip(self.buckets + (math.inf,), contagens):
+                acumulado += quantidade
+                rotulos = _formatar_rotulos(self.rotulos, chave, f'le="{_formatar_numero(limite)}"')
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            rotulos = _formatar_rotulos(self.rotulos, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{rotulos} {total}")
+        return linhas
+
+
+class RegistroPrometheus:
+    """Registro das métricas expostas, criadas sob demanda pelo nome."""
+
+    def __init__(self, buckets_padrao: Sequence[float] = BUCKETS_PADRAO):
+        self.buckets_padrao = tuple(buckets_padrao)
+        self._metricas: Dict[str, _Metrica] = {}
+        self._lock = threading.Lock()
+
+    def _obter(self, classe, nome: str, descricao: str, rotulos: Sequence[str], **kwargs) -> _Metrica:
+        with self._lock:
+            metrica = self._metricas.get(nome)
+            if metrica is None:
+                metrica = self._metricas[nome] = classe(nome, descricao, rotulos, **kwargs)
+            elif not isinstance(metrica, classe) or metrica.rotulos != tuple(rotulos):
+                raise ValueError(f"Métrica {nome} já registrada com outro tipo ou rótulos")
+            return metrica
+
+    def contador(self, nome: str, descricao: str, rotulos: Sequence[str] = ()) -> Contador:
+        """Retorna o contador `nome`, criando-o na primeira chamada."""
+        return self._obter(Contador, nome, descricao, rotulos)
+
+    def medidor(self, nome: str, descricao: str, rotulos: Sequence[str] = ()) -> Medidor:
+        """Retorna o medidor `nome`, criando-o na primeira chamada."""
+        return self._obter(Medidor, nome, descricao, rotulos)
+
+    def histograma(self, nome: str, descricao: str, rotulos: Sequence[str] = (),
+                   buckets: Optional[Sequence[float]] = None) -> Histograma:
+        """Retorna o histograma `nome`, criando-o na primeira chamada.
+
+        Sem `buckets`, usa os buckets padrão do registro (configuráveis em `configurar_buckets`).
+        """
+        if buckets:
+            return self._obter(Histograma, nome, descricao, rotulos, buckets=buckets)
+        return self._obter(Histograma, nome, descricao, rotulos, buckets=self.buckets_padrao,
+                           buckets_do_registro=True)
+
+    def configurar_buckets(self, buckets: Sequence[float]) -> None:
+        """Define os buckets padrão, inclusive dos histogramas já criados sem buckets próprios.
+
+        Os histogramas são criados na importação dos módulos, antes das configurações;
+        as observações feitas até aqui com os buckets antigos são descartadas.
+        """
+        self.buckets_padrao = tuple(buckets)
+        with self._lock:
+            histogramas = [metrica for metrica in self._metricas.values()
+                           if isinstance(metrica, Histograma) and metrica.buckets_do_registro]
+        for histograma in histogramas:
+            histograma.redefinir_buckets(self.buckets_padrao)
+
+    def exportar(self) -> str:
+        """Todas as métricas no formato de texto do Prometheus."""
+        with self._lock:
+            metricas = sorted(self._metricas.values(), key=lambda metrica: metrica.nome)
+        linhas = [linha for metrica in metricas for linha in metrica.exportar()]
+        return "\n".join(linhas) + "\n" if linhas else ""
+
+    def zerar(self) -> None:
+        """Zera as séries de todas as métricas, mantendo-as registradas."""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        for metrica in metricas:
+            metrica.zerar()
+
+
+registro_prometheus = RegistroPrometheus()
+
+
+def observar(nome: str, descricao: str, valor: float, /, **rotulos: str) -> None:
+    """Registra uma observação no histograma `nome` do registro global."""
+    registro_prometheus.histograma(nome, descricao, tuple(rotulos)).observar(valor, **rotulos)
+
+
+class _HandlerMetricas(BaseHTTPRequestHandler):
+    registro: RegistroPrometheus = registro_prometheus
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        corpo = self.registro.exportar().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", TIPO_CONTEUDO)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        logger.debug(formato, *args)
+
+
+_servidor: Optional[ThreadingHTTPServer] = None
+_lock_servidor = threading.Lock()
+
+
+def iniciar_servidor_metricas(porta: int = 9100, endereco: str = "0.0.0.0",
+                              buckets: Optional[Sequence[float]] = None) -> ThreadingHTTPServer:
+    """Serve `/metrics` em uma thread daemon (chamadas repetidas reutilizam o servidor)."""
+    global _servidor
+    with _lock_servidor:
+        if _servidor is None:
+            if buckets:
+                registro_prometheus.configurar_buckets(buckets)
+            _servidor = ThreadingHTTPServer((endereco, porta), _HandlerMetricas)
+            _servidor.daemon_threads = True
+            threading.Thread(target=_servidor.serve_forever, name="servidor-metricas", daemon=True).start()
+            logger.info(f"Métricas disponíveis em http://{endereco}:{_servidor.server_port}/metrics")
+        return _servidor
+
+
+def parar_servidor_metricas() -> None:
+    """Encerra o servidor de métricas, se estiver ativo."""
+    global _servidor
+    with _lock_servidor:
+        if _servidor is not None:
+            _servidor.shutdown()
+            _servidor.server_close()
+            _servidor = None
@@ -0,0 +1,325 @@
+"""Armazenamento do estado das conversas servidas pela API HTTP.
+
+O grafo é compilado uma única vez e não guarda estado: a cada turno, o estado
+da sessão é carregado do armazém, o grafo é executado e o estado final é salvo
+de volta. Novos backends implementam `ArmazemSessoes`.
+
+O lock de `ArmazemSessoes.lock` só serializa os turnos de uma sessão dentro do
+processo. Entre workers, o armazém SQLite usa versionamento otimista: o turno
+salva o estado apenas se a versão carregada ainda é a atual; senão,
+`ConflitoSessao` é levantada em vez de sobrescrever o turno concorrente.
+"""
+from abc import ABC, abstractmethod
+import asyncio
+from collections import OrderedDict
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+import weakref
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.core.prometheus import registro_prometheus
+
+SESSOES_ATIVAS = registro_prometheus.medidor(
+    "banco_agil_sessoes_ativas", "Sessões mantidas em memória pelo armazém da API"
+)
+BYTES_SESSOES = registro_prometheus.medidor(
+    "banco_agil_sessoes_bytes_estimados", "Memória estimada ocupada pelas sessões em memória"
+)
+SESSOES_EXPULSAS = registro_prometheus.contador(
+    "banco_agil_sessoes_expulsas_total", "Sessões retiradas da memória, por motivo", ("motivo",)
+)
+SESSOES_RECUPERADAS = registro_prometheus.contador(
+    "banco_agil_sessoes_recuperadas_total", "Sessões trazidas de volta do disco para a memória"
+)
+CONFLITOS_SESSOES = registro_prometheus.contador(
+    "banco_agil_sessoes_conflitos_total", "Turnos recusados porque outro turno salvou a sessão antes"
+)
+
+# Custo fixo aproximado de cada mensagem (objeto, metadados e ids) além do texto
+BYTES_POR_MENSAGEM = 512
+BYTES_POR_SESSAO = 1024
+
+
+class ConflitoSessao(Exception):
+    """A sessão foi salva por outro turno depois de carregada."""
+
+
+class ArmazemSessoes(ABC):
+    """Interface dos armazéns de sessão (estado completo do grafo por sessao_id)."""
+
+    def __init__(self):
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    @abstractmethod
+    async def carregar(self, sessao_id: str) -> Optional[Dict[str, Any]]:
+        """Estado salvo da sessão, ou None se ela não existe."""
+
+    @abstractmethod
+    async def salvar(self, sessao_id: str, estado: Dict[str, Any], versao: Optional[int] = None) -> None:
+        """Cria ou substitui o estado da sessão.
+
+        Com `versao`, o estado só é salvo se a sessão ainda estiver nessa versão;
+        senão, ConflitoSessao é levantada. Armazéns sem versões ignoram o argumento.
+        """
+
+    async def carregar_versionado(self, sessao_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+        """Estado salvo da sessão e a sua versão (None em armazéns sem versões)."""
+        return await self.carregar(sessao_id), None
+
+    @abstractmethod
+    async def remover(self, sessao_id: str) -> bool:
+        """Remove a sessão; retorna False se ela não existia."""
+
+    async def fechar(self) -> None:
+        """Libera os recursos do armazém."""
+
+    async def manutencao(self) -> None:
+        """Tarefas periódicas do armazém (ex: expulsar sessões ociosas)."""
+
+    def lock(self, sessao_id: str) -> asyncio.Lock:
+        """Lock que serializa os turnos de uma mesma sessão neste processo."""
+        lock = self._locks.get(sessao_id)
+        if lock is None:
+            lock = self._locks[sessao_id] = asyncio.Lock()
+        return lock
+
+
+def estimar_bytes(estado: Dict[str, Any]) -> int:
+    """Estimativa barata da memória ocupada pelo estado de uma sessão."""
+    total = BYTES_POR_SESSAO
+    for mensagem in estado.get("messages") or []:
+        conteudo = mensagem.content if isinstance(mensagem.content, str) else str(mensagem.content)
+        total += BYTES_POR_MENSAGEM + len(conteudo.encode("utf-8"))
+    return total
+
+
+class ArmazemMemoria(ArmazemSessoes):
+    """Sessões na memória do processo, com limites de quantidade, ociosidade e memória.
+
+    Quando um limite é excedido, as sessões menos usadas recentemente são expulsas;
+    sessões sem turnos há mais de `ttl_ocioso_segundos` também. Com `transbordo`, as
+    sessões expulsas são gravadas nesse armazém (ex: SQLite) e trazidas de volta
+    à memória no próximo acesso; sem ele, são descartadas.
+    """
+
+    def __init__(self, max_sessoes: Optional[int] = None, ttl_ocioso_segundos: Optional[float] = None,
+                 orcamento_bytes: Optional[int] = None, transbordo: Optional[ArmazemSessoes] = None,
+                 relogio: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.max_sessoes = max_sessoes
+        self.ttl_ocioso_segundos = ttl_ocioso_segundos
+        self.orcamento_bytes = orcamento_bytes
+        self.transbordo = transbordo
+        self._relogio = relogio
+        # sessao_id -> (último acesso, bytes estimados, estado), da menos para a mais recente
+        self._sessoes: "OrderedDict[str, tuple]" = OrderedDict()
+        self._em_transbordo: Dict[str, Dict[str, Any]] = {}
+        self.bytes_estimados = 0
+
+    async def carregar(self, sessao_id: str) -> Optional[Dict[str, Any]]:
+        await self._expulsar_ociosas()
+        entrada = self._sessoes.get(sessao_id)
+        if entrada is not None:
+            self._sessoes[sessao_id] = (self._relogio(), entrada[1], entrada[2])
+            self._sessoes.move_to_end(sessao_id)
+            return dict(entrada[2])
+
+        estado = await self._recuperar(sessao_id)
+        if estado is None:
+            return None
+        await self.salvar(sessao_id, estado)
+        return dict(estado)
+
+    async def salvar(self, sessao_id: str, estado: Dict[str, Any], versao: Optional[int] = None) -> None:
+        # Um único processo: o lock da sessão já serializa os turnos
+        self._descartar(sessao_id)
+        tamanho = estimar_bytes(estado)
+        self._sessoes[sessao_id] = (self._relogio(), tamanho, dict(estado))
+        self.bytes_estimados += tamanho
+        await self._expulsar_excedentes()
+        self._atualizar_medidores()
+
+    async def remover(self, sessao_id: str) -> bool:
+        removida = self._descartar(sessao_id) is not None
+        if self.transbordo is not None:
+            self._em_transbordo.pop(sessao_id, None)
+            removida = await self.transbordo.remover(sessao_id) or removida
+        self._atualizar_medidores()
+        return removida
+
+    async def fechar(self) -> None:
+        if self.transbordo is not None:
+            # Preserva as sessões em memória para o próximo processo
+            for sessao_id in list(self._sessoes):
+                await self._expulsar(sessao_id, "encerramento")
+            await self.transbordo.fechar()
+
+    async def manutencao(self) -> None:
+        await self._expulsar_ociosas()
+
+    def _descartar(self, sessao_id: str) -> Optional[Dict[str, Any]]:
+        entrada = self._sessoes.pop(sessao_id, None)
+        if entrada is None:
+            return None
+        self.bytes_estimados -= entrada[1]
+        return entrada[2]
+
+    async def _recuperar(self, sessao_id: str) -> Optional[Dict[str, Any]]:
+        """Busca no transbordo uma sessão expulsa da memória."""
+        if self.transbordo is None:
+            return None
+        estado = self._em_transbordo.get(sessao_id)
+        if estado is None:
+            estado = await self.transbordo.carregar(sessao_id)
+            if estado is None:
+                return None
+            await self.transbordo.remover(sessao_id)
+        SESSOES_RECUPERADAS.incrementar()
+        return estado
+
+    async def _expulsar(self, sessao_id: str, motivo: str) -> None:
+        estado = self._descartar(sessao_id)
+        if estado is None:
+            return
+        SESSOES_EXPULSAS.incrementar(motivo=motivo)
+        if self.transbordo is not None:
+            # Visível para `carregar` enquanto a gravação em disco não termina
+            self._em_transbordo[sessao_id] = estado
+            try:
+                await self.transbordo.salvar(sessao_id, estado)
+            finally:
+                if self._em_transbordo.get(sessao_id) is estado:
+                    del self._em_transbordo[sessao_id]
+
+    async def _expulsar_ociosas(self) -> None:
+        if self.ttl_ocioso_segundos is None:
+            return
+        limite = self._relogio() - self.ttl_ocioso_segundos
+        ociosas = []
+        for sessao_id, (ultimo_acesso, _, _) in self._sessoes.items():
+            if ultimo_acesso > limite:
+                break
+            ociosas.append(sessao_id)
+        for sessao_id in ociosas:
+            await self._expulsar(sessao_id, "ociosidade")
+        if ociosas:
+            self._atualizar_medidores()
+
+    async def _expulsar_excedentes(self) -> None:
+        await self._expulsar_ociosas()
+        # A sessão mais recente (a que acabou de ser salva) nunca é expulsa
+        while len(self._sessoes) > 1:
+            if self.max_sessoes is not None and len(self._sessoes) > self.max_sessoes:
+                motivo = "quantidade"
+            elif self.orcamento_bytes is not None and self.bytes_estimados > self.orcamento_bytes:
+                motivo = "memoria"
+            else:
+                break
+            await self._expulsar(next(iter(self._sessoes)), motivo)
+
+    def _atualizar_medidores(self) -> None:
+        SESSOES_ATIVAS.definir(len(self._sessoes))
+        BYTES_SESSOES.definir(self.bytes_estimados)
+
+    def __len__(self) -> int:
+        return len(self._sessoes)
+
+
+class ArmazemSqlite(ArmazemSessoes):
+    """Sessões em um arquivo SQLite, compartilhado entre workers da mesma máquina.
+
+    O estado é serializado com o serializador dos checkpointers do LangGraph,
+    que preserva as mensagens do LangChain. Cada gravação incrementa a versão
+    da sessão, usada para detectar turnos concorrentes em workers diferentes.
+    """
+
+    def __init__(self, caminho: str):
+        super().__init__()
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        self._serializador = JsonPlusSerializer()
+        self._lock_conexao = threading.Lock()
+        # As operações rodam em threads via asyncio.to_thread; o lock serializa o uso da conexão
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False, timeout=30)
+        with self._lock_conexao, self._conexao:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS sessoes ("
+                "sessao_id TEXT PRIMARY KEY, tipo TEXT NOT NULL, estado BLOB NOT NULL, "
+                "atualizado_em REAL NOT NULL, versao INTEGER NOT NULL DEFAULT 0)"
+            )
+            colunas = {linha[1] for linha in self._conexao.execute("PRAGMA table_info(sessoes)")}
+            if "versao" not in colunas:
+                self._conexao.execute("ALTER TABLE sessoes ADD COLUMN versao INTEGER NOT NULL DEFAULT 0")
+
+    def _carregar(self, sessao_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+        with self._lock_conexao:
+            linha = self._conexao.execute(
+                "SELECT tipo, estado, versao FROM sessoes WHERE sessao_id = ?", (sessao_id,)
+            ).fetchone()
+        if linha is None:
+            return None, None
+        return self._serializador.loads_typed(linha[:2]), linha[2]
+
+    def _salvar(self, sessao_id: str, estado: Dict[str, Any], versao: Optional[int]) -> None:
+        tipo, dados = self._serializador.dumps_typed(dict(estado))
+        with self._lock_conexao, self._conexao:
+            if versao is None:
+                self._conexao.execute(
+                    "INSERT INTO sessoes (sessao_id, tipo, estado, atualizado_em) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (sessao_id) DO UPDATE SET tipo = excluded.tipo, estado = excluded.estado, "
+                    "atualizado_em = excluded.atualizado_em, versao = versao + 1",
+                    (sessao_id, tipo, dados, time.time())
+                )
+                return
+            cursor = self._conexao.execute(
+                "UPDATE sessoes SET tipo = ?, estado = ?, atualizado_em = ?, versao = versao + 1 "
+                "WHERE sessao_id = ? AND versao = ?",
+                (tipo, dados, time.time(), sessao_id, versao)
+            )
+        if cursor.rowcount == 0:
+            CONFLITOS_SESSOES.incrementar()
+            raise ConflitoSessao(sessao_id)
+
+    def _remover(self, sessao_id: str) -> bool:
+        with self._lock_conexao, self._conexao:
+            cursor = self._conexao.execute("DELETE FROM sessoes WHERE sessao_id = ?", (sessao_id,))
+        return cursor.rowcount > 0
+
+    async def carregar(self, sessao_id: str) -> Optional[Dict[str, Any]]:
+        return (await asyncio.to_thread(self._carregar, sessao_id))[0]
+
+    async def carregar_versionado(self, sessao_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
+        return await asyncio.to_thread(self._carregar, sessao_id)
+
+    async def salvar(self, sessao_id: str, estado: Dict[str, Any], versao: Optional[int] = None) -> None:
+        await asyncio.to_thread(self._salvar, sessao_id, estado, versao)
+
+    async def remover(self, sessao_id: str) -> bool:
+        return await asyncio.to_thread(self._remover, sessao_id)
+
+    async def fechar(self) -> None:
+        with self._lock_conexao:
+            self._conexao.close()
+
+
+def criar_armazem(tipo: str, caminho: Optional[str] = None, **limites: Any) -> ArmazemSessoes:
+    """Cria o armazém configurado ("memoria" ou "sqlite").
+
+    Para "memoria", `limites` são os argumentos de `ArmazemMemoria`; se `caminho`
+    for informado, as sessões expulsas transbordam para um SQLite nesse arquivo.
+    """
+    if tipo == "memoria":
+        transbordo = ArmazemSqlite(caminho) if caminho else None
+        return ArmazemMemoria(transbordo=transbordo, **limites)
+    if tipo == "sqlite":
+        if not caminho:
+            raise ValueError("O armazém SQLite exige o caminho do arquivo")
+        return ArmazemSqlite(caminho)
+    raise ValueError(f"Armazém de sessões desconhecido: {tipo}")
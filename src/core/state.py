@@ -1,9 +1,17 @@
-from typing import Annotated, Optional, Sequence, TypedDict
+from typing import Annotated, Any, Dict, List, Optional, Sequence, TypedDict
 
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
 
 
+def juntar_respostas_paralelas(atual: Optional[List[Dict[str, Any]]],
+                               novo: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Acumula as respostas dos ramos paralelos; None esvazia a lista depois da junção."""
+    if novo is None:
+        return []
+    return list(atual or []) + list(novo)
+
+
 class AgentState(TypedDict):
     """Estado compartilhado entre todos os agentes."""
     messages: Annotated[Sequence[BaseMessage], add_messages]
@@ -13,9 +21,41 @@ class AgentState(TypedDict):
     nome_cliente: Optional[str]
     limite_credito: Optional[float]
     score: Optional[int]
+    # Versão dos dados do cliente lidos do cadastro (cpf/limite_credito/score): forma o instantâneo
+    versao_cliente: Optional[str]
     authentication_attempts: int
+    # Sem reducer (vale a última escrita): todo nó o escreve, e None limpa o anterior (ver graph.criar_no)
     pending_redirect: Optional[str]
     interview_data: Optional[dict]
     should_end: bool
     temp_cpf: Optional[str]
     temp_data_nascimento: Optional[str]
+    # Quem está do outro lado (IP ou sessão), usado pelo limitador de autenticação
+    cliente_id: Optional[str]
+    # Instante (epoch) até o qual o turno atual deve ser respondido; gravado pelo roteador
+    prazo_turno: Optional[float]
+    # Atualizações dos agentes executados em paralelo, aguardando o nó de junção
+    respostas_paralelas: Annotated[List[Dict[str, Any]], juntar_respostas_paralelas]
+
+
+def estado_inicial() -> Dict[str, Any]:
+    """Estado de uma nova conversa."""
+    return {
+        "messages": [],
+        "current_agent": "triagem",
+        "authenticated": False,
+        "cpf": None,
+        "nome_cliente": None,
+        "limite_credito": None,
+        "score": None,
+        "versao_cliente": None,
+        "authentication_attempts": 0,
+        "pending_redirect": None,
+        "interview_data": None,
+        "should_end": False,
+        "temp_cpf": None,
+        "temp_data_nascimento": None,
+        "cliente_id": None,
+        "prazo_turno": None,
+        "respostas_paralelas": []
+    }
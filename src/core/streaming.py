@@ -0,0 +1,85 @@
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+MARCADOR_REDIRECIONAMENTO = "REDIRECIONAR:"
+
+
+def _texto_visivel(texto: str) -> str:
+    """Remove marcadores de redirecionamento do texto exibido ao cliente.
+
+    Enquanto o final do texto ainda pode ser o início do marcador, esse trecho
+    é retido para não piscar "REDIR..." na tela antes de ser descartado.
+    """
+    if MARCADOR_REDIRECIONAMENTO in texto:
+        return texto.split(MARCADOR_REDIRECIONAMENTO)[0].rstrip()
+
+    for tamanho in range(min(len(MARCADOR_REDIRECIONAMENTO) - 1, len(texto)), 0, -1):
+        if MARCADOR_REDIRECIONAMENTO.startswith(texto[-tamanho:]):
+            return texto[:-tamanho]
+    return texto
+
+
+class _ConversorEventos:
+    """Converte a saída de `stream_mode=["messages", "values"]` em eventos para a interface."""
+
+    def __init__(self):
+        self.textos: Dict[Optional[str], str] = {}
+        self.ultimo_visivel = ""
+        self.estado_final: Dict[str, Any] = {}
+
+    def converter(self, modo: str, dados: Any) -> Iterator[Dict[str, Any]]:
+        if modo == "values":
+            self.estado_final = dados
+            return
+
+        mensagem, _metadata = dados
+        if not isinstance(mensagem, (AIMessage, AIMessageChunk)):
+            return
+
+        chamadas = getattr(mensagem, "tool_call_chunks", None) or mensagem.tool_calls
+        if chamadas:
+            nome = chamadas[0].get("name")
+            if nome:
+                yield {"tipo": "ferramenta", "nome": nome}
+            return
+
+        if not isinstance(mensagem.content, str) or not mensagem.content:
+            return
+
+        if isinstance(mensagem, AIMessageChunk):
+            self.textos[mensagem.id] = self.textos.get(mensagem.id, "") + mensagem.content
+        else:
+            self.textos[mensagem.id] = mensagem.content
+
+        visivel = _texto_visivel(self.textos[mensagem.id])
+        if visivel and visivel != self.ultimo_visivel:
+            self.ultimo_visivel = visivel
+            yield {"tipo": "token", "texto": visivel}
+
+
+def stream_resposta(graph, entrada: Dict[str, Any],
+                    config: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """Executa o grafo emitindo eventos conforme os tokens do LLM chegam.
+
+    Eventos emitidos:
+        {"tipo": "token", "texto": str}        texto visível acumulado da mensagem atual
+        {"tipo": "ferramenta", "nome": str}    o LLM decidiu chamar uma ferramenta
+        {"tipo": "final", "estado": dict}      estado final do grafo ao término do turno
+    """
+    conversor = _ConversorEventos()
+    for modo, dados in graph.stream(entrada, config=config, stream_mode=["messages", "values"]):
+        yield from conversor.converter(modo, dados)
+
+    yield {"tipo": "final", "estado": conversor.estado_final}
+
+
+async def astream_resposta(graph, entrada: Dict[str, Any],
+                           config: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Versão assíncrona de `stream_resposta`, com os mesmos eventos."""
+    conversor = _ConversorEventos()
+    async for modo, dados in graph.astream(entrada, config=config, stream_mode=["messages", "values"]):
+        for evento in conversor.converter(modo, dados):
+            yield evento
+
+    yield {"tipo": "final", "estado": conversor.estado_final}
@@ -0,0 +1,57 @@
+"""Filtro de Bloom: conjunto probabilístico e compacto de CPFs.
+
+Responde "certamente não existe" ou "pode existir" em tempo constante. Um CPF
+ausente do cadastro é recusado sem ler o arquivo; um falso positivo (CPF
+inexistente que o filtro considera possível) apenas segue para a leitura
+normal, então o resultado da autenticação nunca muda.
+"""
+import hashlib
+import math
+from typing import Iterable, Iterator
+
+
+class FiltroBloom:
+    """Filtro de Bloom dimensionado para `capacidade` itens e a taxa de falsos positivos desejada."""
+
+    def __init__(self, capacidade: int, taxa_falsos_positivos: float = 0.01):
+        if not 0 < taxa_falsos_positivos < 1:
+            raise ValueError("taxa_falsos_positivos deve estar entre 0 e 1")
+        capacidade = max(capacidade, 1)
+        self.num_bits = max(8, math.ceil(-capacidade * math.log(taxa_falsos_positivos) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacidade * math.log(2)))
+        self.itens = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    @classmethod
+    def de_itens(cls, itens: Iterable[str], taxa_falsos_positivos: float = 0.01) -> "FiltroBloom":
+        """Cria o filtro já com os itens (dimensionado pela quantidade deles)."""
+        itens = list(itens)
+        filtro = cls(len(itens), taxa_falsos_positivos)
+        for item in itens:
+            filtro.adicionar(item)
+        return filtro
+
+    def _posicoes(self, item: str) -> Iterator[int]:
+        # Hashing duplo: dois valores de 64 bits geram as k posições (Kirsch-Mitzenmacher)
+        resumo = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(resumo[:8], "little")
+        h2 = int.from_bytes(resumo[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def adicionar(self, item: str) -> None:
+        for posicao in self._posicoes(item):
+            self._bits[posicao >> 3] |= 1 << (posicao & 7)
+        self.itens += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[posicao >> 3] & (1 << (posicao & 7)) for posicao in self._posicoes(item))
+
+    @property
+    def bytes(self) -> int:
+        """Memória ocupada pelo vetor de bits."""
+        return len(self._bits)
+
+    def taxa_estimada(self) -> float:
+        """Taxa teórica de falsos positivos com os itens atuais."""
+        return (1 - math.exp(-self.num_hashes * self.itens / self.num_bits)) ** self.num_hashes
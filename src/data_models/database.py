@@ -1,24 +1,169 @@
 import csv
 from datetime import datetime
+import hashlib
 import logging
 import os
-from typing import Optional
+import shutil
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional, Tuple
 
+from src.core.instrumentacao import acumular, instrumentar
+from src.core.prometheus import registro_prometheus
+from src.data_models.bloom import FiltroBloom
 from src.data_models.models import Cliente
 
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Serializa as regravações dos CSVs entre threads (ex: agentes executados via asyncio.to_thread)
+_lock_escrita = threading.RLock()
+
+REJEICOES_FILTRO = registro_prometheus.contador(
+    "banco_agil_database_filtro_rejeicoes_total", "CPFs inexistentes recusados pelo filtro de Bloom sem ler o cadastro"
+)
+
+
+def versao_registro(cpf: str, nome: str, limite_credito: float, score: int) -> str:
+    """Versão de um cliente no cadastro: muda apenas quando os dados dele mudam."""
+    dados = f"{cpf}|{nome}|{float(limite_credito)!r}|{int(score)}"
+    return hashlib.blake2b(dados.encode("utf-8"), digest_size=8).hexdigest()
+
 
 class Database:
     """Gerenciador dos arquivos de dados CSV."""
 
-    def __init__(self, base_path: str = "data"):
+    def __init__(self, base_path: str = "data", filtro_bloom: bool = True,
+                 taxa_falsos_positivos: float = 0.01):
         self.base_path = base_path
         self.clientes_file = os.path.join(base_path, "clientes.csv")
         self.score_limite_file = os.path.join(base_path, "score_limite.csv")
         self.solicitacoes_file = os.path.join(base_path, "solicitacoes_aumento_limite.csv")
 
+        # Filtro dos CPFs do cadastro, reconstruído quando o arquivo muda
+        self.filtro_bloom = filtro_bloom
+        self.taxa_falsos_positivos = taxa_falsos_positivos
+        self._filtro: Optional[FiltroBloom] = None
+        self._assinatura_filtro: Optional[Tuple[int, int, int]] = None
+        # Versões apenas dos clientes já lidos, válidas enquanto o arquivo não muda
+        self._versoes: Dict[str, str] = {}
+        self._assinatura_versoes: Optional[Tuple[int, int, int]] = None
+        self._lock_indice = threading.Lock()
+
+    @staticmethod
+    def _assinatura(estado: os.stat_result) -> Tuple[int, int, int]:
+        # Cada regravação troca o arquivo (os.replace): o inode distingue gravações no mesmo instante e tamanho
+        return estado.st_ino, estado.st_mtime_ns, estado.st_size
+
+    def _assinatura_clientes(self) -> Tuple[int, int, int]:
+        return self._assinatura(os.stat(self.clientes_file))
+
+    def _indexar(self, linhas: Iterable[Dict[str, str]], assinatura: Tuple[int, int, int]) -> None:
+        """Atualiza o filtro e as versões já conhecidas a partir de todas as linhas do cadastro."""
+        linhas = list(linhas)
+        filtro = FiltroBloom.de_itens((row['cpf'] for row in linhas), self.taxa_falsos_positivos) \
+            if self.filtro_bloom else None
+        with self._lock_indice:
+            conhecidos = set(self._versoes)
+        versoes = {row['cpf']: self._versao_linha(row) for row in linhas if row['cpf'] in conhecidos}
+        with self._lock_indice:
+            self._filtro, self._assinatura_filtro = filtro, assinatura
+            self._versoes, self._assinatura_versoes = versoes, assinatura
+
+    def _filtro_atual(self) -> FiltroBloom:
+        """Filtro dos CPFs, relendo o cadastro só se ele mudou desde a última leitura."""
+        assinatura = self._assinatura_clientes()
+        with self._lock_indice:
+            if self._assinatura_filtro == assinatura:
+                return self._filtro
+        with self._abrir_leitura(self.clientes_file) as f:
+            filtro = FiltroBloom.de_itens((row['cpf'] for row in csv.DictReader(f)), self.taxa_falsos_positivos)
+        # Se o arquivo mudar durante a leitura, a assinatura antiga força nova leitura depois
+        with self._lock_indice:
+            self._filtro, self._assinatura_filtro = filtro, assinatura
+        return filtro
+
+    def _cpf_pode_existir(self, cpf: str) -> bool:
+        """Consulta o filtro de Bloom: False garante que o CPF não está no cadastro."""
+        if not self.filtro_bloom:
+            return True
+
+        if cpf in self._filtro_atual():
+            return True
+        REJEICOES_FILTRO.incrementar()
+        return False
+
+    @staticmethod
+    def _versao_linha(row: Dict[str, str]) -> str:
+        return versao_registro(row['cpf'], row['nome'], float(row['limite_credito']), int(row['score']))
+
+    def _lembrar_versao(self, row: Dict[str, str], assinatura: Tuple[int, int, int]) -> None:
+        """Guarda a versão do cliente lido do arquivo com a assinatura `assinatura`."""
+        versao = self._versao_linha(row)
+        with self._lock_indice:
+            if self._assinatura_versoes != assinatura:
+                # O arquivo mudou: as versões guardadas antes deixam de valer
+                self._versoes, self._assinatura_versoes = {}, assinatura
+            self._versoes[row['cpf']] = versao
+
+    def _buscar_linha(self, cpf: str) -> Optional[Dict[str, str]]:
+        """Linha do cliente no cadastro (None se não existe), guardando a sua versão."""
+        # A assinatura é lida antes do arquivo: uma troca no meio só invalida a versão guardada
+        assinatura = self._assinatura_clientes()
+        with self._abrir_leitura(self.clientes_file) as f:
+            for row in csv.DictReader(f):
+                if row['cpf'] == cpf:
+                    self._lembrar_versao(row, assinatura)
+                    return row
+        return None
+
+    def _gravar_csv(self, caminho: str, fieldnames, linhas) -> os.stat_result:
+        """Regrava o CSV de forma atômica: leitores nunca veem o arquivo pela metade.
+
+        Retorna o estado (mtime, tamanho) do arquivo gravado.
+        """
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(caminho) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(linhas)
+            acumular(bytes_escritos=os.path.getsize(temporario))
+            if os.path.exists(caminho):
+                shutil.copymode(caminho, temporario)
+            # O estado é lido antes da troca: descreve exatamente o conteúdo gravado aqui
+            estado = os.stat(temporario)
+            os.replace(temporario, caminho)
+            return estado
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+    def versao_cliente(self, cpf: str) -> Optional[str]:
+        """Versão atual do cliente (ver `versao_registro`); None se o CPF ou o arquivo não existem.
+
+        Regravações do cadastro que não alteram este cliente não mudam a sua versão.
+        """
+        try:
+            assinatura = self._assinatura_clientes()
+        except FileNotFoundError:
+            return None
+        with self._lock_indice:
+            if self._assinatura_versoes == assinatura and cpf in self._versoes:
+                return self._versoes[cpf]
+
+        if not self._cpf_pode_existir(cpf):
+            return None
+        row = self._buscar_linha(cpf)
+        return self._versao_linha(row) if row else None
+
+    def _abrir_leitura(self, caminho: str):
+        """Abre o CSV para leitura, contabilizando os bytes lidos na medição atual."""
+        acumular(bytes_lidos=os.path.getsize(caminho))
+        return open(caminho, 'r', encoding='utf-8')
+
+    @instrumentar("database")
     def autenticar_cliente(self, cpf: str, data_nascimento: str) -> Optional[Cliente]:
         """Autentica o cliente verificando CPF e data de nascimento."""
         try:
@@ -26,17 +171,18 @@ class Database:
                 logger.error(f"Arquivo de clientes não encontrado: {self.clientes_file}")
                 raise FileNotFoundError(f"Arquivo de dados não encontrado. Entre em contato com o suporte.")
 
-            with open(self.clientes_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row['cpf'] == cpf and row['data_nascimento'] == data_nascimento:
-                        return Cliente(
-                            cpf=row['cpf'],
-                            nome=row['nome'],
-                            data_nascimento=row['data_nascimento'],
-                            limite_credito=float(row['limite_credito']),
-                            score=int(row['score'])
-                        )
+            if not self._cpf_pode_existir(cpf):
+                return None
+
+            row = self._buscar_linha(cpf)
+            if row and row['data_nascimento'] == data_nascimento:
+                return Cliente(
+                    cpf=row['cpf'],
+                    nome=row['nome'],
+                    data_nascimento=row['data_nascimento'],
+                    limite_credito=float(row['limite_credito']),
+                    score=int(row['score'])
+                )
             return None
         except FileNotFoundError:
             raise
@@ -44,6 +190,7 @@ class Database:
             logger.error(f"Erro ao autenticar cliente: {str(e)}", exc_info=True)
             raise Exception(f"Erro ao acessar dados do cliente. Tente novamente.")
 
+    @instrumentar("database")
     def obter_cliente(self, cpf: str) -> Optional[Cliente]:
         """Obtém dados do cliente pelo CPF."""
         try:
@@ -51,17 +198,18 @@ class Database:
                 logger.error(f"Arquivo de clientes não encontrado: {self.clientes_file}")
                 raise FileNotFoundError(f"Arquivo de dados não encontrado. Entre em contato com o suporte.")
 
-            with open(self.clientes_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row['cpf'] == cpf:
-                        return Cliente(
-                            cpf=row['cpf'],
-                            nome=row['nome'],
-                            data_nascimento=row['data_nascimento'],
-                            limite_credito=float(row['limite_credito']),
-                            score=int(row['score'])
-                        )
+            if not self._cpf_pode_existir(cpf):
+                return None
+
+            row = self._buscar_linha(cpf)
+            if row:
+                return Cliente(
+                    cpf=row['cpf'],
+                    nome=row['nome'],
+                    data_nascimento=row['data_nascimento'],
+                    limite_credito=float(row['limite_credito']),
+                    score=int(row['score'])
+                )
             return None
         except FileNotFoundError:
             raise
@@ -69,6 +217,7 @@ class Database:
             logger.error(f"Erro ao obter cliente: {str(e)}", exc_info=True)
             raise Exception(f"Erro ao acessar dados do cliente. Tente novamente.")
 
+    @instrumentar("database")
     def atualizar_score(self, cpf: str, novo_score: int) -> bool:
         """Atualiza o score do cliente."""
         try:
@@ -76,19 +225,19 @@ class Database:
                 logger.error(f"Arquivo de clientes não encontrado: {self.clientes_file}")
                 raise FileNotFoundError(f"Arquivo de dados não encontrado. Entre em contato com o suporte.")
 
-            clientes = []
-            with open(self.clientes_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                fieldnames = reader.fieldnames
-                for row in reader:
-                    if row['cpf'] == cpf:
-                        row['score'] = str(novo_score)
-                    clientes.append(row)
+            with _lock_escrita:
+                clientes = []
+                with self._abrir_leitura(self.clientes_file) as f:
+                    reader = csv.DictReader(f)
+                    fieldnames = reader.fieldnames
+                    for row in reader:
+                        if row['cpf'] == cpf:
+                            row['score'] = str(novo_score)
+                        clientes.append(row)
 
-            with open(self.clientes_file, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(clientes)
+                estado = self._gravar_csv(self.clientes_file, fieldnames, clientes)
+                # Os clientes regravados já estão em memória: filtro e versões são atualizados sem nova leitura
+                self._indexar(clientes, self._assinatura(estado))
 
             return True
         except FileNotFoundError:
@@ -97,6 +246,7 @@ class Database:
             logger.error(f"Erro ao atualizar score: {str(e)}", exc_info=True)
             raise Exception(f"Erro ao atualizar dados. Tente novamente.")
 
+    @instrumentar("database")
     def verificar_limite_permitido(self, score: int, novo_limite: float) -> bool:
         """Verifica se o novo limite solicitado é permitido para o score."""
         try:
@@ -104,7 +254,7 @@ class Database:
                 logger.error(f"Arquivo de score/limite não encontrado: {self.score_limite_file}")
                 raise FileNotFoundError(f"Arquivo de configuração não encontrado. Entre em contato com o suporte.")
 
-            with open(self.score_limite_file, 'r', encoding='utf-8') as f:
+            with self._abrir_leitura(self.score_limite_file) as f:
                 reader = csv.DictReader(f)
                 for row in reader:
                     score_min = int(row['score_minimo'])
@@ -120,6 +270,7 @@ class Database:
             logger.error(f"Erro ao verificar limite permitido: {str(e)}", exc_info=True)
             raise Exception(f"Erro ao verificar limite permitido. Tente novamente.")
 
+    @instrumentar("database")
     def criar_solicitacao_aumento(self, cpf: str, limite_atual: float,
                                   novo_limite: float) -> str:
         """Cria uma solicitação de aumento de limite com status 'pendente'."""
@@ -130,7 +281,9 @@ class Database:
             # Garante que o diretório existe
             os.makedirs(os.path.dirname(self.solicitacoes_file), exist_ok=True)
 
-            with open(self.solicitacoes_file, 'a', encoding='utf-8', newline='') as f:
+            # A gravação concorrente de status reescreve o arquivo: o append usa o mesmo lock
+            with _lock_escrita, open(self.solicitacoes_file, 'a', encoding='utf-8', newline='') as f:
+                tamanho_inicial = f.tell()
                 fieldnames = ['cpf_cliente', 'data_hora_solicitacao', 'limite_atual',
                             'novo_limite_solicitado', 'status_pedido']
                 writer = csv.DictWriter(f, fieldnames=fieldnames)
@@ -145,12 +298,14 @@ class Database:
                     'novo_limite_solicitado': novo_limite,
                     'status_pedido': 'pendente'
                 })
+                acumular(bytes_escritos=f.tell() - tamanho_inicial)
 
             return data_hora
         except Exception as e:
             logger.error(f"Erro ao criar solicitação: {str(e)}", exc_info=True)
             raise Exception(f"Erro ao registrar solicitação. Tente novamente.")
 
+    @instrumentar("database")
     def atualizar_status_solicitacao(self, cpf: str, data_hora: str,
                                      novo_status: str, atualizar_limite: bool = False,
                                      novo_limite: float = None) -> bool:
@@ -160,19 +315,17 @@ class Database:
                 logger.error(f"Arquivo de solicitações não encontrado: {self.solicitacoes_file}")
                 raise FileNotFoundError(f"Arquivo de solicitações não encontrado. Entre em contato com o suporte.")
 
-            solicitacoes = []
-            with open(self.solicitacoes_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                fieldnames = reader.fieldnames
-                for row in reader:
-                    if row['cpf_cliente'] == cpf and row['data_hora_solicitacao'] == data_hora:
-                        row['status_pedido'] = novo_status
-                    solicitacoes.append(row)
+            with _lock_escrita:
+                solicitacoes = []
+                with self._abrir_leitura(self.solicitacoes_file) as f:
+                    reader = csv.DictReader(f)
+                    fieldnames = reader.fieldnames
+                    for row in reader:
+                        if row['cpf_cliente'] == cpf and row['data_hora_solicitacao'] == data_hora:
+                            row['status_pedido'] = novo_status
+                        solicitacoes.append(row)
 
-            with open(self.solicitacoes_file, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(solicitacoes)
+                self._gravar_csv(self.solicitacoes_file, fieldnames, solicitacoes)
 
             if atualizar_limite and novo_limite is not None:
                 self._atualizar_limite_cliente(cpf, novo_limite)
@@ -191,19 +344,19 @@ class Database:
                 logger.error(f"Arquivo de clientes não encontrado: {self.clientes_file}")
                 raise FileNotFoundError(f"Arquivo de dados não encontrado. Entre em contato com o suporte.")
 
-            clientes = []
-            with open(self.clientes_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                fieldnames = reader.fieldnames
-                for row in reader:
-                    if row['cpf'] == cpf:
-                        row['limite_credito'] = str(novo_limite)
-                    clientes.append(row)
+            with _lock_escrita:
+                clientes = []
+                with self._abrir_leitura(self.clientes_file) as f:
+                    reader = csv.DictReader(f)
+                    fieldnames = reader.fieldnames
+                    for row in reader:
+                        if row['cpf'] == cpf:
+                            row['limite_credito'] = str(novo_limite)
+                        clientes.append(row)
 
-            with open(self.clientes_file, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(clientes)
+                estado = self._gravar_csv(self.clientes_file, fieldnames, clientes)
+                # Os clientes regravados já estão em memória: filtro e versões são atualizados sem nova leitura
+                self._indexar(clientes, self._assinatura(estado))
 
             return True
         except FileNotFoundError:
@@ -0,0 +1,97 @@
+"""Instantâneo dos dados do cliente guardado na sessão.
+
+Depois da autenticação, o estado da conversa já tem o limite e o score do
+cliente. As ferramentas de crédito recebem esse instantâneo e só voltam a ler
+o cadastro quando ele deixou de valer (read-through). Cada instantâneo carrega
+a versão dos dados do cliente (`versao_registro`): ele vale enquanto a versão do
+cliente no cadastro (`Database.versao_cliente`) for a mesma. Regravações de
+outros clientes não o invalidam; alterações deste cliente, de outra sessão ou
+de outro processo, sim. As escritas da própria sessão atualizam o instantâneo
+junto com o arquivo (write-through), sem nova leitura.
+"""
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from src.core.prometheus import registro_prometheus
+from src.data_models.database import Database, versao_registro
+from src.data_models.models import Cliente
+
+LEITURAS_INSTANTANEO = registro_prometheus.contador(
+    "banco_agil_cliente_instantaneo_total",
+    "Leituras do cliente atendidas pelo instantâneo da sessão (hit) ou pelo cadastro (miss)",
+    ("resultado",)
+)
+
+Instantaneo = Dict[str, Any]
+
+
+def _com_versao(instantaneo: Instantaneo) -> Instantaneo:
+    versao = versao_registro(
+        instantaneo["cpf"], instantaneo["nome"], instantaneo["limite_credito"], instantaneo["score"]
+    )
+    return {**instantaneo, "versao": versao}
+
+
+def criar_instantaneo(cliente: Cliente) -> Instantaneo:
+    """Instantâneo de um cliente lido do cadastro, com a versão dos dados lidos."""
+    return _com_versao({
+        "cpf": cliente.cpf,
+        "nome": cliente.nome,
+        "limite_credito": cliente.limite_credito,
+        "score": cliente.score
+    })
+
+
+def instantaneo_do_estado(state: Mapping[str, Any]) -> Optional[Instantaneo]:
+    """Instantâneo formado pelos dados do cliente autenticado no estado (None se incompleto)."""
+    if not state.get("cpf") or state.get("versao_cliente") is None:
+        return None
+    if state.get("limite_credito") is None or state.get("score") is None:
+        return None
+    return {
+        "cpf": state["cpf"],
+        "nome": state.get("nome_cliente"),
+        "limite_credito": state["limite_credito"],
+        "score": state["score"],
+        "versao": state["versao_cliente"]
+    }
+
+
+def com_instantaneo(state: Mapping[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
+    """Argumentos da ferramenta acrescidos do instantâneo da sessão, quando houver."""
+    instantaneo = instantaneo_do_estado(state)
+    return {**args, "instantaneo": instantaneo} if instantaneo else args
+
+
+def campos_estado(instantaneo: Instantaneo) -> Dict[str, Any]:
+    """Atualizações do estado da conversa que guardam o instantâneo."""
+    return {
+        "limite_credito": instantaneo["limite_credito"],
+        "score": instantaneo["score"],
+        "versao_cliente": instantaneo["versao"]
+    }
+
+
+def ler_cliente(db: Database, cpf: str, instantaneo: Optional[Instantaneo] = None) -> Optional[Instantaneo]:
+    """Dados do cliente: do instantâneo, se ainda vale, ou do cadastro (None se não existe)."""
+    if instantaneo and instantaneo.get("cpf") == cpf and instantaneo.get("versao") is not None \
+            and instantaneo["versao"] == db.versao_cliente(cpf):
+        LEITURAS_INSTANTANEO.incrementar(resultado="hit")
+        return instantaneo
+
+    LEITURAS_INSTANTANEO.incrementar(resultado="miss")
+    cliente = db.obter_cliente(cpf)
+    return criar_instantaneo(cliente) if cliente else None
+
+
+def gravar_cliente(db: Database, instantaneo: Optional[Instantaneo], escrever: Callable[[], Any],
+                   **alteracoes: Any) -> Optional[Instantaneo]:
+    """Executa a escrita no cadastro e aplica as mesmas alterações ao instantâneo.
+
+    A versão é recalculada a partir dos novos dados: se outra escrita alterou o
+    mesmo cliente no intervalo, ela não bate com o cadastro e a próxima leitura
+    volta ao arquivo.
+    """
+    escrever()
+    if instantaneo is None:
+        return None
+    return _com_versao({**instantaneo, **alteracoes})
@@ -1,7 +1,9 @@
+from src.core.instrumentacao import instrumentar_runnable
 from src.tools.atendimento import encerrar_atendimento
 from src.tools.autenticacao import autenticar_cliente
 from src.tools.cambio import consultar_cotacao_moeda
 from src.tools.credito import consultar_limite_credito, solicitar_aumento_limite
+from src.tools.entrevista import registrar_dados_entrevista
 from src.tools.score import calcular_novo_score
 
 tools_list = [
@@ -9,15 +11,21 @@ tools_list = [
     consultar_limite_credito,
     solicitar_aumento_limite,
     calcular_novo_score,
+    registrar_dados_entrevista,
     consultar_cotacao_moeda,
     encerrar_atendimento
 ]
 
+# Mede o tempo de cada execução de ferramenta no registro de métricas
+for ferramenta in tools_list:
+    instrumentar_runnable(ferramenta)
+
 __all__ = [
     'autenticar_cliente',
     'consultar_limite_credito',
     'solicitar_aumento_limite',
     'calcular_novo_score',
+    'registrar_dados_entrevista',
     'consultar_cotacao_moeda',
     'encerrar_atendimento',
     'tools_list'
@@ -3,6 +3,7 @@ from typing import Any, Dict
 from langchain_core.tools import tool
 
 from src.data_models.database import Database
+from src.data_models.instantaneo import criar_instantaneo
 
 db = Database()
 
@@ -25,12 +26,8 @@ def autenticar_cliente(cpf: str, data_nascimento: str) -> Dict[str, Any]:
             return {
                 "sucesso": True,
                 "mensagem": f"Cliente autenticado com sucesso. Bem-vindo(a), {cliente.nome}!",
-                "cliente": {
-                    "cpf": cliente.cpf,
-                    "nome": cliente.nome,
-                    "limite_credito": cliente.limite_credito,
-                    "score": cliente.score
-                }
+                # A versão dos dados lidos forma o instantâneo do cliente guardado na sessão
+                "cliente": criar_instantaneo(cliente)
             }
         else:
             return {
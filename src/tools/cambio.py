@@ -1,19 +1,40 @@
 import logging
 import time
-from typing import Dict, Any
+from typing import Any, Dict, Optional
 
 from langchain_core.tools import tool
 import requests
 
+from src.core.cache import CacheLRU
+from src.core.prazo import limitar_timeout, segundos_restantes
+from src.core.prometheus import registro_prometheus
+
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Cotações recentes: a API de câmbio atualiza as taxas poucas vezes por dia
+TTL_COTACAO_SEGUNDOS = 60.0
+cache_cotacoes = CacheLRU(max_entradas=32, ttl_segundos=TTL_COTACAO_SEGUNDOS)
+# Última cotação obtida de cada moeda, usada como contingência quando o turno fica sem tempo
+TTL_ULTIMA_COTACAO_SEGUNDOS = 24 * 3600.0
+ultimas_cotacoes = CacheLRU(max_entradas=32, ttl_segundos=TTL_ULTIMA_COTACAO_SEGUNDOS)
+INTERVALO_TENTATIVAS_SEGUNDOS = 1.0
+
+CONSULTAS_CACHE_CAMBIO = registro_prometheus.contador(
+    "banco_agil_cambio_cache_total", "Consultas de cotação atendidas pelo cache (hit) ou pela API (miss)",
+    ("resultado",)
+)
+ERROS_PROVEDOR_CAMBIO = registro_prometheus.contador(
+    "banco_agil_cambio_erros_provedor_total", "Falhas nas tentativas de consulta à API de câmbio", ("tipo",)
+)
+
 
 @tool
 def consultar_cotacao_moeda(moeda: str = "USD") -> Dict[str, Any]:
     """
     Consulta a cotação de uma moeda em relação ao Real (BRL).
-    Implementa retry com até 3 tentativas em caso de falha.
+    Implementa retry com até 3 tentativas em caso de falha e mantém as
+    cotações obtidas em cache por TTL_COTACAO_SEGUNDOS.
 
     Args:
         moeda: Código da moeda (USD, EUR, GBP, etc.)
@@ -23,27 +44,39 @@ def consultar_cotacao_moeda(moeda: str = "USD") -> Dict[str, Any]:
     """
     max_tentativas = 3
     timeout = 10
+    moeda = moeda.upper()
+
+    em_cache = cache_cotacoes.obter(moeda)
+    if em_cache is not None:
+        CONSULTAS_CACHE_CAMBIO.incrementar(resultado="hit")
+        return dict(em_cache)
+    CONSULTAS_CACHE_CAMBIO.incrementar(resultado="miss")
 
     for tentativa in range(1, max_tentativas + 1):
         try:
-            moeda = moeda.upper()
             url = f"https://api.exchangerate-api.com/v4/latest/{moeda}"
-            response = requests.get(url, timeout=timeout)
+            # Dentro de um turno, a requisição não passa do prazo da chamada da ferramenta
+            response = requests.get(url, timeout=limitar_timeout(timeout))
 
             if response.status_code == 200:
                 data = response.json()
                 if 'rates' in data and 'BRL' in data['rates']:
                     cotacao = data['rates']['BRL']
-                    return {
+                    resultado = {
                         "sucesso": True,
                         "moeda": moeda,
                         "cotacao": cotacao,
                         "mensagem": f"1 {moeda} = R$ {cotacao:.2f}"
                     }
+                    cache_cotacoes.armazenar(moeda, resultado)
+                    ultimas_cotacoes.armazenar(moeda, {**resultado, "consultada_em": time.time()})
+                    return dict(resultado)
+
+            ERROS_PROVEDOR_CAMBIO.incrementar(tipo="resposta_invalida")
 
             # Se status não é 200, tenta novamente
-            if tentativa < max_tentativas:
-                time.sleep(1)  # Aguarda 1 segundo antes de tentar novamente
+            if _tentar_de_novo(tentativa, max_tentativas):
+                time.sleep(INTERVALO_TENTATIVAS_SEGUNDOS)
                 continue
 
             return {
@@ -52,9 +85,10 @@ def consultar_cotacao_moeda(moeda: str = "USD") -> Dict[str, Any]:
             }
 
         except requests.exceptions.Timeout:
+            ERROS_PROVEDOR_CAMBIO.incrementar(tipo="timeout")
             logger.warning(f"Timeout na tentativa {tentativa}/{max_tentativas} para consultar {moeda}")
-            if tentativa < max_tentativas:
-                time.sleep(1)
+            if _tentar_de_novo(tentativa, max_tentativas):
+                time.sleep(INTERVALO_TENTATIVAS_SEGUNDOS)
                 continue
             return {
                 "sucesso": False,
@@ -62,9 +96,10 @@ def consultar_cotacao_moeda(moeda: str = "USD") -> Dict[str, Any]:
             }
 
         except requests.exceptions.ConnectionError:
+            ERROS_PROVEDOR_CAMBIO.incrementar(tipo="conexao")
             logger.error(f"Erro de conexão na tentativa {tentativa}/{max_tentativas} para consultar {moeda}")
-            if tentativa < max_tentativas:
-                time.sleep(1)
+            if _tentar_de_novo(tentativa, max_tentativas):
+                time.sleep(INTERVALO_TENTATIVAS_SEGUNDOS)
                 continue
             return {
                 "sucesso": False,
@@ -72,9 +107,10 @@ def consultar_cotacao_moeda(moeda: str = "USD") -> Dict[str, Any]:
             }
 
         except Exception as e:
+            ERROS_PROVEDOR_CAMBIO.incrementar(tipo="outro")
             logger.error(f"Erro ao consultar cotação na tentativa {tentativa}/{max_tentativas}: {str(e)}", exc_info=True)
-            if tentativa < max_tentativas:
-                time.sleep(1)
+            if _tentar_de_novo(tentativa, max_tentativas):
+                time.sleep(INTERVALO_TENTATIVAS_SEGUNDOS)
                 continue
             return {
                 "sucesso": False,
@@ -86,3 +122,15 @@ def consultar_cotacao_moeda(moeda: str = "USD") -> Dict[str, Any]:
         "sucesso": False,
         "mensagem": "Não foi possível consultar a cotação. Por favor, tente novamente."
     }
+
+
+def _tentar_de_novo(tentativa: int, max_tentativas: int) -> bool:
+    """Nova tentativa só se ainda houver tentativas e tempo para a pausa entre elas."""
+    restante = segundos_restantes()
+    return tentativa < max_tentativas and (restante is None or restante > INTERVALO_TENTATIVAS_SEGUNDOS)
+
+
+def ultima_cotacao(moeda: str) -> Optional[Dict[str, Any]]:
+    """Última cotação obtida da moeda (com "consultada_em"), mesmo que já fora do cache, ou None."""
+    cotacao = ultimas_cotacoes.obter(moeda.upper())
+    return dict(cotacao) if cotacao is not None else None
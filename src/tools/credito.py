@@ -1,14 +1,22 @@
-from typing import Dict, Any
+from typing import Annotated, Any, Dict, Optional
 
-from langchain_core.tools import tool
+from langchain_core.tools import InjectedToolArg, tool
 
+from src.core.prometheus import registro_prometheus
 from src.data_models.database import Database
+from src.data_models.instantaneo import Instantaneo, gravar_cliente, ler_cliente
 
 db = Database()
 
+SOLICITACOES_AUMENTO = registro_prometheus.contador(
+    "banco_agil_solicitacoes_aumento_total", "Solicitações de aumento de limite analisadas", ("resultado",)
+)
+
 
 @tool
-def consultar_limite_credito(cpf: str) -> Dict[str, Any]:
+def consultar_limite_credito(
+    cpf: str, instantaneo: Annotated[Optional[Instantaneo], InjectedToolArg] = None
+) -> Dict[str, Any]:
     """
     Consulta o limite de crédito disponível do cliente.
 
@@ -19,13 +27,15 @@ def consultar_limite_credito(cpf: str) -> Dict[str, Any]:
         Dict com limite_credito (float) e score (int)
     """
     try:
-        cliente = db.obter_cliente(cpf)
+        # O instantâneo da sessão (injetado pelo agente, invisível ao LLM) evita reler o cadastro
+        cliente = ler_cliente(db, cpf, instantaneo)
         if cliente:
             return {
                 "sucesso": True,
-                "limite_credito": cliente.limite_credito,
-                "score": cliente.score,
-                "mensagem": f"Seu limite de crédito atual é R$ {cliente.limite_credito:.2f}"
+                "limite_credito": cliente["limite_credito"],
+                "score": cliente["score"],
+                "mensagem": f"Seu limite de crédito atual é R$ {cliente['limite_credito']:.2f}",
+                "instantaneo": cliente
             }
         else:
             return {
@@ -40,7 +50,9 @@ def consultar_limite_credito(cpf: str) -> Dict[str, Any]:
 
 
 @tool
-def solicitar_aumento_limite(cpf: str, novo_limite: float) -> Dict[str, Any]:
+def solicitar_aumento_limite(
+    cpf: str, novo_limite: float, instantaneo: Annotated[Optional[Instantaneo], InjectedToolArg] = None
+) -> Dict[str, Any]:
     """
     Solicita aumento de limite de crédito seguindo o fluxo:
     1. Registra solicitação com status 'pendente'
@@ -55,7 +67,7 @@ def solicitar_aumento_limite(cpf: str, novo_limite: float) -> Dict[str, Any]:
         Dict com sucesso (bool), aprovado (bool) e mensagem
     """
     try:
-        cliente = db.obter_cliente(cpf)
+        cliente = ler_cliente(db, cpf, instantaneo)
         if not cliente:
             return {
                 "sucesso": False,
@@ -63,39 +75,49 @@ def solicitar_aumento_limite(cpf: str, novo_limite: float) -> Dict[str, Any]:
                 "mensagem": "Cliente não encontrado"
             }
 
-        if novo_limite <= cliente.limite_credito:
+        if novo_limite <= cliente["limite_credito"]:
             return {
                 "sucesso": False,
                 "aprovado": False,
-                "mensagem": f"O novo limite deve ser maior que o atual (R$ {cliente.limite_credito:.2f})"
+                "mensagem": f"O novo limite deve ser maior que o atual (R$ {cliente['limite_credito']:.2f})",
+                "instantaneo": cliente
             }
 
         # 1. Registra a solicitação com status 'pendente'
-        data_hora = db.criar_solicitacao_aumento(cpf, cliente.limite_credito, novo_limite)
+        data_hora = db.criar_solicitacao_aumento(cpf, cliente["limite_credito"], novo_limite)
 
         # 2. Verifica se o limite é permitido para o score do cliente
-        permitido = db.verificar_limite_permitido(cliente.score, novo_limite)
+        permitido = db.verificar_limite_permitido(cliente["score"], novo_limite)
 
         # 3. Atualiza o status da solicitação baseado na verificação
         if permitido:
-            db.atualizar_status_solicitacao(
-                cpf,
-                data_hora,
-                'aprovado',
-                atualizar_limite=True,
-                novo_limite=novo_limite
+            # O novo limite vai para o cadastro e para o instantâneo da sessão
+            cliente = gravar_cliente(
+                db, cliente,
+                lambda: db.atualizar_status_solicitacao(
+                    cpf,
+                    data_hora,
+                    'aprovado',
+                    atualizar_limite=True,
+                    novo_limite=novo_limite
+                ),
+                limite_credito=novo_limite
             )
+            SOLICITACOES_AUMENTO.incrementar(resultado="aprovado")
             return {
                 "sucesso": True,
                 "aprovado": True,
-                "mensagem": f"Solicitação aprovada! Seu novo limite é R$ {novo_limite:.2f}"
+                "mensagem": f"Solicitação aprovada! Seu novo limite é R$ {novo_limite:.2f}",
+                "instantaneo": cliente
             }
         else:
             db.atualizar_status_solicitacao(cpf, data_hora, 'rejeitado')
+            SOLICITACOES_AUMENTO.incrementar(resultado="rejeitado")
             return {
                 "sucesso": True,
                 "aprovado": False,
-                "mensagem": f"Solicitação rejeitada. Seu score atual ({cliente.score}) não permite este limite."
+                "mensagem": f"Solicitação rejeitada. Seu score atual ({cliente['score']}) não permite este limite.",
+                "instantaneo": cliente
             }
     except Exception as e:
         return {
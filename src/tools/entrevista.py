@@ -0,0 +1,49 @@
+from typing import Any, Dict, Optional
+
+from langchain_core.tools import tool
+
+TIPOS_EMPREGO = ("formal", "autonomo", "desempregado")
+
+
+@tool
+def registrar_dados_entrevista(renda_mensal: Optional[float] = None,
+                               tipo_emprego: Optional[str] = None,
+                               despesas_fixas: Optional[float] = None,
+                               num_dependentes: Optional[int] = None,
+                               tem_dividas: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Registra as informações da entrevista de crédito informadas pelo cliente na última mensagem.
+    Informe apenas os campos que o cliente acabou de responder.
+
+    Args:
+        renda_mensal: Renda mensal do cliente em reais
+        tipo_emprego: 'formal', 'autonomo' ou 'desempregado'
+        despesas_fixas: Despesas fixas mensais em reais
+        num_dependentes: Número de dependentes (0, 1, 2, ou 3+)
+        tem_dividas: Se possui dívidas ativas (True/False)
+
+    Returns:
+        Dict com sucesso (bool), dados (campos válidos registrados) e mensagem
+    """
+    dados: Dict[str, Any] = {}
+
+    if renda_mensal is not None and renda_mensal >= 0:
+        dados["renda_mensal"] = float(renda_mensal)
+
+    if tipo_emprego is not None and tipo_emprego.lower() in TIPOS_EMPREGO:
+        dados["tipo_emprego"] = tipo_emprego.lower()
+
+    if despesas_fixas is not None and despesas_fixas >= 0:
+        dados["despesas_fixas"] = float(despesas_fixas)
+
+    if num_dependentes is not None and num_dependentes >= 0:
+        dados["num_dependentes"] = min(int(num_dependentes), 3)
+
+    if tem_dividas is not None:
+        dados["tem_dividas"] = bool(tem_dividas)
+
+    return {
+        "sucesso": bool(dados),
+        "dados": dados,
+        "mensagem": "Informações registradas." if dados else "Nenhuma informação válida foi informada."
+    }
@@ -1,8 +1,9 @@
-from typing import Dict, Any
+from typing import Annotated, Any, Dict, Optional
 
-from langchain_core.tools import tool
+from langchain_core.tools import InjectedToolArg, tool
 
 from src.data_models.database import Database
+from src.data_models.instantaneo import Instantaneo, gravar_cliente
 
 db = Database()
 
@@ -10,7 +11,8 @@ db = Database()
 @tool
 def calcular_novo_score(cpf: str, renda_mensal: float, tipo_emprego: str,
                        despesas_fixas: float, num_dependentes: int,
-                       tem_dividas: bool) -> Dict[str, Any]:
+                       tem_dividas: bool,
+                       instantaneo: Annotated[Optional[Instantaneo], InjectedToolArg] = None) -> Dict[str, Any]:
     """
     Calcula novo score de crédito baseado em dados financeiros do cliente.
 
@@ -60,12 +62,16 @@ def calcular_novo_score(cpf: str, renda_mensal: float, tipo_emprego: str,
 
         score = max(0, min(1000, int(score)))
 
-        db.atualizar_score(cpf, score)
+        # O novo score vai para o cadastro e para o instantâneo da sessão (injetado pelo agente)
+        if instantaneo is not None and instantaneo.get("cpf") != cpf:
+            instantaneo = None
+        instantaneo = gravar_cliente(db, instantaneo, lambda: db.atualizar_score(cpf, score), score=score)
 
         return {
             "sucesso": True,
             "novo_score": score,
-            "mensagem": f"Score atualizado com sucesso! Seu novo score é {score}."
+            "mensagem": f"Score atualizado com sucesso! Seu novo score é {score}.",
+            "instantaneo": instantaneo
         }
     except Exception as e:
         return {
@@ -7,8 +7,28 @@ from unittest.mock import Mock
 import pytest
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
+from src.core.limitador import get_limitador_autenticacao
 from src.data_models.database import Database
 from src.data_models.models import Cliente
+from src.tools.cambio import cache_cotacoes, ultimas_cotacoes
+
+
+@pytest.fixture(autouse=True)
+def limpar_cache_cotacoes():
+    """Evita que cotações em cache de um teste sejam usadas em outro."""
+    cache_cotacoes.limpar()
+    ultimas_cotacoes.limpar()
+    yield
+    cache_cotacoes.limpar()
+    ultimas_cotacoes.limpar()
+
+
+@pytest.fixture(autouse=True)
+def limpar_limitador_autenticacao():
+    """Evita que falhas de autenticação de um teste bloqueiem outro: cada grafo recebe um limitador novo."""
+    get_limitador_autenticacao.cache_clear()
+    yield
+    get_limitador_autenticacao.cache_clear()
 
 
 @pytest.fixture
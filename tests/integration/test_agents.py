@@ -1,11 +1,22 @@
 """Testes de integração para os agentes."""
-from unittest.mock import patch
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
 from langchain_core.messages import HumanMessage, AIMessage
 
-from src.agents.triagem import AgenteTriagem
-from src.agents.credito import AgenteCredito
-from src.agents.cambio import AgenteCambio
-from src.agents.entrevista import AgenteEntrevista
+from src.agents.triagem import (
+    AUTENTICACOES_LIMITADAS, FALHAS_AUTENTICACAO, MENSAGEM_CPF_INVALIDO, MENSAGEM_DATA_NAO_ENCONTRADA, MENSAGEM_SOLICITA_CPF, MENSAGEM_SOLICITA_CPF_APOS_DATA,
+    MENSAGEM_SOLICITA_DATA, TENTATIVAS_AUTENTICACAO, AgenteTriagem
+)
+from src.agents.credito import MENSAGEM_PRAZO_ESGOTADO as MENSAGEM_PRAZO_CREDITO, AgenteCredito
+from src.agents.cambio import MENSAGEM_FERRAMENTA_INDISPONIVEL, AgenteCambio
+from src.agents.entrevista import AgenteEntrevista, CAMPOS_ENTREVISTA
+from src.core.cache import CacheRespostasLLM
+from src.core.ferramentas import ExecutorFerramentas
+from src.core.limitador import LimitadorTaxa
+from src.tools.cambio import ultimas_cotacoes
 
 
 class TestAgenteTriagem:
@@ -16,15 +27,74 @@ class TestAgenteTriagem:
         agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
 
         sample_agent_state["messages"] = [HumanMessage(content="Olá")]
-        response_msg = AIMessage(content="Por favor, informe seu CPF.")
-        mock_llm_with_tools.invoke.return_value = response_msg
 
         result = agente.process(sample_agent_state)
 
         assert result["current_agent"] == "triagem"
-        assert len(result["messages"]) > 0
+        assert result["messages"][0].content == MENSAGEM_SOLICITA_CPF
+        mock_llm_with_tools.invoke.assert_not_called()
+
+    def test_triagem_solicita_cpf_com_llm_sem_templates(self, mock_llm, mock_llm_with_tools, sample_agent_state):
+        """Testa que, com os templates desativados, o pedido de CPF vem do LLM."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools, templates_autenticacao=False)
+
+        sample_agent_state["messages"] = [HumanMessage(content="Olá")]
+        mock_llm_with_tools.invoke.return_value = AIMessage(content="Por favor, informe seu CPF.")
+
+        result = agente.process(sample_agent_state)
+
+        assert result["messages"][0].content == "Por favor, informe seu CPF."
         mock_llm_with_tools.invoke.assert_called_once()
 
+    def test_triagem_autenticacao_sem_llm(self, mock_llm, mock_llm_with_tools, sample_agent_state):
+        """Testa a coleta de CPF e data apenas com mensagens prontas."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
+
+        sample_agent_state["messages"] = [HumanMessage(content="Meu CPF é 12345678901")]
+        result = agente.process(sample_agent_state)
+        assert result["temp_cpf"] == "12345678901"
+        assert result["messages"][0].content == MENSAGEM_SOLICITA_DATA
+
+        sample_agent_state.update(temp_cpf="12345678901")
+        sample_agent_state["messages"] += [result["messages"][0], HumanMessage(content="nasci em maio")]
+        result = agente.process(sample_agent_state)
+        assert result["messages"][0].content == MENSAGEM_DATA_NAO_ENCONTRADA
+
+        mock_llm_with_tools.invoke.assert_not_called()
+
+    def test_triagem_data_antes_do_cpf(self, mock_llm, mock_llm_with_tools, sample_agent_state):
+        """Testa que a data informada antes do CPF é guardada e o CPF é pedido em seguida."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
+        sample_agent_state["messages"] = [HumanMessage(content="Nasci em 1990-05-15")]
+
+        result = agente.process(sample_agent_state)
+
+        assert result["temp_data_nascimento"] == "1990-05-15"
+        assert result["messages"][0].content == MENSAGEM_SOLICITA_CPF_APOS_DATA
+
+    def test_triagem_encerra_sem_llm(self, mock_llm, mock_llm_with_tools, sample_agent_state):
+        """Testa que o pedido de saída durante a autenticação encerra sem chamar o LLM."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
+        sample_agent_state["messages"] = [HumanMessage(content="Deixa pra lá, quero sair")]
+
+        result = agente.process(sample_agent_state)
+
+        assert result["should_end"] is True
+        mock_llm_with_tools.invoke.assert_not_called()
+
+    @pytest.mark.parametrize("texto", ["quero cancelar meu cartão", "finalizar uma compra"])
+    def test_triagem_assunto_com_termo_de_saida_nao_encerra(self, mock_llm, mock_llm_with_tools,
+                                                             sample_agent_state, texto):
+        """Testa que pedidos sobre outros assuntos recebem o pedido de CPF, sem encerrar a conversa."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
+        sample_agent_state["messages"] = [HumanMessage(content=texto)]
+
+        result = agente.process(sample_agent_state)
+
+        assert not result.get("should_end")
+        assert result["messages"][0].content == MENSAGEM_SOLICITA_CPF
+        mock_llm_with_tools.invoke.assert_not_called()
+
     def test_triagem_extrai_cpf_da_mensagem(self, mock_llm, mock_llm_with_tools, sample_agent_state):
         """Testa que extrai CPF da mensagem do usuário."""
         agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
@@ -89,6 +159,38 @@ class TestAgenteTriagem:
 
         assert result.get("pending_redirect") == "cambio"
 
+    def test_triagem_redireciona_para_varios_agentes(self, mock_llm, mock_llm_with_tools,
+                                                     authenticated_agent_state):
+        """Testa que um pedido com crédito e câmbio redireciona para os dois, na ordem pedida."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
+        authenticated_agent_state["messages"].append(
+            HumanMessage(content="Quanto está o euro e qual meu limite?")
+        )
+        mock_llm_with_tools.invoke.return_value = AIMessage(content="REDIRECIONAR: cambio, credito")
+
+        result = agente.process(authenticated_agent_state)
+
+        assert result["pending_redirect"] == "cambio,credito"
+        assert "messages" not in result
+
+    def test_triagem_ferramentas_de_varios_agentes(self, mock_llm, mock_llm_with_tools,
+                                                   authenticated_agent_state):
+        """Testa que chamadas de ferramenta de crédito e câmbio viram um redirecionamento duplo."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
+        authenticated_agent_state["messages"].append(HumanMessage(content="Meu limite e o dólar"))
+
+        response = AIMessage(content="")
+        response.tool_calls = [
+            {"name": "consultar_limite_credito", "args": {}, "id": "c1"},
+            {"name": "consultar_cotacao_moeda", "args": {"moeda": "USD"}, "id": "c2"},
+            {"name": "solicitar_aumento_limite", "args": {"novo_limite": 1.0}, "id": "c3"}
+        ]
+        mock_llm_with_tools.invoke.return_value = response
+
+        result = agente.process(authenticated_agent_state)
+
+        assert result["pending_redirect"] == "credito,cambio"
+
     def test_triagem_falha_autenticacao_incrementa_tentativas(self, mock_llm, mock_llm_with_tools,
                                                                 sample_agent_state, mock_database):
         """Testa que incrementa contador de tentativas em falha."""
@@ -118,6 +220,20 @@ class TestAgenteTriagem:
         assert result["authentication_attempts"] == 3
         assert result["should_end"] is True
 
+    def test_triagem_conta_tentativas_e_falhas(self, mock_llm, mock_llm_with_tools, sample_agent_state,
+                                               mock_database):
+        """Testa os contadores de autenticação expostos no /metrics."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
+        tentativas = TENTATIVAS_AUTENTICACAO.valor()
+        falhas = FALHAS_AUTENTICACAO.valor()
+
+        with patch('src.tools.autenticacao.db', mock_database):
+            agente.process({**sample_agent_state, "messages": [HumanMessage(content="99999999999 2000-01-01")]})
+            agente.process({**sample_agent_state, "messages": [HumanMessage(content="12345678901 1990-05-15")]})
+
+        assert TENTATIVAS_AUTENTICACAO.valor() == tentativas + 2
+        assert FALHAS_AUTENTICACAO.valor() == falhas + 1
+
 
 class TestAgenteCredito:
     """Testes de integração para o agente de crédito."""
@@ -209,6 +325,34 @@ class TestAgenteCredito:
 
         assert "entrevista" in result["messages"][0].content.lower()
 
+    def test_credito_une_resultados_de_varias_ferramentas(self, mock_llm, mock_llm_with_tools,
+                                                          authenticated_agent_state):
+        """Testa que a consulta de limite e o pedido de aumento aparecem juntos na resposta."""
+        agente = AgenteCredito(mock_llm, mock_llm_with_tools)
+        authenticated_agent_state["messages"].append(
+            HumanMessage(content="Qual meu limite? E quero aumentar para 6000")
+        )
+
+        response = AIMessage(content="")
+        response.tool_calls = [
+            {"name": "consultar_limite_credito", "args": {}, "id": "c1"},
+            {"name": "solicitar_aumento_limite", "args": {"novo_limite": 6000.0}, "id": "c2"}
+        ]
+        mock_llm_with_tools.invoke.return_value = response
+
+        with patch('src.agents.credito.consultar_limite_credito') as mock_consulta, \
+             patch('src.agents.credito.solicitar_aumento_limite') as mock_aumento:
+            mock_consulta.invoke.return_value = {"sucesso": True, "mensagem": "Seu limite atual é R$ 5000.00"}
+            mock_aumento.invoke.return_value = {"aprovado": True, "mensagem": "Aumento aprovado!"}
+            result = agente.process(authenticated_agent_state)
+
+        conteudo = result["messages"][0].content
+        assert conteudo == "Seu limite atual é R$ 5000.00\n\nAumento aprovado!"
+        assert result["limite_credito"] == 6000.0
+        mock_aumento.invoke.assert_called_once_with(
+            {"novo_limite": 6000.0, "cpf": authenticated_agent_state["cpf"]}
+        )
+
     def test_credito_redireciona_para_entrevista(self, mock_llm, mock_llm_with_tools,
                                                    authenticated_agent_state):
         """Testa redirecionamento para entrevista."""
@@ -290,6 +434,60 @@ class TestAgenteCambio:
         assert result["current_agent"] == "cambio"
 
 
+    def test_cambio_varias_moedas_em_paralelo(self, mock_llm, mock_llm_with_tools,
+                                              authenticated_agent_state):
+        """Testa que várias cotações na mesma resposta são consultadas juntas e todas exibidas."""
+        agente = AgenteCambio(mock_llm, mock_llm_with_tools)
+        authenticated_agent_state["messages"].append(HumanMessage(content="Dólar e euro, por favor"))
+
+        response = AIMessage(content="")
+        response.tool_calls = [
+            {"name": "consultar_cotacao_moeda", "args": {"moeda": "USD"}, "id": "c1"},
+            {"name": "consultar_cotacao_moeda", "args": {"moeda": "EUR"}, "id": "c2"}
+        ]
+        mock_llm_with_tools.invoke.return_value = response
+
+        def cotacao(args):
+            time.sleep(0.3)
+            return {"sucesso": True, "mensagem": f"1 {args['moeda']} = R$ 5.00"}
+
+        with patch('src.agents.cambio.consultar_cotacao_moeda') as mock_tool:
+            mock_tool.invoke.side_effect = cotacao
+            inicio = time.perf_counter()
+            result = agente.process(authenticated_agent_state)
+            duracao = time.perf_counter() - inicio
+
+        conteudo = result["messages"][0].content
+        assert "1 USD = R$ 5.00" in conteudo and "1 EUR = R$ 5.00" in conteudo
+        assert conteudo.index("USD") < conteudo.index("EUR")
+        assert duracao < 0.55
+
+    def test_cambio_cotacao_expirada(self, mock_llm, mock_llm_with_tools, authenticated_agent_state):
+        """Testa que uma cotação que excede o tempo limite vira aviso sem perder as demais."""
+        agente = AgenteCambio(mock_llm, mock_llm_with_tools, executor=ExecutorFerramentas(timeout_segundos=0.1))
+        authenticated_agent_state["messages"].append(HumanMessage(content="Dólar e libra"))
+
+        response = AIMessage(content="")
+        response.tool_calls = [
+            {"name": "consultar_cotacao_moeda", "args": {"moeda": "USD"}, "id": "c1"},
+            {"name": "consultar_cotacao_moeda", "args": {"moeda": "GBP"}, "id": "c2"}
+        ]
+        mock_llm_with_tools.invoke.return_value = response
+
+        def cotacao(args):
+            if args["moeda"] == "GBP":
+                time.sleep(0.5)
+            return {"sucesso": True, "mensagem": f"1 {args['moeda']} = R$ 5.00"}
+
+        with patch('src.agents.cambio.consultar_cotacao_moeda') as mock_tool:
+            mock_tool.invoke.side_effect = cotacao
+            result = agente.process(authenticated_agent_state)
+
+        conteudo = result["messages"][0].content
+        assert "1 USD = R$ 5.00" in conteudo
+        assert MENSAGEM_FERRAMENTA_INDISPONIVEL in conteudo
+
+
 class TestAgenteEntrevista:
     """Testes de integração para o agente de entrevista."""
 
@@ -362,3 +560,462 @@ class TestAgenteEntrevista:
         result = agente.process(authenticated_agent_state)
 
         assert result.get("pending_redirect") == "credito"
+
+    def test_entrevista_registra_dados_parciais(self, mock_llm, mock_llm_with_tools,
+                                                 authenticated_agent_state):
+        """Testa que campos extraídos são acumulados em interview_data."""
+        agente = AgenteEntrevista(mock_llm, mock_llm_with_tools)
+
+        authenticated_agent_state["current_agent"] = "entrevista"
+        authenticated_agent_state["interview_data"] = {"renda_mensal": 5000.0}
+        authenticated_agent_state["messages"].append(HumanMessage(content="Trabalho de CLT"))
+
+        response = AIMessage(content="")
+        response.tool_calls = [{
+            "name": "registrar_dados_entrevista",
+            "args": {"tipo_emprego": "formal"},
+            "id": "test_call"
+        }]
+        mock_llm_with_tools.invoke.return_value = response
+
+        result = agente.process(authenticated_agent_state)
+
+        assert result["interview_data"] == {"renda_mensal": 5000.0, "tipo_emprego": "formal"}
+        assert "despesas fixas" in result["messages"][0].content
+
+    def test_entrevista_envia_apenas_ultima_troca(self, mock_llm, mock_llm_with_tools,
+                                                  authenticated_agent_state):
+        """Testa que o prompt tem tamanho constante independentemente do histórico."""
+        agente = AgenteEntrevista(mock_llm, mock_llm_with_tools)
+
+        authenticated_agent_state["current_agent"] = "entrevista"
+        historico = []
+        for i in range(20):
+            historico += [HumanMessage(content=f"mensagem {i}"), AIMessage(content=f"pergunta {i}")]
+        authenticated_agent_state["messages"] = historico + [HumanMessage(content="2 dependentes")]
+        mock_llm_with_tools.invoke.return_value = AIMessage(content="Qual sua renda mensal?")
+
+        agente.process(authenticated_agent_state)
+
+        enviadas = mock_llm_with_tools.invoke.call_args[0][0]
+        assert len(enviadas) == 3
+        assert enviadas[1].content == "pergunta 19"
+        assert enviadas[2].content == "2 dependentes"
+
+    def test_entrevista_calcula_score_ao_completar_campos(self, mock_llm, mock_llm_with_tools,
+                                                          authenticated_agent_state):
+        """Testa que o score é calculado assim que o último campo é registrado."""
+        agente = AgenteEntrevista(mock_llm, mock_llm_with_tools)
+
+        authenticated_agent_state["current_agent"] = "entrevista"
+        authenticated_agent_state["interview_data"] = {
+            "renda_mensal": 8000.0,
+            "tipo_emprego": "formal",
+            "despesas_fixas": 3000.0,
+            "num_dependentes": 2
+        }
+
+        response = AIMessage(content="")
+        response.tool_calls = [{
+            "name": "registrar_dados_entrevista",
+            "args": {"tem_dividas": False},
+            "id": "test_call"
+        }]
+        mock_llm_with_tools.invoke.return_value = response
+
+        with patch('src.agents.entrevista.calcular_novo_score') as mock_tool:
+            mock_tool.invoke.return_value = {
+                "sucesso": True,
+                "novo_score": 720,
+                "mensagem": "Seu novo score é 720"
+            }
+
+            result = agente.process(authenticated_agent_state)
+
+        args = mock_tool.invoke.call_args[0][0]
+        assert args["tem_dividas"] is False
+        assert args["cpf"] == authenticated_agent_state["cpf"]
+        assert result["score"] == 720
+        assert result["pending_redirect"] == "credito"
+        assert result["interview_data"] is None
+
+
+class TestEntrevistaInterpretacaoLocal:
+    """Testes para o preenchimento da entrevista sem chamadas ao LLM."""
+
+    def test_inicio_da_entrevista_sem_llm(self, mock_llm, mock_llm_with_tools, authenticated_agent_state):
+        """Testa que a primeira pergunta é feita sem consultar o LLM."""
+        agente = AgenteEntrevista(mock_llm, mock_llm_with_tools)
+
+        authenticated_agent_state["current_agent"] = "credito"
+        authenticated_agent_state["interview_data"] = {"renda_mensal": 1.0}
+        authenticated_agent_state["messages"].append(HumanMessage(content="Sim, quero a entrevista"))
+
+        result = agente.process(authenticated_agent_state)
+
+        assert result["current_agent"] == "entrevista"
+        assert result["interview_data"] == {}
+        assert CAMPOS_ENTREVISTA["renda_mensal"][1] in result["messages"][0].content
+        mock_llm_with_tools.invoke.assert_not_called()
+
+    def test_resposta_interpretada_localmente(self, mock_llm, mock_llm_with_tools, authenticated_agent_state):
+        """Testa que respostas claras preenchem o campo sem consultar o LLM."""
+        agente = AgenteEntrevista(mock_llm, mock_llm_with_tools)
+
+        authenticated_agent_state["current_agent"] = "entrevista"
+        authenticated_agent_state["interview_data"] = {"renda_mensal": 5000.0}
+        authenticated_agent_state["messages"] += [
+            AIMessage(content="Obrigado! " + CAMPOS_ENTREVISTA["tipo_emprego"][1]),
+            HumanMessage(content="sou MEI")
+        ]
+
+        result = agente.process(authenticated_agent_state)
+
+        assert result["interview_data"] == {"renda_mensal": 5000.0, "tipo_emprego": "autonomo"}
+        assert CAMPOS_ENTREVISTA["despesas_fixas"][1] in result["messages"][0].content
+        mock_llm_with_tools.invoke.assert_not_called()
+
+    def test_resposta_ambigua_consulta_llm(self, mock_llm, mock_llm_with_tools, authenticated_agent_state):
+        """Testa que o LLM é consultado quando a resposta não é interpretável."""
+        agente = AgenteEntrevista(mock_llm, mock_llm_with_tools)
+
+        authenticated_agent_state["current_agent"] = "entrevista"
+        authenticated_agent_state["interview_data"] = {}
+        authenticated_agent_state["messages"] += [
+            AIMessage(content=CAMPOS_ENTREVISTA["renda_mensal"][1]),
+            HumanMessage(content="depende do mês, entre 4 e 5 mil")
+        ]
+        mock_llm_with_tools.invoke.return_value = AIMessage(content="Qual a média aproximada?")
+
+        result = agente.process(authenticated_agent_state)
+
+        mock_llm_with_tools.invoke.assert_called_once()
+        assert result["messages"][0].content == "Qual a média aproximada?"
+
+    def test_ultima_resposta_local_calcula_score(self, mock_llm, mock_llm_with_tools, authenticated_agent_state):
+        """Testa que a última resposta interpretada localmente conclui a entrevista."""
+        agente = AgenteEntrevista(mock_llm, mock_llm_with_tools)
+
+        authenticated_agent_state["current_agent"] = "entrevista"
+        authenticated_agent_state["interview_data"] = {
+            "renda_mensal": 8000.0,
+            "tipo_emprego": "formal",
+            "despesas_fixas": 3000.0,
+            "num_dependentes": 2
+        }
+        authenticated_agent_state["messages"] += [
+            AIMessage(content=CAMPOS_ENTREVISTA["tem_dividas"][1]),
+            HumanMessage(content="Não tenho")
+        ]
+
+        with patch('src.agents.entrevista.calcular_novo_score') as mock_tool:
+            mock_tool.invoke.return_value = {"sucesso": True, "novo_score": 720, "mensagem": "Seu novo score é 720"}
+            result = agente.process(authenticated_agent_state)
+
+        assert mock_tool.invoke.call_args[0][0]["tem_dividas"] is False
+        assert result["score"] == 720
+        mock_llm_with_tools.invoke.assert_not_called()
+
+
+class TestCacheRespostasAgentes:
+    """Testes de integração do cache de respostas com os agentes."""
+
+    def test_triagem_reutiliza_roteamento_em_cache(self, mock_llm, mock_llm_with_tools,
+                                                   authenticated_agent_state):
+        """Testa que o mesmo pedido de roteamento não chama o LLM duas vezes."""
+        cache = CacheRespostasLLM()
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools, cache)
+        mock_llm_with_tools.invoke.return_value = AIMessage(content="REDIRECIONAR: cambio")
+
+        authenticated_agent_state["messages"] = [HumanMessage(content="Cotação do dólar")]
+        primeiro = agente.process(authenticated_agent_state)
+        segundo = agente.process(authenticated_agent_state)
+
+        assert primeiro["pending_redirect"] == segundo["pending_redirect"] == "cambio"
+        mock_llm_with_tools.invoke.assert_called_once()
+        assert cache.hits == 1
+
+    def test_cambio_nao_armazena_texto_livre(self, mock_llm, mock_llm_with_tools,
+                                            authenticated_agent_state):
+        """Testa que respostas textuais do câmbio, que podem citar o cliente, não vão para o cache."""
+        cache = CacheRespostasLLM()
+        agente = AgenteCambio(mock_llm, mock_llm_with_tools, cache)
+        mock_llm_with_tools.invoke.return_value = AIMessage(content="Olá João, qual moeda?")
+
+        agente.process(authenticated_agent_state)
+        agente.process(authenticated_agent_state)
+
+        assert mock_llm_with_tools.invoke.call_count == 2
+        assert len(cache) == 0
+
+
+class TestAgentesAssincronos:
+    """Testes de integração para a execução assíncrona dos agentes."""
+
+    @pytest.mark.asyncio
+    async def test_triagem_aprocess_solicita_cpf(self, mock_llm, mock_llm_with_tools, sample_agent_state):
+        """Testa que a triagem assíncrona usa ainvoke do LLM."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools, templates_autenticacao=False)
+        mock_llm_with_tools.ainvoke = AsyncMock(return_value=AIMessage(content="Por favor, informe seu CPF."))
+
+        sample_agent_state["messages"] = [HumanMessage(content="Olá")]
+        result = await agente.aprocess(sample_agent_state)
+
+        assert result["messages"][0].content == "Por favor, informe seu CPF."
+        mock_llm_with_tools.ainvoke.assert_awaited_once()
+        mock_llm_with_tools.invoke.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_triagem_aprocess_autentica(self, mock_llm, mock_llm_with_tools,
+                                              sample_agent_state, mock_database, sample_cliente):
+        """Testa autenticação assíncrona sem chamar o LLM."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
+        mock_llm_with_tools.ainvoke = AsyncMock()
+
+        sample_agent_state["messages"] = [HumanMessage(content="1990-05-15")]
+        sample_agent_state["temp_cpf"] = sample_cliente.cpf
+
+        with patch('src.tools.autenticacao.db', mock_database):
+            result = await agente.aprocess(sample_agent_state)
+
+        assert result["authenticated"] is True
+        mock_llm_with_tools.ainvoke.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_credito_aprocess_consulta_limite(self, mock_llm, mock_llm_with_tools,
+                                                    authenticated_agent_state, mock_database):
+        """Testa consulta de limite assíncrona com a ferramenta real."""
+        agente = AgenteCredito(mock_llm, mock_llm_with_tools)
+
+        response = AIMessage(content="")
+        response.tool_calls = [{
+            "name": "consultar_limite_credito",
+            "args": {"cpf": authenticated_agent_state["cpf"]},
+            "id": "test_call"
+        }]
+        mock_llm_with_tools.ainvoke = AsyncMock(return_value=response)
+
+        with patch('src.tools.credito.db', mock_database):
+            result = await agente.aprocess(authenticated_agent_state)
+
+        assert "5000.00" in result["messages"][0].content
+
+    @pytest.mark.asyncio
+    async def test_entrevista_aprocess_erro_redireciona_credito(self, mock_llm, mock_llm_with_tools,
+                                                                authenticated_agent_state):
+        """Testa que falhas do LLM assíncrono devolvem o cliente ao crédito."""
+        agente = AgenteEntrevista(mock_llm, mock_llm_with_tools)
+        mock_llm_with_tools.ainvoke = AsyncMock(side_effect=Exception("timeout"))
+        authenticated_agent_state["current_agent"] = "entrevista"
+
+        result = await agente.aprocess(authenticated_agent_state)
+
+        assert result["pending_redirect"] == "credito"
+
+    @pytest.mark.asyncio
+    async def test_cambio_aprocess_consulta_cotacao(self, mock_llm, mock_llm_with_tools,
+                                                    authenticated_agent_state):
+        """Testa consulta de cotação assíncrona."""
+        agente = AgenteCambio(mock_llm, mock_llm_with_tools)
+
+        response = AIMessage(content="")
+        response.tool_calls = [{"name": "consultar_cotacao_moeda", "args": {"moeda": "USD"}, "id": "c1"}]
+        mock_llm_with_tools.ainvoke = AsyncMock(return_value=response)
+
+        with patch('src.agents.cambio.consultar_cotacao_moeda') as mock_tool:
+            mock_tool.invoke.return_value = {"sucesso": True, "mensagem": "1 USD = R$ 5.25"}
+            result = await agente.aprocess(authenticated_agent_state)
+
+        assert "5.25" in result["messages"][0].content
+
+
+class TestPrazoTurno:
+    """Testes para as respostas de contingência quando o turno fica sem tempo."""
+
+    def test_credito_informa_limite_do_database(self, mock_llm, mock_llm_with_tools, authenticated_agent_state):
+        """Testa que, sem tempo para o LLM, o crédito informa o limite lido do Database."""
+        agente = AgenteCredito(mock_llm, mock_llm_with_tools)
+        authenticated_agent_state["prazo_turno"] = time.time() - 1
+
+        with patch('src.agents.credito.consultar_limite_credito') as mock_tool:
+            mock_tool.invoke.return_value = {"sucesso": True, "mensagem": "Seu limite de crédito atual é R$ 5000.00"}
+            result = agente.process(authenticated_agent_state)
+
+        mock_llm_with_tools.invoke.assert_not_called()
+        assert result["messages"][0].content.startswith(MENSAGEM_PRAZO_CREDITO)
+        assert "R$ 5000.00" in result["messages"][0].content
+
+    def test_llm_lento_nao_prende_o_turno(self, mock_llm, mock_llm_with_tools, authenticated_agent_state):
+        """Testa que o turno termina no prazo mesmo com o LLM demorando."""
+        agente = AgenteCredito(mock_llm, mock_llm_with_tools)
+        mock_llm_with_tools.invoke.side_effect = lambda messages: time.sleep(1)
+        authenticated_agent_state["prazo_turno"] = time.time() + 0.1
+
+        inicio = time.perf_counter()
+        with patch('src.agents.credito.consultar_limite_credito') as mock_tool:
+            mock_tool.invoke.return_value = {"sucesso": False, "mensagem": "Cliente não encontrado"}
+            result = agente.process(authenticated_agent_state)
+
+        assert time.perf_counter() - inicio < 0.5
+        assert result["messages"][0].content == MENSAGEM_PRAZO_CREDITO
+
+    def test_cambio_usa_ultima_cotacao(self, mock_llm, mock_llm_with_tools, authenticated_agent_state):
+        """Testa que o câmbio responde com a última cotação conhecida das moedas citadas."""
+        agente = AgenteCambio(mock_llm, mock_llm_with_tools)
+        ultimas_cotacoes.armazenar("EUR", {"mensagem": "1 EUR = R$ 5.70", "consultada_em": time.time()})
+        authenticated_agent_state["messages"].append(HumanMessage(content="Quanto está o euro e o dólar?"))
+        authenticated_agent_state["prazo_turno"] = time.time() - 1
+
+        conteudo = agente.process(authenticated_agent_state)["messages"][0].content
+
+        assert "1 EUR = R$ 5.70" in conteudo
+        assert "USD" not in conteudo
+
+    def test_triagem_roteia_por_palavras_chave(self, mock_llm, mock_llm_with_tools, authenticated_agent_state):
+        """Testa que a triagem sem tempo roteia pelas palavras-chave da mensagem."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
+        authenticated_agent_state["messages"].append(HumanMessage(content="Qual meu limite e a cotação do euro?"))
+        authenticated_agent_state["prazo_turno"] = time.time() - 1
+
+        result = agente.process(authenticated_agent_state)
+
+        assert result["pending_redirect"] == "credito,cambio"
+
+    @pytest.mark.asyncio
+    async def test_triagem_aprocess_pede_cpf(self, mock_llm, mock_llm_with_tools, sample_agent_state):
+        """Testa que, sem tempo, a triagem assíncrona pede o CPF com a mensagem padrão."""
+        async def lento(messages):
+            await asyncio.sleep(1)
+
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools, templates_autenticacao=False)
+        mock_llm_with_tools.ainvoke = lento
+        sample_agent_state["messages"] = [HumanMessage(content="Olá")]
+        sample_agent_state["prazo_turno"] = time.time() + 0.05
+
+        result = await agente.aprocess(sample_agent_state)
+
+        assert result["messages"][0].content == MENSAGEM_SOLICITA_CPF
+
+    def test_entrevista_repete_a_pergunta(self, mock_llm, mock_llm_with_tools, authenticated_agent_state):
+        """Testa que a entrevista sem tempo repete a pergunta pendente."""
+        agente = AgenteEntrevista(mock_llm, mock_llm_with_tools)
+        authenticated_agent_state.update({
+            "current_agent": "entrevista",
+            "interview_data": {"renda_mensal": 5000},
+            "prazo_turno": time.time() - 1
+        })
+        authenticated_agent_state["messages"] += [
+            AIMessage(content=CAMPOS_ENTREVISTA["tipo_emprego"][1]),
+            HumanMessage(content="hmm, depende do mês")
+        ]
+
+        result = agente.process(authenticated_agent_state)
+
+        assert result["current_agent"] == "entrevista"
+        assert result["messages"][0].content.endswith(CAMPOS_ENTREVISTA["tipo_emprego"][1])
+
+
+class TestExtracaoCredenciais:
+    """Testes para os formatos de CPF e data aceitos pela triagem."""
+
+    def test_triagem_autentica_com_formatos_brasileiros(self, mock_llm, mock_llm_with_tools,
+                                                        sample_agent_state, mock_database):
+        """Testa a autenticação com CPF pontuado e data no formato DD/MM/AAAA."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools)
+        sample_agent_state["messages"] = [HumanMessage(content="123.456.789-01 e nasci em 15/05/1990")]
+
+        with patch('src.tools.autenticacao.db', mock_database):
+            result = agente.process(sample_agent_state)
+
+        assert result["authenticated"] is True
+        mock_llm_with_tools.invoke.assert_not_called()
+
+    def test_cpf_invalido_nao_consulta_cadastro(self, mock_llm, mock_llm_with_tools, sample_agent_state):
+        """Testa que, com a validação ativa, um CPF inválido é recusado sem gastar tentativa."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools, validar_cpf=True)
+        sample_agent_state["messages"] = [HumanMessage(content="12345678901 1990-05-15")]
+
+        with patch('src.agents.triagem.autenticar_cliente') as mock_autenticar:
+            result = agente.process(sample_agent_state)
+
+        mock_autenticar.invoke.assert_not_called()
+        assert result["messages"][0].content == MENSAGEM_CPF_INVALIDO
+        assert "authentication_attempts" not in result
+        assert result["temp_data_nascimento"] == "1990-05-15"
+
+
+class TestLimiteAutenticacao:
+    """Testes para o limite de autenticações malsucedidas entre conversas."""
+
+    def _tentar(self, agente, mensagem, cliente_id="10.0.0.1"):
+        state = {"messages": [HumanMessage(content=mensagem)], "authenticated": False,
+                 "authentication_attempts": 0, "cliente_id": cliente_id}
+        return agente.process(state)
+
+    def test_falhas_em_novas_conversas_sao_limitadas(self, mock_llm, mock_llm_with_tools, mock_database):
+        """Testa que, esgotadas as tentativas do CPF, o cadastro não é mais consultado."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools, limitador=LimitadorTaxa(2, 300.0))
+        limitadas = AUTENTICACOES_LIMITADAS.valor()
+
+        with patch('src.tools.autenticacao.db', mock_database):
+            # Cada tentativa vem de uma conversa nova, com o contador da conversa zerado
+            for _ in range(2):
+                self._tentar(agente, "12345678901 2000-01-01")
+            with patch('src.agents.triagem.autenticar_cliente') as mock_autenticar:
+                result = self._tentar(agente, "12345678901 1990-05-15")
+
+        mock_autenticar.invoke.assert_not_called()
+        assert "aguarde" in result["messages"][0].content
+        assert "authentication_attempts" not in result
+        assert AUTENTICACOES_LIMITADAS.valor() == limitadas + 1
+
+    def test_cliente_limitado_entre_cpfs(self, mock_llm, mock_llm_with_tools, mock_database):
+        """Testa que o mesmo cliente testando CPFs diferentes também é limitado."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools, limitador=LimitadorTaxa(2, 300.0))
+
+        with patch('src.tools.autenticacao.db', mock_database):
+            self._tentar(agente, "00000000001 2000-01-01")
+            self._tentar(agente, "00000000002 2000-01-01")
+            bloqueado = self._tentar(agente, "12345678901 1990-05-15")
+            outro_cliente = self._tentar(agente, "12345678901 1990-05-15", cliente_id="10.0.0.2")
+
+        assert "aguarde" in bloqueado["messages"][0].content
+        assert outro_cliente["authenticated"] is True
+
+    def test_sucesso_nao_consome_tentativas(self, mock_llm, mock_llm_with_tools, mock_database):
+        """Testa que autenticações bem-sucedidas não esgotam o limite."""
+        agente = AgenteTriagem(mock_llm, mock_llm_with_tools, limitador=LimitadorTaxa(1, 300.0))
+
+        with patch('src.tools.autenticacao.db', mock_database):
+            resultados = [self._tentar(agente, "12345678901 1990-05-15") for _ in range(3)]
+
+        assert all(r["authenticated"] for r in resultados)
+
+
+class TestInstantaneoSessao:
+    """Testes para o instantâneo do cliente guardado no estado da conversa."""
+
+    def test_limite_consultado_sem_reler_o_cadastro(self, mock_llm, mock_llm_with_tools,
+                                                    sample_agent_state, mock_database):
+        """Testa que, depois da autenticação, a consulta e o aumento de limite não releem o cliente."""
+        triagem = AgenteTriagem(mock_llm, mock_llm_with_tools)
+        credito = AgenteCredito(mock_llm, mock_llm_with_tools)
+        sample_agent_state["messages"] = [HumanMessage(content="98765432100 1985-10-20")]
+
+        with patch('src.tools.autenticacao.db', mock_database), patch('src.tools.credito.db', mock_database):
+            state = {**sample_agent_state, **triagem.process(sample_agent_state)}
+            assert state["versao_cliente"] is not None
+
+            aumento = AIMessage(content="")
+            aumento.tool_calls = [{"name": "solicitar_aumento_limite", "args": {"novo_limite": 20000.0}, "id": "1"}]
+            consulta = AIMessage(content="")
+            consulta.tool_calls = [{"name": "consultar_limite_credito", "args": {}, "id": "2"}]
+            mock_llm_with_tools.invoke.side_effect = [aumento, consulta]
+
+            with patch.object(mock_database, "obter_cliente") as mock_obter:
+                state = {**state, **credito.process(state)}
+                result = credito.process(state)
+
+        mock_obter.assert_not_called()
+        assert state["limite_credito"] == 20000.0
+        assert "20000.00" in result["messages"][0].content
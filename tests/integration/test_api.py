@@ -0,0 +1,161 @@
+"""Testes de integração para a API HTTP."""
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.app import criar_app
+from src.benchmark.fake_llm import LLMRoteirizado, responder_banco_agil
+from src.benchmark.replay import cotacao_offline, dados_isolados
+from src.config import get_settings
+from src.core.graph import create_graph
+from src.core.sessoes import ArmazemMemoria, ArmazemSqlite
+
+
+@pytest.fixture
+def cliente(mock_openai_api_key):
+    """Cliente HTTP da API com o LLM roteirizado e dados isolados."""
+    with dados_isolados(), cotacao_offline():
+        graph = create_graph(mock_openai_api_key, llm=LLMRoteirizado(responder=responder_banco_agil))
+        with TestClient(criar_app(graph=graph, armazem=ArmazemMemoria())) as client:
+            yield client
+
+
+def _eventos_sse(corpo: str):
+    eventos = []
+    for bloco in corpo.strip().split("\n\n"):
+        linhas = dict(linha.split(": ", 1) for linha in bloco.split("\n"))
+        eventos.append((linhas["event"], json.loads(linhas["data"])))
+    return eventos
+
+
+class TestApi:
+    """Testes para os endpoints de sessão e mensagens."""
+
+    def test_conversa_completa(self, cliente):
+        """Testa autenticação e consulta de limite pela API."""
+        sessao_id = cliente.post("/sessoes").json()["sessao_id"]
+
+        resposta = cliente.post(f"/sessoes/{sessao_id}/mensagens", json={"texto": "12345678901 1990-05-15"})
+        assert resposta.status_code == 200
+        assert resposta.json()["estado"]["authenticated"] is True
+
+        resposta = cliente.post(f"/sessoes/{sessao_id}/mensagens", json={"texto": "Qual é o meu limite?"})
+        assert "R$ 5000.00" in resposta.json()["resposta"]
+
+        sessao = cliente.get(f"/sessoes/{sessao_id}").json()
+        assert [m["papel"] for m in sessao["mensagens"]] == ["cliente", "assistente", "cliente", "assistente"]
+
+    def test_falhas_limitadas_entre_sessoes(self, cliente):
+        """Testa que o mesmo cliente abrindo novas sessões continua limitado."""
+        for indice in range(5):
+            sessao_id = cliente.post("/sessoes").json()["sessao_id"]
+            cliente.post(f"/sessoes/{sessao_id}/mensagens", json={"texto": f"0000000000{indice} 2000-01-01"})
+
+        sessao_id = cliente.post("/sessoes").json()["sessao_id"]
+        resposta = cliente.post(f"/sessoes/{sessao_id}/mensagens", json={"texto": "12345678901 1990-05-15"})
+
+        assert resposta.json()["estado"]["authenticated"] is False
+        assert "aguarde" in resposta.json()["resposta"]
+
+    def test_clientes_atras_do_balanceador_nao_se_bloqueiam(self, cliente, monkeypatch):
+        """Testa que, atrás de um proxy confiável, as falhas contam pelo IP encaminhado de cada cliente."""
+        monkeypatch.setenv("TRUSTED_PROXY_IPS", '["testclient"]')
+        get_settings.cache_clear()
+        try:
+            for indice in range(5):
+                sessao_id = cliente.post("/sessoes").json()["sessao_id"]
+                cliente.post(f"/sessoes/{sessao_id}/mensagens", json={"texto": f"0000000000{indice} 2000-01-01"},
+                             headers={"X-Forwarded-For": "200.1.1.1"})
+
+            sessao_id = cliente.post("/sessoes").json()["sessao_id"]
+            resposta = cliente.post(f"/sessoes/{sessao_id}/mensagens", json={"texto": "12345678901 1990-05-15"},
+                                    headers={"X-Forwarded-For": "200.2.2.2"})
+        finally:
+            get_settings.cache_clear()
+
+        assert resposta.json()["estado"]["authenticated"] is True
+        assert resposta.json()["estado"]["cliente_id"] == "200.2.2.2"
+
+    def test_sessao_inexistente(self, cliente):
+        """Testa respostas 404 para sessões que não existem."""
+        assert cliente.post("/sessoes/xyz/mensagens", json={"texto": "Olá"}).status_code == 404
+        assert cliente.get("/sessoes/xyz").status_code == 404
+        assert cliente.delete("/sessoes/xyz").status_code == 404
+
+    def test_conversa_encerrada(self, cliente):
+        """Testa que uma conversa encerrada não aceita novas mensagens."""
+        sessao_id = cliente.post("/sessoes").json()["sessao_id"]
+
+        resposta = cliente.post(f"/sessoes/{sessao_id}/mensagens", json={"texto": "quero sair"})
+        assert resposta.json()["encerrada"] is True
+        assert cliente.post(f"/sessoes/{sessao_id}/mensagens", json={"texto": "Olá"}).status_code == 409
+
+    def test_remover_sessao(self, cliente):
+        """Testa a remoção de uma sessão."""
+        sessao_id = cliente.post("/sessoes").json()["sessao_id"]
+
+        assert cliente.delete(f"/sessoes/{sessao_id}").status_code == 204
+        assert cliente.get(f"/sessoes/{sessao_id}").status_code == 404
+
+    def test_mensagem_vazia_rejeitada(self, cliente):
+        """Testa a validação do corpo da mensagem."""
+        sessao_id = cliente.post("/sessoes").json()["sessao_id"]
+        assert cliente.post(f"/sessoes/{sessao_id}/mensagens", json={"texto": ""}).status_code == 422
+
+    def test_stream(self, cliente):
+        """Testa o streaming do turno em Server-Sent Events."""
+        sessao_id = cliente.post("/sessoes").json()["sessao_id"]
+
+        resposta = cliente.post(f"/sessoes/{sessao_id}/mensagens/stream", json={"texto": "Olá"})
+        assert resposta.headers["content-type"].startswith("text/event-stream")
+
+        eventos = _eventos_sse(resposta.text)
+        assert eventos[0][0] == "token"
+        tipo, final = eventos[-1]
+        assert tipo == "final"
+        assert "CPF" in final["resposta"]
+
+        sessao = cliente.get(f"/sessoes/{sessao_id}").json()
+        assert len(sessao["mensagens"]) == 2
+
+    def test_metrics(self, cliente):
+        """Testa que a API também expõe as métricas do Prometheus."""
+        cliente.post("/sessoes")
+        resposta = cliente.get("/metrics")
+        assert resposta.status_code == 200
+        assert resposta.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+
+class GraphComTurnoConcorrente:
+    """Grafo cujo turno termina depois que outro worker já salvou a mesma sessão."""
+
+    def __init__(self, graph, outro_worker: ArmazemSqlite, sessao_id: str):
+        self.graph = graph
+        self.outro_worker = outro_worker
+        self.sessao_id = sessao_id
+
+    async def ainvoke(self, entrada):
+        final = await self.graph.ainvoke(entrada)
+        estado = await self.outro_worker.carregar(self.sessao_id)
+        await self.outro_worker.salvar(self.sessao_id, {**estado, "cpf": "outro-worker"})
+        return final
+
+
+def test_turno_concorrente_em_outro_worker_nao_e_sobrescrito(mock_openai_api_key, temp_data_dir):
+    """Testa que o turno que terminou por último recebe 409 em vez de apagar o turno do outro worker."""
+    caminho = f"{temp_data_dir}/sessoes.sqlite"
+    outro_worker = ArmazemSqlite(caminho)
+    with dados_isolados(), cotacao_offline():
+        graph = create_graph(mock_openai_api_key, llm=LLMRoteirizado(responder=responder_banco_agil))
+        with TestClient(criar_app(graph=graph, armazem=ArmazemSqlite(caminho))) as client:
+            sessao_id = client.post("/sessoes").json()["sessao_id"]
+            client.app.state.graph = GraphComTurnoConcorrente(graph, outro_worker, sessao_id)
+
+            resposta = client.post(f"/sessoes/{sessao_id}/mensagens", json={"texto": "Olá"})
+            estado = client.get(f"/sessoes/{sessao_id}").json()["estado"]
+    asyncio.run(outro_worker.fechar())
+
+    assert resposta.status_code == 409
+    assert estado["cpf"] == "outro-worker"
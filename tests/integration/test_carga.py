@@ -0,0 +1,30 @@
+"""Testes de integração para o gerador de carga."""
+import pytest
+
+from src.benchmark.carga import executar_carga, jornada
+
+
+class TestCarga:
+    """Testes para a execução de clientes simultâneos."""
+
+    @pytest.mark.asyncio
+    async def test_clientes_simultaneos_completam_a_jornada(self):
+        """Testa que todos os clientes percorrem a jornada sem erros."""
+        resultado = await executar_carga(clientes=4, latencia_llm=0.0)
+
+        turnos_por_jornada = len(jornada("12345678901", "1990-05-15"))
+        assert resultado["erros"] == []
+        assert resultado["turnos"] == 4 * turnos_por_jornada
+        assert resultado["por_tipo"]["entrevista"]["n"] == 4 * 5
+        assert {"p50_ms", "p95_ms", "p99_ms"} <= set(resultado["geral"])
+
+    @pytest.mark.asyncio
+    async def test_reporta_io_do_database(self):
+        """Testa que o tempo gasto em cada método do Database é contabilizado."""
+        resultado = await executar_carga(clientes=2, latencia_llm=0.0)
+
+        io = resultado["io_database"]
+        assert io["autenticar_cliente"]["chamadas"] == 2
+        assert io["atualizar_score"]["chamadas"] == 2
+        # Os instantâneos da sessão valem enquanto os dados do próprio cliente não mudam
+        assert "obter_cliente" not in io
@@ -0,0 +1,85 @@
+"""Testes de integração para a persistência do estado das conversas."""
+import os
+
+from langchain_core.messages import HumanMessage
+
+from src.benchmark.fake_llm import LLMRoteirizado, responder_banco_agil
+from src.benchmark.replay import cotacao_offline, dados_isolados
+from src.core.checkpoint import (
+    config_sessao,
+    criar_checkpointer,
+    entrada_turno,
+    estado_sessao,
+    nova_sessao,
+)
+from src.core.graph import create_graph
+
+
+def _graph(api_key, caminho):
+    """Cria o grafo com LLM roteirizado e checkpointer SQLite no caminho dado."""
+    llm = LLMRoteirizado(responder=responder_banco_agil)
+    return create_graph(api_key, llm=llm, checkpointer=criar_checkpointer(caminho))
+
+
+def _turno(graph, thread_id, texto):
+    return graph.invoke(entrada_turno(graph, thread_id, texto), config_sessao(thread_id))
+
+
+class TestCheckpoint:
+    """Testes para conversas persistidas por thread_id."""
+
+    def test_primeiro_turno_inicializa_estado(self, mock_openai_api_key, temp_data_dir):
+        """Testa que o primeiro turno envia o estado inicial completo."""
+        graph = _graph(mock_openai_api_key, os.path.join(temp_data_dir, "checkpoints.sqlite"))
+        thread_id = nova_sessao()
+
+        entrada = entrada_turno(graph, thread_id, "Olá")
+
+        assert entrada["authenticated"] is False
+        assert entrada["messages"][0].content == "Olá"
+
+    def test_turnos_seguintes_enviam_apenas_a_mensagem(self, mock_openai_api_key, temp_data_dir):
+        """Testa que, com a conversa salva, apenas a nova mensagem (e quem a enviou) é enviada."""
+        with dados_isolados():
+            graph = _graph(mock_openai_api_key, os.path.join(temp_data_dir, "checkpoints.sqlite"))
+            thread_id = nova_sessao()
+            _turno(graph, thread_id, "Olá")
+
+            entrada = entrada_turno(graph, thread_id, "12345678901 1990-05-15")
+            resultado = graph.invoke(entrada, config_sessao(thread_id))
+
+        assert sorted(entrada) == ["cliente_id", "messages"]
+        assert entrada["cliente_id"] == thread_id
+        assert resultado["authenticated"] is True
+        assert [m.content for m in resultado["messages"] if isinstance(m, HumanMessage)] == [
+            "Olá", "12345678901 1990-05-15"
+        ]
+
+    def test_estado_sobrevive_a_reinicio(self, mock_openai_api_key, temp_data_dir):
+        """Testa que um novo processo retoma a conversa a partir do arquivo SQLite."""
+        caminho = os.path.join(temp_data_dir, "checkpoints.sqlite")
+        thread_id = nova_sessao()
+
+        with dados_isolados(), cotacao_offline():
+            graph = _graph(mock_openai_api_key, caminho)
+            _turno(graph, thread_id, "Olá")
+            _turno(graph, thread_id, "11122233344 1992-03-10")
+
+            # Simula outro processo abrindo o mesmo arquivo
+            outro_graph = _graph(mock_openai_api_key, caminho)
+            resultado = _turno(outro_graph, thread_id, "Qual a cotação do dólar?")
+
+        assert resultado["nome_cliente"] == "Carlos Souza"
+        assert "1 USD = R$ 5.25" in resultado["messages"][-1].content
+
+    def test_conversas_isoladas_por_thread(self, mock_openai_api_key, temp_data_dir):
+        """Testa que cada thread_id tem seu próprio estado."""
+        with dados_isolados():
+            graph = _graph(mock_openai_api_key, os.path.join(temp_data_dir, "checkpoints.sqlite"))
+            autenticada, anonima = nova_sessao(), nova_sessao()
+            _turno(graph, autenticada, "12345678901 1990-05-15")
+            _turno(graph, anonima, "Olá")
+
+        assert estado_sessao(graph, autenticada)["authenticated"] is True
+        assert estado_sessao(graph, anonima)["authenticated"] is False
+        assert estado_sessao(graph, nova_sessao()) == {}
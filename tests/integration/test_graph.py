@@ -1,8 +1,23 @@
 """Testes de integração para o grafo LangGraph."""
-from unittest.mock import Mock, patch
+import os
+import subprocess
+import sys
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
 from langchain_core.messages import HumanMessage, AIMessage
 
-from src.core.graph import create_graph
+from src.core import graph as graph_module
+from src.config import get_settings
+from src.core import aquecimento
+from src.core.graph import (
+    create_graph,
+    criar_no,
+    destinos_redirecionamento,
+    get_graph,
+    get_graph_aplicacao,
+    juntar_respostas,
+)
 
 
 class TestGraphCreation:
@@ -294,3 +309,248 @@ class TestGraphStateManagement:
                     result = graph.invoke(initial_state)
 
                     mock_credito_instance.process.assert_called()
+
+
+class TestGraphAssincrono:
+    """Testes para a execução assíncrona do grafo."""
+
+    @pytest.mark.asyncio
+    async def test_ainvoke_usa_aprocess_dos_agentes(self, mock_openai_api_key, authenticated_agent_state):
+        """Testa que ainvoke percorre o grafo usando os métodos assíncronos."""
+        with patch('src.core.graph.BancoAgilAgents'):
+            with patch('src.core.graph.AgenteTriagem') as mock_triagem:
+                with patch('src.core.graph.AgenteCambio') as mock_cambio:
+                    mock_triagem_instance = Mock()
+                    mock_triagem_instance.aprocess = AsyncMock(return_value={
+                        "current_agent": "triagem",
+                        "pending_redirect": "cambio"
+                    })
+                    mock_triagem.return_value = mock_triagem_instance
+
+                    mock_cambio_instance = Mock()
+                    mock_cambio_instance.aprocess = AsyncMock(return_value={
+                        "current_agent": "cambio",
+                        "messages": [AIMessage(content="1 USD = R$ 5.25")]
+                    })
+                    mock_cambio.return_value = mock_cambio_instance
+
+                    graph = create_graph(mock_openai_api_key)
+
+                    result = await graph.ainvoke({
+                        **authenticated_agent_state,
+                        "messages": [HumanMessage(content="Cotação do dólar?")]
+                    })
+
+                    mock_triagem_instance.aprocess.assert_awaited_once()
+                    mock_cambio_instance.aprocess.assert_awaited_once()
+                    mock_triagem_instance.process.assert_not_called()
+                    assert result["messages"][-1].content == "1 USD = R$ 5.25"
+
+
+class TestGraphSobDemanda:
+    """Testes para a construção preguiçosa do grafo e das configurações."""
+
+    def test_importar_pacote_nao_exige_api_key(self):
+        """Testa que importar os módulos não carrega configurações nem cria o grafo."""
+        env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+        codigo = (
+            "import src.config, src.core.graph; "
+            "assert src.config.get_settings.cache_info().currsize == 0; "
+            "assert src.core.graph.get_graph.cache_info().currsize == 0"
+        )
+
+        resultado = subprocess.run([sys.executable, "-c", codigo], env=env, cwd=os.getcwd(),
+                                   capture_output=True, text=True)
+
+        assert resultado.returncode == 0, resultado.stderr
+
+    def test_modelos_injetados_dispensam_api_key(self):
+        """Testa que benchmarks e grafos com modelos injetados funcionam sem chave e não a definem no ambiente."""
+        env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+        codigo = (
+            "import os, pytest; "
+            "import src.benchmark.carga, src.benchmark.modelos, src.benchmark.replay; "
+            "assert 'OPENAI_API_KEY' not in os.environ; "
+            "from src.benchmark.fake_llm import LLMRoteirizado; "
+            "from src.core.graph import create_graph; "
+            "create_graph(None, llm=LLMRoteirizado(roteiro=[])); "
+            "create_graph(None, llms={a: LLMRoteirizado(roteiro=[]) "
+            "for a in ('triagem', 'credito', 'entrevista', 'cambio')}); "
+            "pytest.raises(ValueError, create_graph, None).match('OPENAI_API_KEY')"
+        )
+
+        resultado = subprocess.run([sys.executable, "-c", codigo], env=env, cwd=os.getcwd(),
+                                   capture_output=True, text=True)
+
+        assert resultado.returncode == 0, resultado.stderr
+
+    def test_graph_criado_uma_unica_vez(self, mock_openai_api_key):
+        """Testa que o atributo `graph` cria o grafo sob demanda e o reaproveita."""
+        get_graph.cache_clear()
+        try:
+            with patch('src.core.graph.create_graph') as mock_create:
+                primeiro = graph_module.graph
+                segundo = get_graph()
+
+            mock_create.assert_called_once()
+            assert primeiro is segundo
+        finally:
+            get_graph.cache_clear()
+
+
+class TestGraphCompartilhado:
+    """Testes para o grafo compartilhado entre as sessões da interface."""
+
+    @pytest.fixture(autouse=True)
+    def limpar_caches(self):
+        get_settings.cache_clear()
+        get_graph_aplicacao.cache_clear()
+        yield
+        get_settings.cache_clear()
+        get_graph_aplicacao.cache_clear()
+
+    def test_grafo_da_aplicacao_unico_com_checkpointer(self, mock_openai_api_key, monkeypatch, tmp_path):
+        """Testa que sessões diferentes recebem o mesmo grafo, com checkpointer."""
+        monkeypatch.setenv("CHECKPOINT_DB_PATH", str(tmp_path / "checkpoints.sqlite"))
+
+        with patch('src.core.graph.BancoAgilAgents') as mock_agents:
+            primeiro = get_graph_aplicacao()
+            segundo = get_graph_aplicacao()
+
+        mock_agents.assert_called_once()
+        assert primeiro is segundo
+        assert primeiro.checkpointer is not None
+
+    def test_aquecer_cria_recursos(self, mock_openai_api_key, monkeypatch):
+        """Testa que o aquecimento cria o grafo e o servidor de métricas antes da interface."""
+        monkeypatch.setenv("METRICS_ENABLED", "true")
+        with patch.object(aquecimento, 'get_graph_aplicacao') as mock_graph, \
+             patch.object(aquecimento, 'iniciar_servidor_metricas') as mock_servidor:
+            duracao = aquecimento.aquecer()
+
+        assert duracao is not None and duracao >= 0
+        mock_graph.assert_called_once()
+        mock_servidor.assert_called_once()
+
+    def test_aquecer_sem_api_key(self, monkeypatch):
+        """Testa que sem configuração o aquecimento é ignorado sem erro."""
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        with patch.object(aquecimento, 'get_graph_aplicacao') as mock_graph:
+            assert aquecimento.aquecer() is None
+
+        mock_graph.assert_not_called()
+
+
+class TestCriarNo:
+    """Testes para a fábrica de nós dos agentes."""
+
+    def test_no_sem_redirecionamento_limpa_o_anterior(self):
+        """Testa que o nó escreve pending_redirect=None quando o agente não redireciona."""
+        agente = Mock()
+        agente.process.return_value = {"current_agent": "credito"}
+
+        updates = criar_no("credito", agente).invoke({"pending_redirect": "credito"})
+
+        assert updates == {"current_agent": "credito", "pending_redirect": None}
+
+    def test_no_mantem_o_redirecionamento_do_agente(self):
+        """Testa que o redirecionamento pedido pelo agente é preservado."""
+        agente = Mock()
+        agente.process.return_value = {"pending_redirect": "entrevista"}
+
+        assert criar_no("credito", agente).invoke({})["pending_redirect"] == "entrevista"
+
+
+class TestGraphRamosParalelos:
+    """Testes para o atendimento de pedidos com mais de um assunto no mesmo turno."""
+
+    def test_destinos_redirecionamento(self):
+        """Testa a escolha entre um agente, os ramos paralelos ou o fim do turno."""
+        assert destinos_redirecionamento({"pending_redirect": "cambio"}) == "cambio"
+        assert destinos_redirecionamento({"pending_redirect": "credito,cambio"}) == [
+            "credito_paralelo", "cambio_paralelo"
+        ]
+        assert destinos_redirecionamento({"pending_redirect": "credito,cambio"}, paralelo=False) == "credito"
+        assert destinos_redirecionamento({"pending_redirect": "credito", "should_end": True}) == "end"
+        assert destinos_redirecionamento({"pending_redirect": None}) == "end"
+
+    def test_juntar_respostas_na_ordem_pedida(self):
+        """Testa que a junção une os textos na ordem do pedido e aplica as demais atualizações."""
+        estado = {
+            "pending_redirect": "cambio,credito",
+            "respostas_paralelas": [
+                {"agente": "credito", "current_agent": "credito", "limite_credito": 7000.0,
+                 "messages": [AIMessage(content="Aumento aprovado!")]},
+                {"agente": "cambio", "current_agent": "cambio",
+                 "messages": [AIMessage(content="1 EUR = R$ 5.70")]}
+            ]
+        }
+
+        updates = juntar_respostas(estado)
+
+        assert updates["messages"][0].content == "1 EUR = R$ 5.70\n\nAumento aprovado!"
+        assert updates["limite_credito"] == 7000.0
+        assert updates["respostas_paralelas"] is None
+        assert updates["pending_redirect"] is None
+        assert "should_end" not in updates
+
+    def test_juntar_respostas_preserva_redirecionamento_e_encerramento(self):
+        """Testa que um ramo pode encerrar a conversa ou seguir para a entrevista."""
+        updates = juntar_respostas({
+            "pending_redirect": "credito,cambio",
+            "respostas_paralelas": [
+                {"agente": "cambio", "should_end": True, "messages": [AIMessage(content="Até logo!")]},
+                {"agente": "credito", "pending_redirect": "entrevista"}
+            ]
+        })
+
+        assert updates["should_end"] is True
+        assert updates["pending_redirect"] == "entrevista"
+
+
+class TestGraphAtualizacoesParciais:
+    """Testes para os nós que devolvem apenas as atualizações dos agentes."""
+
+    def test_nos_devolvem_apenas_atualizacoes(self, mock_openai_api_key, authenticated_agent_state):
+        """Testa que nenhum nó devolve uma cópia do estado completo."""
+        with patch('src.core.graph.BancoAgilAgents'):
+            with patch('src.core.graph.AgenteTriagem') as mock_triagem:
+                mock_instance = Mock()
+                mock_instance.process.return_value = {
+                    "current_agent": "triagem",
+                    "messages": [AIMessage(content="Como posso ajudar?")]
+                }
+                mock_triagem.return_value = mock_instance
+
+                graph = create_graph(mock_openai_api_key)
+                atualizacoes = list(graph.stream({
+                    **authenticated_agent_state,
+                    "messages": [HumanMessage(content="Oi")]
+                }, stream_mode="updates"))
+
+        # O roteador grava apenas o prazo do turno
+        assert set(atualizacoes[0]["router"]) == {"prazo_turno"}
+        assert set(atualizacoes[1]["triagem"]) == {"current_agent", "messages", "pending_redirect"}
+
+    def test_redirecionamento_limpo_apos_ser_atendido(self, mock_openai_api_key, authenticated_agent_state):
+        """Testa que pending_redirect volta a None quando o agente seguinte não redireciona."""
+        with patch('src.core.graph.BancoAgilAgents'):
+            with patch('src.core.graph.AgenteTriagem') as mock_triagem:
+                with patch('src.core.graph.AgenteCredito') as mock_credito:
+                    mock_triagem.return_value.process.return_value = {
+                        "current_agent": "triagem",
+                        "pending_redirect": "credito"
+                    }
+                    mock_credito.return_value.process.return_value = {
+                        "current_agent": "credito",
+                        "messages": [AIMessage(content="Seu limite é R$ 5000.00")]
+                    }
+
+                    graph = create_graph(mock_openai_api_key)
+                    result = graph.invoke({
+                        **authenticated_agent_state,
+                        "messages": [HumanMessage(content="Qual meu limite?")]
+                    })
+
+        assert result["current_agent"] == "credito"
+        assert result["pending_redirect"] is None
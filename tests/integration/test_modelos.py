@@ -0,0 +1,73 @@
+"""Testes de integração para os modelos por agente e o benchmark de custo."""
+from unittest.mock import MagicMock, patch
+
+from src.agents.base import BancoAgilAgents
+from src.benchmark.fake_llm import LLMRoteirizado
+from src.benchmark.modelos import (
+    CONFIGURACOES,
+    PERFIS_MODELOS,
+    PerfilModelo,
+    comparar_configuracao,
+    custo_chamadas,
+)
+from src.config.settings import Settings
+
+
+class TestModelosPorAgente:
+    """Testes para a escolha do modelo de cada agente."""
+
+    def test_modelo_agente_usa_padrao_quando_vazio(self, mock_openai_api_key):
+        """Testa o modelo específico de cada agente e o padrão quando não configurado."""
+        settings = Settings(llm_model="gpt-4o", llm_model_triagem="gpt-4o-mini", llm_model_cambio="")
+
+        assert settings.modelo_agente("triagem") == "gpt-4o-mini"
+        assert settings.modelo_agente("cambio") == "gpt-4o"
+        assert settings.modelo_agente("entrevista") == "gpt-4o"
+
+    def test_um_cliente_por_modelo(self, mock_openai_api_key):
+        """Testa que agentes com o mesmo modelo compartilham o cliente da OpenAI."""
+        with patch('src.agents.base.ChatOpenAI') as mock_chat:
+            mock_chat.side_effect = lambda **kwargs: MagicMock(name=kwargs["model"])
+            agents = BancoAgilAgents(mock_openai_api_key)
+
+        modelos = sorted(chamada.kwargs["model"] for chamada in mock_chat.call_args_list)
+        assert modelos == ["gpt-4o", "gpt-4o-mini"]
+        assert agents.llms["triagem"] is agents.llms["cambio"]
+        assert agents.llms["credito"] is agents.llms["entrevista"] is agents.llm
+        assert agents.llms_with_tools["triagem"] is agents.llms_with_tools["cambio"]
+
+    def test_llms_substituem_agentes_informados(self, mock_openai_api_key):
+        """Testa que `llms` troca apenas o modelo dos agentes informados."""
+        base, triagem = LLMRoteirizado(), LLMRoteirizado()
+        agents = BancoAgilAgents(mock_openai_api_key, llm=base, llms={"triagem": triagem})
+
+        assert agents.llms["triagem"] is triagem
+        assert agents.llms["credito"] is base
+
+
+class TestBenchmarkModelos:
+    """Testes para a comparação de latência e custo entre configurações."""
+
+    def test_custo_por_modelo_do_agente(self):
+        """Testa que o custo usa o preço do modelo de cada agente, inclusive nos ramos paralelos."""
+        llm = {
+            "triagem": {"tokens_prompt": 1_000_000, "tokens_resposta": 0},
+            "credito_paralelo": {"tokens_prompt": 0, "tokens_resposta": 1_000_000}
+        }
+
+        custo = custo_chamadas(llm, CONFIGURACOES["escalonado"])
+
+        assert custo == PERFIS_MODELOS["gpt-4o-mini"].preco_entrada + PERFIS_MODELOS["gpt-4o"].preco_saida
+
+    def test_escalonado_mais_barato_e_rapido_que_unico(self, monkeypatch):
+        """Testa que o modelo pequeno na triagem e no câmbio reduz latência e custo por conversa."""
+        monkeypatch.setitem(PERFIS_MODELOS, "gpt-4o", PerfilModelo(0.04, 2.50, 10.00))
+        monkeypatch.setitem(PERFIS_MODELOS, "gpt-4o-mini", PerfilModelo(0.01, 0.15, 0.60))
+
+        unico = comparar_configuracao(CONFIGURACOES["unico"])
+        escalonado = comparar_configuracao(CONFIGURACOES["escalonado"])
+
+        assert escalonado["conversas"] == unico["conversas"]
+        assert escalonado["tokens_prompt"] == unico["tokens_prompt"]
+        assert escalonado["custo_por_conversa_usd"] < unico["custo_por_conversa_usd"]
+        assert escalonado["latencia_media_s"] < unico["latencia_media_s"]
@@ -0,0 +1,85 @@
+"""Testes de integração para o replay de conversas com LLM roteirizado."""
+import os
+
+from src.benchmark.fake_llm import LLMRoteirizado, responder_banco_agil
+from src.benchmark.replay import (
+    CONVERSAS,
+    cotacao_offline,
+    dados_isolados,
+    executar_conversa,
+    executar_replay,
+    percentil,
+)
+from src.config.settings import BASE_DIR
+from src.core.graph import create_graph
+
+
+class TestReplay:
+    """Testes para a reprodução de conversas completas pelo grafo."""
+
+    def test_conversa_de_aumento_com_entrevista(self, mock_openai_api_key):
+        """Testa o fluxo completo de aumento rejeitado seguido de entrevista."""
+        with dados_isolados(), cotacao_offline():
+            graph = create_graph(mock_openai_api_key, llm=LLMRoteirizado(responder=responder_banco_agil))
+            resultado = executar_conversa(graph, CONVERSAS["aumento_rejeitado_entrevista"], {})
+
+        estado = resultado["estado"]
+        assert estado["score"] != 250
+        assert estado["interview_data"] is None
+        assert estado["should_end"] is True
+
+    def test_cotacao_offline(self, mock_openai_api_key):
+        """Testa que a cotação é respondida sem acessar a API de câmbio."""
+        with dados_isolados(), cotacao_offline({"USD": 4.0}):
+            graph = create_graph(mock_openai_api_key, llm=LLMRoteirizado(responder=responder_banco_agil))
+            resultado = executar_conversa(graph, CONVERSAS["cotacao"][:4], {})
+
+        assert "1 USD = R$ 4.00" in resultado["estado"]["messages"][-1].content
+
+    def test_pedido_com_dois_assuntos_em_um_turno(self, mock_openai_api_key):
+        """Testa que limite e cotação são respondidos juntos, com os agentes em paralelo."""
+        with dados_isolados(), cotacao_offline({"EUR": 6.0}):
+            llm = LLMRoteirizado(responder=responder_banco_agil, latencia_segundos=0.3)
+            graph = create_graph(mock_openai_api_key, llm=llm)
+            latencias = {}
+            resultado = executar_conversa(graph, CONVERSAS["limite_e_cotacao"][:3], latencias)
+
+        estado = resultado["estado"]
+        resposta = estado["messages"][-1].content
+        assert "R$ 5000.00" in resposta and "1 EUR = R$ 6.00" in resposta
+        assert resposta.index("R$ 5000.00") < resposta.index("1 EUR")
+        assert estado["respostas_paralelas"] == []
+        assert estado["pending_redirect"] is None
+        # Três chamadas ao LLM em série (2 triagens + o mais lento dos ramos), e não quatro
+        assert sum(sum(duracoes) for duracoes in latencias.values()) < 1.1
+
+    def test_executar_replay_reporta_latencia_por_no(self):
+        """Testa que o relatório contém todos os nós exercitados e a vazão."""
+        resultado = executar_replay(repeticoes=1)
+
+        assert resultado["turnos"] == sum(len(turnos) for turnos in CONVERSAS.values())
+        assert set(resultado["nos"]) == {
+            "router", "triagem", "credito", "entrevista", "cambio",
+            "credito_paralelo", "cambio_paralelo", "juntar"
+        }
+        assert resultado["turnos_por_segundo"] > 0
+        assert resultado["chamadas_llm"] > 0
+
+    def test_replay_nao_altera_dados_originais(self):
+        """Testa que as gravações do replay acontecem em uma cópia dos CSVs."""
+        arquivo = os.path.join(BASE_DIR, "data", "clientes.csv")
+        with open(arquivo, encoding="utf-8") as f:
+            original = f.read()
+
+        executar_replay(repeticoes=1)
+
+        with open(arquivo, encoding="utf-8") as f:
+            assert f.read() == original
+
+    def test_percentil(self):
+        """Testa o percentil pelo posto mais próximo."""
+        valores = list(range(1, 101))
+
+        assert percentil(valores, 50) == 50
+        assert percentil(valores, 95) == 95
+        assert percentil([], 95) == 0.0
@@ -0,0 +1,115 @@
+"""Testes de integração para o streaming de respostas do grafo."""
+from langchain_core.messages import AIMessage, HumanMessage
+
+import threading
+
+from src.benchmark.fake_llm import LLMRoteirizado
+from src.core.admissao import get_controlador_admissao
+from src.core.graph import create_graph
+from src.core.instrumentacao import metricas
+from src.core.prazo import segundos_restantes
+from src.core.streaming import _texto_visivel, stream_resposta
+
+
+class LLMEspiao(LLMRoteirizado):
+    """LLM roteirizado que registra o prazo e a thread vistos em cada streaming."""
+
+    observacoes: list = []
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.observacoes.append((segundos_restantes(), threading.current_thread().name))
+        yield from super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def _graph_com_respostas(api_key, respostas):
+    """Cria o grafo real com um LLM roteirizado que responde com as mensagens dadas.
+
+    O modelo passa pelos mesmos invólucros da aplicação (instrumentação, prazo do
+    turno e controle de admissão), então os tokens precisam atravessá-los.
+    """
+    return create_graph(api_key, llm=LLMRoteirizado(roteiro=list(respostas)))
+
+
+class TestTextoVisivel:
+    """Testes para a filtragem do marcador de redirecionamento."""
+
+    def test_texto_sem_marcador_inalterado(self):
+        """Testa que texto comum é exibido integralmente."""
+        assert _texto_visivel("Informe seu CPF.") == "Informe seu CPF."
+
+    def test_remove_marcador_completo(self):
+        """Testa que o marcador e o destino não são exibidos."""
+        assert _texto_visivel("Certo! REDIRECIONAR: entrevista") == "Certo!"
+
+    def test_retem_prefixo_do_marcador(self):
+        """Testa que um possível início de marcador é retido."""
+        assert _texto_visivel("REDIR") == ""
+
+
+class TestStreamResposta:
+    """Testes para o streaming de tokens do grafo."""
+
+    def test_emite_tokens_antes_do_estado_final(self, mock_openai_api_key, authenticated_agent_state):
+        """Testa que tokens parciais chegam antes do evento final."""
+        graph = _graph_com_respostas(
+            mock_openai_api_key,
+            [AIMessage(content="REDIRECIONAR: cambio"), AIMessage(content="Olá! Qual moeda deseja consultar?")]
+        )
+        entrada = {**authenticated_agent_state, "messages": [HumanMessage(content="Cotação")]}
+
+        eventos = list(stream_resposta(graph, entrada))
+
+        tokens = [e["texto"] for e in eventos if e["tipo"] == "token"]
+        assert len(tokens) > 1
+        assert tokens[-1] == "Olá! Qual moeda deseja consultar?"
+        assert eventos[-1]["tipo"] == "final"
+        assert eventos[-1]["estado"]["messages"][-1].content == "Olá! Qual moeda deseja consultar?"
+
+    def test_nao_exibe_redirecionamento_da_triagem(self, mock_openai_api_key, authenticated_agent_state):
+        """Testa que o rótulo de redirecionamento nunca é exibido."""
+        graph = _graph_com_respostas(
+            mock_openai_api_key,
+            [AIMessage(content="REDIRECIONAR: cambio"), AIMessage(content="Qual moeda deseja consultar?")]
+        )
+        entrada = {**authenticated_agent_state, "messages": [HumanMessage(content="Cotação")]}
+
+        eventos = list(stream_resposta(graph, entrada))
+
+        tokens = [e["texto"] for e in eventos if e["tipo"] == "token"]
+        assert all("REDIRECIONAR" not in t for t in tokens)
+        assert tokens[-1] == "Qual moeda deseja consultar?"
+
+    def test_tokens_atravessam_prazo_admissao_e_instrumentacao(
+        self, mock_openai_api_key, authenticated_agent_state, monkeypatch
+    ):
+        """Testa que o streaming passa pelo prazo do turno, pela admissão e pela instrumentação."""
+        llm = LLMEspiao(roteiro=[AIMessage(content="REDIRECIONAR: cambio"),
+                                 AIMessage(content="Olá! Qual moeda deseja consultar?")])
+        graph = create_graph(mock_openai_api_key, llm=llm)
+
+        controlador = get_controlador_admissao()
+        assert controlador is not None
+        admissoes = []
+        admitir = controlador.admitir
+
+        def admitir_espiao(entrada, limite_segundos=None):
+            admissoes.append(limite_segundos)
+            return admitir(entrada, limite_segundos)
+
+        monkeypatch.setattr(controlador, "admitir", admitir_espiao)
+        chamadas_antes = sum(s["chamadas"] for s in metricas.instantaneo().get("llm", {}).values())
+        entrada = {**authenticated_agent_state, "messages": [HumanMessage(content="Cotação")]}
+
+        eventos = list(stream_resposta(graph, entrada))
+
+        tokens = [e["texto"] for e in eventos if e["tipo"] == "token"]
+        assert len(tokens) > 1
+        assert len(llm.observacoes) == 2
+        # O modelo roda na thread do prazo, com o tempo restante do turno no contexto
+        assert all(restante is not None and restante > 0 for restante, _ in llm.observacoes)
+        assert all(thread.startswith("prazo") for _, thread in llm.observacoes)
+        # Cada chamada é admitida com a espera limitada ao prazo do turno
+        assert len(admissoes) == 2
+        assert all(limite is not None and limite > 0 for limite in admissoes)
+        chamadas_depois = sum(s["chamadas"] for s in metricas.instantaneo().get("llm", {}).values())
+        assert chamadas_depois - chamadas_antes == 2
@@ -0,0 +1,223 @@
+"""Testes unitários para o controle de admissão das chamadas ao LLM."""
+import asyncio
+import threading
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+import pytest
+
+from src.core.admissao import (
+    TOKENS_RESPOSTA_ESTIMADOS, AdmissaoLocal, AdmissaoSqlite, LLMComAdmissao, estimar_tokens
+)
+from src.core.prazo import PrazoEsgotado, chamar_com_prazo
+
+
+class LLMLento:
+    """LLM falso que demora `atraso` segundos e conta as chamadas simultâneas."""
+
+    def __init__(self, atraso: float = 0.05, tokens: int = 10):
+        self.atraso = atraso
+        self.tokens = tokens
+        self.em_andamento = 0
+        self.pico = 0
+        self._lock = threading.Lock()
+
+    def _resposta(self):
+        return AIMessage(content="ok", usage_metadata={
+            "input_tokens": self.tokens, "output_tokens": 0, "total_tokens": self.tokens
+        })
+
+    def invoke(self, input, config=None, **kwargs):
+        with self._lock:
+            self.em_andamento += 1
+            self.pico = max(self.pico, self.em_andamento)
+        time.sleep(self.atraso)
+        with self._lock:
+            self.em_andamento -= 1
+        return self._resposta()
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.em_andamento += 1
+        self.pico = max(self.pico, self.em_andamento)
+        await asyncio.sleep(self.atraso)
+        self.em_andamento -= 1
+        return self._resposta()
+
+
+def _em_threads(funcao, quantidade: int):
+    threads = [threading.Thread(target=funcao, args=(i,)) for i in range(quantidade)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join(timeout=10)
+
+
+def test_estimar_tokens():
+    """Testa a estimativa: ~4 caracteres por token mais a reserva da resposta."""
+    assert estimar_tokens([HumanMessage(content="a" * 400)]) == 100 + TOKENS_RESPOSTA_ESTIMADOS
+    assert estimar_tokens("a" * 40) == 10 + TOKENS_RESPOSTA_ESTIMADOS
+
+
+class TestAdmissaoLocal:
+    """Testes para limite de chamadas, ordem da fila e orçamento de tokens."""
+
+    def test_limita_chamadas_em_voo(self):
+        """Testa que nunca há mais chamadas em andamento que o limite."""
+        llm = LLMLento()
+        controlado = LLMComAdmissao(llm, AdmissaoLocal(max_em_voo=2))
+
+        _em_threads(lambda i: controlado.invoke([HumanMessage(content="oi")]), 6)
+
+        assert llm.pico == 2
+
+    def test_fila_atende_na_ordem_de_chegada(self):
+        """Testa que as chamadas que esperam são admitidas na ordem em que chegaram."""
+        controlador = AdmissaoLocal(max_em_voo=1)
+        primeira = controlador.adquirir(1)
+        ordem = []
+
+        def chamar(i):
+            bilhete = controlador.adquirir(1)
+            ordem.append(i)
+            controlador.liberar(bilhete)
+
+        threads = [threading.Thread(target=chamar, args=(i,)) for i in range(5)]
+        for i, thread in enumerate(threads):
+            thread.start()
+            while controlador.tamanho_fila < i + 1:
+                time.sleep(0.001)
+        controlador.liberar(primeira)
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert ordem == [0, 1, 2, 3, 4]
+        assert controlador.em_voo == 0
+
+    def test_orcamento_de_tokens_por_minuto(self):
+        """Testa que, sem orçamento, a chamada espera o balde se recompor."""
+        # 6000 tokens/min = 100 tokens/s
+        controlador = AdmissaoLocal(max_em_voo=10, tokens_por_minuto=6000)
+        controlador.liberar(controlador.adquirir(6000))
+
+        inicio = time.perf_counter()
+        controlador.liberar(controlador.adquirir(20))
+        assert 0.15 <= time.perf_counter() - inicio < 1.0
+
+    def test_uso_real_corrige_o_orcamento(self):
+        """Testa que os tokens realmente usados substituem a estimativa no orçamento."""
+        controlador = AdmissaoLocal(max_em_voo=10, tokens_por_minuto=6000)
+        bilhete = controlador.adquirir(1000)
+        bilhete.tokens_usados = 100
+        controlador.liberar(bilhete)
+
+        assert controlador._tokens > 5800
+
+    @pytest.mark.asyncio
+    async def test_async_limita_e_nao_bloqueia_o_loop(self):
+        """Testa o limite com chamadas assíncronas no mesmo event loop."""
+        llm = LLMLento(atraso=0.05)
+        controlado = LLMComAdmissao(llm, AdmissaoLocal(max_em_voo=2))
+
+        await asyncio.gather(*(controlado.ainvoke([HumanMessage(content="oi")]) for _ in range(6)))
+
+        assert llm.pico == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelamento_sai_da_fila(self):
+        """Testa que uma chamada cancelada na fila não ocupa a vaga."""
+        controlador = AdmissaoLocal(max_em_voo=1)
+        bilhete = controlador.adquirir(1)
+
+        tarefa = asyncio.create_task(controlador.aadquirir(1))
+        await asyncio.sleep(0.01)
+        assert controlador.tamanho_fila == 1
+        tarefa.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tarefa
+
+        assert controlador.tamanho_fila == 0
+        controlador.liberar(bilhete)
+        assert controlador.em_voo == 0
+
+
+    def test_espera_termina_com_o_limite(self):
+        """Testa que a chamada desiste da fila no limite e não é admitida depois."""
+        controlador = AdmissaoLocal(max_em_voo=1)
+        bilhete = controlador.adquirir(1)
+
+        with pytest.raises(PrazoEsgotado):
+            controlador.adquirir(1, limite_segundos=0.05)
+
+        assert controlador.tamanho_fila == 0
+        controlador.liberar(bilhete)
+        assert controlador.em_voo == 0
+
+    @pytest.mark.asyncio
+    async def test_async_espera_termina_com_o_limite(self):
+        """Testa o limite de espera na admissão assíncrona."""
+        controlador = AdmissaoLocal(max_em_voo=1)
+        bilhete = controlador.adquirir(1)
+
+        with pytest.raises(PrazoEsgotado):
+            await controlador.aadquirir(1, limite_segundos=0.05)
+
+        assert controlador.tamanho_fila == 0
+        controlador.liberar(bilhete)
+        assert controlador.em_voo == 0
+
+    def test_chamada_abandonada_pelo_turno_sai_da_fila(self):
+        """Testa que o prazo do turno chega à fila: a chamada não roda depois que o turno desistiu."""
+        llm = LLMLento(atraso=0.01)
+        controlador = AdmissaoLocal(max_em_voo=1)
+        controlado = LLMComAdmissao(llm, controlador)
+        ocupada = controlador.adquirir(1)
+
+        with pytest.raises(PrazoEsgotado):
+            chamar_com_prazo({"prazo_turno": time.time() + 0.05}, "credito", controlado.invoke, "oi")
+        time.sleep(0.1)
+        controlador.liberar(ocupada)
+        time.sleep(0.05)
+
+        assert llm.pico == 0
+        assert controlador.tamanho_fila == 0
+
+
+class TestAdmissaoSqlite:
+    """Testes para a admissão compartilhada por um arquivo SQLite."""
+
+    def test_limite_vale_entre_controladores(self, tmp_path):
+        """Testa que dois controladores (como dois processos) respeitam o mesmo limite."""
+        caminho = str(tmp_path / "admissao.sqlite")
+        controladores = [AdmissaoSqlite(caminho, max_em_voo=1, intervalo_segundos=0.005) for _ in range(2)]
+        llm = LLMLento(atraso=0.03)
+
+        _em_threads(lambda i: LLMComAdmissao(llm, controladores[i % 2]).invoke("oi"), 4)
+
+        assert llm.pico == 1
+        for controlador in controladores:
+            controlador.fechar()
+
+    def test_espera_termina_com_o_limite(self, tmp_path):
+        """Testa que o bilhete sai da tabela quando o limite de espera termina."""
+        controlador = AdmissaoSqlite(str(tmp_path / "admissao.sqlite"), max_em_voo=1, intervalo_segundos=0.005)
+        bilhete = controlador.adquirir(1)
+
+        with pytest.raises(PrazoEsgotado):
+            controlador.adquirir(1, limite_segundos=0.05)
+
+        controlador.liberar(bilhete)
+        controlador.liberar(controlador.adquirir(1, limite_segundos=1.0))
+        controlador.fechar()
+
+    @pytest.mark.asyncio
+    async def test_async(self, tmp_path):
+        """Testa a admissão assíncrona via SQLite."""
+        controlador = AdmissaoSqlite(str(tmp_path / "admissao.sqlite"), max_em_voo=2, intervalo_segundos=0.005)
+        llm = LLMLento(atraso=0.03)
+        controlado = LLMComAdmissao(llm, controlador)
+
+        await asyncio.gather(*(controlado.ainvoke("oi") for _ in range(5)))
+
+        assert llm.pico == 2
+        controlador.fechar()
@@ -0,0 +1,36 @@
+"""Testes unitários para o filtro de Bloom de CPFs."""
+import pytest
+
+from src.benchmark.bloom import cpfs_sinteticos, medir_filtro
+from src.data_models.bloom import FiltroBloom
+
+
+class TestFiltroBloom:
+    """Testes para pertinência, taxa de falsos positivos e dimensionamento."""
+
+    def test_sem_falsos_negativos(self):
+        """Testa que todo CPF adicionado é sempre encontrado."""
+        cpfs = cpfs_sinteticos(2_000)
+        filtro = FiltroBloom.de_itens(cpfs)
+
+        assert all(cpf in filtro for cpf in cpfs)
+
+    def test_taxa_de_falsos_positivos_proxima_do_alvo(self):
+        """Testa que a taxa medida fica próxima da taxa pedida."""
+        resultado = medir_filtro(2_000, taxa=0.01, consultas=20_000, consultas_arquivo=5)
+
+        assert resultado["taxa_medida"] < 0.02
+        assert resultado["bytes_filtro"] < resultado["bytes_set"] / 10
+        assert resultado["autenticacao_com_filtro_us"] < resultado["autenticacao_sem_filtro_us"]
+
+    def test_dimensionamento(self):
+        """Testa o tamanho clássico: ~9,6 bits e 7 funções de hash por item para 1%."""
+        filtro = FiltroBloom(1_000, 0.01)
+
+        assert filtro.num_bits == 9586
+        assert filtro.num_hashes == 7
+
+    def test_taxa_invalida(self):
+        """Testa que a taxa precisa estar entre 0 e 1."""
+        with pytest.raises(ValueError):
+            FiltroBloom(10, 0)
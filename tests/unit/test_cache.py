@@ -0,0 +1,143 @@
+"""Testes unitários para o cache de respostas do LLM."""
+from unittest.mock import Mock
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.core.cache import CONSULTAS_CACHE_LLM, CacheLRU, CacheRespostasLLM
+from src.core.prometheus import registro_prometheus
+
+
+class RelogioFake:
+    """Relógio controlado manualmente para testar expiração."""
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+class TestCacheLRU:
+    """Testes para o cache LRU com TTL."""
+
+    def test_armazena_e_obtem_valor(self):
+        """Testa que um valor armazenado é recuperado."""
+        cache = CacheLRU()
+        cache.armazenar("a", 1)
+
+        assert cache.obter("a") == 1
+        assert cache.hits == 1
+        assert cache.misses == 0
+
+    def test_chave_ausente_conta_miss(self):
+        """Testa que chave inexistente é contada como miss."""
+        cache = CacheLRU()
+
+        assert cache.obter("inexistente") is None
+        assert cache.misses == 1
+
+    def test_expulsa_menos_usado(self):
+        """Testa que a entrada menos usada é expulsa ao exceder a capacidade."""
+        cache = CacheLRU(max_entradas=2)
+        cache.armazenar("a", 1)
+        cache.armazenar("b", 2)
+        cache.obter("a")
+        cache.armazenar("c", 3)
+
+        assert cache.obter("b") is None
+        assert cache.obter("a") == 1
+        assert cache.obter("c") == 3
+
+    def test_entrada_expira_apos_ttl(self):
+        """Testa que entradas expiram após o TTL."""
+        relogio = RelogioFake()
+        cache = CacheLRU(ttl_segundos=10, relogio=relogio)
+        cache.armazenar("a", 1)
+
+        relogio.agora = 11
+        assert cache.obter("a") is None
+        assert len(cache) == 0
+
+    def test_estatisticas(self):
+        """Testa o cálculo da taxa de acerto."""
+        cache = CacheLRU()
+        cache.armazenar("a", 1)
+        cache.obter("a")
+        cache.obter("b")
+
+        stats = cache.estatisticas()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["taxa_acerto"] == 0.5
+
+
+class TestCacheRespostasLLM:
+    """Testes para o cache de respostas do LLM."""
+
+    def test_chave_normaliza_espacos_e_caixa(self):
+        """Testa que variações de espaço e caixa geram a mesma chave."""
+        cache = CacheRespostasLLM()
+
+        chave1 = cache.chave("Prompt  do\nsistema", [HumanMessage(content="Quero  SAIR")])
+        chave2 = cache.chave("Prompt do sistema", [HumanMessage(content="quero sair")])
+
+        assert chave1 == chave2
+
+    def test_chave_considera_a_partir_da_ultima_resposta(self):
+        """Testa que as mensagens anteriores à última resposta do assistente não compõem a chave."""
+        cache = CacheRespostasLLM()
+
+        chave1 = cache.chave("P", [HumanMessage(content="a"), AIMessage(content="x"), HumanMessage(content="olá")])
+        chave2 = cache.chave("P", [HumanMessage(content="b"), AIMessage(content="x"), HumanMessage(content="olá")])
+
+        assert chave1 == chave2
+
+    def test_mesma_mensagem_em_contextos_diferentes(self):
+        """Testa que respostas curtas a perguntas diferentes não compartilham a entrada."""
+        cache = CacheRespostasLLM()
+        euro = AIMessage(content="", tool_calls=[{"name": "consultar_cotacao", "args": {"moeda": "EUR"}, "id": "1"}])
+        dolar = AIMessage(content="", tool_calls=[{"name": "consultar_cotacao", "args": {"moeda": "USD"}, "id": "2"}])
+
+        assert cache.chave("P", [AIMessage(content="Deseja ver o dólar?"), HumanMessage(content="sim")]) != \
+            cache.chave("P", [AIMessage(content="Deseja encerrar?"), HumanMessage(content="sim")])
+        assert cache.chave("P", [euro, HumanMessage(content="e o outro?")]) != \
+            cache.chave("P", [dolar, HumanMessage(content="e o outro?")])
+
+    def test_invocar_usa_cache_na_segunda_chamada(self):
+        """Testa que o LLM é chamado apenas uma vez para a mesma chave."""
+        cache = CacheRespostasLLM()
+        llm = Mock()
+        llm.invoke.return_value = AIMessage(content="Informe seu CPF.", id="original")
+
+        primeira = cache.invocar(llm, [], "chave")
+        segunda = cache.invocar(llm, [], "chave")
+
+        llm.invoke.assert_called_once()
+        assert segunda.content == primeira.content
+        assert segunda.id is None
+
+    def test_invocar_respeita_predicado_de_armazenamento(self):
+        """Testa que respostas rejeitadas pelo predicado não são armazenadas."""
+        cache = CacheRespostasLLM()
+        llm = Mock()
+        llm.invoke.return_value = AIMessage(content="Olá, João!")
+
+        cache.invocar(llm, [], "chave", armazenar_se=lambda resposta: False)
+        cache.invocar(llm, [], "chave", armazenar_se=lambda resposta: False)
+
+        assert llm.invoke.call_count == 2
+
+    def test_invocar_conta_hits_e_misses_no_registro(self):
+        """Testa que acertos e falhas do cache são exportados nas métricas."""
+        cache = CacheRespostasLLM()
+        llm = Mock()
+        llm.invoke.return_value = AIMessage(content="Informe seu CPF.")
+        hits = CONSULTAS_CACHE_LLM.valor(resultado="hit")
+        misses = CONSULTAS_CACHE_LLM.valor(resultado="miss")
+
+        cache.invocar(llm, [], "chave")
+        cache.invocar(llm, [], "chave")
+
+        assert CONSULTAS_CACHE_LLM.valor(resultado="hit") == hits + 1
+        assert CONSULTAS_CACHE_LLM.valor(resultado="miss") == misses + 1
+        assert 'banco_agil_llm_cache_total{resultado="hit"}' in registro_prometheus.exportar()
@@ -1,6 +1,8 @@
 """Testes unitários para operações de database."""
 import os
 import csv
+import threading
+from unittest.mock import patch
 import pytest
 
 from src.data_models.database import Database
@@ -302,3 +304,107 @@ class TestDatabaseIntegracao:
 
         cliente_final = mock_database.obter_cliente(cliente.cpf)
         assert cliente_final.limite_credito == limite_original
+
+
+class TestDatabaseConcorrencia:
+    """Testes para gravações concorrentes nos arquivos CSV."""
+
+    def test_atualizacoes_concorrentes_nao_se_perdem(self, mock_database):
+        """Testa que regravações simultâneas de clientes diferentes são preservadas."""
+        scores = {"12345678901": 701, "98765432100": 702, "11122233344": 703}
+
+        def atualizar(cpf, score):
+            for _ in range(20):
+                mock_database.atualizar_score(cpf, score)
+                assert mock_database.obter_cliente(cpf) is not None
+
+        threads = [threading.Thread(target=atualizar, args=item) for item in scores.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for cpf, score in scores.items():
+            assert mock_database.obter_cliente(cpf).score == score
+
+    def test_regravacao_nao_deixa_arquivos_temporarios(self, mock_database, temp_data_dir):
+        """Testa que a gravação atômica remove o arquivo temporário."""
+        mock_database.atualizar_score("12345678901", 720)
+
+        assert not [nome for nome in os.listdir(temp_data_dir) if nome.endswith(".tmp")]
+
+
+    def test_versao_cliente_muda_so_com_os_dados_dele(self, mock_database, sample_cliente):
+        """Testa que a versão de um cliente ignora as regravações que alteram outros clientes."""
+        antes = mock_database.versao_cliente(sample_cliente.cpf)
+
+        mock_database.atualizar_score("98765432100", 100)
+        assert mock_database.versao_cliente(sample_cliente.cpf) == antes
+
+        mock_database.atualizar_score(sample_cliente.cpf, 720)
+        assert mock_database.versao_cliente(sample_cliente.cpf) != antes
+        assert mock_database.versao_cliente("00000000000") is None
+        assert Database("/caminho/inexistente").versao_cliente(sample_cliente.cpf) is None
+
+    def test_versao_cliente_acompanha_outro_processo(self, mock_database, sample_cliente):
+        """Testa que uma regravação externa de mesmo tamanho é percebida pela versão."""
+        antes = mock_database.versao_cliente(sample_cliente.cpf)
+        outro_processo = Database(mock_database.base_path)
+        outro_processo.atualizar_score(sample_cliente.cpf, sample_cliente.score + 1)
+
+        assert mock_database.versao_cliente(sample_cliente.cpf) != antes
+
+    def test_versoes_guardadas_so_dos_clientes_lidos(self, mock_database, sample_cliente):
+        """Testa que a autenticação guarda só a versão do cliente lido e a consulta seguinte não relê o arquivo."""
+        mock_database.autenticar_cliente(sample_cliente.cpf, sample_cliente.data_nascimento)
+        assert set(mock_database._versoes) == {sample_cliente.cpf}
+
+        with patch.object(mock_database, "_abrir_leitura", wraps=mock_database._abrir_leitura) as leitura:
+            assert mock_database.versao_cliente(sample_cliente.cpf) is not None
+
+        leitura.assert_not_called()
+
+        mock_database.atualizar_score("98765432100", 100)
+        assert set(mock_database._versoes) == {sample_cliente.cpf}
+
+
+class TestDatabaseFiltroBloom:
+    """Testes para a recusa de CPFs inexistentes sem leitura do cadastro."""
+
+    def test_cpf_inexistente_nao_le_o_arquivo(self, mock_database):
+        """Testa que, com o filtro construído, um CPF inexistente não abre o arquivo."""
+        mock_database.obter_cliente("12345678901")
+
+        with patch.object(mock_database, "_abrir_leitura", wraps=mock_database._abrir_leitura) as leitura:
+            assert mock_database.autenticar_cliente("00000000000", "1990-05-15") is None
+            assert mock_database.obter_cliente("00000000000") is None
+
+        leitura.assert_not_called()
+
+    def test_cliente_adicionado_externamente(self, mock_database):
+        """Testa que o filtro é reconstruído quando o arquivo muda fora do Database."""
+        assert mock_database.obter_cliente("55566677788") is None
+
+        with open(mock_database.clientes_file, "a", encoding="utf-8") as f:
+            f.write("55566677788,Ana Lima,1988-01-01,2000.0,500\n")
+
+        assert mock_database.obter_cliente("55566677788").nome == "Ana Lima"
+
+    def test_regravacao_atualiza_o_filtro_sem_nova_leitura(self, mock_database, sample_cliente):
+        """Testa que, após atualizar o score, o filtro continua válido sem reler o cadastro."""
+        mock_database.obter_cliente(sample_cliente.cpf)
+        mock_database.atualizar_score(sample_cliente.cpf, 700)
+
+        with patch.object(mock_database, "_abrir_leitura", wraps=mock_database._abrir_leitura) as leitura:
+            assert mock_database.obter_cliente("00000000000") is None
+
+        leitura.assert_not_called()
+
+    def test_filtro_desativado(self, mock_database):
+        """Testa que, sem o filtro, a busca lê o arquivo como antes."""
+        db = Database(mock_database.base_path, filtro_bloom=False)
+
+        with patch.object(db, "_abrir_leitura", wraps=db._abrir_leitura) as leitura:
+            assert db.obter_cliente("00000000000") is None
+
+        leitura.assert_called_once()
@@ -0,0 +1,44 @@
+"""Testes unitários para a extração local de CPF e data de nascimento."""
+import pytest
+
+from src.core.extracao import cpf_valido, extrair_credenciais, extrair_data
+
+
+class TestExtrairCredenciais:
+    """Testes para os formatos de CPF e data aceitos."""
+
+    @pytest.mark.parametrize("texto", [
+        "12345678901", "123.456.789-01", "meu cpf é 123 456 789 01", "CPF: 123456789-01"
+    ])
+    def test_formatos_de_cpf(self, texto):
+        """Testa que o CPF é normalizado para 11 dígitos."""
+        assert extrair_credenciais(texto)[0] == "12345678901"
+
+    @pytest.mark.parametrize("texto", [
+        "1990-05-15", "15/05/1990", "15-05-1990", "15.05.1990", "15/5/90", "nasci em 15 de maio de 1990"
+    ])
+    def test_formatos_de_data(self, texto):
+        """Testa que a data é normalizada para AAAA-MM-DD."""
+        assert extrair_data(texto) == "1990-05-15"
+
+    def test_cpf_e_data_na_mesma_mensagem(self):
+        """Testa que os dígitos do CPF não são confundidos com a data."""
+        assert extrair_credenciais("123.456.789-01, 15/05/1990") == ("12345678901", "1990-05-15")
+
+    @pytest.mark.parametrize("texto", ["1990-02-30", "31/04/1990", "15/05/2999", "01/01/1850"])
+    def test_datas_impossiveis_descartadas(self, texto):
+        """Testa que datas inexistentes ou implausíveis não chegam ao cadastro."""
+        assert extrair_data(texto) is None
+
+    @pytest.mark.parametrize("texto", ["Quero 5000", "1234567890123", "123.456.789-0112"])
+    def test_sem_cpf(self, texto):
+        """Testa que números que não são CPF são ignorados."""
+        assert extrair_credenciais(texto)[0] is None
+
+
+def test_cpf_valido():
+    """Testa os dígitos verificadores (os CPFs de demonstração não são válidos)."""
+    assert cpf_valido("52998224725") is True
+    assert cpf_valido("12345678909") is True
+    assert cpf_valido("12345678901") is False
+    assert cpf_valido("11111111111") is False
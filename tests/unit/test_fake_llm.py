@@ -0,0 +1,96 @@
+"""Testes unitários para o LLM roteirizado usado nos benchmarks."""
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from src.agents.credito import SYSTEM_PROMPT as PROMPT_CREDITO
+from src.agents.triagem import SYSTEM_PROMPT_AUTENTICADO
+from src.benchmark.fake_llm import LLMRoteirizado, chamada_ferramenta, responder_banco_agil
+
+
+class TestLLMRoteirizado:
+    """Testes para a reprodução do roteiro."""
+
+    def test_reproduz_roteiro_em_ordem(self):
+        """Testa que as respostas são retornadas na ordem do roteiro."""
+        llm = LLMRoteirizado(roteiro=["primeira", AIMessage(content="segunda")])
+
+        assert llm.invoke("oi").content == "primeira"
+        assert llm.invoke("oi").content == "segunda"
+        assert llm.chamadas == 2
+
+    def test_roteiro_esgotado_sem_responder(self):
+        """Testa que um roteiro esgotado sem responder gera erro."""
+        llm = LLMRoteirizado(roteiro=[])
+
+        with pytest.raises(RuntimeError):
+            llm.invoke("oi")
+
+    def test_chamada_de_ferramenta(self):
+        """Testa que chamadas de ferramenta roteirizadas chegam ao agente."""
+        llm = LLMRoteirizado(roteiro=[chamada_ferramenta("consultar_cotacao_moeda", moeda="USD")])
+
+        resposta = llm.bind_tools([]).invoke("cotação do dólar")
+
+        assert resposta.tool_calls[0]["name"] == "consultar_cotacao_moeda"
+        assert resposta.tool_calls[0]["args"] == {"moeda": "USD"}
+
+    def test_respostas_repetidas_tem_ids_distintos(self):
+        """Testa que a mesma resposta reutilizada não substitui mensagens anteriores."""
+        resposta = AIMessage(content="igual")
+        llm = LLMRoteirizado(roteiro=[resposta, resposta])
+
+        assert llm.invoke("a").id != llm.invoke("b").id
+
+    def test_latencia_simulada(self):
+        """Testa que a latência configurada é aplicada a cada chamada."""
+        llm = LLMRoteirizado(roteiro=["ok"], latencia_segundos=0.05)
+
+        inicio = time.perf_counter()
+        llm.invoke("oi")
+
+        assert time.perf_counter() - inicio >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_ainvoke(self):
+        """Testa a invocação assíncrona."""
+        llm = LLMRoteirizado(roteiro=["assíncrono"], latencia_segundos=0.01)
+
+        resposta = await llm.ainvoke("oi")
+
+        assert resposta.content == "assíncrono"
+
+    def test_stream_em_tokens(self):
+        """Testa que o texto é emitido em vários chunks."""
+        llm = LLMRoteirizado(roteiro=["Informe seu CPF, por favor."])
+
+        chunks = [chunk.content for chunk in llm.stream("oi")]
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == "Informe seu CPF, por favor."
+
+
+class TestResponderBancoAgil:
+    """Testes para as regras que imitam o LLM em cada agente."""
+
+    def test_triagem_redireciona_para_credito(self):
+        """Testa que a triagem autenticada redireciona pedidos de limite."""
+        mensagens = [
+            SystemMessage(content=SYSTEM_PROMPT_AUTENTICADO.format(nome="João")),
+            HumanMessage(content="Qual é o meu limite?")
+        ]
+
+        assert responder_banco_agil(mensagens) == "REDIRECIONAR: credito"
+
+    def test_credito_solicita_aumento(self):
+        """Testa que pedidos de aumento chamam a ferramenta com o valor informado."""
+        mensagens = [
+            SystemMessage(content=PROMPT_CREDITO.format(cpf="12345678901", nome="João")),
+            HumanMessage(content="Quero aumentar meu limite para 7.000")
+        ]
+
+        resposta = responder_banco_agil(mensagens)
+
+        assert resposta.tool_calls[0]["name"] == "solicitar_aumento_limite"
+        assert resposta.tool_calls[0]["args"] == {"novo_limite": 7000.0}
@@ -0,0 +1,83 @@
+"""Testes unitários para a execução paralela de ferramentas."""
+from contextvars import ContextVar
+import time
+
+from src.core.ferramentas import FERRAMENTAS_EXPIRADAS, ExecutorFerramentas
+
+
+class FerramentaLenta:
+    """Ferramenta falsa que demora `atraso` segundos e devolve os argumentos."""
+
+    def __init__(self, atraso: float = 0.0, erro: Exception = None):
+        self.atraso = atraso
+        self.erro = erro
+
+    def invoke(self, args):
+        time.sleep(self.atraso)
+        if self.erro is not None:
+            raise self.erro
+        return {"mensagem": f"ok {args}"}
+
+
+class TestExecutorFerramentas:
+    """Testes para paralelismo, ordem, tempo limite e erros."""
+
+    def test_chamadas_em_paralelo(self):
+        """Testa que duas chamadas lentas custam o tempo da mais lenta, e não a soma."""
+        executor = ExecutorFerramentas(timeout_segundos=5)
+        inicio = time.perf_counter()
+        resultados = executor.executar([
+            ("a", FerramentaLenta(0.3), {"moeda": "USD"}),
+            ("b", FerramentaLenta(0.3), {"moeda": "EUR"})
+        ])
+        duracao = time.perf_counter() - inicio
+
+        assert duracao < 0.55
+        assert all(resultado.sucesso for resultado in resultados)
+
+    def test_resultados_na_ordem_das_chamadas(self):
+        """Testa que os resultados seguem a ordem pedida pelo LLM, e não a de conclusão."""
+        resultados = ExecutorFerramentas().executar([
+            ("lenta", FerramentaLenta(0.1), {"n": 1}),
+            ("rapida", FerramentaLenta(0.0), {"n": 2})
+        ])
+
+        assert [resultado.nome for resultado in resultados] == ["lenta", "rapida"]
+        assert resultados[1].resultado == {"mensagem": "ok {'n': 2}"}
+
+    def test_tempo_limite(self):
+        """Testa que uma chamada lenta expira sem descartar as demais."""
+        antes = FERRAMENTAS_EXPIRADAS.valor(ferramenta="lenta")
+        executor = ExecutorFerramentas(timeout_segundos=0.1)
+
+        resultados = executor.executar([
+            ("lenta", FerramentaLenta(1.0), {}),
+            ("rapida", FerramentaLenta(0.0), {})
+        ])
+
+        assert resultados[0].expirou and not resultados[0].sucesso
+        assert resultados[1].sucesso
+        assert FERRAMENTAS_EXPIRADAS.valor(ferramenta="lenta") == antes + 1
+
+    def test_erro_isolado(self):
+        """Testa que a falha de uma ferramenta não impede o resultado das outras."""
+        resultados = ExecutorFerramentas().executar([
+            ("falha", FerramentaLenta(erro=RuntimeError("indisponível")), {}),
+            ("ok", FerramentaLenta(), {})
+        ])
+
+        assert resultados[0].erro == "indisponível" and not resultados[0].expirou
+        assert resultados[1].sucesso
+
+    def test_propaga_contexto(self):
+        """Testa que as ferramentas enxergam o contexto (ex: medição em andamento) de quem as chamou."""
+        variavel = ContextVar("variavel", default=None)
+
+        class LerContexto:
+            def invoke(self, args):
+                return {"mensagem": variavel.get()}
+
+        variavel.set("turno-1")
+        resultados = ExecutorFerramentas().executar([("ler", LerContexto(), {})])
+
+        assert resultados[0].resultado == {"mensagem": "turno-1"}
@@ -0,0 +1,129 @@
+"""Testes unitários para o instantâneo do cliente guardado na sessão."""
+from unittest.mock import patch
+
+from src.data_models.instantaneo import (
+    LEITURAS_INSTANTANEO, campos_estado, com_instantaneo, gravar_cliente, instantaneo_do_estado, ler_cliente
+)
+from src.tools.credito import consultar_limite_credito, solicitar_aumento_limite
+from src.tools.score import calcular_novo_score
+
+
+class TestInstantaneo:
+    """Testes para a leitura e a escrita através do instantâneo."""
+
+    def test_primeira_leitura_vai_ao_cadastro(self, mock_database, sample_cliente):
+        """Testa que, sem instantâneo, o cliente é lido do cadastro com a versão atual."""
+        instantaneo = ler_cliente(mock_database, sample_cliente.cpf)
+
+        assert instantaneo["limite_credito"] == sample_cliente.limite_credito
+        assert instantaneo["versao"] == mock_database.versao_cliente(sample_cliente.cpf)
+
+    def test_instantaneo_vigente_nao_le_o_cadastro(self, mock_database, sample_cliente):
+        """Testa que um instantâneo da versão atual é devolvido sem ler o arquivo."""
+        instantaneo = ler_cliente(mock_database, sample_cliente.cpf)
+        hits = LEITURAS_INSTANTANEO.valor(resultado="hit")
+
+        with patch.object(mock_database, "obter_cliente") as mock_obter:
+            assert ler_cliente(mock_database, sample_cliente.cpf, instantaneo) is instantaneo
+
+        mock_obter.assert_not_called()
+        assert LEITURAS_INSTANTANEO.valor(resultado="hit") == hits + 1
+
+    def test_escrita_de_outra_sessao_invalida(self, mock_database, sample_cliente):
+        """Testa que uma alteração do cliente fora da sessão força nova leitura."""
+        instantaneo = ler_cliente(mock_database, sample_cliente.cpf)
+        mock_database.atualizar_score(sample_cliente.cpf, 900)
+
+        assert ler_cliente(mock_database, sample_cliente.cpf, instantaneo)["score"] == 900
+
+    def test_escrita_de_outro_cliente_nao_invalida(self, mock_database, sample_cliente):
+        """Testa que regravar o cadastro por causa de outro cliente mantém o instantâneo."""
+        instantaneo = ler_cliente(mock_database, sample_cliente.cpf)
+        mock_database.atualizar_score("98765432100", 100)
+
+        with patch.object(mock_database, "obter_cliente") as mock_obter:
+            assert ler_cliente(mock_database, sample_cliente.cpf, instantaneo) is instantaneo
+        mock_obter.assert_not_called()
+
+    def test_instantaneo_de_outro_cpf_e_ignorado(self, mock_database, sample_cliente):
+        """Testa que o instantâneo só vale para o CPF em que foi lido."""
+        instantaneo = ler_cliente(mock_database, "98765432100")
+
+        assert ler_cliente(mock_database, sample_cliente.cpf, instantaneo)["cpf"] == sample_cliente.cpf
+
+    def test_escrita_da_sessao_atualiza_o_instantaneo(self, mock_database, sample_cliente):
+        """Testa o write-through: o instantâneo continua valendo depois da própria escrita."""
+        instantaneo = ler_cliente(mock_database, sample_cliente.cpf)
+        atualizado = gravar_cliente(
+            mock_database, instantaneo, lambda: mock_database.atualizar_score(sample_cliente.cpf, 720), score=720
+        )
+
+        assert atualizado["score"] == 720
+        with patch.object(mock_database, "obter_cliente") as mock_obter:
+            assert ler_cliente(mock_database, sample_cliente.cpf, atualizado)["score"] == 720
+        mock_obter.assert_not_called()
+
+    def test_escrita_concorrente_invalida_o_instantaneo(self, mock_database, sample_cliente):
+        """Testa que, com outra alteração do mesmo cliente no intervalo, o instantâneo deixa de valer."""
+        instantaneo = ler_cliente(mock_database, sample_cliente.cpf)
+
+        def escrever():
+            mock_database.atualizar_score(sample_cliente.cpf, 720)
+            mock_database.atualizar_score(sample_cliente.cpf, 650)
+
+        atualizado = gravar_cliente(mock_database, instantaneo, escrever, score=720)
+
+        assert ler_cliente(mock_database, sample_cliente.cpf, atualizado)["score"] == 650
+
+    def test_ida_e_volta_pelo_estado(self, mock_database, sample_cliente):
+        """Testa que o instantâneo sobrevive aos campos do estado da conversa."""
+        instantaneo = ler_cliente(mock_database, sample_cliente.cpf)
+        state = {**campos_estado(instantaneo), "cpf": sample_cliente.cpf, "nome_cliente": sample_cliente.nome}
+
+        assert instantaneo_do_estado(state) == instantaneo
+        assert com_instantaneo({}, {"cpf": "1"}) == {"cpf": "1"}
+
+
+class TestFerramentasComInstantaneo:
+    """Testes para as ferramentas de crédito e score com o instantâneo da sessão."""
+
+    def test_consulta_servida_pelo_instantaneo(self, mock_database, sample_cliente):
+        """Testa que a consulta de limite não relê o cadastro com um instantâneo vigente."""
+        instantaneo = ler_cliente(mock_database, sample_cliente.cpf)
+
+        with patch('src.tools.credito.db', mock_database), \
+                patch.object(mock_database, "obter_cliente") as mock_obter:
+            result = consultar_limite_credito.invoke({"cpf": sample_cliente.cpf, "instantaneo": instantaneo})
+
+        mock_obter.assert_not_called()
+        assert result["limite_credito"] == sample_cliente.limite_credito
+
+    def test_aumento_aprovado_atualiza_o_instantaneo(self, mock_database, sample_cliente_alto_score):
+        """Testa que o novo limite aprovado vai para o cadastro e para o instantâneo."""
+        instantaneo = ler_cliente(mock_database, sample_cliente_alto_score.cpf)
+
+        with patch('src.tools.credito.db', mock_database):
+            result = solicitar_aumento_limite.invoke({
+                "cpf": sample_cliente_alto_score.cpf, "novo_limite": 20000.0, "instantaneo": instantaneo
+            })
+            with patch.object(mock_database, "obter_cliente") as mock_obter:
+                consulta = consultar_limite_credito.invoke({
+                    "cpf": sample_cliente_alto_score.cpf, "instantaneo": result["instantaneo"]
+                })
+
+        mock_obter.assert_not_called()
+        assert consulta["limite_credito"] == 20000.0
+        assert mock_database.obter_cliente(sample_cliente_alto_score.cpf).limite_credito == 20000.0
+
+    def test_novo_score_atualiza_o_instantaneo(self, mock_database, sample_cliente):
+        """Testa que o score recalculado vai para o cadastro e para o instantâneo."""
+        instantaneo = ler_cliente(mock_database, sample_cliente.cpf)
+
+        with patch('src.tools.score.db', mock_database):
+            result = calcular_novo_score.invoke({
+                "cpf": sample_cliente.cpf, "renda_mensal": 5000, "tipo_emprego": "formal",
+                "despesas_fixas": 2000, "num_dependentes": 0, "tem_dividas": False, "instantaneo": instantaneo
+            })
+
+        assert result["instantaneo"]["score"] == result["novo_score"]
+        assert ler_cliente(mock_database, sample_cliente.cpf, result["instantaneo"]) is result["instantaneo"]
@@ -0,0 +1,128 @@
+"""Testes unitários para a instrumentação de agentes, LLM, ferramentas e Database."""
+import json
+import logging
+
+import pytest
+
+from src.benchmark.fake_llm import LLMRoteirizado, responder_banco_agil
+from src.benchmark.replay import CONVERSAS, cotacao_offline, dados_isolados, executar_conversa
+from src.core.graph import create_graph
+from src.core.instrumentacao import (
+    RegistroMetricas,
+    acumular,
+    handler_metricas,
+    instrumentar,
+    instrumentar_runnable,
+    medir,
+    metricas,
+)
+
+
+@pytest.fixture
+def registro_limpo():
+    metricas.limpar()
+    yield metricas
+    metricas.limpar()
+
+
+class TestRegistroMetricas:
+    """Testes para a agregação das medições."""
+
+    def test_agrega_por_categoria_e_nome(self):
+        """Testa a soma de chamadas, duração e valores acumulados."""
+        registro = RegistroMetricas()
+        registro.registrar("llm", "triagem", 0.2, tokens_prompt=100, tokens_resposta=10)
+        registro.registrar("llm", "triagem", 0.4, erro=True, tokens_prompt=50)
+
+        serie = registro.instantaneo()["llm"]["triagem"]
+        assert serie["chamadas"] == 2
+        assert serie["erros"] == 1
+        assert serie["duracao_total_s"] == pytest.approx(0.6)
+        assert serie["duracao_min_s"] == 0.2
+        assert serie["duracao_max_s"] == 0.4
+        assert serie["tokens_prompt"] == 150
+        assert serie["tokens_resposta"] == 10
+
+    def test_exportar_json(self):
+        """Testa que o dump é JSON válido com as mesmas séries."""
+        registro = RegistroMetricas()
+        registro.registrar("database", "obter_cliente", 0.01, bytes_lidos=300)
+
+        assert json.loads(registro.exportar_json()) == registro.instantaneo()
+
+
+class TestMedicao:
+    """Testes para o context manager e o decorador de medição."""
+
+    def test_medir_com_valores_acumulados(self, registro_limpo):
+        """Testa que `acumular` soma valores à medição em andamento."""
+        with medir("database", "leitura"):
+            acumular(bytes_lidos=100)
+            acumular(bytes_lidos=20)
+
+        assert registro_limpo.instantaneo()["database"]["leitura"]["bytes_lidos"] == 120
+
+    def test_acumular_fora_de_medicao_e_ignorado(self, registro_limpo):
+        """Testa que `acumular` sem medição em andamento não falha nem registra."""
+        acumular(bytes_lidos=10)
+        assert registro_limpo.instantaneo() == {}
+
+    def test_erro_e_contabilizado(self, registro_limpo):
+        """Testa que exceções marcam a medição como erro e são propagadas."""
+        @instrumentar("agente")
+        def falha():
+            raise ValueError("falhou")
+
+        with pytest.raises(ValueError):
+            falha()
+
+        assert registro_limpo.instantaneo()["agente"]["falha"]["erros"] == 1
+
+    def test_linha_de_log_estruturada(self, registro_limpo, caplog):
+        """Testa a emissão de uma linha JSON por medição no nível INFO."""
+        with caplog.at_level(logging.INFO, logger="src.core.instrumentacao"):
+            with medir("ferramenta", "consultar_limite_credito"):
+                pass
+
+        evento = json.loads(caplog.records[-1].getMessage())
+        assert evento["evento"] == "metrica"
+        assert evento["categoria"] == "ferramenta"
+        assert evento["nome"] == "consultar_limite_credito"
+        assert evento["erro"] is False
+
+    def test_database_registra_bytes(self, registro_limpo, mock_database, sample_cliente):
+        """Testa que os métodos do Database registram bytes lidos e gravados."""
+        mock_database.obter_cliente(sample_cliente.cpf)
+        mock_database.atualizar_score(sample_cliente.cpf, 700)
+
+        series = registro_limpo.instantaneo()["database"]
+        assert series["obter_cliente"]["bytes_lidos"] > 0
+        assert series["atualizar_score"]["bytes_escritos"] > 0
+
+
+class TestHandlerMetricas:
+    """Testes para a medição de LLM e ferramentas via callbacks."""
+
+    def test_instrumentar_runnable_e_idempotente(self):
+        """Testa que o handler não é anexado duas vezes."""
+        llm = LLMRoteirizado(roteiro=["ok"])
+        instrumentar_runnable(llm)
+        instrumentar_runnable(llm)
+
+        assert llm.callbacks.count(handler_metricas) == 1
+
+    def test_grafo_registra_agentes_llm_e_ferramentas(self, registro_limpo, mock_openai_api_key):
+        """Testa a medição de uma conversa pelo grafo, com tokens agrupados por nó."""
+        with dados_isolados(), cotacao_offline():
+            graph = create_graph(mock_openai_api_key, llm=LLMRoteirizado(responder=responder_banco_agil))
+            executar_conversa(graph, CONVERSAS["consulta_limite"], {})
+
+        series = registro_limpo.instantaneo()
+        assert series["agente"]["triagem"]["chamadas"] > 0
+        assert series["llm"]["triagem"]["tokens_prompt"] > 0
+        assert series["llm"]["credito"]["tokens_resposta"] > 0
+        assert series["ferramenta"]["consultar_limite_credito"]["chamadas"] == 1
+        assert series["database"]["autenticar_cliente"]["chamadas"] > 0
+        # O limite é servido pelo instantâneo guardado na autenticação, sem reler o cadastro
+        assert "obter_cliente" not in series["database"]
+
@@ -0,0 +1,119 @@
+"""Testes unitários para o interpretador local das respostas da entrevista."""
+import pytest
+
+from src.benchmark.corpus_entrevista import CORPUS_ENTREVISTA
+from src.benchmark.interpretacao import avaliar_corpus
+from src.core.interpretacao import (
+    detectar_intencao_saida,
+    interpretar_num_dependentes,
+    interpretar_sim_nao,
+    interpretar_tipo_emprego,
+    interpretar_valor_monetario,
+)
+
+
+class TestInterpretarValorMonetario:
+    """Testes para valores monetários em português."""
+
+    @pytest.mark.parametrize("texto,esperado", [
+        ("5 mil", 5000.0),
+        ("3.5k", 3500.0),
+        ("R$ 5.000,00", 5000.0),
+        ("2.500", 2500.0),
+        ("dois mil", 2000.0),
+    ])
+    def test_formatos_comuns(self, texto, esperado):
+        """Testa os formatos mais comuns de valores."""
+        assert interpretar_valor_monetario(texto) == esperado
+
+    def test_multiplos_valores_sao_ambiguos(self):
+        """Testa que faixas de valores não são interpretadas."""
+        assert interpretar_valor_monetario("entre 4 e 5 mil") is None
+
+    @pytest.mark.parametrize("texto", ["12 mil anuais", "60 mil por ano", "500 por semana", "150 por dia"])
+    def test_outros_periodos_sao_ambiguos(self, texto):
+        """Testa que valores anuais, semanais ou diários não são lidos como mensais."""
+        assert interpretar_valor_monetario(texto) is None
+
+    @pytest.mark.parametrize("texto", ["-500", "menos 500", "R$ -1.200,00", "- 2 mil", "menos dois mil"])
+    def test_valores_negativos_sao_ambiguos(self, texto):
+        """Testa que o sinal negativo não é descartado: o valor fica para o LLM."""
+        assert interpretar_valor_monetario(texto) is None
+
+
+class TestInterpretarTipoEmprego:
+    """Testes para o tipo de emprego."""
+
+    def test_variacoes_formais(self):
+        """Testa sinônimos de emprego formal."""
+        assert interpretar_tipo_emprego("CLT") == "formal"
+        assert interpretar_tipo_emprego("carteira assinada") == "formal"
+
+    def test_sem_carteira_e_autonomo(self):
+        """Testa que a ausência de carteira não é confundida com emprego formal."""
+        assert interpretar_tipo_emprego("não tenho carteira assinada") == "autonomo"
+
+    def test_negacao_e_ambigua(self):
+        """Testa que negações não cobertas retornam None."""
+        assert interpretar_tipo_emprego("não sou CLT") is None
+
+
+class TestInterpretarDependentesESimNao:
+    """Testes para dependentes e respostas de sim/não."""
+
+    def test_dependentes_limitados_a_tres(self):
+        """Testa que 3 ou mais dependentes resultam em 3."""
+        assert interpretar_num_dependentes("5") == 3
+        assert interpretar_num_dependentes("3 ou mais") == 3
+
+    def test_nenhum_dependente(self):
+        """Testa respostas negativas para dependentes."""
+        assert interpretar_num_dependentes("nenhum") == 0
+
+    def test_sim_nao(self):
+        """Testa respostas afirmativas, negativas e ambíguas."""
+        assert interpretar_sim_nao("Sim, tenho") is True
+        assert interpretar_sim_nao("Não tenho") is False
+        assert interpretar_sim_nao("talvez") is None
+
+    @pytest.mark.parametrize("texto", ["não sei", "acho que não", "acho que sim", "sei lá", "não tenho certeza"])
+    def test_incerteza_e_ambigua(self, texto):
+        """Testa que respostas incertas não são lidas como sim ou não."""
+        assert interpretar_sim_nao(texto) is None
+
+
+class TestDetectarIntencaoSaida:
+    """Testes para o detector local de pedidos de encerramento."""
+
+    @pytest.mark.parametrize("texto", [
+        "sair", "Quero sair", "tchau!", "Até logo", "não quero mais", "pode cancelar", "Deixa pra lá, quero sair",
+        "encerrar o atendimento", "Ok, obrigado. Tchau", "quero encerrar a conversa por aqui"
+    ])
+    def test_pedidos_de_saida(self, texto):
+        """Testa formas comuns de pedir o encerramento."""
+        assert detectar_intencao_saida(texto) is True
+
+    @pytest.mark.parametrize("texto", [
+        "Olá", "12345678901", "não quero sair", "não vou cancelar", "saiu o resultado?",
+        "quero cancelar meu cartão", "finalizar uma compra", "como faço para sair do cheque especial?",
+        "preciso encerrar uma conta", "meu CPF é 12345678901, quero cancelar uma cobrança"
+    ])
+    def test_mensagens_sem_saida(self, texto):
+        """Testa que saudações, dados, negações e pedidos sobre outros assuntos não encerram o atendimento."""
+        assert detectar_intencao_saida(texto) is False
+
+
+class TestCorpusEntrevista:
+    """Testes de acurácia sobre o corpus rotulado."""
+
+    def test_nenhum_erro_confiante(self):
+        """Respostas interpretadas localmente nunca podem divergir do rótulo."""
+        assert avaliar_corpus()["erros_confiantes"] == []
+
+    def test_acuracia_minima(self):
+        """Testa a acurácia e a cobertura mínimas sobre o corpus."""
+        resultado = avaliar_corpus()
+
+        assert resultado["total"] == len(CORPUS_ENTREVISTA)
+        assert resultado["acuracia"] >= 0.95
+        assert resultado["cobertura"] >= 0.70
@@ -0,0 +1,140 @@
+"""Testes unitários para o limitador de tentativas de autenticação."""
+import pytest
+
+from src.core.limitador import LimitadorSqlite, LimitadorTaxa, identificar_cliente
+
+
+class RelogioFake:
+    """Relógio controlado manualmente para testar a reposição de fichas."""
+
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def _limitador(capacidade: int = 3, janela: float = 60.0, max_chaves: int = 100):
+    relogio = RelogioFake()
+    return LimitadorTaxa(capacidade, janela, max_chaves, relogio=relogio), relogio
+
+
+class TestLimitadorTaxa:
+    """Testes para os baldes de fichas por chave."""
+
+    def test_libera_ate_a_capacidade(self):
+        """Testa que as tentativas são liberadas até esgotar o balde."""
+        limitador, _ = _limitador(capacidade=3)
+
+        assert [limitador.tentar("cpf:1") for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limitador.tentar("cpf:1") == pytest.approx(20.0)
+
+    def test_fichas_voltam_com_o_tempo(self):
+        """Testa que uma ficha volta a cada janela/capacidade segundos."""
+        limitador, relogio = _limitador(capacidade=3, janela=60.0)
+        for _ in range(3):
+            limitador.tentar("cpf:1")
+
+        relogio.agora = 19.0
+        assert limitador.tentar("cpf:1") > 0
+        relogio.agora = 20.0
+        assert limitador.tentar("cpf:1") == 0.0
+
+    def test_chaves_sao_independentes(self):
+        """Testa que esgotar um CPF não afeta outro."""
+        limitador, _ = _limitador(capacidade=1)
+        limitador.tentar("cpf:1")
+
+        assert limitador.tentar("cpf:1") > 0
+        assert limitador.tentar("cpf:2") == 0.0
+
+    def test_recusa_nao_consome_das_outras_chaves(self):
+        """Testa que a reserva é tudo ou nada entre as chaves."""
+        limitador, _ = _limitador(capacidade=2)
+        limitador.tentar("cliente:a")
+        limitador.tentar("cliente:a")
+
+        assert limitador.tentar("cpf:1", "cliente:a") > 0
+        # O CPF continua com as duas fichas
+        assert limitador.tentar("cpf:1") == 0.0
+        assert limitador.tentar("cpf:1") == 0.0
+
+    def test_devolver_restaura_a_ficha(self):
+        """Testa que uma tentativa bem-sucedida não conta."""
+        limitador, _ = _limitador(capacidade=1)
+        limitador.tentar("cpf:1")
+        limitador.devolver("cpf:1")
+
+        assert limitador.tentar("cpf:1") == 0.0
+
+    def test_baldes_cheios_expiram(self):
+        """Testa que baldes parados por uma janela inteira são esquecidos."""
+        limitador, relogio = _limitador(janela=60.0)
+        limitador.tentar("cpf:1")
+        relogio.agora = 30.0
+        limitador.tentar("cpf:2")
+
+        relogio.agora = 60.0
+        limitador.tentar("cpf:3")
+        assert len(limitador) == 2
+
+    def test_memoria_limitada(self):
+        """Testa que, acima do máximo de chaves, a menos usada é descartada."""
+        limitador, _ = _limitador(max_chaves=2)
+        for chave in ("cpf:1", "cpf:2", "cpf:3"):
+            limitador.tentar(chave)
+
+        assert len(limitador) == 2
+
+
+class TestLimitadorSqlite:
+    """Testes para os baldes compartilhados entre processos."""
+
+    def test_processos_compartilham_as_fichas(self, tmp_path):
+        """Testa que dois limitadores no mesmo arquivo (ex: dois workers) somam as tentativas."""
+        relogio = RelogioFake()
+        caminho = str(tmp_path / "limitador.sqlite")
+        worker_a = LimitadorSqlite(caminho, 2, 60.0, relogio=relogio)
+        worker_b = LimitadorSqlite(caminho, 2, 60.0, relogio=relogio)
+
+        assert worker_a.tentar("cpf:1") == 0.0
+        assert worker_b.tentar("cpf:1") == 0.0
+        assert worker_a.tentar("cpf:1") == pytest.approx(30.0)
+
+        worker_b.devolver("cpf:1")
+        assert worker_a.tentar("cpf:1") == 0.0
+        worker_a.fechar()
+        worker_b.fechar()
+
+    def test_expira_e_limita_as_chaves(self, tmp_path):
+        """Testa a expiração dos baldes cheios e o máximo de chaves no arquivo."""
+        relogio = RelogioFake()
+        limitador = LimitadorSqlite(str(tmp_path / "limitador.sqlite"), 3, 60.0, max_chaves=2, relogio=relogio)
+        for chave in ("cpf:1", "cpf:2", "cpf:3"):
+            relogio.agora += 1
+            limitador.tentar(chave)
+        assert len(limitador) == 2
+
+        relogio.agora += 60.0
+        limitador.tentar("cpf:4")
+        assert len(limitador) == 1
+        limitador.fechar()
+
+
+class TestIdentificarCliente:
+    """Testes para o identificador do cliente usado pelo limitador."""
+
+    def test_conexao_direta_usa_o_ip(self):
+        """Testa que, sem proxy confiável, vale o IP da conexão (X-Forwarded-For é ignorado)."""
+        assert identificar_cliente("200.1.1.1", "10.0.0.1", "sessao") == "200.1.1.1"
+
+    def test_atras_do_proxy_usa_o_encaminhado(self):
+        """Testa que, atrás do balanceador, vale o último endereço não confiável de X-Forwarded-For."""
+        proxies = ["10.0.0.2", "10.0.0.3"]
+
+        assert identificar_cliente("10.0.0.2", "1.2.3.4, 200.1.1.1, 10.0.0.3", "sessao", proxies) == "200.1.1.1"
+
+    def test_sem_endereco_usa_a_sessao(self):
+        """Testa que, sem IP real do cliente, vale a sessão em vez do IP do balanceador."""
+        assert identificar_cliente("10.0.0.2", None, "sessao", ["10.0.0.2"]) == "sessao"
+        assert identificar_cliente(None, None, "sessao") == "sessao"
@@ -0,0 +1,115 @@
+"""Testes unitários para o prazo de cada turno."""
+import asyncio
+import time
+
+import pytest
+
+from unittest.mock import Mock
+
+from src.core.ferramentas import ExecutorFerramentas
+from src.core.prazo import (
+    PRAZOS_ESGOTADOS, LLMComPrazo, PrazoEsgotado, achamar_com_prazo, chamar_com_prazo, definir_prazo,
+    limitar_timeout, novo_prazo, segundos_restantes, tempo_restante
+)
+
+
+def _lenta(segundos: float, valor: str = "ok") -> str:
+    time.sleep(segundos)
+    return valor
+
+
+def test_novo_prazo_e_tempo_restante():
+    """Testa que o prazo é contado a partir de agora e que sem orçamento não há prazo."""
+    state = {"prazo_turno": novo_prazo(10)}
+    assert 9 < tempo_restante(state) <= 10
+    assert novo_prazo(0) is None
+    assert tempo_restante({}) is None
+
+
+def test_sem_prazo_chama_diretamente():
+    """Testa que, sem prazo no estado, a chamada acontece normalmente."""
+    assert chamar_com_prazo({}, "credito", _lenta, 0, "valor") == "valor"
+
+
+def test_chamada_dentro_do_prazo():
+    """Testa que uma chamada rápida devolve o seu resultado."""
+    assert chamar_com_prazo({"prazo_turno": time.time() + 5}, "credito", _lenta, 0.01) == "ok"
+
+
+def test_chamada_lenta_esgota_o_prazo():
+    """Testa que o turno deixa de esperar pela chamada quando o prazo termina."""
+    antes = PRAZOS_ESGOTADOS.valor(agente="cambio")
+    inicio = time.perf_counter()
+    with pytest.raises(PrazoEsgotado):
+        chamar_com_prazo({"prazo_turno": time.time() + 0.1}, "cambio", _lenta, 1.0)
+
+    assert time.perf_counter() - inicio < 0.5
+    assert PRAZOS_ESGOTADOS.valor(agente="cambio") == antes + 1
+
+
+def test_prazo_vencido_nem_chama():
+    """Testa que, com o prazo já vencido, a chamada nem é feita."""
+    chamadas = []
+    with pytest.raises(PrazoEsgotado):
+        chamar_com_prazo({"prazo_turno": time.time() - 1}, "triagem", chamadas.append, 1)
+    assert chamadas == []
+
+
+@pytest.mark.asyncio
+async def test_async_cancela_chamada_lenta():
+    """Testa que a chamada assíncrona é cancelada quando o prazo termina."""
+    with pytest.raises(PrazoEsgotado):
+        await achamar_com_prazo({"prazo_turno": time.time() + 0.05}, "credito", asyncio.sleep(1))
+
+    assert await achamar_com_prazo({"prazo_turno": time.time() + 5}, "credito", asyncio.sleep(0, "ok")) == "ok"
+
+
+def test_prazo_chega_a_chamada():
+    """Testa que a chamada enxerga o prazo do turno e limita por ele os seus timeouts."""
+    restante = chamar_com_prazo({"prazo_turno": time.time() + 5}, "credito", segundos_restantes)
+
+    assert 4 < restante <= 5
+    assert segundos_restantes() is None
+    assert chamar_com_prazo({"prazo_turno": time.time() + 5}, "cambio", limitar_timeout, 10) <= 5
+    assert limitar_timeout(10) == 10
+
+
+@pytest.mark.asyncio
+async def test_async_prazo_chega_a_chamada():
+    """Testa que a chamada assíncrona também enxerga o prazo do turno."""
+    async def restante():
+        return segundos_restantes()
+
+    assert 4 < await achamar_com_prazo({"prazo_turno": time.time() + 5}, "credito", restante()) <= 5
+    assert segundos_restantes() is None
+
+
+def test_llm_recebe_o_restante_como_timeout():
+    """Testa que a requisição ao LLM leva como timeout o que resta do prazo."""
+    llm = Mock()
+    com_prazo = LLMComPrazo(llm)
+
+    com_prazo.invoke("oi")
+    assert "timeout" not in llm.invoke.call_args.kwargs
+
+    chamar_com_prazo({"prazo_turno": time.time() + 5}, "credito", com_prazo.invoke, "oi")
+    assert 4 < llm.invoke.call_args.kwargs["timeout"] <= 5
+
+    token = definir_prazo(time.time() - 1)
+    try:
+        with pytest.raises(PrazoEsgotado):
+            com_prazo.invoke("oi")
+    finally:
+        token.var.reset(token)
+
+
+def test_ferramentas_recebem_o_prazo():
+    """Testa que cada ferramenta executada enxerga o seu tempo limite como prazo."""
+    ferramenta = Mock()
+    ferramenta.invoke.side_effect = lambda args: {"restante": segundos_restantes()}
+    executor = ExecutorFerramentas(timeout_segundos=30)
+
+    resultado = executor.executar([("f", ferramenta, {})], limite_segundos=2)[0]
+    executor.encerrar()
+
+    assert 1 < resultado.resultado["restante"] <= 2
@@ -0,0 +1,132 @@
+"""Testes unitários para as métricas no formato do Prometheus."""
+from urllib.request import urlopen
+
+import pytest
+
+from src.core.instrumentacao import medir
+from src.core.prometheus import (
+    Histograma,
+    RegistroPrometheus,
+    iniciar_servidor_metricas,
+    parar_servidor_metricas,
+    registro_prometheus,
+)
+
+
+class TestRegistroPrometheus:
+    """Testes para contadores, histogramas e a exposição em texto."""
+
+    def test_contador_por_rotulos(self):
+        """Testa a exposição de um contador com rótulos."""
+        registro = RegistroPrometheus()
+        contador = registro.contador("pedidos_total", "Pedidos", ("resultado",))
+        contador.incrementar(resultado="aprovado")
+        contador.incrementar(2, resultado="rejeitado")
+
+        texto = registro.exportar()
+        assert "# TYPE pedidos_total counter" in texto
+        assert 'pedidos_total{resultado="aprovado"} 1' in texto
+        assert 'pedidos_total{resultado="rejeitado"} 2' in texto
+
+    def test_contador_nao_decrementa(self):
+        """Testa que contadores rejeitam valores negativos."""
+        contador = RegistroPrometheus().contador("x_total", "X")
+        with pytest.raises(ValueError):
+            contador.incrementar(-1)
+
+    def test_rotulos_invalidos(self):
+        """Testa que rótulos diferentes dos declarados são rejeitados."""
+        contador = RegistroPrometheus().contador("x_total", "X", ("agente",))
+        with pytest.raises(ValueError):
+            contador.incrementar(tipo="a")
+
+    def test_medidor(self):
+        """Testa que o medidor expõe o último valor definido."""
+        registro = RegistroPrometheus()
+        medidor = registro.medidor("sessoes_ativas", "Sessões")
+        medidor.definir(5)
+        medidor.definir(3)
+
+        assert "# TYPE sessoes_ativas gauge" in registro.exportar()
+        assert "sessoes_ativas 3" in registro.exportar()
+
+    def test_histograma_buckets_cumulativos(self):
+        """Testa buckets cumulativos, soma e contagem."""
+        histograma = Histograma("latencia_segundos", "Latência", ("agente",), buckets=(0.1, 1.0))
+        for valor in (0.05, 0.1, 0.5, 3.0):
+            histograma.observar(valor, agente="triagem")
+
+        linhas = histograma.exportar()
+        assert 'latencia_segundos_bucket{agente="triagem",le="0.1"} 2' in linhas
+        assert 'latencia_segundos_bucket{agente="triagem",le="1"} 3' in linhas
+        assert 'latencia_segundos_bucket{agente="triagem",le="+Inf"} 4' in linhas
+        assert 'latencia_segundos_sum{agente="triagem"} 3.65' in linhas
+        assert 'latencia_segundos_count{agente="triagem"} 4' in linhas
+
+    def test_buckets_configuraveis(self):
+        """Testa que os buckets padrão configurados valem para novos histogramas."""
+        registro = RegistroPrometheus()
+        registro.configurar_buckets([0.5, 2.0])
+
+        assert registro.histograma("h", "H").buckets == (0.5, 2.0)
+        assert registro.histograma("h2", "H", buckets=[7.0]).buckets == (7.0,)
+
+    def test_buckets_configurados_depois_valem_para_histogramas_existentes(self):
+        """Testa que histogramas criados na importação seguem os buckets configurados depois."""
+        registro = RegistroPrometheus()
+        existente = registro.histograma("espera_segundos", "Espera")
+        proprio = registro.histograma("proprio_segundos", "Próprio", buckets=[7.0])
+        existente.observar(0.2)
+
+        registro.configurar_buckets([0.5, 2.0])
+        existente.observar(1.0)
+
+        assert existente.buckets == (0.5, 2.0)
+        assert existente.contagem() == 1
+        assert 'espera_segundos_bucket{le="2"} 1' in existente.exportar()
+        assert proprio.buckets == (7.0,)
+
+    def test_tipo_conflitante(self):
+        """Testa que o mesmo nome não pode ser registrado com outro tipo."""
+        registro = RegistroPrometheus()
+        registro.contador("m", "M")
+        with pytest.raises(ValueError):
+            registro.histograma("m", "M")
+
+    def test_zerar_mantem_metricas(self):
+        """Testa que zerar remove as séries mas mantém as métricas registradas."""
+        registro = RegistroPrometheus()
+        contador = registro.contador("x_total", "X")
+        contador.incrementar()
+        registro.zerar()
+
+        assert contador.valor() == 0
+        assert "# TYPE x_total counter" in registro.exportar()
+
+    def test_instrumentacao_alimenta_histograma_de_duracao(self):
+        """Testa que as medições da instrumentação chegam ao histograma de duração."""
+        with medir("llm", "teste_prometheus"):
+            pass
+
+        histograma = registro_prometheus.histograma(
+            "banco_agil_duracao_segundos", "", ("categoria", "nome")
+        )
+        assert histograma.contagem(categoria="llm", nome="teste_prometheus") >= 1
+
+
+class TestServidorMetricas:
+    """Testes para o endpoint HTTP de métricas."""
+
+    def test_endpoint_metrics(self):
+        """Testa que /metrics responde no formato de texto do Prometheus."""
+        registro_prometheus.contador("teste_servidor_total", "Teste").incrementar()
+        servidor = iniciar_servidor_metricas(porta=0, endereco="127.0.0.1")
+        try:
+            assert iniciar_servidor_metricas(porta=0) is servidor
+            with urlopen(f"http://127.0.0.1:{servidor.server_port}/metrics", timeout=5) as resposta:
+                corpo = resposta.read().decode("utf-8")
+                assert resposta.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        finally:
+            parar_servidor_metricas()
+
+        assert "teste_servidor_total 1" in corpo
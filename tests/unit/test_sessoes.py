@@ -0,0 +1,217 @@
+"""Testes unitários para os armazéns de sessão da API."""
+import os
+import sqlite3
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.core.sessoes import (
+    BYTES_SESSOES,
+    SESSOES_ATIVAS,
+    ArmazemMemoria,
+    CONFLITOS_SESSOES,
+    ArmazemSqlite,
+    ConflitoSessao,
+    criar_armazem,
+    estimar_bytes,
+)
+from src.core.state import estado_inicial
+
+
+@pytest.fixture(params=["memoria", "sqlite"])
+def armazem(request, temp_data_dir):
+    caminho = os.path.join(temp_data_dir, "sessoes.sqlite")
+    return criar_armazem(request.param, caminho)
+
+
+class TestArmazemSessoes:
+    """Testes comuns aos armazéns em memória e SQLite."""
+
+    @pytest.mark.asyncio
+    async def test_salvar_e_carregar_preserva_mensagens(self, armazem):
+        """Testa que o estado volta com as mensagens do LangChain."""
+        estado = {**estado_inicial(), "authenticated": True,
+                  "messages": [HumanMessage(content="Olá"), AIMessage(content="Informe seu CPF")]}
+        await armazem.salvar("s1", estado)
+
+        carregado = await armazem.carregar("s1")
+        assert carregado["authenticated"] is True
+        assert isinstance(carregado["messages"][0], HumanMessage)
+        assert carregado["messages"][1].content == "Informe seu CPF"
+        await armazem.fechar()
+
+    @pytest.mark.asyncio
+    async def test_sessao_inexistente(self, armazem):
+        """Testa carga e remoção de uma sessão que não existe."""
+        assert await armazem.carregar("nao-existe") is None
+        assert await armazem.remover("nao-existe") is False
+        await armazem.fechar()
+
+    @pytest.mark.asyncio
+    async def test_remover(self, armazem):
+        """Testa a remoção de uma sessão existente."""
+        await armazem.salvar("s1", estado_inicial())
+        assert await armazem.remover("s1") is True
+        assert await armazem.carregar("s1") is None
+        await armazem.fechar()
+
+    def test_lock_por_sessao(self, armazem):
+        """Testa que a mesma sessão recebe o mesmo lock enquanto ele está em uso."""
+        lock = armazem.lock("s1")
+        assert armazem.lock("s1") is lock
+        assert armazem.lock("s2") is not lock
+
+
+class TestArmazemSqlite:
+    """Testes específicos do armazém SQLite."""
+
+    @pytest.mark.asyncio
+    async def test_sessoes_persistem_entre_instancias(self, temp_data_dir):
+        """Testa que outro processo (outra instância) enxerga as sessões salvas."""
+        caminho = os.path.join(temp_data_dir, "sessoes.sqlite")
+        primeiro = ArmazemSqlite(caminho)
+        await primeiro.salvar("s1", {**estado_inicial(), "cpf": "12345678901"})
+        await primeiro.fechar()
+
+        segundo = ArmazemSqlite(caminho)
+        assert (await segundo.carregar("s1"))["cpf"] == "12345678901"
+        await segundo.fechar()
+
+
+    @pytest.mark.asyncio
+    async def test_turnos_concorrentes_entre_workers(self, temp_data_dir):
+        """Testa que o turno que salva por último, com uma versão vencida, é recusado em vez de sobrescrever."""
+        caminho = os.path.join(temp_data_dir, "sessoes.sqlite")
+        worker_a, worker_b = ArmazemSqlite(caminho), ArmazemSqlite(caminho)
+        await worker_a.salvar("s1", estado_inicial())
+        conflitos = CONFLITOS_SESSOES.valor()
+
+        estado_a, versao_a = await worker_a.carregar_versionado("s1")
+        estado_b, versao_b = await worker_b.carregar_versionado("s1")
+        await worker_a.salvar("s1", {**estado_a, "messages": [HumanMessage(content="a")]}, versao_a)
+        with pytest.raises(ConflitoSessao):
+            await worker_b.salvar("s1", {**estado_b, "messages": [HumanMessage(content="b")]}, versao_b)
+
+        assert (await worker_b.carregar("s1"))["messages"][0].content == "a"
+        assert (await worker_b.carregar_versionado("s1"))[1] == versao_a + 1
+        assert CONFLITOS_SESSOES.valor() == conflitos + 1
+        await worker_a.fechar()
+        await worker_b.fechar()
+
+    @pytest.mark.asyncio
+    async def test_arquivo_sem_versao_e_migrado(self, temp_data_dir):
+        """Testa que um arquivo criado antes do versionamento ganha a coluna de versão."""
+        caminho = os.path.join(temp_data_dir, "sessoes.sqlite")
+        with sqlite3.connect(caminho) as conexao:
+            conexao.execute(
+                "CREATE TABLE sessoes (sessao_id TEXT PRIMARY KEY, tipo TEXT NOT NULL, estado BLOB NOT NULL, "
+                "atualizado_em REAL NOT NULL)"
+            )
+        conexao.close()
+
+        armazem = ArmazemSqlite(caminho)
+        await armazem.salvar("s1", estado_inicial())
+        assert (await armazem.carregar_versionado("s1"))[1] == 0
+        await armazem.fechar()
+
+
+def test_criar_armazem_desconhecido():
+    """Testa que tipos de armazém desconhecidos são rejeitados."""
+    assert isinstance(criar_armazem("memoria"), ArmazemMemoria)
+    with pytest.raises(ValueError):
+        criar_armazem("redis")
+
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+
+def _estado(texto: str = "Olá") -> dict:
+    return {**estado_inicial(), "messages": [HumanMessage(content=texto)]}
+
+
+class TestArmazemMemoriaLimitado:
+    """Testes para a expulsão de sessões por LRU, ociosidade e memória."""
+
+    @pytest.mark.asyncio
+    async def test_expulsa_menos_usada_recentemente(self):
+        """Testa que, acima do limite de sessões, sai a menos usada recentemente."""
+        armazem = ArmazemMemoria(max_sessoes=2)
+        await armazem.salvar("a", _estado())
+        await armazem.salvar("b", _estado())
+        await armazem.carregar("a")
+        await armazem.salvar("c", _estado())
+
+        assert await armazem.carregar("b") is None
+        assert await armazem.carregar("a") is not None
+        assert len(armazem) == 2
+
+    @pytest.mark.asyncio
+    async def test_expulsa_sessoes_ociosas(self):
+        """Testa a expulsão por tempo sem turnos, inclusive na manutenção periódica."""
+        relogio = RelogioFalso()
+        armazem = ArmazemMemoria(ttl_ocioso_segundos=60, relogio=relogio)
+        await armazem.salvar("a", _estado())
+        relogio.agora = 30
+        await armazem.salvar("b", _estado())
+
+        relogio.agora = 70
+        await armazem.manutencao()
+
+        assert len(armazem) == 1
+        assert await armazem.carregar("b") is not None
+
+    @pytest.mark.asyncio
+    async def test_orcamento_de_memoria(self):
+        """Testa que o total estimado fica dentro do orçamento."""
+        tamanho = estimar_bytes(_estado("x" * 1000))
+        armazem = ArmazemMemoria(orcamento_bytes=tamanho * 2)
+        for sessao_id in ("a", "b", "c"):
+            await armazem.salvar(sessao_id, _estado("x" * 1000))
+
+        assert len(armazem) == 2
+        assert armazem.bytes_estimados == tamanho * 2
+        assert BYTES_SESSOES.valor() == tamanho * 2
+        assert SESSOES_ATIVAS.valor() == 2
+
+    @pytest.mark.asyncio
+    async def test_sessao_atual_nunca_e_expulsa(self):
+        """Testa que uma sessão maior que o orçamento continua disponível no turno."""
+        armazem = ArmazemMemoria(orcamento_bytes=10)
+        await armazem.salvar("a", _estado())
+        assert await armazem.carregar("a") is not None
+
+    @pytest.mark.asyncio
+    async def test_transbordo_para_disco(self, temp_data_dir):
+        """Testa que sessões expulsas vão para o disco e voltam no próximo acesso."""
+        transbordo = ArmazemSqlite(os.path.join(temp_data_dir, "transbordo.sqlite"))
+        armazem = ArmazemMemoria(max_sessoes=1, transbordo=transbordo)
+        await armazem.salvar("a", _estado("primeira"))
+        await armazem.salvar("b", _estado("segunda"))
+
+        assert await transbordo.carregar("a") is not None
+        recuperada = await armazem.carregar("a")
+        assert recuperada["messages"][0].content == "primeira"
+        # "b" foi para o disco ao dar lugar a "a"
+        assert await transbordo.carregar("a") is None
+        assert await transbordo.carregar("b") is not None
+
+        assert await armazem.remover("b") is True
+        assert await armazem.carregar("b") is None
+        await armazem.fechar()
+
+    @pytest.mark.asyncio
+    async def test_fechar_preserva_sessoes_no_transbordo(self, temp_data_dir):
+        """Testa que as sessões em memória vão para o disco no encerramento."""
+        caminho = os.path.join(temp_data_dir, "transbordo.sqlite")
+        armazem = criar_armazem("memoria", caminho)
+        await armazem.salvar("a", _estado())
+        await armazem.fechar()
+
+        reaberto = criar_armazem("memoria", caminho)
+        assert await reaberto.carregar("a") is not None
+        await reaberto.fechar()
@@ -2,7 +2,12 @@
 import responses
 from unittest.mock import patch
 
-from src.tools.cambio import consultar_cotacao_moeda
+from src.tools.cambio import (
+    CONSULTAS_CACHE_CAMBIO,
+    ERROS_PROVEDOR_CAMBIO,
+    cache_cotacoes,
+    consultar_cotacao_moeda,
+)
 
 
 class TestConsultarCotacaoMoeda:
@@ -192,3 +197,43 @@ class TestConsultarCotacaoMoeda:
 
         assert result["sucesso"] is True
         assert result["moeda"] == "USD"
+
+
+class TestCacheCotacoes:
+    """Testes para o cache de cotações e as métricas do provedor."""
+
+    @responses.activate
+    def test_segunda_consulta_usa_cache(self):
+        """Testa que a cotação recente é reutilizada sem nova chamada à API."""
+        responses.add(
+            responses.GET,
+            "https://api.exchangerate-api.com/v4/latest/USD",
+            json={"rates": {"BRL": 5.25}},
+            status=200
+        )
+        hits = CONSULTAS_CACHE_CAMBIO.valor(resultado="hit")
+
+        primeira = consultar_cotacao_moeda.invoke({"moeda": "USD"})
+        segunda = consultar_cotacao_moeda.invoke({"moeda": "usd"})
+
+        assert segunda == primeira
+        assert len(responses.calls) == 1
+        assert CONSULTAS_CACHE_CAMBIO.valor(resultado="hit") == hits + 1
+
+    @responses.activate
+    def test_falha_nao_vai_para_cache_e_conta_erros(self):
+        """Testa que falhas do provedor são contadas e não ficam em cache."""
+        for _ in range(3):
+            responses.add(
+                responses.GET,
+                "https://api.exchangerate-api.com/v4/latest/EUR",
+                status=500
+            )
+        erros = ERROS_PROVEDOR_CAMBIO.valor(tipo="resposta_invalida")
+
+        with patch('src.tools.cambio.time.sleep'):
+            result = consultar_cotacao_moeda.invoke({"moeda": "EUR"})
+
+        assert result["sucesso"] is False
+        assert cache_cotacoes.obter("EUR") is None
+        assert ERROS_PROVEDOR_CAMBIO.valor(tipo="resposta_invalida") == erros + 3
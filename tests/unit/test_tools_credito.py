@@ -1,7 +1,7 @@
 """Testes unitários para tools de crédito."""
 from unittest.mock import Mock, patch
 
-from src.tools.credito import consultar_limite_credito, solicitar_aumento_limite
+from src.tools.credito import SOLICITACOES_AUMENTO, consultar_limite_credito, solicitar_aumento_limite
 
 
 class TestConsultarLimiteCredito:
@@ -143,6 +143,19 @@ class TestSolicitarAumentoLimite:
         call_args = mock_database.atualizar_status_solicitacao.call_args
         assert call_args[0][2] == 'rejeitado'  # status
 
+    def test_aumento_conta_aprovacoes_e_rejeicoes(self, mock_database, sample_cliente_alto_score,
+                                                   sample_cliente_baixo_score):
+        """Testa os contadores de aprovações e rejeições expostos no /metrics."""
+        aprovados = SOLICITACOES_AUMENTO.valor(resultado="aprovado")
+        rejeitados = SOLICITACOES_AUMENTO.valor(resultado="rejeitado")
+
+        with patch('src.tools.credito.db', mock_database):
+            solicitar_aumento_limite.invoke({"cpf": sample_cliente_alto_score.cpf, "novo_limite": 20000.0})
+            solicitar_aumento_limite.invoke({"cpf": sample_cliente_baixo_score.cpf, "novo_limite": 10000.0})
+
+        assert SOLICITACOES_AUMENTO.valor(resultado="aprovado") == aprovados + 1
+        assert SOLICITACOES_AUMENTO.valor(resultado="rejeitado") == rejeitados + 1
+
     def test_aumento_erro_database(self, mock_database, sample_cliente):
         """Testa tratamento de erro do database."""
         mock_database.obter_cliente = Mock(side_effect=Exception("Erro de BD"))
@@ -0,0 +1,35 @@
+"""Testes unitários para a tool de registro da entrevista."""
+from src.tools.entrevista import registrar_dados_entrevista
+
+
+class TestRegistrarDadosEntrevista:
+    """Testes para a tool registrar_dados_entrevista."""
+
+    def test_registra_apenas_campos_informados(self):
+        """Testa que somente os campos informados são retornados."""
+        result = registrar_dados_entrevista.invoke({"renda_mensal": 5000})
+
+        assert result["sucesso"] is True
+        assert result["dados"] == {"renda_mensal": 5000.0}
+
+    def test_normaliza_tipo_emprego(self):
+        """Testa que o tipo de emprego é normalizado para minúsculas."""
+        result = registrar_dados_entrevista.invoke({"tipo_emprego": "Formal"})
+
+        assert result["dados"] == {"tipo_emprego": "formal"}
+
+    def test_descarta_valores_invalidos(self):
+        """Testa que valores inválidos não são registrados."""
+        result = registrar_dados_entrevista.invoke({
+            "tipo_emprego": "estagiario",
+            "renda_mensal": -10
+        })
+
+        assert result["sucesso"] is False
+        assert result["dados"] == {}
+
+    def test_limita_dependentes_em_tres(self):
+        """Testa que 3 ou mais dependentes são registrados como 3."""
+        result = registrar_dados_entrevista.invoke({"num_dependentes": 5, "tem_dividas": True})
+
+        assert result["dados"] == {"num_dependentes": 3, "tem_dividas": True}